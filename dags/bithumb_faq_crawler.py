@@ -1,6 +1,8 @@
 """
 빗썸 FAQ 크롤링 Airflow DAG
-매일 자동으로 빗썸 고객지원 센터 FAQ를 크롤링하여 MongoDB Atlas에 저장합니다.
+매시간 실행되어 재크롤링 시각이 된 빗썸 고객지원 센터 FAQ 아티클만 크롤링하여 MongoDB Atlas에 저장합니다.
+아티클별 재크롤링 간격은 변경 이력으로 추정하며(recrawl_scheduler), 전체 목록 발견과 삭제 정리는 하루 한 번 수행합니다.
+discover -> select -> fetch -> embed -> load 단계가 실행별 산출물 디렉토리(CRAWL_ARTIFACT_DIR)로 연결됩니다.
 app/scripts/data/crawl_bithumb_playwright.py를 사용합니다.
 """
 from datetime import datetime, timedelta
@@ -12,29 +14,20 @@ import os
 from pathlib import Path
 
 # 프로젝트 루트를 Python 경로에 추가
-# Airflow 컨테이너에서는 /opt/airflow/project로 마운트됨
+# Airflow 컨테이너에서는 /opt/airflow/project가 PYTHONPATH에 있으므로 DAG 파싱 때 경로 확인/추가를 생략
 project_root = Path('/opt/airflow/project')
-if not project_root.exists():
-    # 로컬 개발 환경에서는 상대 경로 사용
-    project_root = Path(__file__).parent.parent.parent
-sys.path.insert(0, str(project_root))
+if str(project_root) not in sys.path:
+    if not project_root.exists():
+        # 로컬 개발 환경에서는 상대 경로 사용
+        project_root = Path(__file__).parent.parent.parent
+    sys.path.insert(0, str(project_root))
 
-# 환경 변수 로드
-from dotenv import load_dotenv
+# 긴 대기(서킷 브레이커/속도 제한)를 triggerer에 넘기는 크롤링 단계 오퍼레이터
+# (파싱 시 PythonOperator만 import하고 트리거 모듈은 지연할 때 로드, 크롤러/임베딩 의존성은 읽지 않음)
+from airflow.scripts.crawl_triggers import DeferrableStageOperator
 
-# 1. 프로젝트 루트의 .env 파일 확인
-project_env = project_root / '.env'
-# 2. airflow 폴더의 .env 파일 확인
-airflow_dir = Path(__file__).parent.parent
-airflow_env = airflow_dir / '.env'
-
-# 프로젝트 루트 .env 먼저 로드
-if project_env.exists():
-    load_dotenv(project_env)
-
-# airflow/.env 파일이 있으면 우선순위로 로드 (override=True)
-if airflow_env.exists():
-    load_dotenv(airflow_env, override=True)
+# 태스크 시작 시 .env 로드 (DAG 파싱 때는 읽지 않음, DAG 구조에 쓰는 값은 docker-compose environment에서 읽음)
+from airflow.scripts.task_env import load_task_env
 
 default_args = {
     'owner': 'bithumb-crawler',
@@ -44,16 +37,23 @@ default_args = {
     'retries': 2,
     'retry_delay': timedelta(minutes=5),
     'start_date': datetime(2024, 1, 1),
+    'on_execute_callback': load_task_env,
 }
 
 dag = DAG(
     'bithumb_faq_crawler',
     default_args=default_args,
     description='빗썸 FAQ 크롤링 및 MongoDB Atlas 저장 (Playwright 사용)',
-    schedule_interval='0 2 * * *',  # 매일 오전 2시 실행
+    schedule_interval='0 * * * *',  # 매시간 실행 (재크롤링 시각이 된 아티클만 처리)
     catchup=False,
     tags=['bithumb', 'crawler', 'faq', 'mongodb', 'playwright'],
     max_active_runs=1,  # 동시 실행 방지
+    params={
+        # True면 새 세대 컬렉션에 전체 적재 후 인덱스를 만들고 한 번에 전환 (이전 세대는 롤백용 보존)
+        'full_rebuild': False,
+        # True면 크롤링 단계를 샘플링 프로파일러 + 함수 타이머로 측정 (CRAWL_PROFILE=true와 같음)
+        'profile': False,
+    },
 )
 
 
@@ -75,29 +75,43 @@ def check_playwright_installation(**context):
 
 
 def check_mongodb_connection(**context):
-    """MongoDB 연결 상태 확인 (Airflow 전용 모듈 사용)"""
-    import asyncio
+    """
+    MongoDB 연결 상태 확인 및 인덱스 보장 (Airflow 전용 모듈 사용)
+    인덱스 부트스트랩/실행 계획 확인은 전체 목록을 확인하는 실행(하루 한 번)이나 전체 재구축 때만 수행
+    """
     import logging
     
     logger = logging.getLogger(__name__)
     logger.info("MongoDB 연결 확인 시작...")
     
     # Airflow 전용 모듈 사용 (app과 완전히 분리)
+    from airflow.scripts.clients import run_async
     from airflow.scripts.mongodb_store import AirflowVectorStore
+    from airflow.scripts.recrawl_scheduler import RecrawlScheduler
+    
+    full_rebuild = context['params'].get('full_rebuild', False)
     
     async def _check():
         vector_store = AirflowVectorStore()
         connected = await vector_store.connect()
         if connected:
             logger.info("✅ MongoDB 연결 성공")
-            await vector_store.disconnect()
+            try:
+                # 인덱스 부트스트랩 및 주요 쿼리 실행 계획 확인 (검색 인덱스 조회/explain이 많아 매시간 실행은 생략)
+                if full_rebuild or await RecrawlScheduler(vector_store).discovery_due():
+                    await vector_store.ensure_indexes()
+                    await vector_store.verify_query_plans()
+                else:
+                    logger.info("발견 주기가 아니어서 인덱스 부트스트랩/실행 계획 확인을 생략합니다")
+            finally:
+                await vector_store.disconnect()
             return True
         else:
             logger.error("❌ MongoDB 연결 실패")
             return False
     
     try:
-        result = asyncio.run(_check())
+        result = run_async(_check())
         if not result:
             raise Exception("MongoDB 연결 실패 - 환경 변수(MONGODB_URI, MONGODB_DATABASE)를 확인하세요")
         return result
@@ -106,105 +120,216 @@ def check_mongodb_connection(**context):
         raise
 
 
-def run_crawl_bithumb_faq(**context):
-    """빗썸 FAQ 크롤링 실행 (Airflow 전용 모듈 사용)"""
-    import asyncio
+def _stage_run_dir(context):
+    """이번 DAG 실행의 산출물 디렉토리 (모든 단계가 run_id로 같은 경로 사용)"""
+    from airflow.scripts.pipeline_stages import run_directory
+    return run_directory(context['run_id'])
+
+
+def _profiled(context, label, run):
+    """
+    프로파일링이 켜져 있으면 run()을 프로파일 세션 안에서 실행
+    산출물(<태스크>.folded / .summary.txt / .json)은 실행 디렉토리의 profile/에 기록하고 경로를 XCom(profile)으로 전달
+    """
+    from airflow.scripts.profiling import maybe_profile
+    
+    enabled = context['params'].get('profile') or None
+    with maybe_profile(_stage_run_dir(context) / 'profile', label, enabled=enabled) as session:
+        result = run()
+    if session is not None:
+        context['ti'].xcom_push(key='profile', value={
+            'folded': session.result['folded'],
+            'summary': session.result['summary_text'],
+            'timers': session.result['timers'][:10],
+        })
+    return result
+
+
+def _run_with_store(stage):
+    """
+    MongoDB 연결 후 단계 실행 (stage: 저장소를 받는 코루틴 함수)
+    같은 태스크 프로세스에서 여러 번 호출해도 공유 이벤트 루프와 MongoDB/OpenAI 클라이언트(연결 풀)를 재사용
+    """
+    from airflow.scripts.clients import run_async
+    from airflow.scripts.mongodb_store import AirflowVectorStore
+    
+    async def _run():
+        vector_store = AirflowVectorStore()
+        connected = await vector_store.connect()
+        if not connected:
+            raise ConnectionError("MongoDB 연결 실패")
+        try:
+            return await stage(vector_store)
+        finally:
+            await vector_store.disconnect()
+    
+    return run_async(_run())
+
+
+def run_discover_articles(**context):
+    """1단계: 아티클 URL 발견 (브라우저, 마지막 전체 확인 후 RECRAWL_DISCOVERY_INTERVAL_HOURS가 지난 경우만)"""
     import logging
     
     logger = logging.getLogger(__name__)
-    logger.info("=" * 60)
-    logger.info("빗썸 FAQ 크롤링 시작 (Playwright 사용)")
-    logger.info("=" * 60)
+    from airflow.scripts.crawl_guard import CrawlDeadline
+    from airflow.scripts.pipeline_stages import discover_stage, prune_old_runs
+    from airflow.scripts.recrawl_scheduler import RecrawlScheduler
     
-    # Airflow 전용 크롤링 모듈 사용 (app과 완전히 분리)
-    from airflow.scripts.bithumb_crawler import crawl_bithumb_faq
+    run_dir = _stage_run_dir(context)
+    prune_old_runs(int(os.getenv('CRAWL_ARTIFACT_KEEP_RUNS', '7')), current=run_dir)
+    full_rebuild = context['params'].get('full_rebuild', False)
+    if not full_rebuild and not _run_with_store(lambda store: RecrawlScheduler(store).discovery_due()):
+        logger.info("최근 전체 목록 확인 이후 발견 주기가 지나지 않아 생략 (재크롤링 시각이 된 아티클만 처리)")
+        return 0
+    # 본문 추출과 같은 마감 시각 적용 (전체 재구축은 마감 없음)
+    if full_rebuild:
+        deadline = CrawlDeadline()
+    else:
+        deadline = CrawlDeadline.from_env(started_at=context['dag_run'].start_date)
+    # limit=None으로 설정하면 모든 아티클 크롤링 (목록 페이지 HTTP 검증자는 MongoDB에 보관)
+    stats = _profiled(context, 'discover', lambda: _run_with_store(
+        lambda store: discover_stage(run_dir, limit=None, headless=True, store=store, deadline=deadline)))
+    logger.info(f"✅ 아티클 URL 발견: {stats['urls']}개 (완전: {stats['complete']})")
+    if stats.get('http_cache'):
+        logger.info(f"목록 페이지 HTTP 캐시: {stats['http_cache']}")
+    context['ti'].xcom_push(key='discover_stats', value=stats)
+    return stats['urls']
+
+
+def run_select_articles(**context):
+    """크롤링 대상 선택: 신규 아티클 + 재크롤링 시각이 지난 아티클 (전체 재구축이면 발견된 전체)"""
+    import logging
     
-    try:
-        # Playwright 사용 크롤링 실행 (헤드리스 모드)
-        # limit=None으로 설정하면 모든 아티클 크롤링
-        asyncio.run(crawl_bithumb_faq(limit=None, headless=True))
-        logger.info("✅ 빗썸 FAQ 크롤링 완료")
-        
-        # Airflow XCom에 성공 정보 저장
-        context['ti'].xcom_push(key='crawl_status', value='success')
-        context['ti'].xcom_push(key='crawl_method', value='playwright')
-        return 'success'
-        
-    except Exception as e:
-        logger.error(f"❌ 빗썸 FAQ 크롤링 실패: {e}")
-        logger.exception("상세 오류 정보:")
-        
-        # Airflow XCom에 실패 정보 저장
-        context['ti'].xcom_push(key='crawl_status', value='failed')
-        context['ti'].xcom_push(key='crawl_error', value=str(e))
-        context['ti'].xcom_push(key='crawl_method', value='playwright')
-        raise
+    logger = logging.getLogger(__name__)
+    from airflow.scripts.pipeline_stages import select_stage
+    
+    run_dir = _stage_run_dir(context)
+    full_rebuild = context['params'].get('full_rebuild', False)
+    stats = _run_with_store(lambda store: select_stage(run_dir, store, full=full_rebuild))
+    logger.info(f"✅ 크롤링 대상: {stats['due']}개 (발견: {stats['discovered']})")
+    context['ti'].xcom_push(key='select_stats', value=stats)
+    return stats['due']
 
 
-def verify_mongodb_data(**context):
-    """MongoDB에 저장된 데이터 확인 (Airflow 전용 모듈 사용)"""
-    import asyncio
+def run_fetch_articles(**context):
+    """
+    2단계: 아티클 본문 추출 (브라우저)
+    DAG 실행 시작부터 CRAWL_DEADLINE_MINUTES가 지나면 추출한 아티클까지만 넘기고 부분 결과로 완료
+    (전체 재구축은 마감 없이 실행, triggerer에서 대기한 시간도 마감에 포함)
+    긴 서킷 브레이커 대기는 StageDeferred로 triggerer에 넘기고 재개 시 추출한 아티클 이후부터 처리
+    """
     import logging
-    from datetime import datetime, timedelta
     
     logger = logging.getLogger(__name__)
-    logger.info("MongoDB 데이터 확인 시작...")
+    from airflow.scripts.clients import run_async
+    from airflow.scripts.crawl_guard import CrawlDeadline
+    from airflow.scripts.pipeline_stages import fetch_stage
     
-    # Airflow 전용 모듈 사용 (app과 완전히 분리)
-    from airflow.scripts.mongodb_store import AirflowVectorStore
+    run_dir = _stage_run_dir(context)
+    if context['params'].get('full_rebuild', False):
+        deadline = CrawlDeadline()
+    else:
+        deadline = CrawlDeadline.from_env(started_at=context['dag_run'].start_date)
+    stats = _profiled(context, 'fetch',
+                      lambda: run_async(fetch_stage(run_dir, headless=True, deadline=deadline,
+                                                    defer_after=context.get('defer_after'))))
+    if stats.get('status') == 'partial':
+        logger.warning(f"⚠️ 본문 추출 부분 완료 ({stats['stopped']}): {stats['articles']}개, "
+                       f"미처리 {stats['remaining']}개 (다음 실행에서 처리)")
+    else:
+        logger.info(f"✅ 본문 추출: {stats['articles']}개 (실패 {len(stats['failed'])}개, "
+                    f"지연 실행 {stats.get('deferrals', 0)}회)")
+    if stats.get('http_cache'):
+        logger.info(f"HTTP 캐시: {stats['http_cache']}")
+    if stats.get('browser'):
+        browser = stats['browser']
+        logger.info(f"브라우저 재활용: {browser['recycles']}, 최대 RSS {browser['peak_rss_mb']}MB, "
+                    f"최대 JS 힙 {browser['peak_js_heap_mb']}MB")
+    context['ti'].xcom_push(key='fetch_stats', value=stats)
+    return stats['articles']
+
+
+def run_embed_articles(**context):
+    """3단계: 변경된 아티클 청크 임베딩 (임베딩 API, 긴 재시도 대기는 triggerer에서 대기 후 재개)"""
+    import logging
     
+    logger = logging.getLogger(__name__)
+    from airflow.scripts.pipeline_stages import embed_stage
+    
+    if context['params'].get('full_rebuild', False):
+        # 재구축은 적재 단계에서 기존 세대 재사용 여부를 판단하며 임베딩
+        logger.info("전체 재구축 모드 - 임베딩은 적재 단계에서 수행")
+        return 'skipped'
+    
+    run_dir = _stage_run_dir(context)
+    stats = _profiled(context, 'embed', lambda: _run_with_store(
+        lambda store: embed_stage(run_dir, store, defer_after=context.get('defer_after'))))
+    context['ti'].xcom_push(key='embed_stats', value=stats)
+    return stats['planned']
+
+
+def run_load_articles(**context):
+    """4단계: MongoDB 저장, 삭제된 아티클 정리 (전체 재구축이면 새 세대 적재 후 전환)"""
+    import logging
+    
+    logger = logging.getLogger(__name__)
+    from airflow.scripts.pipeline_stages import load_stage, rebuild_stage
+    
+    run_dir = _stage_run_dir(context)
+    # 실행 ID를 크롤링 세대로 사용 (이번 실행에서 확인되지 않은 아티클은 정리 대상)
+    crawl_generation = context['run_id']
+    if context['params'].get('full_rebuild', False):
+        summary = _profiled(context, 'rebuild',
+                            lambda: _run_with_store(lambda store: rebuild_stage(run_dir, store, crawl_generation)))
+        logger.info(f"✅ 재구축 전환 완료: {summary['previous']} -> {summary['generation']}")
+    else:
+        summary = _profiled(context, 'load',
+                            lambda: _run_with_store(lambda store: load_stage(run_dir, store, crawl_generation)))
+    
+    # 본문 추출이 마감/서킷 브레이커로 중단된 실행은 부분 결과로 기록
+    fetch_stats = context['ti'].xcom_pull(task_ids='crawling.fetch_articles', key='fetch_stats') or {}
+    status = 'partial' if fetch_stats.get('status') == 'partial' else 'success'
+    context['ti'].xcom_push(key='crawl_status', value=status)
+    context['ti'].xcom_push(key='crawl_summary', value=summary)
+    return status
+
+
+def run_retrieval_benchmark(**context):
+    """검색 지연시간/재현율 벤치마크와 인덱스 상태 수집 (결과는 XCom과 이력 컬렉션에 저장)"""
+    import logging
+    
+    logger = logging.getLogger(__name__)
+    from airflow.scripts.retrieval_benchmark import run_benchmark
+    
+    # 저장된 내용이 그대로인 매시간 실행은 측정 생략 (전체 목록을 확인한 실행은 항상 측정)
     ti = context['ti']
+    summary = ti.xcom_pull(task_ids='crawling.load_articles', key='crawl_summary') or {}
+    discovered = ti.xcom_pull(task_ids='crawling.discover_articles', key='discover_stats')
+    changed = summary.get('created') or summary.get('updated') or summary.get('sweep', {}).get('articles')
+    if not (discovered or changed or context['params'].get('full_rebuild', False)):
+        logger.info("변경된 아티클이 없어 검색 벤치마크를 생략합니다")
+        return True
     
-    async def _verify():
-        vector_store = AirflowVectorStore()
-        connected = await vector_store.connect()
-        if not connected:
-            logger.error("MongoDB 연결 실패")
-            return None
-        
-        try:
-            collection = vector_store.collection
-            if collection is None:
-                logger.error("MongoDB 컬렉션이 없습니다")
-                return None
-            
-            # 최근 24시간 내 저장된 zendesk_article 타입 문서 수
-            yesterday = datetime.utcnow() - timedelta(days=1)
-            
-            count = await collection.count_documents({
-                "metadata.type": "zendesk_article",
-                "created_at": {"$gte": yesterday}
-            })
-            
-            logger.info(f"✅ 최근 24시간 내 저장된 FAQ 문서 수: {count}개")
-            
-            # 전체 문서 수 확인
-            total_count = await collection.count_documents({
-                "metadata.type": "zendesk_article"
-            })
-            logger.info(f"📊 전체 FAQ 문서 수: {total_count}개")
-            
-            return {'count_24h': count, 'total': total_count}
-            
-        except Exception as e:
-            logger.error(f"데이터 확인 중 오류: {e}")
-            return None
-        finally:
-            await vector_store.disconnect()
+    report = _run_with_store(lambda store: run_benchmark(store, context['run_id']))
     
-    try:
-        result = asyncio.run(_verify())
-        if result:
-            # XCom에 통계 저장
-            ti.xcom_push(key='documents_count_24h', value=result['count_24h'])
-            ti.xcom_push(key='documents_count_total', value=result['total'])
-            return True
-        else:
-            logger.warning("⚠️ 데이터 확인 실패 (크롤링은 성공했을 수 있음)")
-            return False
-    except Exception as e:
-        logger.error(f"데이터 확인 중 오류: {e}")
-        return False
+    chunks = report['chunks']
+    logger.info(f"📊 청크 {chunks['total']}개 (임베딩 {chunks['embedded']}개, 중복 참조 {chunks['duplicates']}개, "
+                f"재임베딩 대상 {chunks['stale']}개), 벡터 검색 인덱스: {report['search_index']['status']}")
+    for mode in ('vector', 'lexical'):
+        result = report['searches'].get(mode)
+        if result and 'latency_ms' in result:
+            latency = result['latency_ms']
+            logger.info(f"✅ {mode} 검색 p50/p95/p99: {latency['p50']}/{latency['p95']}/{latency['p99']}ms, "
+                        f"recall@{report['k']}: {result['recall']['recall']}")
+    
+    ti.xcom_push(key='retrieval_benchmark', value=report)
+    # 회귀가 있으면 태스크를 실패시켜 DAG 실행 결과에 드러나게 함 (기록은 이미 이력 컬렉션에 저장됨)
+    if report['regressions'] and os.getenv('RETRIEVAL_BENCHMARK_FAIL_ON_REGRESSION', 'true').lower() == 'true':
+        from airflow.exceptions import AirflowFailException
+        
+        details = ', '.join(f"{r['mode']} {r['metric']} {r['baseline']} -> {r['current']}" for r in report['regressions'])
+        raise AirflowFailException(f"검색 성능 회귀 감지: {details}")
+    return True
 
 
 # 작업 정의
@@ -226,18 +351,58 @@ with TaskGroup("preparation", dag=dag) as prep_group:
     check_playwright >> check_mongodb
 
 with TaskGroup("crawling", dag=dag) as crawl_group:
-    """크롤링 작업 그룹"""
-    crawl_task = PythonOperator(
-        task_id='crawl_bithumb_faq',
-        python_callable=run_crawl_bithumb_faq,
+    """크롤링 작업 그룹 (단계별 산출물로 연결, 실패한 단계만 재시도)"""
+    # 브라우저 단계와 API 단계를 서로 다른 풀에서 실행 (풀은 Airflow에 미리 생성)
+    browser_pool = os.getenv('CRAWL_BROWSER_POOL', 'default_pool')
+    embedding_pool = os.getenv('CRAWL_EMBEDDING_POOL', 'default_pool')
+    
+    discover_task = PythonOperator(
+        task_id='discover_articles',
+        python_callable=run_discover_articles,
+        pool=browser_pool,
+        dag=dag,
+    )
+    
+    select_task = PythonOperator(
+        task_id='select_articles',
+        python_callable=run_select_articles,
         dag=dag,
     )
+    
+    # 마감 시각 처리가 멈춘 경우(브라우저 무응답 등)를 대비한 상한
+    deadline_minutes = float(os.getenv('CRAWL_DEADLINE_MINUTES', '45'))
+    # 본문 추출/임베딩은 긴 대기 동안 워커 슬롯을 반환 (CRAWL_DEFERRABLE=false면 태스크 안에서 대기)
+    fetch_task = DeferrableStageOperator(
+        task_id='fetch_articles',
+        python_callable=run_fetch_articles,
+        pool=browser_pool,
+        execution_timeout=timedelta(minutes=deadline_minutes + 15) if deadline_minutes else None,
+        dag=dag,
+    )
+    
+    embed_task = DeferrableStageOperator(
+        task_id='embed_articles',
+        python_callable=run_embed_articles,
+        pool=embedding_pool,
+        # 재시도는 체크포인트(부분 산출물)부터 이어서 실행
+        retries=4,
+        dag=dag,
+    )
+    
+    load_task = PythonOperator(
+        task_id='load_articles',
+        python_callable=run_load_articles,
+        retries=4,
+        dag=dag,
+    )
+    
+    discover_task >> select_task >> fetch_task >> embed_task >> load_task
 
 with TaskGroup("verification", dag=dag) as verify_group:
     """검증 작업 그룹"""
-    verify_data = PythonOperator(
-        task_id='verify_mongodb_data',
-        python_callable=verify_mongodb_data,
+    benchmark_task = PythonOperator(
+        task_id='retrieval_benchmark',
+        python_callable=run_retrieval_benchmark,
         dag=dag,
     )
 
@@ -0,0 +1,95 @@
+"""
+knowledge_base 재임베딩 Airflow DAG
+임베딩 모델/차원/버전 설정이 바뀐 뒤 수동으로 실행하여, 크롤링 없이
+현재 설정과 다른 임베딩을 가진 청크만 배치로 다시 임베딩합니다.
+중단되면 체크포인트에서 이어서 실행됩니다.
+"""
+from datetime import datetime, timedelta
+from airflow import DAG
+from airflow.operators.python import PythonOperator
+import sys
+from pathlib import Path
+
+# 프로젝트 루트를 Python 경로에 추가
+# Airflow 컨테이너에서는 /opt/airflow/project가 PYTHONPATH에 있으므로 DAG 파싱 때 경로 확인/추가를 생략
+project_root = Path('/opt/airflow/project')
+if str(project_root) not in sys.path:
+    if not project_root.exists():
+        # 로컬 개발 환경에서는 상대 경로 사용
+        project_root = Path(__file__).parent.parent.parent
+    sys.path.insert(0, str(project_root))
+
+# 태스크 시작 시 .env 로드 (DAG 파싱 때는 읽지 않음, DAG 구조에 쓰는 값은 docker-compose environment에서 읽음)
+from airflow.scripts.task_env import load_task_env
+
+default_args = {
+    'owner': 'bithumb-crawler',
+    'depends_on_past': False,
+    'email_on_failure': False,
+    'email_on_retry': False,
+    # 실패해도 체크포인트부터 재개하므로 재시도 횟수를 넉넉하게
+    'retries': 5,
+    'retry_delay': timedelta(minutes=5),
+    'on_execute_callback': load_task_env,
+    'start_date': datetime(2024, 1, 1),
+}
+
+dag = DAG(
+    'reembed_knowledge_base',
+    default_args=default_args,
+    description='knowledge_base 재임베딩 백필 (모델/차원/버전 변경 시 수동 실행)',
+    schedule_interval=None,  # 수동 실행
+    catchup=False,
+    tags=['mongodb', 'embedding', 'backfill'],
+    max_active_runs=1,  # 같은 체크포인트를 동시에 갱신하지 않도록
+    params={
+        'batch_size': 1000,            # 한 번에 임베딩/저장할 청크 수
+        'max_chunks_per_minute': 0,    # 분당 처리 상한 (0이면 RPM/TPM 예산만 적용)
+        'limit': 0,                    # 이번 실행 최대 처리 수 (0이면 끝까지)
+        'reset': False,                # True면 체크포인트를 지우고 처음부터
+    },
+)
+
+
+def run_reembed(**context):
+    """재임베딩 작업 실행 (Airflow 전용 모듈 사용)"""
+    import logging
+
+    logger = logging.getLogger(__name__)
+    params = context['params']
+
+    from airflow.scripts.clients import run_async
+    from airflow.scripts.mongodb_store import AirflowVectorStore
+    from airflow.scripts.reembed_job import ReembedJob
+
+    async def _run():
+        vector_store = AirflowVectorStore()
+        connected = await vector_store.connect()
+        if not connected:
+            raise ConnectionError("MongoDB 연결 실패")
+        try:
+            job = ReembedJob(
+                vector_store,
+                batch_size=int(params['batch_size']),
+                max_chunks_per_minute=int(params['max_chunks_per_minute']) or None,
+            )
+            return await job.run(reset=bool(params['reset']), limit=int(params['limit']) or None)
+        finally:
+            await vector_store.disconnect()
+
+    result = run_async(_run())
+    logger.info(f"✅ 재임베딩 {result['status']}: 이번 실행 {result['processed']}개, "
+                f"누적 {result['total_processed']}개, 남은 대상 {result['remaining']}개 "
+                f"({result['elapsed']:.0f}초)")
+
+    context['ti'].xcom_push(key='reembed_job_id', value=result['job_id'])
+    context['ti'].xcom_push(key='reembed_processed', value=result['processed'])
+    context['ti'].xcom_push(key='reembed_remaining', value=result['remaining'])
+    return result['status']
+
+
+reembed_task = PythonOperator(
+    task_id='reembed_stale_chunks',
+    python_callable=run_reembed,
+    dag=dag,
+)
@@ -0,0 +1,120 @@
+"""
+청크 분할 벤치마크 스크립트
+구버전 문자 기반 split_text와 토큰 예산 기반 청크 분할을 비교합니다.
+JSONL에 본문 구조 블록(blocks)이 있으면 구조 기반 분할도 함께 비교합니다.
+
+사용 예:
+    python airflow/scripts/benchmark_chunker.py --articles 50 --paragraphs 400
+    python airflow/scripts/benchmark_chunker.py --jsonl articles.jsonl
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from airflow.scripts.mongodb_store import AirflowVectorStore
+from airflow.scripts.text_chunker import TokenChunker
+
+# 합성 아티클 생성용 문장 조각
+_SAMPLE_SENTENCES = [
+    "빗썸 앱에서 원화 입금 한도를 확인할 수 있습니다.",
+    "출금 주소를 잘못 입력한 경우 복구가 어려우니 반드시 확인해 주세요.",
+    "BTC, ETH 등 주요 가상자산의 출금 수수료는 네트워크 상황에 따라 달라집니다.",
+    "고객센터 운영 시간은 평일 오전 9시부터 오후 6시까지입니다.",
+    "본인인증이 완료되지 않은 계정은 일부 서비스 이용이 제한됩니다.",
+    "오류 코드 E1001이 표시되면 앱을 최신 버전으로 업데이트해 주세요.",
+    "투자 유의 종목으로 지정된 가상자산은 거래 지원이 종료될 수 있습니다.",
+]
+
+
+def build_synthetic_articles(count: int, paragraphs: int, seed: int = 42):
+    """문단/목록/짧은 줄이 섞인 대용량 합성 아티클 생성"""
+    rng = random.Random(seed)
+    articles = []
+    for _ in range(count):
+        blocks = []
+        for _ in range(paragraphs):
+            kind = rng.random()
+            if kind < 0.6:
+                blocks.append(" ".join(rng.choice(_SAMPLE_SENTENCES) for _ in range(rng.randint(1, 8))))
+            elif kind < 0.9:
+                blocks.append("\n".join(f"{n}. {rng.choice(_SAMPLE_SENTENCES)}" for n in range(1, rng.randint(2, 6))))
+            else:
+                blocks.append(rng.choice(_SAMPLE_SENTENCES)[:12])
+        articles.append("\n\n".join(blocks))
+    return articles
+
+
+def load_articles(jsonl_path: str):
+    """크롤링 결과 JSONL에서 아티클 로드"""
+    with open(jsonl_path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def summarize(name, elapsed, token_counts, budget):
+    """청크별 토큰 수 통계 출력"""
+    over = sum(1 for t in token_counts if t > budget)
+    under = sum(1 for t in token_counts if t < budget // 4)
+    print(f"\n[{name}]")
+    print(f"  소요 시간: {elapsed * 1000:.1f} ms")
+    print(f"  청크 수: {len(token_counts)}")
+    print(f"  임베딩 토큰 합계: {sum(token_counts)}")
+    print(f"  청크당 토큰: 평균 {statistics.mean(token_counts):.0f}, 최대 {max(token_counts)}")
+    print(f"  예산 초과 청크: {over}개, 예산 25% 미만 청크: {under}개")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="청크 분할 벤치마크")
+    parser.add_argument("--jsonl", help="크롤링된 아티클 JSONL 경로 (없으면 합성 데이터 사용)")
+    parser.add_argument("--articles", type=int, default=20, help="합성 아티클 수")
+    parser.add_argument("--paragraphs", type=int, default=300, help="합성 아티클당 문단 수")
+    parser.add_argument("--max-tokens", type=int, default=500, help="토큰 예산")
+    parser.add_argument("--overlap-tokens", type=int, default=50, help="토큰 겹침")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="구버전 문자 기준 청크 크기")
+    parser.add_argument("--overlap", type=int, default=200, help="구버전 문자 겹침")
+    args = parser.parse_args()
+
+    if args.jsonl:
+        articles = load_articles(args.jsonl)
+        texts = [article["full_text"] for article in articles]
+    else:
+        articles = []
+        texts = build_synthetic_articles(args.articles, args.paragraphs)
+    print(f"아티클 {len(texts)}개, 총 {sum(len(t) for t in texts):,}자")
+
+    store = AirflowVectorStore()
+    chunker = TokenChunker(store.embedding_model, max_tokens=args.max_tokens, overlap_tokens=args.overlap_tokens,
+                           tokenizer_loader=store.embedding_backend.tokenizer_loader())
+
+    started = time.perf_counter()
+    legacy_chunks = [c for t in texts for c in store.split_text(t, chunk_size=args.chunk_size, overlap=args.overlap)]
+    legacy_elapsed = time.perf_counter() - started
+
+    started = time.perf_counter()
+    token_chunks = [c for t in texts for c in chunker.split(t)]
+    token_elapsed = time.perf_counter() - started
+
+    # 토큰 수는 두 방식 모두 같은 토크나이저로 측정 (측정 시간은 제외)
+    summarize("split_text (문자 기준)", legacy_elapsed,
+              [chunker.count_tokens(c) for c in legacy_chunks], args.max_tokens)
+    summarize("TokenChunker (토큰 기준)", token_elapsed,
+              [chunker.count_tokens(c["text"]) for c in token_chunks], args.max_tokens)
+
+    structured = [a for a in articles if a.get("blocks")]
+    if structured:
+        started = time.perf_counter()
+        block_chunks = [c for a in structured for c in chunker.split_blocks(a["blocks"], title=a.get("title"))]
+        block_elapsed = time.perf_counter() - started
+        summarize(f"TokenChunker.split_blocks (구조 기준, 아티클 {len(structured)}개)", block_elapsed,
+                  [c["tokens"] for c in block_chunks], args.max_tokens)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+임베딩 백엔드 처리량 벤치마크 스크립트
+크롤링 결과 JSONL(또는 합성 아티클)을 청크로 나눈 뒤 지정한 백엔드로 임베딩하여
+모델 로드 시간과 청크/토큰 처리량을 측정합니다. local 백엔드는 네트워크 없이 실행됩니다.
+
+사용 예:
+    python airflow/scripts/benchmark_embeddings.py --backend local --threads 4 --batch-size 64
+    python airflow/scripts/benchmark_embeddings.py --backend openai --jsonl articles.jsonl
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+# 환경 변수 로드
+from dotenv import load_dotenv
+
+# 1. 프로젝트 루트의 .env 파일 확인
+project_env = project_root / '.env'
+# 2. airflow 폴더의 .env 파일 확인
+airflow_dir = Path(__file__).parent.parent
+airflow_env = airflow_dir / '.env'
+
+if project_env.exists():
+    load_dotenv(project_env)
+if airflow_env.exists():
+    load_dotenv(airflow_env, override=True)
+
+from airflow.scripts.benchmark_chunker import build_synthetic_articles, load_articles
+
+
+async def run(args):
+    """청크 분할 후 백엔드 임베딩 처리량 측정"""
+    # 명령행 설정을 환경 변수로 넘겨 저장소와 같은 방식으로 백엔드 생성
+    os.environ["EMBEDDING_BACKEND"] = args.backend
+    if args.threads:
+        os.environ["LOCAL_EMBEDDING_THREADS"] = str(args.threads)
+    if args.batch_size:
+        os.environ["LOCAL_EMBEDDING_BATCH_SIZE"] = str(args.batch_size)
+    if args.model:
+        os.environ["LOCAL_EMBEDDING_MODEL" if args.backend == "local" else "OPENAI_EMBEDDING_MODEL"] = args.model
+
+    from airflow.scripts.mongodb_store import AirflowVectorStore
+
+    if args.jsonl:
+        articles = load_articles(args.jsonl)
+    else:
+        articles = [{"full_text": text} for text in build_synthetic_articles(args.articles, args.paragraphs)]
+
+    store = AirflowVectorStore()
+    chunks = [chunk["text"] for article in articles for chunk in store.chunk_article(article)]
+    tokens = sum(store.chunker.count_tokens(text) for text in chunks)
+    print(f"백엔드: {store.embedding_backend.name}, 모델: {store.embedding_model} ({store.embedding_dimensions}차원)")
+    print(f"아티클 {len(articles)}개, 청크 {len(chunks)}개, 토큰 {tokens:,}개")
+
+    started = time.perf_counter()
+    store.embedding_backend.warm_load()
+    print(f"모델 로드: {time.perf_counter() - started:.2f}초")
+
+    started = time.perf_counter()
+    vectors = await store.create_embeddings(chunks)
+    elapsed = time.perf_counter() - started
+    print(f"임베딩: {elapsed:.2f}초, {len(vectors) / elapsed:.1f} 청크/초, {tokens / elapsed:,.0f} 토큰/초")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="임베딩 백엔드 처리량 벤치마크")
+    parser.add_argument("--backend", choices=["openai", "local"], default="local", help="임베딩 백엔드")
+    parser.add_argument("--model", help="모델 이름 (생략하면 환경 변수 설정 사용)")
+    parser.add_argument("--threads", type=int, help="local 백엔드 추론 스레드 수")
+    parser.add_argument("--batch-size", type=int, help="local 백엔드 배치 크기")
+    parser.add_argument("--jsonl", help="크롤링된 아티클 JSONL 경로 (없으면 합성 데이터 사용)")
+    parser.add_argument("--articles", type=int, default=20, help="합성 아티클 수")
+    parser.add_argument("--paragraphs", type=int, default=50, help="합성 아티클당 문단 수")
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""
+DAG 파싱 시간 / 태스크 시작 시간 벤치마크 스크립트
+- parse: 새 인터프리터에서 DAG 파일을 반복 실행해 파싱 시간, 새로 import된 무거운 모듈, 연 파일(.env 등)을 측정
+  (Airflow 자체 import는 스케줄러 프로세스처럼 미리 해 두고 DAG 파일 실행 시간만 측정)
+  --baseline-ref로 이전 커밋의 DAG 파일을 함께 측정해 비교
+- startup: 태스크처럼 저장소 생성 + MongoDB 연결 + ping + 해제를 반복해 클라이언트 재사용(run_async + 공유 연결 풀)과
+  기존 방식(asyncio.run + 태스크마다 새 클라이언트)을 비교 (MONGODB_URI 필요)
+
+사용 예:
+    python airflow/scripts/benchmark_startup.py parse --repeat 5
+    python airflow/scripts/benchmark_startup.py parse --baseline-ref HEAD~1
+    python airflow/scripts/benchmark_startup.py startup --iterations 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from airflow.scripts.task_env import AIRFLOW_DIR, AIRFLOW_ENV, PROJECT_ENV, load_task_env
+
+# DAG 파싱 시 import되면 안 되는 무거운 모듈 (태스크 실행 시점에만 필요)
+HEAVY_MODULES = ["dotenv", "motor", "pymongo", "openai", "numpy", "tiktoken", "playwright", "pyarrow",
+                 "sentence_transformers", "airflow.scripts.mongodb_store", "airflow.scripts.pipeline_stages"]
+# 파일 열기 집계에서 제외할 확장자 (모듈 import)
+CODE_SUFFIXES = (".py", ".pyc", ".so", ".pth", ".pyd")
+
+# 새 인터프리터에서 실행할 파싱 측정 코드 (argv: DAG 파일 경로, JSON 결과를 stdout 마지막 줄에 출력)
+PARSE_PROBE = r'''
+import importlib.util, json, sys, time
+from airflow import DAG
+from airflow.operators.python import PythonOperator
+from airflow.utils.task_group import TaskGroup
+
+heavy, suffixes = json.loads(sys.argv[2]), tuple(json.loads(sys.argv[3]))
+opened = []
+def hook(event, args):
+    if event == "open" and isinstance(args[0], str) and not args[0].endswith(suffixes):
+        opened.append(args[0])
+before = set(sys.modules)
+sys.addaudithook(hook)
+spec = importlib.util.spec_from_file_location("benchmark_dag_module", sys.argv[1])
+module = importlib.util.module_from_spec(spec)
+started = time.perf_counter()
+spec.loader.exec_module(module)
+elapsed = time.perf_counter() - started
+new_modules = set(sys.modules) - before
+print(json.dumps({
+    "elapsed": elapsed,
+    "new_modules": len(new_modules),
+    "heavy_modules": sorted(m for m in heavy if m in new_modules),
+    "opened_files": sorted(set(p for p in opened if "/site-packages/" not in p)),
+}))
+'''
+
+
+def run_probe(dag_path: Path, env: dict) -> dict:
+    """새 인터프리터에서 DAG 파일 1회 파싱 측정"""
+    result = subprocess.run(
+        [sys.executable, "-c", PARSE_PROBE, str(dag_path), json.dumps(HEAVY_MODULES), json.dumps(CODE_SUFFIXES)],
+        capture_output=True, text=True, env=env,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"DAG 파싱 실패 ({dag_path}):\n{result.stderr[-2000:]}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def measure_parse(dag_path: Path, repeat: int, env: dict) -> dict:
+    """DAG 파일 파싱 repeat회 측정 (시간은 중앙값/최소값, 모듈/파일은 첫 실행 기준)"""
+    runs = [run_probe(dag_path, env) for _ in range(repeat)]
+    times = [r["elapsed"] for r in runs]
+    return {
+        "median_ms": round(statistics.median(times) * 1000, 1),
+        "min_ms": round(min(times) * 1000, 1),
+        "new_modules": runs[0]["new_modules"],
+        "heavy_modules": runs[0]["heavy_modules"],
+        "opened_files": runs[0]["opened_files"],
+    }
+
+
+def baseline_copy(ref: str, dag_path: Path, workdir: Path) -> Path:
+    """
+    이전 커밋의 DAG 파일을 임시 디렉토리에 같은 상대 경로로 복원 (.env는 원래 파일을 링크해 같은 I/O가 일어나게 함)
+    반환값: 복원한 DAG 파일 경로
+    """
+    relative = dag_path.resolve().relative_to(AIRFLOW_DIR.resolve())
+    source = subprocess.run(["git", "-C", str(AIRFLOW_DIR), "show", f"{ref}:./{relative.as_posix()}"],
+                            capture_output=True, text=True, check=True).stdout
+    target = workdir / AIRFLOW_DIR.name / relative
+    target.parent.mkdir(parents=True)
+    target.write_text(source, encoding="utf-8")
+    for env_file, link in ((PROJECT_ENV, workdir / ".env"), (AIRFLOW_ENV, workdir / AIRFLOW_DIR.name / ".env")):
+        if env_file.exists():
+            link.symlink_to(env_file.resolve())
+    return target
+
+
+def print_parse(name: str, stats: dict):
+    print(f"  {name}: 중앙값 {stats['median_ms']}ms (최소 {stats['min_ms']}ms), 새 모듈 {stats['new_modules']}개")
+    print(f"    무거운 모듈: {', '.join(stats['heavy_modules']) or '없음'}")
+    print(f"    연 파일: {', '.join(stats['opened_files']) or '없음'}")
+
+
+def benchmark_parse(args):
+    """DAG 파일 파싱 측정 (--baseline-ref가 있으면 같은 조건으로 이전 버전도 측정)"""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(p for p in (str(project_root), env.get("PYTHONPATH")) if p)
+    dag_files = [Path(p) for p in args.dag] if args.dag else sorted((AIRFLOW_DIR / "dags").glob("*.py"))
+    results = {}
+    for dag_path in dag_files:
+        print(f"\n📄 {dag_path.name} (새 인터프리터 {args.repeat}회)")
+        current = measure_parse(dag_path, args.repeat, env)
+        print_parse("현재", current)
+        results[dag_path.name] = {"current": current}
+        if args.baseline_ref:
+            with tempfile.TemporaryDirectory() as workdir:
+                baseline = measure_parse(baseline_copy(args.baseline_ref, dag_path, Path(workdir)), args.repeat, env)
+            print_parse(args.baseline_ref, baseline)
+            results[dag_path.name]["baseline"] = baseline
+    return results
+
+
+def startup_iterations(iterations: int, reuse: bool) -> list:
+    """
+    태스크 시작 경로 반복 측정 (저장소 생성 + 연결 + ping + 해제)
+    reuse=True면 DAG 태스크와 같이 run_async + 공유 클라이언트, False면 asyncio.run + 매번 새 클라이언트
+    반환값: 반복별 소요 시간(초) 목록
+    """
+    os.environ["MONGODB_CLIENT_REUSE"] = "true" if reuse else "false"
+    from airflow.scripts.clients import close_clients, run_async
+    from airflow.scripts.mongodb_store import AirflowVectorStore
+
+    async def _task():
+        store = AirflowVectorStore()
+        if not await store.connect():
+            raise ConnectionError("MongoDB 연결 실패")
+        try:
+            await store.db.command("ping")
+        finally:
+            await store.disconnect()
+
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        if reuse:
+            run_async(_task())
+        else:
+            asyncio.run(_task())
+        timings.append(time.perf_counter() - started)
+    close_clients()
+    return timings
+
+
+def benchmark_startup(args):
+    """태스크 시작 측정 (모듈 import는 첫 반복 전에 끝나므로 연결/풀 준비 시간 비교)"""
+    if not os.getenv("MONGODB_URI"):
+        print("[ERROR] MONGODB_URI 환경변수가 설정되지 않았습니다.")
+        return {}
+    import_started = time.perf_counter()
+    import airflow.scripts.mongodb_store  # noqa: F401
+    print(f"\n📦 저장소 모듈 import: {(time.perf_counter() - import_started) * 1000:.0f}ms")
+
+    results = {}
+    for name, reuse in (("legacy", False), ("shared", True)):
+        timings = startup_iterations(args.iterations, reuse)
+        results[name] = {
+            "first_ms": round(timings[0] * 1000, 1),
+            "next_median_ms": round(statistics.median(timings[1:]) * 1000, 1) if len(timings) > 1 else None,
+            "total_ms": round(sum(timings) * 1000, 1),
+        }
+        label = "공유 클라이언트 (run_async)" if reuse else "태스크마다 새 클라이언트 (asyncio.run)"
+        print(f"  {label}: 첫 실행 {results[name]['first_ms']}ms, "
+              f"이후 중앙값 {results[name]['next_median_ms']}ms, 합계 {results[name]['total_ms']}ms")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DAG 파싱 / 태스크 시작 시간 벤치마크")
+    parser.add_argument("--json", action="store_true", help="결과를 JSON으로 출력")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    parse_parser = subparsers.add_parser("parse", help="DAG 파일 파싱 시간/무거운 import/파일 I/O 측정")
+    parse_parser.add_argument("--dag", action="append", help="측정할 DAG 파일 (여러 번 지정 가능, 기본: dags/*.py)")
+    parse_parser.add_argument("--repeat", type=int, default=5, help="DAG 파일별 반복 횟수")
+    parse_parser.add_argument("--baseline-ref", help="비교할 이전 git 커밋/브랜치 (예: HEAD~1)")
+
+    startup_parser = subparsers.add_parser("startup", help="태스크 시작(MongoDB 연결) 시간 측정")
+    startup_parser.add_argument("--iterations", type=int, default=10, help="방식별 반복 횟수 (태스크 수)")
+
+    args = parser.parse_args()
+    if not load_task_env():
+        print("[WARNING] .env 파일을 찾을 수 없습니다.")
+    results = benchmark_parse(args) if args.command == "parse" else benchmark_startup(args)
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -5,17 +5,26 @@ app과 완전히 분리된 독립적인 모듈
 """
 import asyncio
 import logging
+import time
 from typing import List, Dict, Optional, Set, TYPE_CHECKING
 import re
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, Comment, NavigableString, Tag
 from datetime import datetime
 
+from .browser_recycler import PageRecycler
+from .http_cache import CHANGED, NOT_MODIFIED, UNCHANGED, ConditionalFetcher, ValidatorStore, http_cache_enabled
+from .crawl_guard import (CircuitBreaker, CircuitOpenError, CrawlBlockedError, CrawlDeadline, detect_challenge,
+                          page_timeout_ms, stop_reason)
+from .profiling import default_profile_dir, maybe_profile, profiled
+
 # Playwright 설정
 try:
     from playwright.async_api import async_playwright, Browser, Page
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
     PLAYWRIGHT_AVAILABLE = True
 except ImportError:
     PLAYWRIGHT_AVAILABLE = False
+    PlaywrightTimeoutError = TimeoutError
     # 타입 힌트를 위한 더미 클래스
     if TYPE_CHECKING:
         from playwright.async_api import Page
@@ -29,10 +38,65 @@ except ImportError:
 BASE_URL = "https://support.bithumb.com"
 LOCALE = "ko"
 HELP_CENTER_BASE = f"{BASE_URL}/hc/{LOCALE}"
+ARTICLE_ID_PATTERN = re.compile(r'/articles/(\d+)')
 
 logger = logging.getLogger(__name__)
 
 
+def extract_image_info(img) -> Dict:
+    """img 태그 하나에서 이미지 정보 추출 (URL, alt, title, 캡션, 주변 텍스트)"""
+    img_info = {}
+    
+    # 이미지 URL 추출
+    img_url = img.get('src') or img.get('data-src') or img.get('data-lazy-src')
+    if img_url:
+        if img_url.startswith('//'):
+            img_url = f"https:{img_url}"
+        elif img_url.startswith('/'):
+            img_url = f"{BASE_URL}{img_url}"
+        elif not img_url.startswith('http'):
+            return {}
+        
+        img_info['url'] = img_url
+    
+    # Alt 텍스트 추출
+    alt_text = img.get('alt', '').strip()
+    if alt_text:
+        img_info['alt'] = alt_text
+    
+    # Title 속성 추출
+    title_text = img.get('title', '').strip()
+    if title_text:
+        img_info['title'] = title_text
+    
+    # 이미지 주변 텍스트 추출
+    parent = img.find_parent(['figure', 'div', 'p'])
+    if parent:
+        caption = parent.find(class_=re.compile(r'caption|figcaption|image.*caption', re.I))
+        if caption:
+            caption_text = caption.get_text(strip=True)
+            if caption_text:
+                img_info['caption'] = caption_text
+        
+        img_text_parts = []
+        prev_sibling = img.find_previous_sibling(['p', 'div', 'span'])
+        if prev_sibling:
+            prev_text = prev_sibling.get_text(strip=True)
+            if prev_text and len(prev_text) < 200:
+                img_text_parts.append(prev_text)
+        
+        next_sibling = img.find_next_sibling(['p', 'div', 'span'])
+        if next_sibling:
+            next_text = next_sibling.get_text(strip=True)
+            if next_text and len(next_text) < 200:
+                img_text_parts.append(next_text)
+        
+        if img_text_parts:
+            img_info['context'] = ' '.join(img_text_parts)
+    
+    return img_info
+
+
 def extract_images_from_element(soup: BeautifulSoup) -> List[Dict]:
     """요소에서 이미지 정보 추출"""
     images = []
@@ -40,280 +104,531 @@ def extract_images_from_element(soup: BeautifulSoup) -> List[Dict]:
     if not soup:
         return images
     
-    img_tags = soup.find_all('img')
+    for img in soup.find_all('img'):
+        img_info = extract_image_info(img)
+        if img_info:
+            images.append(img_info)
     
+    return images
+
+
+def describe_image(img: Dict) -> str:
+    """이미지 정보를 검색용 설명 텍스트로 변환"""
+    img_desc_parts = []
+    if img.get('alt'):
+        img_desc_parts.append(f"[이미지 설명: {img['alt']}]")
+    if img.get('caption'):
+        img_desc_parts.append(f"[이미지 캡션: {img['caption']}]")
+    if img.get('context'):
+        img_desc_parts.append(f"[이미지 주변 설명: {img['context']}]")
+    return ' '.join(img_desc_parts)
+
+
+# 구조 블록 추출용 태그 분류
+HEADING_TAGS = {'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+LIST_TAGS = {'ul', 'ol'}
+TEXT_BLOCK_TAGS = {'p', 'pre', 'blockquote', 'dl'}
+BLOCK_LEVEL_TAGS = HEADING_TAGS | LIST_TAGS | TEXT_BLOCK_TAGS | {
+    'table', 'figure', 'div', 'section', 'article', 'img', 'hr',
+}
+# 인라인 요소 안에 이 태그가 있으면 컨테이너로 보고 재귀
+CONTAINER_MARKER_TAGS = sorted(BLOCK_LEVEL_TAGS - {'img'})
+
+
+def _image_descriptions(element: Tag) -> List[str]:
+    """요소 내부 이미지의 설명 텍스트 목록"""
+    if element.name == 'img':
+        img_tags = [element]
+    else:
+        img_tags = element.find_all('img')
+    descriptions = []
     for img in img_tags:
-        img_info = {}
-        
-        # 이미지 URL 추출
-        img_url = img.get('src') or img.get('data-src') or img.get('data-lazy-src')
-        if img_url:
-            if img_url.startswith('//'):
-                img_url = f"https:{img_url}"
-            elif img_url.startswith('/'):
-                img_url = f"{BASE_URL}{img_url}"
-            elif not img_url.startswith('http'):
-                continue
-            
-            img_info['url'] = img_url
-        
-        # Alt 텍스트 추출
-        alt_text = img.get('alt', '').strip()
-        if alt_text:
-            img_info['alt'] = alt_text
+        desc = describe_image(extract_image_info(img))
+        if desc:
+            descriptions.append(desc)
+    return descriptions
+
+
+def _list_to_text(list_elem: Tag) -> str:
+    """목록을 항목 단위 줄 텍스트로 변환 (순서 목록은 번호 유지)"""
+    ordered = list_elem.name == 'ol'
+    lines = []
+    for i, item in enumerate(list_elem.find_all('li', recursive=False), 1):
+        item_text = item.get_text(' ', strip=True)
+        if item_text:
+            lines.append(f"{i}. {item_text}" if ordered else f"- {item_text}")
+    return '\n'.join(lines)
+
+
+def _table_to_text(table: Tag) -> str:
+    """표를 행 단위 텍스트로 변환"""
+    rows = []
+    for tr in table.find_all('tr'):
+        cells = [cell.get_text(' ', strip=True) for cell in tr.find_all(['th', 'td'])]
+        if any(cells):
+            rows.append(' | '.join(cells))
+    return '\n'.join(rows)
+
+
+def _collect_blocks(element: Tag, blocks: List[Dict]):
+    """DOM을 순회하며 구조 블록 수집 (연속된 인라인 노드는 한 문단으로 묶음)"""
+    inline_parts: List[str] = []
+    inline_images: List[str] = []
+    
+    def flush_inline():
+        text = ' '.join(' '.join(inline_parts).split())
+        if text or inline_images:
+            blocks.append({"type": "paragraph", "text": text, "images": list(inline_images)})
+        inline_parts.clear()
+        inline_images.clear()
+    
+    for child in element.children:
+        if isinstance(child, Comment):
+            continue
+        if isinstance(child, NavigableString):
+            if child.strip():
+                inline_parts.append(child.strip())
+            continue
+        if not isinstance(child, Tag):
+            continue
         
-        # Title 속성 추출
-        title_text = img.get('title', '').strip()
-        if title_text:
-            img_info['title'] = title_text
+        name = child.name
+        is_container = name not in BLOCK_LEVEL_TAGS and child.find(CONTAINER_MARKER_TAGS) is not None
+        if name not in BLOCK_LEVEL_TAGS and not is_container:
+            # 인라인 요소 (a, strong, span 등)
+            child_text = child.get_text(' ', strip=True)
+            if child_text:
+                inline_parts.append(child_text)
+            inline_images.extend(_image_descriptions(child))
+            continue
         
-        # 이미지 주변 텍스트 추출
-        parent = img.find_parent(['figure', 'div', 'p'])
-        if parent:
-            caption = parent.find(class_=re.compile(r'caption|figcaption|image.*caption', re.I))
-            if caption:
-                caption_text = caption.get_text(strip=True)
-                if caption_text:
-                    img_info['caption'] = caption_text
-            
-            img_text_parts = []
-            prev_sibling = img.find_previous_sibling(['p', 'div', 'span'])
-            if prev_sibling:
-                prev_text = prev_sibling.get_text(strip=True)
-                if prev_text and len(prev_text) < 200:
-                    img_text_parts.append(prev_text)
-            
-            next_sibling = img.find_next_sibling(['p', 'div', 'span'])
-            if next_sibling:
-                next_text = next_sibling.get_text(strip=True)
-                if next_text and len(next_text) < 200:
-                    img_text_parts.append(next_text)
-            
-            if img_text_parts:
-                img_info['context'] = ' '.join(img_text_parts)
+        flush_inline()
         
-        if img_info:
-            images.append(img_info)
+        if name in HEADING_TAGS:
+            heading_text = child.get_text(' ', strip=True)
+            if heading_text:
+                blocks.append({"type": "heading", "level": int(name[1]), "text": heading_text})
+        elif name in LIST_TAGS:
+            list_text = _list_to_text(child)
+            if list_text:
+                blocks.append({"type": "list", "text": list_text, "images": _image_descriptions(child)})
+        elif name == 'table':
+            table_text = _table_to_text(child)
+            if table_text:
+                blocks.append({"type": "table", "text": table_text, "images": _image_descriptions(child)})
+        elif name in ('img', 'figure'):
+            images = _image_descriptions(child)
+            if images:
+                blocks.append({"type": "image", "text": "", "images": images})
+        elif name in TEXT_BLOCK_TAGS:
+            block_text = child.get_text(' ', strip=True)
+            images = _image_descriptions(child)
+            if block_text:
+                blocks.append({"type": "paragraph", "text": block_text, "images": images})
+            elif images:
+                blocks.append({"type": "image", "text": "", "images": images})
+        elif name == 'hr':
+            continue
+        else:
+            # div/section 등 컨테이너는 하위 블록으로 재귀
+            _collect_blocks(child, blocks)
     
-    return images
+    flush_inline()
+
+
+@profiled()
+def extract_content_blocks(container: Tag) -> List[Dict]:
+    """
+    본문 DOM을 구조 블록 목록으로 변환
+    반환값: [{"type": "heading|paragraph|list|table|image", "text": ..., "level"/"images": ...}, ...]
+    """
+    blocks: List[Dict] = []
+    if container is not None:
+        _collect_blocks(container, blocks)
+    return blocks
+
+
+async def navigate(page, url: str, timeout_ms: Optional[int] = None) -> str:
+    """
+    페이지 이동 후 HTML 반환 (페이지 예산 timeout_ms, 기본 CRAWL_PAGE_TIMEOUT_MS)
+    DOM이 준비되면 바로 챌린지/차단 여부를 확인하여 CrawlBlockedError 발생,
+    정상 페이지는 남은 예산 안에서만 네트워크 유휴 상태를 기다림
+    """
+    timeout_ms = timeout_ms or page_timeout_ms()
+    started = time.perf_counter()
+    response = await page.goto(url, wait_until="domcontentloaded", timeout=timeout_ms)
+    reason = detect_challenge(response.status if response else None, await page.content())
+    if reason:
+        raise CrawlBlockedError(url, reason)
+    remaining_ms = timeout_ms - int((time.perf_counter() - started) * 1000)
+    if remaining_ms > 0:
+        try:
+            await page.wait_for_load_state("networkidle", timeout=remaining_ms)
+        except PlaywrightTimeoutError:
+            # 분석/광고 스크립트 등 남은 요청은 기다리지 않음 (본문은 DOM 준비 시점에 이미 렌더링됨)
+            pass
+    return await page.content()
+
+
+def _listing_links(html: str, kind: str) -> Set[str]:
+    """목록 페이지 HTML에서 categories/sections/articles 링크를 절대 URL로 추출"""
+    soup = BeautifulSoup(html, 'html.parser')
+    links = set()
+    for link in soup.find_all('a', href=re.compile(r'/hc/' + LOCALE + rf'/{kind}/\d+')):
+        href = link.get('href', '')
+        if href.startswith('/'):
+            full_url = f"{BASE_URL}{href}"
+        elif href.startswith('http'):
+            full_url = href
+        else:
+            continue
+        if f'/{kind}/' in full_url:
+            links.add(full_url)
+    return links
+
+
+async def _fetch_listing_links(page, url: str, kind: str, fetcher: Optional[ConditionalFetcher]) -> Set[str]:
+    """
+    목록 페이지의 링크 추출
+    fetcher가 있으면 조건부 요청으로 확인하여 변경이 없으면 이전 실행의 링크를 재사용하고,
+    바뀌었으면 응답 HTML에서 바로 추출 (챌린지/오류 응답이면 브라우저로 이동)
+    """
+    if fetcher is not None:
+        result, html = await fetcher.fetch(page.context.request, url)
+        cached = fetcher.cached_links(url)
+        if result in (NOT_MODIFIED, UNCHANGED) and cached is not None:
+            return set(cached)
+        if result == CHANGED:
+            links = _listing_links(html, kind)
+            if links:
+                fetcher.set_links(url, list(links))
+                return links
+            fetcher.pop_validators(url)
+    return _listing_links(await navigate(page, url), kind)
 
 
 async def discover_all_articles(page, limit: Optional[int] = None) -> List[str]:
     """모든 아티클 URL 발견"""
+    catalog = await discover_article_catalog(page, limit=limit)
+    return catalog["urls"]
+
+
+@profiled()
+async def discover_article_catalog(page, limit: Optional[int] = None,
+                                   fetcher: Optional[ConditionalFetcher] = None,
+                                   deadline: Optional[CrawlDeadline] = None) -> Dict:
+    """
+    모든 아티클 URL 발견 (누락 여부 포함)
+    fetcher: 카테고리/섹션 목록 페이지 조건부 요청 (ValidatorStore.load_listings 검증자, 변경 없으면 이전 링크 사용)
+    deadline: 실행 마감 시각 (지나면 지금까지 발견한 URL로 불완전 목록 반환)
+    반환값: {"urls": 아티클 URL 목록, "complete": 모든 카테고리/섹션을 끝까지 확인했는지, "failures": 실패한 페이지 수}
+    complete가 False면 목록에 없는 아티클이 삭제되었다고 판단할 수 없음
+    """
     all_articles = set()
+    failures = 0
+    truncated = False
+    # 연속 실패(차단/타임아웃) 시 잠시 멈추고, 계속 실패하면 불완전 목록으로 종료
+    breaker = CircuitBreaker()
+    deadline = deadline or CrawlDeadline()
     
     try:
         logger.info("메인 페이지 접속 중...")
-        await page.goto(f"{HELP_CENTER_BASE}", wait_until="networkidle", timeout=30000)
+        page_source = await navigate(page, HELP_CENTER_BASE)
         await asyncio.sleep(2)
         
-        page_source = await page.content()
-        soup = BeautifulSoup(page_source, 'html.parser')
-        
         # 카테고리 링크 찾기
-        category_links = soup.find_all('a', href=re.compile(r'/hc/' + LOCALE + r'/categories/\d+'))
-        categories = set()
-        for link in category_links:
-            href = link.get('href', '')
-            if href:
-                if href.startswith('/'):
-                    full_url = f"{BASE_URL}{href}"
-                elif href.startswith('http'):
-                    full_url = href
-                else:
-                    continue
-                if '/categories/' in full_url:
-                    categories.add(full_url)
+        categories = _listing_links(page_source, "categories")
         
         logger.info(f"발견된 카테고리 수: {len(categories)}")
         
-        # 각 카테고리에서 섹션 찾기
+        # 각 카테고리에서 섹션 찾기 (목록이 바뀌지 않았으면 이전 실행의 링크 사용)
         all_sections = set()
         for category_url in categories:
+            if await stop_reason(breaker, deadline):
+                truncated = True
+                break
             try:
                 logger.info(f"카테고리 접속: {category_url}")
-                await page.goto(category_url, wait_until="networkidle", timeout=30000)
+                all_sections |= await _fetch_listing_links(page, category_url, "sections", fetcher)
+                breaker.record_success()
                 await asyncio.sleep(1)
-                
-                cat_soup = BeautifulSoup(await page.content(), 'html.parser')
-                section_links = cat_soup.find_all('a', href=re.compile(r'/hc/' + LOCALE + r'/sections/\d+'))
-                
-                for link in section_links:
-                    href = link.get('href', '')
-                    if href:
-                        if href.startswith('/'):
-                            full_url = f"{BASE_URL}{href}"
-                        elif href.startswith('http'):
-                            full_url = href
-                        else:
-                            continue
-                        if '/sections/' in full_url:
-                            all_sections.add(full_url)
             except Exception as e:
+                failures += 1
                 logger.warning(f"카테고리 처리 실패 ({category_url}): {e}")
+                breaker.record_failure(getattr(e, "reason", "error"))
                 continue
         
         logger.info(f"발견된 섹션 수: {len(all_sections)}")
         
         # 각 섹션에서 아티클 찾기
         for section_url in all_sections:
+            if await stop_reason(breaker, deadline):
+                truncated = True
+                break
             try:
                 logger.info(f"섹션 접속: {section_url}")
-                await page.goto(section_url, wait_until="networkidle", timeout=30000)
+                article_links = await _fetch_listing_links(page, section_url, "articles", fetcher)
+                breaker.record_success()
                 await asyncio.sleep(1)
                 
-                section_soup = BeautifulSoup(await page.content(), 'html.parser')
-                article_links = section_soup.find_all('a', href=re.compile(r'/hc/' + LOCALE + r'/articles/\d+'))
-                
-                for link in article_links:
-                    href = link.get('href', '')
-                    if href:
-                        if href.startswith('/'):
-                            full_url = f"{BASE_URL}{href}"
-                        elif href.startswith('http'):
-                            full_url = href
-                        else:
-                            continue
-                        if '/articles/' in full_url:
-                            all_articles.add(full_url)
-                            
-                        if limit and len(all_articles) >= limit:
-                            break
+                for full_url in sorted(article_links):
+                    all_articles.add(full_url)
+                    if limit and len(all_articles) >= limit:
+                        truncated = True
+                        break
                 
-                if limit and len(all_articles) >= limit:
+                if truncated:
                     break
             except Exception as e:
+                failures += 1
                 logger.warning(f"섹션 처리 실패 ({section_url}): {e}")
+                breaker.record_failure(getattr(e, "reason", "error"))
                 continue
         
         # 메인 페이지에서도 직접 아티클 링크 찾기
-        await page.goto(f"{HELP_CENTER_BASE}", wait_until="networkidle", timeout=30000)
-        await asyncio.sleep(1)
-        main_soup = BeautifulSoup(await page.content(), 'html.parser')
-        main_article_links = main_soup.find_all('a', href=re.compile(r'/hc/' + LOCALE + r'/articles/\d+'))
-        for link in main_article_links:
-            href = link.get('href', '')
-            if href:
-                if href.startswith('/'):
-                    full_url = f"{BASE_URL}{href}"
-                elif href.startswith('http'):
-                    full_url = href
-                else:
-                    continue
-                if '/articles/' in full_url:
-                    all_articles.add(full_url)
+        all_articles |= _listing_links(await navigate(page, HELP_CENTER_BASE), "articles")
         
-        logger.info(f"총 발견된 아티클 수: {len(all_articles)}")
-        return list(all_articles)
+        complete = bool(categories) and bool(all_sections) and not failures and not truncated
+        logger.info(f"총 발견된 아티클 수: {len(all_articles)}" + ("" if complete else f" (불완전: 실패 {failures}개 페이지)"))
+        return {"urls": list(all_articles), "complete": complete, "failures": failures}
         
+    except CircuitOpenError as e:
+        # 지금까지 발견한 URL은 사용하되 불완전 목록으로 처리 (삭제 정리 안 함)
+        logger.error(f"아티클 발견 중단: {e}")
+        return {"urls": list(all_articles), "complete": False, "failures": failures}
     except Exception as e:
         logger.error(f"아티클 발견 실패: {e}")
-        return []
+        return {"urls": [], "complete": False, "failures": failures + 1}
 
 
-async def extract_article_content(page, article_url: str) -> Optional[Dict]:
-    """아티클 내용 추출"""
+@profiled()
+async def extract_article_content(page, article_url: str, timeout_ms: Optional[int] = None) -> Optional[Dict]:
+    """
+    아티클 내용 추출 (실패하면 None, 챌린지/차단 페이지면 서킷 브레이커가 알 수 있도록 CrawlBlockedError 발생)
+    timeout_ms: 페이지 예산 (기본 CRAWL_PAGE_TIMEOUT_MS)
+    """
     try:
         logger.info(f"아티클 접속: {article_url}")
-        await page.goto(article_url, wait_until="networkidle", timeout=30000)
-        await asyncio.sleep(1)
-        
-        page_source = await page.content()
-        soup = BeautifulSoup(page_source, 'html.parser')
-        
-        # 제목 추출
-        title_elem = soup.find('h1') or soup.find(class_=re.compile(r'article.*title|title.*article', re.I))
-        title = title_elem.get_text(strip=True) if title_elem else "제목 없음"
-        
-        # 섹션/카테고리 정보 추출
-        section_name = None
-        category_name = None
-        
-        # Breadcrumb에서 섹션/카테고리 정보 추출
-        breadcrumb = soup.find(class_=re.compile(r'breadcrumb|bread.*crumb', re.I))
-        if breadcrumb:
-            breadcrumb_links = breadcrumb.find_all('a')
-            for link in breadcrumb_links:
-                href = link.get('href', '')
-                text = link.get_text(strip=True)
-                if '/sections/' in href and not section_name:
-                    section_name = text
-                elif '/categories/' in href and not category_name:
-                    category_name = text
-        
-        # 본문 추출
-        body_elem = (
-            soup.find(class_=re.compile(r'article.*body|body.*article', re.I)) or
-            soup.find('article') or
-            soup.find(id=re.compile(r'article.*content|content.*article', re.I))
-        )
-        
-        images = []
-        body_text = ""
-        
-        if body_elem:
-            images = extract_images_from_element(body_elem)
-            for tag in body_elem(['script', 'style', 'nav', 'footer', 'header', 'aside']):
-                tag.decompose()
-            body_text = body_elem.get_text(separator='\n', strip=True)
-        else:
-            main_content = soup.find('main') or soup.find('div', class_=re.compile(r'content|main', re.I))
-            if main_content:
-                images = extract_images_from_element(main_content)
-                for tag in main_content(['script', 'style', 'nav', 'footer', 'header', 'aside']):
-                    tag.decompose()
-                body_text = main_content.get_text(separator='\n', strip=True)
-            else:
-                images = extract_images_from_element(soup)
-                body_text = soup.get_text(separator='\n', strip=True)
-        
-        # 텍스트 정리
-        lines = [line.strip() for line in body_text.split('\n') if line.strip()]
-        clean_body = '\n'.join(lines)
-        
-        # 이미지 설명 추가
-        image_descriptions = []
-        for img in images:
-            img_desc_parts = []
-            if img.get('alt'):
-                img_desc_parts.append(f"[이미지 설명: {img['alt']}]")
-            if img.get('caption'):
-                img_desc_parts.append(f"[이미지 캡션: {img['caption']}]")
-            if img.get('context'):
-                img_desc_parts.append(f"[이미지 주변 설명: {img['context']}]")
-            if img_desc_parts:
-                image_descriptions.append(' '.join(img_desc_parts))
-        
-        if image_descriptions:
-            clean_body += "\n\n" + "\n".join(image_descriptions)
-        
-        # 아티클 ID 추출
-        article_id_match = re.search(r'/articles/(\d+)', article_url)
-        article_id = article_id_match.group(1) if article_id_match else None
-        
-        return {
-            "url": article_url,
-            "title": title,
-            "body": clean_body,
-            "article_id": article_id,
-            "images": images,
-            "section_name": section_name,
-            "category_name": category_name,
-            "full_text": f"제목: {title}\n\n{clean_body}"
-        }
+        page_source = await navigate(page, article_url, timeout_ms=timeout_ms)
+        return parse_article_html(page_source, article_url)
         
+    except CrawlBlockedError:
+        raise
     except Exception as e:
         logger.error(f"아티클 내용 추출 실패 ({article_url}): {e}")
         return None
 
 
-async def crawl_bithumb_faq(limit: Optional[int] = None, headless: bool = True):
-    """빗썸 FAQ 크롤링 메인 함수"""
+@profiled()
+def parse_article_html(page_source: str, article_url: str) -> Dict:
+    """아티클 페이지 HTML에서 제목/섹션/본문/이미지/구조 블록 추출 (브라우저 없이 단독 실행 가능)"""
+    soup = BeautifulSoup(page_source, 'html.parser')
+    
+    # 제목 추출
+    title_elem = soup.find('h1') or soup.find(class_=re.compile(r'article.*title|title.*article', re.I))
+    title = title_elem.get_text(strip=True) if title_elem else "제목 없음"
+    
+    # 섹션/카테고리 정보 추출
+    section_name = None
+    category_name = None
+    
+    # Breadcrumb에서 섹션/카테고리 정보 추출
+    breadcrumb = soup.find(class_=re.compile(r'breadcrumb|bread.*crumb', re.I))
+    if breadcrumb:
+        breadcrumb_links = breadcrumb.find_all('a')
+        for link in breadcrumb_links:
+            href = link.get('href', '')
+            text = link.get_text(strip=True)
+            if '/sections/' in href and not section_name:
+                section_name = text
+            elif '/categories/' in href and not category_name:
+                category_name = text
+    
+    # 본문 추출
+    body_elem = (
+        soup.find(class_=re.compile(r'article.*body|body.*article', re.I)) or
+        soup.find('article') or
+        soup.find(id=re.compile(r'article.*content|content.*article', re.I))
+    )
+    
+    images = []
+    blocks = []
+    body_text = ""
+    
+    if body_elem:
+        images = extract_images_from_element(body_elem)
+        for tag in body_elem(['script', 'style', 'nav', 'footer', 'header', 'aside']):
+            tag.decompose()
+        body_text = body_elem.get_text(separator='\n', strip=True)
+        blocks = extract_content_blocks(body_elem)
+    else:
+        main_content = soup.find('main') or soup.find('div', class_=re.compile(r'content|main', re.I))
+        if main_content:
+            images = extract_images_from_element(main_content)
+            for tag in main_content(['script', 'style', 'nav', 'footer', 'header', 'aside']):
+                tag.decompose()
+            body_text = main_content.get_text(separator='\n', strip=True)
+            blocks = extract_content_blocks(main_content)
+        else:
+            images = extract_images_from_element(soup)
+            body_text = soup.get_text(separator='\n', strip=True)
+    
+    # 텍스트 정리
+    lines = [line.strip() for line in body_text.split('\n') if line.strip()]
+    clean_body = '\n'.join(lines)
+    
+    # 이미지 설명 추가
+    image_descriptions = [desc for desc in (describe_image(img) for img in images) if desc]
+    
+    if image_descriptions:
+        clean_body += "\n\n" + "\n".join(image_descriptions)
+    
+    # 아티클 ID 추출
+    article_id_match = ARTICLE_ID_PATTERN.search(article_url)
+    article_id = article_id_match.group(1) if article_id_match else None
+    
+    return {
+        "url": article_url,
+        "title": title,
+        "body": clean_body,
+        "article_id": article_id,
+        "images": images,
+        "blocks": blocks,
+        "section_name": section_name,
+        "category_name": category_name,
+        "full_text": f"제목: {title}\n\n{clean_body}"
+    }
+
+
+async def launch_browser(p, headless: bool = True):
+    """Cloudflare 우회 설정을 적용한 Chromium 브라우저 시작"""
+    return await p.chromium.launch(
+        headless=headless,
+        args=[
+            '--disable-blink-features=AutomationControlled',
+            '--disable-dev-shm-usage',
+            '--no-sandbox',
+            '--disable-setuid-sandbox',
+        ]
+    )
+
+
+async def new_browser_context(browser, storage_state: Optional[Dict] = None):
+    """
+    크롤링용 브라우저 컨텍스트 생성
+    storage_state: 이전 컨텍스트의 쿠키/로컬 스토리지 (컨텍스트 재활용 시 Cloudflare 통과 상태 유지)
+    """
+    context = await browser.new_context(
+        viewport={'width': 1920, 'height': 1080},
+        user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+        locale='ko-KR',
+        timezone_id='Asia/Seoul',
+        storage_state=storage_state,
+    )
+    
+    await context.add_init_script("""
+        Object.defineProperty(navigator, 'webdriver', {
+            get: () => undefined
+        });
+        window.chrome = {
+            runtime: {}
+        };
+    """)
+    return context
+
+
+async def launch_browser_context(p, headless: bool = True):
+    """Cloudflare 우회 설정을 적용한 Chromium 브라우저와 컨텍스트 시작 (반환값: (browser, context))"""
+    browser = await launch_browser(p, headless=headless)
+    context = await new_browser_context(browser)
+    return browser, context
+
+
+def create_page_recycler(browser, context) -> PageRecycler:
+    """컨텍스트 교체 시 같은 브라우저에 storage_state를 옮긴 새 컨텍스트를 만드는 페이지 재활용기"""
+    return PageRecycler(context, lambda state: new_browser_context(browser, storage_state=state))
+
+
+async def fetch_article(recycler: PageRecycler, article_url: str, breaker: CircuitBreaker,
+                        deadline: Optional[CrawlDeadline] = None,
+                        fetcher: Optional[ConditionalFetcher] = None) -> Optional[Dict]:
+    """
+    재활용 페이지로 아티클 하나를 추출하고 결과를 서킷 브레이커에 기록
+    페이지 예산은 마감까지 남은 시간을 넘지 않음
+    fetcher가 있으면 먼저 조건부 요청을 보내 변경이 없으면 {"url", "article_id", "unchanged": True}를 반환하고
+    (파싱/저장 생략), 바뀌었으면 응답 HTML을 바로 파싱 (챌린지/오류 응답이나 본문이 없으면 브라우저로 이동)
+    반환값: 아티클 데이터 (실패하면 None, 연속 실패가 한도를 넘으면 CircuitOpenError)
+    """
+    budget = deadline.budget_ms(page_timeout_ms()) if deadline else None
+    if fetcher is not None:
+        result, html = await fetcher.fetch(recycler.context.request, article_url, timeout_ms=budget)
+        if result in (NOT_MODIFIED, UNCHANGED):
+            breaker.record_success()
+            match = ARTICLE_ID_PATTERN.search(article_url)
+            return {"url": article_url, "article_id": match.group(1) if match else None, "unchanged": True}
+        if result == CHANGED:
+            article_data = parse_article_html(html, article_url)
+            if article_data.get("body"):
+                breaker.record_success()
+                return article_data
+            fetcher.pop_validators(article_url)
+    
+    reason = "error"
+    started = time.perf_counter()
+    try:
+        article_data = await extract_article_content(await recycler.get_page(), article_url, timeout_ms=budget)
+    except CrawlBlockedError as e:
+        logger.warning(str(e))
+        article_data, reason = None, e.reason
+    await recycler.after_navigation(time.perf_counter() - started)
+    
+    if article_data and article_data.get("body"):
+        breaker.record_success()
+        return article_data
+    breaker.record_failure(reason)
+    return None
+
+
+async def crawl_bithumb_faq(limit: Optional[int] = None, headless: bool = True, rebuild: bool = False,
+                            crawl_generation: Optional[str] = None,
+                            article_urls: Optional[List[str]] = None) -> Optional[Dict]:
+    """
+    빗썸 FAQ 크롤링 (CRAWL_PROFILE=true면 프로파일을 CRAWL_PROFILE_DIR에 기록)
+    인자와 반환값은 _crawl_bithumb_faq 참고
+    """
+    label = f"crawl_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}"
+    with maybe_profile(default_profile_dir(), label):
+        return await _crawl_bithumb_faq(limit=limit, headless=headless, rebuild=rebuild,
+                                        crawl_generation=crawl_generation, article_urls=article_urls)
+
+
+async def _crawl_bithumb_faq(limit: Optional[int] = None, headless: bool = True, rebuild: bool = False,
+                             crawl_generation: Optional[str] = None,
+                             article_urls: Optional[List[str]] = None) -> Optional[Dict]:
+    """
+    빗썸 FAQ 크롤링 메인 함수
+    rebuild=True면 새 세대 스테이징 컬렉션에 전체를 적재한 뒤 인덱스를 만들고 한 번에 전환
+    crawl_generation: 이번 실행의 세대 ID (확인한 아티클에 기록, 생략하면 시작 시각)
+    article_urls: 크롤링할 URL 목록 (재크롤링 스케줄러의 due-list, 주어지면 발견 단계와 삭제 정리 생략)
+    발견 단계가 완전하면 이번 세대에서 확인되지 않은 아티클(도움말 센터에서 삭제됨)을 정리
+    CRAWL_HTTP_CACHE_ENABLED면 목록/아티클 페이지를 조건부 요청으로 확인하여 변경 없는 페이지는 파싱/저장 생략
+    (전체 재구축은 모든 아티클을 새로 적재해야 하므로 사용 안 함)
+    마감 시각(CRAWL_DEADLINE_MINUTES)이나 서킷 브레이커로 중단되면 처리한 아티클까지 확정하고 status="partial"
+    (전체 재구축은 마감 없이 실행하며, 중단되면 전환하지 않음)
+    반환값: {"status", "stopped", "remaining", "created", "updated", "skipped", "failed", "chunks",
+             "duplicate_chunks", "duplicate_rate", "sweep", "browser", "guard", "http_cache", "schedule"}
+            처리 요약 (아티클이 없으면 None)
+    """
     if not PLAYWRIGHT_AVAILABLE:
         raise ImportError("Playwright가 설치되지 않았습니다.")
     
     # 상대 경로 import (airflow/scripts 내부)
     from .mongodb_store import AirflowVectorStore
+    from .recrawl_scheduler import RecrawlScheduler
+    
+    scheduled_run = article_urls is not None
+    if rebuild and scheduled_run:
+        raise ValueError("전체 재구축은 발견 단계의 전체 목록이 필요합니다 (article_urls와 함께 사용 불가)")
     
     logger.info("=" * 60)
     logger.info("빗썸 FAQ 크롤링 시작 (Playwright 사용)")
@@ -328,116 +643,205 @@ async def crawl_bithumb_faq(limit: Optional[int] = None, headless: bool = True):
     
     logger.info("✅ MongoDB 연결 성공!")
     
-    # Playwright 브라우저 시작
-    logger.info("브라우저 시작 중...")
-    async with async_playwright() as p:
-        try:
-            browser = await p.chromium.launch(
-                headless=headless,
-                args=[
-                    '--disable-blink-features=AutomationControlled',
-                    '--disable-dev-shm-usage',
-                    '--no-sandbox',
-                    '--disable-setuid-sandbox',
-                ]
-            )
-            
-            context = await browser.new_context(
-                viewport={'width': 1920, 'height': 1080},
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                locale='ko-KR',
-                timezone_id='Asia/Seoul',
-            )
-            
-            await context.add_init_script("""
-                Object.defineProperty(navigator, 'webdriver', {
-                    get: () => undefined
-                });
-                window.chrome = {
-                    runtime: {}
-                };
-            """)
-            
-            page = await context.new_page()
-            logger.info("✅ 브라우저 시작 완료!")
-            
+    vector_store.crawl_generation = crawl_generation or datetime.utcnow().strftime("%Y%m%d%H%M%S")
+    logger.info(f"크롤링 세대: {vector_store.crawl_generation}")
+    
+    summary = None
+    if rebuild:
+        generation = await vector_store.begin_rebuild()
+        logger.info(f"전체 재구축 모드: {generation}에 적재 후 전환")
+    
+    try:
+        # Playwright 브라우저 시작
+        logger.info("브라우저 시작 중...")
+        async with async_playwright() as p:
             try:
-                # 아티클 URL 발견
-                logger.info("아티클 URL 발견 중...")
-                article_urls = await discover_all_articles(page, limit=limit)
-                
-                if not article_urls:
-                    logger.warning("아티클을 찾을 수 없습니다.")
-                    return
+                browser, context = await launch_browser_context(p, headless=headless)
+                # 이동 횟수/메모리 기준으로 페이지와 컨텍스트를 교체하여 긴 실행에서도 메모리 상한 유지
+                recycler = create_page_recycler(browser, context)
+                page = await recycler.get_page()
+                logger.info("✅ 브라우저 시작 완료!")
                 
-                if limit:
-                    article_urls = article_urls[:limit]
-                
-                logger.info(f"총 {len(article_urls)}개 아티클 발견")
-                logger.info("크롤링 및 벡터 DB 저장 시작...")
-                
-                success_count = 0
-                updated_count = 0
-                skipped_count = 0
-                fail_count = 0
-                
-                # 각 아티클 처리 및 저장
-                for i, article_url in enumerate(article_urls, 1):
-                    try:
-                        logger.info(f"[{i}/{len(article_urls)}] 크롤링 중: {article_url}")
-                        
-                        # 아티클 내용 추출
-                        article_data = await extract_article_content(page, article_url)
-                        
-                        if not article_data or not article_data.get("body"):
+                try:
+                    validator_store = ValidatorStore(vector_store) if http_cache_enabled() and not rebuild else None
+                    if article_urls is None:
+                        # 아티클 URL 발견
+                        logger.info("아티클 URL 발견 중...")
+                        listing_fetcher = None
+                        if validator_store is not None:
+                            listing_fetcher = ConditionalFetcher(await validator_store.load_listings())
+                        catalog = await discover_article_catalog(page, limit=limit, fetcher=listing_fetcher)
+                        article_urls = catalog["urls"]
+                        if listing_fetcher is not None:
+                            await validator_store.save(listing_fetcher.updated)
+                            logger.info(f"목록 페이지 HTTP 캐시: {listing_fetcher.report()}")
+                    else:
+                        # 스케줄러가 고른 일부 아티클만 크롤링 (전체 목록이 아니므로 삭제 정리 대상 아님)
+                        logger.info(f"재크롤링 대상 {len(article_urls)}개 사용 (발견 단계 생략)")
+                        catalog = {"urls": article_urls, "complete": False, "failures": 0}
+                    
+                    if not article_urls:
+                        logger.warning("아티클을 찾을 수 없습니다.")
+                        return
+                    
+                    if limit:
+                        article_urls = article_urls[:limit]
+                    
+                    logger.info(f"총 {len(article_urls)}개 아티클 발견")
+                    
+                    # 발견된 아티클에 세대 표시 (변경 없는 아티클은 저장하지 않으므로 여기서 일괄 기록)
+                    if not rebuild and not scheduled_run:
+                        article_ids = [match.group(1) for match in map(ARTICLE_ID_PATTERN.search, article_urls) if match]
+                        marked = await vector_store.mark_articles_seen(article_ids)
+                        logger.info(f"기존 아티클 {marked}개에 세대 표시")
+                    logger.info("크롤링 및 벡터 DB 저장 시작...")
+                    
+                    success_count = 0
+                    updated_count = 0
+                    skipped_count = 0
+                    fail_count = 0
+                    stored_chunks = 0
+                    duplicate_chunks = 0
+                    checked_ids = []
+                    breaker = CircuitBreaker()
+                    deadline = CrawlDeadline() if rebuild else CrawlDeadline.from_env()
+                    fetcher = None
+                    if validator_store is not None:
+                        fetcher = ConditionalFetcher(await validator_store.load(article_urls))
+                    # 처리를 마친 아티클의 검증자 (저장에 실패한 아티클은 다음 실행에서 다시 받도록 제외)
+                    validated = {}
+                    stopped = None
+                    processed = 0
+                    
+                    # 각 아티클 처리 및 저장
+                    for i, article_url in enumerate(article_urls, 1):
+                        stopped = await stop_reason(breaker, deadline)
+                        if stopped:
+                            break
+                        processed = i
+                        try:
+                            logger.info(f"[{i}/{len(article_urls)}] 크롤링 중: {article_url}")
+                            
+                            # 아티클 내용 추출 (재활용 정책에 따라 교체된 페이지 사용)
+                            article_data = await fetch_article(recycler, article_url, breaker, deadline, fetcher)
+                            
+                            if not article_data:
+                                fail_count += 1
+                                logger.warning(f"내용 추출 실패: {article_url}")
+                                continue
+                            
+                            # 벡터 DB에 저장 (변경 감지 포함, HTTP 캐시에서 변경 없음이면 생략)
+                            if article_data.get("unchanged"):
+                                result = {"status": "unchanged", "chunks": 0}
+                            else:
+                                result = await vector_store.store_article(article_data)
+                            stored_chunks += result.get("chunks", 0)
+                            duplicate_chunks += result.get("duplicates", 0)
+                            
+                            if result["status"] == "created":
+                                success_count += 1
+                                logger.info(f"✅ 신규 저장 완료: {article_data['title'][:40]}...")
+                            elif result["status"] == "updated":
+                                updated_count += 1
+                                logger.info(f"🔄 업데이트 완료: {article_data['title'][:40]}...")
+                            elif result["status"] == "migrated":
+                                updated_count += 1  # 마이그레이션도 업데이트로 카운트
+                                logger.info(f"🔄 마이그레이션 완료: {article_data['title'][:40]}... (content_hash 추가)")
+                            elif result["status"] == "skipped":
+                                skipped_count += 1
+                                logger.info(f"⏭️  변경사항 없음 (스킵): {article_data['title'][:40]}...")
+                            elif result["status"] == "unchanged":
+                                skipped_count += 1
+                                logger.info(f"⏭️  페이지 변경 없음 (HTTP 캐시): {article_url}")
+                            else:
+                                fail_count += 1
+                                logger.warning(f"저장 실패: {article_url}")
+                            if result["status"] != "error":
+                                checked_ids.append(article_data["article_id"])
+                                if fetcher is not None and article_url in fetcher.updated:
+                                    validated[article_url] = fetcher.pop_validators(article_url)
+                            
+                            await asyncio.sleep(1)  # Rate limit 방지
+                            
+                        except CircuitOpenError as e:
+                            fail_count += 1
+                            stopped = "circuit_open"
+                            logger.error(f"크롤링 중단: {e}")
+                            break
+                        except Exception as e:
                             fail_count += 1
-                            logger.warning(f"내용 추출 실패: {article_url}")
+                            logger.error(f"실패: {article_url} - {e}")
                             continue
-                        
-                        # 벡터 DB에 저장 (변경 감지 포함)
-                        result = await vector_store.store_article(article_data)
-                        
-                        if result["status"] == "created":
-                            success_count += 1
-                            logger.info(f"✅ 신규 저장 완료: {article_data['title'][:40]}...")
-                        elif result["status"] == "updated":
-                            updated_count += 1
-                            logger.info(f"🔄 업데이트 완료: {article_data['title'][:40]}...")
-                        elif result["status"] == "migrated":
-                            updated_count += 1  # 마이그레이션도 업데이트로 카운트
-                            logger.info(f"🔄 마이그레이션 완료: {article_data['title'][:40]}... (content_hash 추가)")
-                        elif result["status"] == "skipped":
-                            skipped_count += 1
-                            logger.info(f"⏭️  변경사항 없음 (스킵): {article_data['title'][:40]}...")
+                    
+                    remaining = len(article_urls) - processed
+                    if stopped and rebuild:
+                        raise RuntimeError(f"전체 재구축 크롤링 중단 ({stopped}, 미처리 {remaining}개) - 전환하지 않음")
+                    
+                    logger.info("=" * 60)
+                    if stopped:
+                        logger.warning(f"⚠️ 크롤링 부분 완료 ({stopped}): 미처리 {remaining}개는 다음 실행에서 처리")
+                    else:
+                        logger.info(f"✅ 크롤링 완료!")
+                    logger.info(f"   신규 저장: {success_count}개")
+                    logger.info(f"   업데이트: {updated_count}개")
+                    logger.info(f"   변경 없음 (스킵): {skipped_count}개")
+                    logger.info(f"   실패: {fail_count}개")
+                    logger.info(f"   총 처리: {success_count + updated_count + skipped_count}개")
+                    duplicate_rate = duplicate_chunks / stored_chunks if stored_chunks else 0.0
+                    logger.info(f"   저장 청크: {stored_chunks}개 (중복 참조 {duplicate_chunks}개, {duplicate_rate:.1%})")
+                    logger.info("=" * 60)
+                    
+                    # 전체 목록을 누락 없이 확인한 실행에서만 삭제된 아티클 정리
+                    # (재구축은 새 세대에 확인된 아티클만 적재하므로 정리 불필요)
+                    sweep = {"status": "skipped", "articles": 0, "chunks": 0}
+                    if not rebuild:
+                        if limit is None and catalog["complete"]:
+                            sweep = await vector_store.sweep_stale_articles()
                         else:
-                            fail_count += 1
-                            logger.warning(f"저장 실패: {article_url}")
-                        
-                        await asyncio.sleep(1)  # Rate limit 방지
+                            logger.info("발견 단계가 불완전하거나 일부만 크롤링하여 삭제된 아티클 정리를 건너뜁니다")
+                    summary = {
+                        "status": "partial" if stopped else "complete",
+                        "stopped": stopped,
+                        "remaining": remaining,
+                        "created": success_count,
+                        "updated": updated_count,
+                        "skipped": skipped_count,
+                        "failed": fail_count,
+                        "chunks": stored_chunks,
+                        "duplicate_chunks": duplicate_chunks,
+                        "duplicate_rate": duplicate_rate,
+                        "sweep": sweep,
+                        "browser": recycler.report(),
+                        "guard": breaker.report(),
+                        "http_cache": fetcher.report() if fetcher is not None else None,
+                    }
+                    if fetcher is not None:
+                        await validator_store.save(validated)
+                        logger.info(f"   HTTP 캐시: {summary['http_cache']}")
+                    logger.info(f"   브라우저 재활용: {summary['browser']['recycles']}, "
+                                f"최대 RSS {summary['browser']['peak_rss_mb']}MB")
                         
-                    except Exception as e:
-                        fail_count += 1
-                        logger.error(f"실패: {article_url} - {e}")
-                        continue
-                
-                logger.info("=" * 60)
-                logger.info(f"✅ 크롤링 완료!")
-                logger.info(f"   신규 저장: {success_count}개")
-                logger.info(f"   업데이트: {updated_count}개")
-                logger.info(f"   변경 없음 (스킵): {skipped_count}개")
-                logger.info(f"   실패: {fail_count}개")
-                logger.info(f"   총 처리: {success_count + updated_count + skipped_count}개")
-                logger.info("=" * 60)
-                
-            finally:
-                await page.close()
-                await context.close()
-                await browser.close()
-                logger.info("브라우저 종료 완료")
+                    if rebuild:
+                        rebuild_result = await vector_store.finish_rebuild()
+                        logger.info(f"✅ 재구축 전환 완료: {rebuild_result['previous']} -> {rebuild_result['generation']}")
+                    
+                    # 확인한 아티클의 변경 이력 기준으로 다음 크롤링 시각 기록
+                    summary["schedule"] = await RecrawlScheduler(vector_store).schedule(checked_ids)
+                    
+                finally:
+                    await recycler.close()
+                    await browser.close()
+                    logger.info("브라우저 종료 완료")
+            
+            except Exception as e:
+                logger.error(f"브라우저 실행 오류: {e}")
+                raise
         
-        except Exception as e:
-            logger.error(f"브라우저 실행 오류: {e}")
-            raise
+    finally:
+        # 전환하지 못한 재구축(오류/중단)은 스테이징 세대를 삭제하고 기존 세대 유지
+        if vector_store.rebuild is not None:
+            await vector_store.abort_rebuild()
     
     # MongoDB 연결 해제
     await vector_store.disconnect()
+    return summary
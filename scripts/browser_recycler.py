@@ -0,0 +1,182 @@
+"""
+브라우저 페이지/컨텍스트 재활용 모듈
+한 페이지로 긴 크롤링을 하면 Chromium JS 힙, 분리된 DOM, 서비스 워커 캐시가 계속 커지므로
+페이지 JS 힙이 임계값을 넘으면 페이지를, 컨텍스트에서 N번 이동했거나 브라우저 프로세스 RSS가
+임계값을 넘으면 컨텍스트를 새로 만듭니다. 컨텍스트를 바꿀 때는 쿠키/로컬 스토리지(storage_state)를 옮겨
+Cloudflare 통과 상태를 유지하고, 측정한 메모리 표본을 보고합니다.
+"""
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional
+
+# psutil 설정 (브라우저 프로세스 RSS 측정에만 필요, Airflow 의존성으로 설치됨)
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+    logging.warning("psutil이 설치되지 않았습니다. 브라우저 RSS 기준 재활용을 사용할 수 없습니다.")
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+
+def browser_rss_mb() -> Optional[float]:
+    """현재 프로세스의 하위 프로세스(Playwright 드라이버 + Chromium) RSS 합계 (MB, 측정 불가면 None)"""
+    if not PSUTIL_AVAILABLE:
+        return None
+    total = 0
+    for child in psutil.Process().children(recursive=True):
+        try:
+            total += child.memory_info().rss
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    return total / MB
+
+
+async def page_js_heap_mb(context, page) -> Optional[float]:
+    """CDP Performance 지표의 페이지 JS 힙 사용량 (MB, Chromium이 아니거나 실패하면 None)"""
+    try:
+        session = await context.new_cdp_session(page)
+    except Exception:
+        return None
+    try:
+        await session.send("Performance.enable")
+        metrics = await session.send("Performance.getMetrics")
+        used = next((m["value"] for m in metrics.get("metrics", []) if m["name"] == "JSHeapUsedSize"), None)
+        return used / MB if used is not None else None
+    except Exception:
+        return None
+    finally:
+        try:
+            await session.detach()
+        except Exception:
+            pass
+
+
+class PageRecycler:
+    """
+    크롤링 페이지 재활용 정책
+    사용법: page = await recycler.get_page() -> 이동/추출 -> await recycler.after_navigation(latency)
+    context_factory: storage_state(없으면 None)를 받아 새 BrowserContext를 만드는 코루틴 함수
+    """
+
+    def __init__(self, context, context_factory: Callable[[Optional[Dict]], Awaitable],
+                 max_navigations: Optional[int] = None, max_rss_mb: Optional[float] = None,
+                 max_js_heap_mb: Optional[float] = None, sample_every: Optional[int] = None):
+        self.context = context
+        self.context_factory = context_factory
+        self.page = None
+        # 0이면 해당 기준 비활성화
+        self.max_navigations = max_navigations if max_navigations is not None else int(
+            os.getenv("BROWSER_RECYCLE_NAVIGATIONS", "100"))
+        self.max_rss_mb = max_rss_mb if max_rss_mb is not None else float(
+            os.getenv("BROWSER_RECYCLE_RSS_MB", "1200"))
+        self.max_js_heap_mb = max_js_heap_mb if max_js_heap_mb is not None else float(
+            os.getenv("BROWSER_RECYCLE_JS_HEAP_MB", "256"))
+        self.sample_every = max(1, sample_every or int(os.getenv("BROWSER_MEMORY_SAMPLE_EVERY", "10")))
+
+        self.navigations = 0
+        self.context_navigations = 0
+        self.recycles = {"page": 0, "context": 0}
+        self.samples: List[Dict] = []
+        self._latencies: List[float] = []
+
+    async def get_page(self):
+        """현재 페이지 (없으면 생성)"""
+        if self.page is None or self.page.is_closed():
+            self.page = await self.context.new_page()
+        return self.page
+
+    async def after_navigation(self, latency: Optional[float] = None):
+        """
+        아티클 하나 처리 후 호출: 이동 횟수 집계, sample_every마다 메모리 측정, 기준을 넘으면 재활용
+        latency: 이번 아티클 처리 시간(초), 표본 구간 평균으로 기록
+        """
+        self.navigations += 1
+        self.context_navigations += 1
+        if latency is not None:
+            self._latencies.append(latency)
+
+        if self.max_navigations and self.context_navigations >= self.max_navigations:
+            await self.recycle("context", f"이동 {self.context_navigations}회")
+            return
+        if self.navigations % self.sample_every:
+            return
+
+        sample = await self.sample()
+        if self.max_rss_mb and sample["rss_mb"] is not None and sample["rss_mb"] >= self.max_rss_mb:
+            await self.recycle("context", f"RSS {sample['rss_mb']:.0f}MB")
+        elif self.max_js_heap_mb and sample["js_heap_mb"] is not None and sample["js_heap_mb"] >= self.max_js_heap_mb:
+            await self.recycle("page", f"JS 힙 {sample['js_heap_mb']:.0f}MB")
+
+    async def sample(self) -> Dict:
+        """메모리 표본 측정 및 기록 {"navigations", "rss_mb", "js_heap_mb", "avg_latency_ms", "at"}"""
+        js_heap = await page_js_heap_mb(self.context, self.page) if self.page is not None else None
+        rss = browser_rss_mb()
+        sample = {
+            "navigations": self.navigations,
+            "rss_mb": round(rss, 1) if rss is not None else None,
+            "js_heap_mb": round(js_heap, 1) if js_heap is not None else None,
+            "avg_latency_ms": round(sum(self._latencies) / len(self._latencies) * 1000, 1) if self._latencies else None,
+            "at": datetime.utcnow().isoformat(),
+        }
+        self._latencies = []
+        self.samples.append(sample)
+        logger.info(f"브라우저 메모리: 이동 {sample['navigations']}회, RSS {sample['rss_mb']}MB, "
+                    f"JS 힙 {sample['js_heap_mb']}MB, 평균 처리 {sample['avg_latency_ms']}ms")
+        return sample
+
+    async def recycle(self, scope: str, reason: str):
+        """
+        페이지 또는 컨텍스트 교체
+        scope: page(같은 컨텍스트에 새 페이지) | context(storage_state를 옮긴 새 컨텍스트)
+        """
+        started = time.perf_counter()
+        if scope == "context":
+            state = None
+            try:
+                state = await self.context.storage_state()
+            except Exception as e:
+                logger.warning(f"storage_state 저장 실패 - 쿠키 없이 새 컨텍스트 생성: {e}")
+            await self._close_page()
+            try:
+                await self.context.close()
+            except Exception as e:
+                logger.warning(f"이전 브라우저 컨텍스트 종료 실패: {e}")
+            self.context = await self.context_factory(state)
+            self.context_navigations = 0
+        else:
+            await self._close_page()
+
+        self.recycles[scope] += 1
+        await self.get_page()
+        logger.info(f"♻️ 브라우저 {scope} 재활용 ({reason}, {time.perf_counter() - started:.2f}초)")
+
+    async def _close_page(self):
+        if self.page is not None:
+            try:
+                await self.page.close()
+            except Exception as e:
+                logger.warning(f"페이지 종료 실패: {e}")
+            self.page = None
+
+    async def close(self):
+        """현재 페이지/컨텍스트 종료 (브라우저는 호출한 쪽에서 종료)"""
+        await self._close_page()
+        await self.context.close()
+
+    def report(self) -> Dict:
+        """재활용 횟수와 메모리 표본 요약 (XCom/요약 보고용)"""
+        rss = [s["rss_mb"] for s in self.samples if s["rss_mb"] is not None]
+        heap = [s["js_heap_mb"] for s in self.samples if s["js_heap_mb"] is not None]
+        return {
+            "navigations": self.navigations,
+            "recycles": dict(self.recycles),
+            "peak_rss_mb": max(rss) if rss else None,
+            "peak_js_heap_mb": max(heap) if heap else None,
+            "samples": self.samples,
+        }
@@ -0,0 +1,114 @@
+"""
+어휘(BM25) 인덱스 재구성/조회 스크립트
+어휘 인덱스 도입 이전에 저장된 청크를 색인하고, 어휘/하이브리드 검색을 확인합니다.
+
+사용 예:
+    python airflow/scripts/build_lexical_index.py rebuild
+    python airflow/scripts/build_lexical_index.py query "BTC 출금 수수료" --mode hybrid
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+# 환경 변수 로드
+from dotenv import load_dotenv
+
+# 1. 프로젝트 루트의 .env 파일 확인
+project_env = project_root / '.env'
+# 2. airflow 폴더의 .env 파일 확인
+airflow_dir = Path(__file__).parent.parent
+airflow_env = airflow_dir / '.env'
+
+env_loaded = False
+if project_env.exists():
+    load_dotenv(project_env)
+    env_loaded = True
+
+if airflow_env.exists():
+    load_dotenv(airflow_env, override=True)
+    env_loaded = True
+
+if not env_loaded:
+    print("[WARNING] .env 파일을 찾을 수 없습니다.")
+
+from airflow.scripts.mongodb_store import AirflowVectorStore
+
+
+async def rebuild_index(batch_size: int):
+    """저장된 청크로 어휘 인덱스 재구성"""
+    print("=" * 60)
+    print("어휘(BM25) 인덱스 재구성")
+    print("=" * 60)
+
+    vector_store = AirflowVectorStore()
+    connected = await vector_store.connect()
+
+    if not connected:
+        print("[ERROR] MongoDB 연결 실패")
+        return
+
+    try:
+        started = time.perf_counter()
+        result = await vector_store.rebuild_lexical_index(batch_size=batch_size)
+        print(f"[OK] {result['indexed']}개 청크 색인, {result['removed']}개 정리 "
+              f"({time.perf_counter() - started:.1f}초)")
+    except Exception as e:
+        print(f"[ERROR] 재구성 중 오류: {e}")
+        import traceback
+        traceback.print_exc()
+    finally:
+        await vector_store.disconnect()
+
+
+async def query_index(queries, k: int, mode: str):
+    """어휘/하이브리드 검색 (lexical 모드는 임베딩 API 호출 없음)"""
+    vector_store = AirflowVectorStore()
+    connected = await vector_store.connect()
+
+    if not connected:
+        print("[ERROR] MongoDB 연결 실패")
+        return
+
+    try:
+        for query in queries:
+            started = time.perf_counter()
+            hits = await vector_store.search(query, k=k, mode=mode)
+            elapsed = time.perf_counter() - started
+
+            print(f"\n[질의] {query} ({elapsed * 1000:.0f} ms)")
+            for rank, hit in enumerate(hits, 1):
+                preview = hit["text"].replace("\n", " ")[:60]
+                ranks = ""
+                if mode == "hybrid":
+                    ranks = f" (어휘 {hit['lexical_rank'] or '-'}위, 벡터 {hit['vector_rank'] or '-'}위)"
+                print(f"  {rank}. {hit['score']:.4f}{ranks} 아티클 {hit['article_id']}#{hit['chunk_index']} {preview}")
+    finally:
+        await vector_store.disconnect()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='어휘(BM25) 인덱스 재구성/조회')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    rebuild_parser = subparsers.add_parser('rebuild', help='저장된 청크로 어휘 인덱스 재구성')
+    rebuild_parser.add_argument('--batch-size', type=int, default=500, help='커서 배치 크기 (기본값: 500)')
+
+    query_parser = subparsers.add_parser('query', help='어휘/하이브리드 검색')
+    query_parser.add_argument('queries', nargs='+', help='검색 질의')
+    query_parser.add_argument('-k', type=int, default=5, help='결과 수 (기본값: 5)')
+    query_parser.add_argument('--mode', choices=['lexical', 'hybrid'], default='lexical',
+                              help='검색 모드 (기본값: lexical)')
+
+    args = parser.parse_args()
+
+    if args.command == 'rebuild':
+        asyncio.run(rebuild_index(args.batch_size))
+    else:
+        asyncio.run(query_index(args.queries, args.k, args.mode))
@@ -0,0 +1,109 @@
+"""
+오프라인 벡터 인덱스 생성/조회 스크립트
+knowledge_base 임베딩을 memmap float32 행렬로 내보내고, 로컬에서 검색해 볼 수 있습니다.
+
+사용 예:
+    python airflow/scripts/build_vector_index.py export --path ./kb_index --ivf 0
+    python airflow/scripts/build_vector_index.py query --path ./kb_index "출금 수수료" -k 5
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+# 환경 변수 로드
+from dotenv import load_dotenv
+
+# 1. 프로젝트 루트의 .env 파일 확인
+project_env = project_root / '.env'
+# 2. airflow 폴더의 .env 파일 확인
+airflow_dir = Path(__file__).parent.parent
+airflow_env = airflow_dir / '.env'
+
+env_loaded = False
+if project_env.exists():
+    load_dotenv(project_env)
+    env_loaded = True
+
+if airflow_env.exists():
+    load_dotenv(airflow_env, override=True)
+    env_loaded = True
+
+if not env_loaded:
+    print("[WARNING] .env 파일을 찾을 수 없습니다.")
+
+from airflow.scripts.mongodb_store import AirflowVectorStore
+
+
+async def export_index(path: str, batch_size: int, ivf_lists):
+    """knowledge_base를 오프라인 인덱스로 내보내기"""
+    print("=" * 60)
+    print("오프라인 벡터 인덱스 내보내기")
+    print("=" * 60)
+
+    vector_store = AirflowVectorStore()
+    connected = await vector_store.connect()
+
+    if not connected:
+        print("[ERROR] MongoDB 연결 실패")
+        return
+
+    try:
+        result = await vector_store.export_local_index(path, batch_size=batch_size, ivf_lists=ivf_lists)
+        print(f"[OK] {result['count']}개 청크 내보내기 완료 ({result['elapsed']:.1f}초)")
+        if result.get("ivf"):
+            print(f"[OK] IVF 분할 {result['ivf']['nlist']}개 생성 ({result['ivf']['elapsed']:.1f}초)")
+    except Exception as e:
+        print(f"[ERROR] 내보내기 중 오류: {e}")
+        import traceback
+        traceback.print_exc()
+    finally:
+        await vector_store.disconnect()
+
+
+async def query_index(path: str, queries, k: int, nprobe):
+    """오프라인 인덱스로 검색 (질의 임베딩만 API 사용)"""
+    vector_store = AirflowVectorStore()
+    vector_store.local_index_path = path
+    vector_store.local_index_nprobe = nprobe
+
+    started = time.perf_counter()
+    results = await vector_store.search_many(queries, k=k, backend="local")
+    elapsed = time.perf_counter() - started
+
+    for query, hits in zip(queries, results):
+        print(f"\n[질의] {query}")
+        for rank, hit in enumerate(hits, 1):
+            preview = hit["text"].replace("\n", " ")[:60]
+            print(f"  {rank}. {hit['score']:.4f} 아티클 {hit['article_id']}#{hit['chunk_index']} {preview}")
+    print(f"\n{len(queries)}개 질의, {elapsed * 1000:.0f} ms (임베딩 포함)")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='오프라인 벡터 인덱스 생성/조회')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    export_parser = subparsers.add_parser('export', help='knowledge_base 내보내기')
+    export_parser.add_argument('--path', required=True, help='인덱스 디렉토리')
+    export_parser.add_argument('--batch-size', type=int, default=2000, help='커서 배치 크기 (기본값: 2000)')
+    export_parser.add_argument('--ivf', type=int, default=None,
+                               help='IVF 분할 수 (0이면 sqrt(N), 생략하면 IVF 없음)')
+
+    query_parser = subparsers.add_parser('query', help='오프라인 인덱스 검색')
+    query_parser.add_argument('--path', required=True, help='인덱스 디렉토리')
+    query_parser.add_argument('queries', nargs='+', help='검색 질의')
+    query_parser.add_argument('-k', type=int, default=5, help='결과 수 (기본값: 5)')
+    query_parser.add_argument('--nprobe', type=int, default=None, help='IVF 탐색 분할 수 (생략하면 전수 검색)')
+
+    args = parser.parse_args()
+
+    if args.command == 'export':
+        asyncio.run(export_index(args.path, args.batch_size, args.ivf))
+    else:
+        asyncio.run(query_index(args.path, args.queries, args.k, args.nprobe))
@@ -1,11 +1,18 @@
 """
-MongoDB에 저장된 데이터 확인 스크립트
+MongoDB 저장 공간 분석 스크립트
+knowledge_base 청크/아티클/어휘/보조 컬렉션의 문서·인덱스 크기, 임베딩 대 반복 메타데이터 바이트,
+아티클별 청크 수 분포, 사용되지 않거나 누락된 인덱스를 보고합니다.
+
+사용 예:
+    python airflow/scripts/check_mongodb_data.py
+    python airflow/scripts/check_mongodb_data.py --json
+    python airflow/scripts/check_mongodb_data.py --output data/storage_history.jsonl --articles data/article_footprints.jsonl
 """
+import argparse
 import asyncio
+import json
 import sys
-import os
 from pathlib import Path
-from datetime import datetime, timedelta
 
 # 프로젝트 루트를 Python 경로에 추가
 project_root = Path(__file__).parent.parent.parent
@@ -36,77 +43,91 @@ if not env_loaded:
 sys.path.insert(0, str(airflow_dir))
 
 from airflow.scripts.mongodb_store import AirflowVectorStore
+from airflow.scripts.storage_analysis import DEFAULT_BATCH_SIZE, analyze_storage, format_bytes, iter_article_footprints
 
 
-async def check_mongodb_data():
-    """MongoDB에 저장된 데이터 확인"""
+def print_report(report: dict):
+    """사람이 읽는 요약 출력"""
     print("=" * 60)
-    print("MongoDB 데이터 확인")
+    print(f"MongoDB 저장 공간 분석 ({report['collection']}, {report['analyzed_at']})")
     print("=" * 60)
-    
+
+    print("\n[컬렉션 크기]")
+    print(f"{'컬렉션':<36} {'문서':>9} {'데이터':>10} {'저장소':>10} {'인덱스':>10}")
+    for name, stats in report["collections"].items():
+        print(f"{name:<36} {stats['count']:>9,} {format_bytes(stats['size']):>10} "
+              f"{format_bytes(stats['storage_size']):>10} {format_bytes(stats['total_index_size']):>10}")
+
+    chunks = report["chunks"]
+    print(f"\n[청크 문서] {chunks['chunks']:,}개, 평균 {format_bytes(int(chunks['avg_bytes']))}, "
+          f"최대 {format_bytes(chunks['max_bytes'])}, 중복 참조 {chunks['duplicates']:,}개")
+    for name, size in chunks["fields"].items():
+        print(f"  {name:<18} {format_bytes(size):>10} ({chunks['field_ratios'][name]:.1%})")
+    print("  임베딩 형식: " + ", ".join(f"{row['type']} {row['chunks']:,}개" for row in chunks["embedding_formats"]))
+
+    distribution = chunks["chunks_per_article"]
+    print(f"\n[아티클별 청크 수] 아티클 {distribution['articles']:,}개, 평균 {distribution['avg']}, "
+          f"최소 {distribution['min']}, 최대 {distribution['max']}")
+    for row in distribution["buckets"]:
+        print(f"  {str(row['from']) + '~':>6} {row['articles']:>7,}")
+    print("\n[크기가 큰 아티클]")
+    for row in chunks["largest_articles"]:
+        print(f"  {row['article_id']}: 청크 {row['chunks']}개, {format_bytes(row['bytes'])}")
+
+    print("\n[인덱스 사용]")
+    for collection, indexes in report["indexes"].items():
+        for index in indexes["indexes"]:
+            ops = "N/A" if index["ops"] is None else f"{index['ops']:,}"
+            print(f"  {collection}.{index['name']:<28} {format_bytes(index['size']):>10} 사용 {ops}")
+
+    print("\n[확인 사항]")
+    for note in report["findings"] or ["없음"]:
+        print(f"  - {note}")
+
+
+async def check_mongodb_data(args):
+    """저장 공간 분석 실행 (--json: JSON 출력, --output: 추세 기록 JSONL 추가, --articles: 아티클별 JSONL)"""
     vector_store = AirflowVectorStore()
-    connected = await vector_store.connect()
-    
-    if not connected:
+    if not await vector_store.connect():
         print("[ERROR] MongoDB 연결 실패")
-        return
-    
+        sys.exit(1)
+
     try:
-        collection = vector_store.collection
-        if collection is None:
-            print("[ERROR] MongoDB 컬렉션이 없습니다")
-            return
-        
-        # 전체 FAQ 문서 수
-        total_count = await collection.count_documents({
-            "metadata.type": "zendesk_article"
-        })
-        print(f"\n[전체 FAQ 문서 수] {total_count}개")
-        
-        # 최근 24시간 내 저장된 문서 수
-        yesterday = datetime.utcnow() - timedelta(days=1)
-        recent_count = await collection.count_documents({
-            "metadata.type": "zendesk_article",
-            "created_at": {"$gte": yesterday}
-        })
-        print(f"[최근 24시간 내 저장된 문서 수] {recent_count}개")
-        
-        # 최근 저장된 문서 5개 조회
-        print("\n[최근 저장된 문서 5개]")
-        print("-" * 60)
-        
-        recent_docs = await collection.find({
-            "metadata.type": "zendesk_article"
-        }).sort("created_at", -1).limit(5).to_list(length=5)
-        
-        for i, doc in enumerate(recent_docs, 1):
-            metadata = doc.get("metadata", {})
-            article_id = metadata.get("article_id", "N/A")
-            title = metadata.get("title", "N/A")
-            url = metadata.get("url", "N/A")
-            created_at = doc.get("created_at", "N/A")
-            
-            if isinstance(created_at, datetime):
-                created_at_str = created_at.strftime("%Y-%m-%d %H:%M:%S UTC")
-            else:
-                created_at_str = str(created_at)
-            
-            print(f"\n{i}. 아티클 ID: {article_id}")
-            print(f"   제목: {title[:50]}..." if len(title) > 50 else f"   제목: {title}")
-            print(f"   URL: {url}")
-            print(f"   저장 시간: {created_at_str}")
-        
-        print("\n" + "=" * 60)
-        print("[SUCCESS] 데이터 확인 완료")
-        print("=" * 60)
-        
-    except Exception as e:
-        print(f"[ERROR] 데이터 확인 중 오류: {e}")
-        import traceback
-        traceback.print_exc()
+        report = await analyze_storage(vector_store, top_n=args.top, batch_size=args.batch_size)
+        if args.json:
+            print(json.dumps(report, ensure_ascii=False, indent=2, default=str))
+        else:
+            print_report(report)
+
+        if args.output:
+            output = Path(args.output)
+            output.parent.mkdir(parents=True, exist_ok=True)
+            with open(output, "a", encoding="utf-8") as f:
+                f.write(json.dumps(report, ensure_ascii=False, default=str) + "\n")
+            print(f"\n[SUCCESS] 분석 결과 추가: {output}", file=sys.stderr)
+
+        if args.articles:
+            articles = Path(args.articles)
+            articles.parent.mkdir(parents=True, exist_ok=True)
+            count = 0
+            with open(articles, "w", encoding="utf-8") as f:
+                async for row in iter_article_footprints(vector_store, batch_size=args.batch_size):
+                    f.write(json.dumps(row, ensure_ascii=False) + "\n")
+                    count += 1
+            print(f"[SUCCESS] 아티클 {count}개 크기 기록: {articles}", file=sys.stderr)
     finally:
         await vector_store.disconnect()
 
 
+def main():
+    parser = argparse.ArgumentParser(description="MongoDB 저장 공간 / 인덱스 사용 분석")
+    parser.add_argument("--json", action="store_true", help="요약 대신 JSON 출력")
+    parser.add_argument("--output", help="분석 결과를 한 줄씩 추가할 JSONL 경로 (추세 비교용)")
+    parser.add_argument("--articles", help="아티클별 청크 수/바이트를 기록할 JSONL 경로")
+    parser.add_argument("--top", type=int, default=10, help="크기가 큰 아티클 표시 수")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="집계 커서 배치 크기")
+    asyncio.run(check_mongodb_data(parser.parse_args()))
+
+
 if __name__ == "__main__":
-    asyncio.run(check_mongodb_data())
+    main()
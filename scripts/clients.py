@@ -0,0 +1,216 @@
+"""
+워커 프로세스 공유 클라이언트 레지스트리
+같은 프로세스에서 AirflowVectorStore를 여러 번 만들어도 같은 설정의 MongoDB(Motor) 클라이언트와 OpenAI 클라이언트를
+재사용해 연결 풀, TLS 핸드셰이크, 서버 탐색 비용을 한 번만 냅니다.
+- 키에 PID를 포함해 fork된 프로세스(LocalExecutor 태스크)는 부모의 소켓을 물려 쓰지 않고 새 클라이언트를 만듦
+- Motor와 OpenAI(httpx) 클라이언트는 처음 사용한 이벤트 루프에 묶이므로 이벤트 루프별로 보관
+  (DAG 태스크는 run_async로 프로세스당 하나의 이벤트 루프를 계속 사용)
+- 연결 풀/타임아웃/압축 설정은 MONGODB_* 환경 변수로 조정
+"""
+import asyncio
+import atexit
+import functools
+import logging
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 압축 방식별 필요한 모듈 (zlib은 표준 라이브러리)
+COMPRESSOR_MODULES = {
+    "zstd": ("backports.zstd", "compression.zstd", "zstandard"),
+    "snappy": ("snappy",),
+    "zlib": ("zlib",),
+}
+
+_lock = threading.Lock()
+# (pid, 이벤트 루프, 설정) -> 클라이언트
+_mongo_clients: Dict[Tuple, object] = {}
+_openai_clients: Dict[Tuple, object] = {}
+# pid -> 태스크 실행용 이벤트 루프
+_worker_loops: Dict[int, asyncio.AbstractEventLoop] = {}
+
+
+def client_reuse_enabled() -> bool:
+    """프로세스 내 클라이언트 재사용 여부 (MONGODB_CLIENT_REUSE, 기본 true)"""
+    return os.getenv("MONGODB_CLIENT_REUSE", "true").lower() == "true"
+
+
+def _module_available(name: str) -> bool:
+    try:
+        __import__(name)
+        return True
+    except ImportError:
+        return False
+
+
+@functools.lru_cache(maxsize=None)
+def available_compressors(names: str) -> Tuple[str, ...]:
+    """설정한 압축 방식 중 필요한 모듈이 설치된 것만 (순서 유지, 설정값별로 한 번만 확인/경고)"""
+    compressors = []
+    for name in (n.strip().lower() for n in names.split(",")):
+        if not name or name == "none":
+            continue
+        modules = COMPRESSOR_MODULES.get(name)
+        if modules is None:
+            logger.warning(f"알 수 없는 MongoDB 압축 방식 무시: {name}")
+        elif any(_module_available(module) for module in modules):
+            compressors.append(name)
+        else:
+            logger.warning(f"MongoDB 압축 방식 {name}에 필요한 모듈이 없어 제외합니다: {' | '.join(modules)}")
+    return tuple(compressors)
+
+
+def mongo_client_options() -> Dict:
+    """
+    환경 변수로 정한 MongoDB 클라이언트 옵션 (대량 적재/재임베딩 기준 기본값)
+    - MONGODB_MAX_POOL_SIZE / MONGODB_MIN_POOL_SIZE: 연결 풀 크기 (기본 20 / 1)
+    - MONGODB_SOCKET_TIMEOUT_MS: 응답 대기 시간, 대량 bulk_write가 끊기지 않도록 기본 120000 (0이면 제한 없음)
+    - MONGODB_CONNECT_TIMEOUT_MS / MONGODB_SERVER_SELECTION_TIMEOUT_MS: 연결/서버 선택 대기 (기본 5000)
+    - MONGODB_MAX_IDLE_TIME_MS: 유휴 연결 정리 시간 (기본 300000)
+    - MONGODB_COMPRESSORS: 전송 압축 방식 우선순위 (기본 zstd,zlib, none이면 압축 안 함)
+    """
+    options = {
+        "serverSelectionTimeoutMS": int(os.getenv("MONGODB_SERVER_SELECTION_TIMEOUT_MS", "5000")),
+        "connectTimeoutMS": int(os.getenv("MONGODB_CONNECT_TIMEOUT_MS", "5000")),
+        "socketTimeoutMS": int(os.getenv("MONGODB_SOCKET_TIMEOUT_MS", "120000")) or None,
+        "maxPoolSize": int(os.getenv("MONGODB_MAX_POOL_SIZE", "20")),
+        "minPoolSize": int(os.getenv("MONGODB_MIN_POOL_SIZE", "1")),
+        "maxIdleTimeMS": int(os.getenv("MONGODB_MAX_IDLE_TIME_MS", "300000")),
+    }
+    compressors = available_compressors(os.getenv("MONGODB_COMPRESSORS", "zstd,zlib"))
+    if compressors:
+        options["compressors"] = ",".join(compressors)
+    return options
+
+
+def _current_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def _prune_closed_loops():
+    """닫힌 이벤트 루프의 클라이언트 정리 (_lock 안에서 호출)"""
+    for key in [k for k in _mongo_clients if k[1] is not None and k[1].is_closed()]:
+        _mongo_clients.pop(key).close()
+    for key in [k for k in _openai_clients if k[1] is not None and k[1].is_closed()]:
+        _close_openai_client(_openai_clients.pop(key), key[1])
+
+
+def _close_openai_client(client, loop: Optional[asyncio.AbstractEventLoop]):
+    """
+    AsyncOpenAI 클라이언트의 httpx 연결 풀 닫기
+    만든 이벤트 루프가 열려 있으면 그 루프에서, 루프가 닫혔으면 현재 실행 중인 루프나 임시 루프에서 닫음
+    (닫힌 루프에 묶인 연결은 정리 중 오류가 날 수 있어 기록만 하고 무시)
+    """
+    running = _current_loop()
+    try:
+        if loop is not None and loop.is_running():
+            asyncio.run_coroutine_threadsafe(client.close(), loop).add_done_callback(_log_close_error)
+        elif loop is not None and not loop.is_closed():
+            loop.run_until_complete(client.close())
+        elif running is not None:
+            running.create_task(client.close()).add_done_callback(_log_close_error)
+        else:
+            temp_loop = asyncio.new_event_loop()
+            try:
+                temp_loop.run_until_complete(client.close())
+            finally:
+                temp_loop.close()
+    except Exception as e:
+        logger.debug(f"OpenAI 클라이언트 종료 중 오류 무시: {e}")
+
+
+def _log_close_error(future):
+    if not future.cancelled() and future.exception() is not None:
+        logger.debug(f"OpenAI 클라이언트 종료 중 오류 무시: {future.exception()}")
+
+
+def get_mongo_client(uri: str, **overrides):
+    """
+    현재 프로세스/이벤트 루프에서 공유하는 Motor 클라이언트 (없으면 생성)
+    overrides: mongo_client_options() 위에 덮어쓸 옵션
+    반환값: (클라이언트, 공유 여부) - 공유 클라이언트는 사용한 쪽에서 닫지 않음
+    """
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    options = {**mongo_client_options(), **overrides}
+    if not client_reuse_enabled():
+        return AsyncIOMotorClient(uri, **options), False
+
+    key = (os.getpid(), _current_loop(), uri, tuple(sorted(options.items())))
+    with _lock:
+        _prune_closed_loops()
+        client = _mongo_clients.get(key)
+        if client is None:
+            client = AsyncIOMotorClient(uri, **options)
+            _mongo_clients[key] = client
+            logger.info(f"MongoDB 클라이언트 생성 (maxPoolSize={options['maxPoolSize']}, "
+                        f"socketTimeoutMS={options['socketTimeoutMS']}, "
+                        f"compressors={options.get('compressors', 'none')})")
+    return client, True
+
+
+def get_openai_client(api_key: str):
+    """현재 프로세스/이벤트 루프에서 공유하는 AsyncOpenAI 클라이언트 (재시도는 EmbeddingDispatcher가 처리)"""
+    from openai import AsyncOpenAI
+
+    if not client_reuse_enabled():
+        return AsyncOpenAI(api_key=api_key, max_retries=0)
+
+    key = (os.getpid(), _current_loop(), api_key)
+    with _lock:
+        _prune_closed_loops()
+        client = _openai_clients.get(key)
+        if client is None:
+            client = AsyncOpenAI(api_key=api_key, max_retries=0)
+            _openai_clients[key] = client
+    return client
+
+
+def worker_loop() -> asyncio.AbstractEventLoop:
+    """현재 프로세스의 태스크 실행용 이벤트 루프 (fork된 프로세스나 닫힌 루프면 새로 생성)"""
+    pid = os.getpid()
+    loop = _worker_loops.get(pid)
+    if loop is None or loop.is_closed():
+        loop = asyncio.new_event_loop()
+        _worker_loops[pid] = loop
+    return loop
+
+
+def run_async(coro):
+    """
+    코루틴을 프로세스 공유 이벤트 루프에서 실행 (asyncio.run 대신 사용)
+    asyncio.run은 호출마다 새 루프를 만들어 루프에 묶인 공유 클라이언트를 재사용할 수 없음
+    """
+    loop = worker_loop()
+    asyncio.set_event_loop(loop)
+    return loop.run_until_complete(coro)
+
+
+def close_clients():
+    """현재 프로세스에서 만든 공유 클라이언트 모두 닫기 (프로세스 종료 시 자동 호출)"""
+    pid = os.getpid()
+    with _lock:
+        for key in [k for k in _mongo_clients if k[0] == pid]:
+            _mongo_clients.pop(key).close()
+        openai_clients = [(key[1], _openai_clients.pop(key)) for key in [k for k in _openai_clients if k[0] == pid]]
+    # 연결 풀 종료는 클라이언트를 만든 루프에서 실행되므로 루프를 닫기 전에, 잠금 밖에서 처리
+    for client_loop, client in openai_clients:
+        _close_openai_client(client, client_loop)
+    loop = _worker_loops.pop(pid, None)
+    if loop is not None and not loop.is_closed():
+        loop.close()
+
+
+def registry_stats() -> Dict:
+    """현재 프로세스의 공유 클라이언트 수 (벤치마크/디버깅용)"""
+    pid = os.getpid()
+    return {"mongo": sum(1 for k in _mongo_clients if k[0] == pid),
+            "openai": sum(1 for k in _openai_clients if k[0] == pid)}
+
+
+atexit.register(close_clients)
@@ -0,0 +1,220 @@
+"""
+크롤링 빠른 실패 / 중단 정책 모듈
+- 챌린지 감지: 이동 직후 응답 상태와 HTML로 Cloudflare 챌린지/차단 페이지를 판별하여 전체 타임아웃을 기다리지 않음
+- 서킷 브레이커: 연속 실패가 임계값에 이르면 크롤링을 잠시 멈추고(대기 시간은 회차마다 2배), 계속 실패하면 중단
+- 전체 마감 시각: 실행이 마감 시각을 넘기면 완료한 아티클만 확정하고 부분 결과(partial)로 종료하여 워커 슬롯 반환
+- 지연 실행: 지연 실행 임계값보다 긴 대기는 체크포인트 후 StageDeferred로 알려 triggerer에서 대기 (crawl_triggers)
+"""
+import asyncio
+import logging
+import os
+import re
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 차단/과부하를 뜻하는 응답 상태 코드
+BLOCKED_STATUS_CODES = {403, 429, 503}
+
+# Cloudflare 챌린지/차단 페이지 표식 (본문 앞부분만 검사)
+CHALLENGE_MARKERS = [
+    (re.compile(r'<title>\s*(Just a moment|잠시만 기다리십시오)', re.I), "cloudflare_challenge"),
+    (re.compile(r'<title>\s*Attention Required', re.I), "cloudflare_block"),
+    (re.compile(r'cf-error-code|error code:\s*10\d\d', re.I), "cloudflare_block"),
+    (re.compile(r'<title>\s*(Access denied|Too Many Requests)', re.I), "blocked"),
+]
+# 챌린지 스크립트 표식 - Cloudflare가 정상 페이지에도 /cdn-cgi/challenge-platform/ 스크립트를 넣으므로
+# 챌린지 응답 상태(403/503)일 때만 챌린지로 판단 (챌린지 제목은 위 CHALLENGE_MARKERS에서 상태와 무관하게 판단)
+CHALLENGE_SCRIPT_PATTERN = re.compile(r'challenge-platform|cf-chl-|cf_chl_opt', re.I)
+CHALLENGE_STATUS_CODES = {403, 503}
+CHALLENGE_SCAN_CHARS = 20000
+
+
+class CrawlBlockedError(Exception):
+    """이동한 페이지가 챌린지/차단 페이지임 (reason: 판별 사유)"""
+
+    def __init__(self, url: str, reason: str):
+        super().__init__(f"차단 페이지 감지 ({reason}): {url}")
+        self.url = url
+        self.reason = reason
+
+
+class CircuitOpenError(Exception):
+    """연속 실패로 서킷 브레이커가 최대 횟수만큼 열려 크롤링을 중단해야 함"""
+
+
+class StageDeferred(Exception):
+    """긴 대기가 필요하여 체크포인트를 남기고 단계를 멈춤 (seconds초 뒤 같은 단계를 다시 실행하면 이어서 처리)"""
+
+    def __init__(self, seconds: float, reason: str):
+        super().__init__(f"{seconds:.0f}초 대기 필요 ({reason})")
+        self.seconds = seconds
+        self.reason = reason
+
+
+def defer_threshold() -> Optional[float]:
+    """
+    이 시간(초) 이상 기다려야 하면 워커 대신 triggerer에서 대기 (CRAWL_DEFER_MIN_SECONDS, 기본 30초)
+    CRAWL_DEFERRABLE=false면 None (기존처럼 태스크 안에서 대기)
+    """
+    if os.getenv("CRAWL_DEFERRABLE", "true").lower() != "true":
+        return None
+    return float(os.getenv("CRAWL_DEFER_MIN_SECONDS", "30"))
+
+
+def page_timeout_ms() -> int:
+    """페이지 하나의 이동 + 로딩 예산 (CRAWL_PAGE_TIMEOUT_MS, 기본 10초)"""
+    return int(os.getenv("CRAWL_PAGE_TIMEOUT_MS", "10000"))
+
+
+def detect_challenge(status: Optional[int], html: str) -> Optional[str]:
+    """응답 상태와 HTML 앞부분으로 챌린지/차단 페이지 판별 (정상 페이지면 None)"""
+    head = html[:CHALLENGE_SCAN_CHARS]
+    for pattern, reason in CHALLENGE_MARKERS:
+        if pattern.search(head):
+            return reason
+    if status in CHALLENGE_STATUS_CODES and CHALLENGE_SCRIPT_PATTERN.search(head):
+        return "cloudflare_challenge"
+    if status in BLOCKED_STATUS_CODES:
+        return f"http_{status}"
+    return None
+
+
+class CrawlDeadline:
+    """실행 전체 마감 시각 (seconds가 None이면 마감 없음, 0 이하면 이미 마감)"""
+
+    def __init__(self, seconds: Optional[float] = None):
+        self.expires_at = time.monotonic() + seconds if seconds is not None else None
+
+    @classmethod
+    def from_env(cls, started_at: Optional[datetime] = None) -> "CrawlDeadline":
+        """
+        CRAWL_DEADLINE_MINUTES(기본 45분, 0이면 마감 없음) 기준 마감
+        started_at: 실행 시작 시각 (DAG 실행 시작 시각을 주면 앞 단계에서 쓴 시간도 차감)
+        """
+        seconds = float(os.getenv("CRAWL_DEADLINE_MINUTES", "45")) * 60
+        if not seconds:
+            return cls()
+        if started_at is not None:
+            if started_at.tzinfo is None:
+                started_at = started_at.replace(tzinfo=timezone.utc)
+            seconds -= (datetime.now(timezone.utc) - started_at).total_seconds()
+        return cls(seconds)
+
+    def remaining(self) -> Optional[float]:
+        """남은 시간(초, 마감 없으면 None)"""
+        if self.expires_at is None:
+            return None
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    def expired(self) -> bool:
+        return self.remaining() == 0.0
+
+    def budget_ms(self, page_budget_ms: int) -> int:
+        """페이지 예산과 남은 시간 중 짧은 쪽 (ms, 최소 1초)"""
+        remaining = self.remaining()
+        if remaining is None:
+            return page_budget_ms
+        return max(min(page_budget_ms, int(remaining * 1000)), 1000)
+
+
+class CircuitBreaker:
+    """
+    연속 실패 서킷 브레이커
+    threshold번 연속 실패하면 열려서 cooldown초(열릴 때마다 2배) 동안 요청을 멈추고,
+    max_trips번을 넘게 열리면 CircuitOpenError로 크롤링 중단
+    """
+
+    def __init__(self, threshold: Optional[int] = None, cooldown: Optional[float] = None,
+                 max_trips: Optional[int] = None):
+        self.threshold = threshold or int(os.getenv("CRAWL_BREAKER_THRESHOLD", "5"))
+        self.cooldown = cooldown if cooldown is not None else float(os.getenv("CRAWL_BREAKER_COOLDOWN_SECONDS", "60"))
+        self.max_trips = max_trips if max_trips is not None else int(os.getenv("CRAWL_BREAKER_MAX_TRIPS", "3"))
+        self.consecutive = 0
+        self.trips = 0
+        self.open_until: Optional[float] = None
+        self.reasons: List[str] = []
+        self.blocked = 0
+
+    def record_success(self):
+        self.consecutive = 0
+
+    def record_failure(self, reason: str = "error"):
+        """실패 기록, 임계값에 이르면 브레이커를 엶 (최대 횟수를 넘으면 CircuitOpenError)"""
+        self.consecutive += 1
+        self.reasons = (self.reasons + [reason])[-self.threshold:]
+        if reason != "error":
+            self.blocked += 1
+        if self.consecutive < self.threshold:
+            return
+        self.trips += 1
+        self.consecutive = 0
+        if self.trips > self.max_trips:
+            raise CircuitOpenError(f"연속 실패로 서킷 브레이커가 {self.trips}번 열림 (최근 사유: {self.reasons})")
+        pause = self.pause_seconds()
+        self.open_until = time.monotonic() + pause
+        logger.warning(f"⛔ 연속 {self.threshold}회 실패 ({self.reasons}) - {pause:.0f}초 동안 크롤링 일시 중지 "
+                       f"({self.trips}/{self.max_trips})")
+
+    def pause_seconds(self) -> float:
+        """이번 회차 대기 시간 (열릴 때마다 2배)"""
+        return self.cooldown * (2 ** max(self.trips - 1, 0))
+
+    def remaining_pause(self) -> float:
+        """열려 있으면 남은 대기 시간(초), 닫혀 있으면 0"""
+        if self.open_until is None:
+            return 0.0
+        return max(self.open_until - time.monotonic(), 0.0)
+
+    async def wait(self, deadline: Optional[CrawlDeadline] = None) -> bool:
+        """
+        열려 있으면 닫힐 때까지 대기
+        반환값: 계속 크롤링해도 되는지 (대기가 마감 시각을 넘기면 기다리지 않고 False)
+        """
+        pause = self.remaining_pause()
+        if not pause:
+            return True
+        remaining = deadline.remaining() if deadline else None
+        if remaining is not None and pause >= remaining:
+            logger.warning(f"서킷 브레이커 대기({pause:.0f}초)가 마감까지 남은 시간({remaining:.0f}초)보다 길어 중단")
+            return False
+        await asyncio.sleep(pause)
+        self.open_until = None
+        return True
+
+    def defer_seconds(self, defer_after: Optional[float], deadline: Optional[CrawlDeadline] = None) -> Optional[float]:
+        """
+        남은 대기를 triggerer에 넘길지 판단
+        반환값: 넘길 대기 시간(초) - 대기가 defer_after보다 짧거나 마감을 넘기면 None (기존 wait()로 처리)
+        """
+        pause = self.remaining_pause()
+        if defer_after is None or not pause or pause < defer_after:
+            return None
+        remaining = deadline.remaining() if deadline else None
+        if remaining is not None and pause >= remaining:
+            return None
+        return pause
+
+    def report(self) -> Dict:
+        return {"trips": self.trips, "blocked": self.blocked, "recent_reasons": self.reasons}
+
+    def restore(self, report: Dict):
+        """지연 실행 후 재개 시 이전 상태 복원 (대기는 이미 끝났으므로 닫힌 상태, 다음 대기 시간은 이어서 2배)"""
+        self.trips = report.get("trips", 0)
+        self.blocked = report.get("blocked", 0)
+        self.reasons = list(report.get("recent_reasons", []))
+
+
+async def stop_reason(breaker: CircuitBreaker, deadline: CrawlDeadline) -> Optional[str]:
+    """
+    다음 아티클로 넘어가기 전 확인 (브레이커가 열려 있으면 대기)
+    반환값: 중단 사유("deadline") 또는 계속 진행이면 None
+    """
+    if deadline.expired():
+        logger.warning("⏰ 크롤링 마감 시각 도달 - 완료한 아티클만 확정하고 종료")
+        return "deadline"
+    if not await breaker.wait(deadline):
+        return "deadline"
+    return None
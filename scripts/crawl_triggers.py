@@ -0,0 +1,49 @@
+"""
+크롤링 단계 지연 실행(deferrable) 오퍼레이터
+단계가 긴 대기(서킷 브레이커 일시 중지, 사이트 429/차단 후 냉각, 임베딩 API 재시도 대기)를 StageDeferred로 알리면
+워커 안에서 sleep하지 않고 Airflow 기본 DateTimeTrigger로 triggerer에 대기를 넘겨 워커 슬롯(과 풀 슬롯)을 반환합니다.
+대기가 끝나면 같은 태스크가 다시 실행되어 체크포인트(부분 산출물 + 단계 상태 파일)부터 이어서 처리합니다.
+triggerer 프로세스(docker-compose의 airflow-triggerer)가 실행 중이어야 합니다.
+"""
+import os
+from datetime import timedelta
+from typing import Optional
+
+from airflow.operators.python import PythonOperator
+
+from .crawl_guard import StageDeferred, defer_threshold
+
+
+class DeferrableStageOperator(PythonOperator):
+    """
+    PythonOperator와 같지만 단계가 StageDeferred를 발생시키면 대기를 triggerer에 넘김
+    python_callable은 context['defer_after'](초, 지연 실행을 쓰지 않으면 None)를 단계 함수에 넘겨야 함
+    max_deferrals번 넘게 지연되면 이후 대기는 태스크 안에서 처리 (CRAWL_MAX_DEFERRALS, 기본 20)
+    """
+
+    def __init__(self, *, max_deferrals: Optional[int] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.max_deferrals = (max_deferrals if max_deferrals is not None
+                              else int(os.getenv("CRAWL_MAX_DEFERRALS", "20")))
+
+    def execute(self, context, deferrals: int = 0):
+        context["defer_after"] = defer_threshold() if deferrals < self.max_deferrals else None
+        try:
+            return super().execute(context)
+        except StageDeferred as e:
+            # 트리거 모듈은 실제로 지연할 때만 로드 (DAG 파싱 시에는 PythonOperator 외 Airflow 모듈을 읽지 않음)
+            from airflow.triggers.temporal import DateTimeTrigger
+            from airflow.utils import timezone
+
+            self.log.info(f"⏸️ {e.reason}: {e.seconds:.0f}초 동안 triggerer에서 대기 (지연 {deferrals + 1}회)")
+            # 사유와 지연 횟수는 재개 시 execute_complete 인자로 전달
+            self.defer(
+                trigger=DateTimeTrigger(moment=timezone.utcnow() + timedelta(seconds=e.seconds)),
+                method_name="execute_complete",
+                kwargs={"reason": e.reason, "deferrals": deferrals + 1},
+            )
+
+    def execute_complete(self, context, event=None, reason: Optional[str] = None, deferrals: int = 0):
+        """대기가 끝나면 체크포인트부터 단계 재실행"""
+        self.log.info(f"▶️ {reason} 대기 종료 - 체크포인트부터 재개")
+        return self.execute(context, deferrals=deferrals)
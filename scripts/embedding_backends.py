@@ -0,0 +1,224 @@
+"""
+임베딩 백엔드 모듈
+OpenAI API(원격)와 sentence-transformers(로컬 CPU) 임베딩을 같은 인터페이스로 제공합니다.
+청크 메타데이터에 백엔드/모델을 기록하여 서로 다른 모델의 벡터가 섞이지 않도록 합니다.
+"""
+import asyncio
+import importlib.util
+import logging
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .embedding_dispatcher import EmbeddingDispatcher, EmbeddingDispatchError
+
+# sentence-transformers 설정 (torch를 함께 불러오므로 실제 import는 모델 로드 시점에 수행)
+SENTENCE_TRANSFORMERS_AVAILABLE = importlib.util.find_spec("sentence_transformers") is not None
+
+logger = logging.getLogger(__name__)
+
+# OpenAI 임베딩 모델별 기본 벡터 차원
+OPENAI_MODEL_DIMENSIONS = {
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072,
+    "text-embedding-ada-002": 1536,
+}
+
+# 로컬 다국어 모델 기본값 (차원, 질의/문서 접두어)
+# e5 계열은 학습 시 사용한 "query: " / "passage: " 접두어를 붙여야 검색 품질이 유지됨
+LOCAL_MODEL_PRESETS = {
+    "intfloat/multilingual-e5-small": {"dimensions": 384, "query_prefix": "query: ", "document_prefix": "passage: "},
+    "intfloat/multilingual-e5-base": {"dimensions": 768, "query_prefix": "query: ", "document_prefix": "passage: "},
+    "intfloat/multilingual-e5-large": {"dimensions": 1024, "query_prefix": "query: ", "document_prefix": "passage: "},
+    "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2": {"dimensions": 384},
+}
+
+# 로드된 로컬 모델 (워커 프로세스당 모델/스레드 설정별 1회 로드)
+_LOCAL_MODELS: Dict[tuple, object] = {}
+_LOCAL_MODELS_LOCK = threading.Lock()
+
+
+class EmbeddingBackend(ABC):
+    """임베딩 백엔드 공통 인터페이스"""
+
+    name = ""
+
+    def __init__(self, model: str, dimensions: int):
+        self.model = model
+        self.dimensions = dimensions
+
+    @abstractmethod
+    async def embed(self, texts: List[str], input_type: str = "document") -> List[List[float]]:
+        """
+        텍스트 목록 임베딩 (입력 순서 유지)
+        input_type: document(청크) | query(검색 질의)
+        실패하면 EmbeddingDispatchError 발생
+        """
+
+    def warm_load(self):
+        """모델 사전 로드 (원격 백엔드는 할 일 없음)"""
+
+    def tokenizer_loader(self) -> Optional[Callable[[], Tuple[object, Optional[int]]]]:
+        """청크 분할에 쓸 모델 토크나이저 로더 (None이면 모델 이름 기준 tiktoken 사용)"""
+        return None
+
+    def metadata(self) -> Dict:
+        """청크에 기록하는 백엔드/모델/차원 정보"""
+        return {
+            "embedding_backend": self.name,
+            "embedding_model": self.model,
+            "embedding_dimensions": self.dimensions,
+        }
+
+
+class OpenAIEmbeddingBackend(EmbeddingBackend):
+    """OpenAI 임베딩 API 백엔드 (RPM/TPM 예산 + 재시도 디스패처 사용)"""
+
+    name = "openai"
+
+    def __init__(self, client, model: str, dimensions: Optional[int], count_tokens: Callable[[str], int]):
+        native = OPENAI_MODEL_DIMENSIONS.get(model, 1536)
+        super().__init__(model, dimensions or native)
+        # dimensions 파라미터를 보낼 수 없는 모델은 항상 기본 차원 벡터를 반환하므로
+        # 다른 차원을 메타데이터/벡터 인덱스에 기록하지 않도록 설정 단계에서 거부
+        if self.dimensions != native and not (self.supports_reduced_dimensions() and self.dimensions < native):
+            raise ValueError(f"{model} 모델은 {self.dimensions}차원을 지원하지 않습니다 "
+                             f"(기본 {native}차원, 축소 차원은 text-embedding-3 모델만 가능)")
+        self.client = client
+        self.dispatcher = None
+        if client:
+            self.dispatcher = EmbeddingDispatcher(
+                client,
+                self.request_options(),
+                count_tokens,
+                rpm=int(os.getenv("OPENAI_EMBEDDING_RPM", "3000")),
+                tpm=int(os.getenv("OPENAI_EMBEDDING_TPM", "1000000")),
+                max_concurrency=int(os.getenv("OPENAI_EMBEDDING_CONCURRENCY", "8")),
+                max_batch_tokens=int(os.getenv("OPENAI_EMBEDDING_BATCH_TOKENS", "100000")),
+                max_retries=int(os.getenv("OPENAI_EMBEDDING_MAX_RETRIES", "8")),
+            )
+
+    def supports_reduced_dimensions(self) -> bool:
+        """dimensions 파라미터(축소 차원) 지원 모델 여부"""
+        return self.model.startswith("text-embedding-3")
+
+    def request_options(self) -> Dict:
+        """임베딩 API 요청 옵션 (축소 차원 설정 시 dimensions 포함)"""
+        options: Dict = {"model": self.model}
+        native = OPENAI_MODEL_DIMENSIONS.get(self.model)
+        if self.supports_reduced_dimensions() and self.dimensions != native:
+            options["dimensions"] = self.dimensions
+        return options
+
+    async def embed(self, texts: List[str], input_type: str = "document") -> List[List[float]]:
+        if not self.dispatcher:
+            raise EmbeddingDispatchError("OpenAI API 키가 설정되지 않았습니다. OPENAI_API_KEY 환경 변수를 설정하세요.")
+        return await self.dispatcher.embed(texts)
+
+
+class LocalEmbeddingBackend(EmbeddingBackend):
+    """sentence-transformers 로컬 CPU 백엔드 (배치 추론, 스레드 수 설정, 워커당 1회 로드)"""
+
+    name = "local"
+
+    def __init__(self, model: str, dimensions: Optional[int] = None, batch_size: int = 32,
+                 threads: Optional[int] = None, device: str = "cpu",
+                 query_prefix: Optional[str] = None, document_prefix: Optional[str] = None):
+        preset = LOCAL_MODEL_PRESETS.get(model, {})
+        self.batch_size = batch_size
+        self.threads = threads
+        self.device = device
+        self.query_prefix = preset.get("query_prefix", "") if query_prefix is None else query_prefix
+        self.document_prefix = preset.get("document_prefix", "") if document_prefix is None else document_prefix
+        super().__init__(model, dimensions or preset.get("dimensions") or 0)
+        # 모델 출력 차원과 다른 값을 메타데이터/벡터 인덱스에 기록하지 않도록 거부
+        # (프리셋에 없는 모델은 첫 추론에서 확인)
+        if preset.get("dimensions") and self.dimensions != preset["dimensions"]:
+            raise ValueError(f"{model} 모델의 출력 차원은 {preset['dimensions']}입니다 (설정값 {self.dimensions})")
+        if not self.dimensions:
+            # 차원을 모르는 모델은 로드해서 확인
+            self.dimensions = self.warm_load().get_sentence_embedding_dimension()
+
+    def warm_load(self):
+        """모델 로드 (같은 프로세스에서는 캐시된 모델 재사용)"""
+        if not SENTENCE_TRANSFORMERS_AVAILABLE:
+            raise ImportError("sentence-transformers가 설치되지 않았습니다. pip install sentence-transformers")
+
+        key = (self.model, self.device, self.threads)
+        with _LOCAL_MODELS_LOCK:
+            if key not in _LOCAL_MODELS:
+                import torch
+                from sentence_transformers import SentenceTransformer
+
+                if self.threads:
+                    torch.set_num_threads(self.threads)
+                logger.info(f"로컬 임베딩 모델 로드 중: {self.model} (device={self.device}, threads={self.threads})")
+                _LOCAL_MODELS[key] = SentenceTransformer(self.model, device=self.device)
+            return _LOCAL_MODELS[key]
+
+    def tokenizer_loader(self) -> Optional[Callable[[], Tuple[object, Optional[int]]]]:
+        return self._load_tokenizer
+
+    def _load_tokenizer(self) -> Tuple[object, int]:
+        """
+        모델 토크나이저와 청크 최대 토큰 수
+        반환값: (토크나이저, max_seq_length에서 특수 토큰과 문서 접두어 토큰을 뺀 값) - 넘는 입력은 인코딩 때 잘림
+        """
+        model = self.warm_load()
+        tokenizer = model.tokenizer
+        prefix_tokens = (len(tokenizer(self.document_prefix, add_special_tokens=False)["input_ids"])
+                         if self.document_prefix else 0)
+        return tokenizer, model.max_seq_length - tokenizer.num_special_tokens_to_add(pair=False) - prefix_tokens
+
+    def _encode(self, texts: List[str]) -> List[List[float]]:
+        model = self.warm_load()
+        native = model.get_sentence_embedding_dimension()
+        if native != self.dimensions:
+            raise ValueError(f"{self.model} 모델의 출력 차원은 {native}입니다 (설정값 {self.dimensions})")
+        vectors = model.encode(
+            texts,
+            batch_size=self.batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        )
+        return vectors.tolist()
+
+    async def embed(self, texts: List[str], input_type: str = "document") -> List[List[float]]:
+        if not texts:
+            return []
+        prefix = self.query_prefix if input_type == "query" else self.document_prefix
+        inputs = [prefix + text for text in texts] if prefix else list(texts)
+        # 추론은 CPU를 오래 점유하므로 이벤트 루프를 막지 않도록 스레드에서 실행
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(None, self._encode, inputs)
+        except (ImportError, ValueError):
+            # 설치/설정 오류는 재시도해도 같으므로 그대로 전달
+            raise
+        except Exception as e:
+            raise EmbeddingDispatchError(f"로컬 임베딩 실패 ({len(texts)}개): {e}") from e
+
+
+def create_embedding_backend(name: str, client=None, count_tokens: Optional[Callable[[str], int]] = None) -> EmbeddingBackend:
+    """환경 변수 설정으로 임베딩 백엔드 생성 (openai | local)"""
+    if name == "openai":
+        dimensions = os.getenv("OPENAI_EMBEDDING_DIMENSIONS")
+        return OpenAIEmbeddingBackend(
+            client,
+            os.getenv("OPENAI_EMBEDDING_MODEL", "text-embedding-3-small"),
+            int(dimensions) if dimensions else None,
+            count_tokens or len,
+        )
+    if name == "local":
+        dimensions = os.getenv("LOCAL_EMBEDDING_DIMENSIONS")
+        threads = os.getenv("LOCAL_EMBEDDING_THREADS")
+        return LocalEmbeddingBackend(
+            os.getenv("LOCAL_EMBEDDING_MODEL", "intfloat/multilingual-e5-small"),
+            dimensions=int(dimensions) if dimensions else None,
+            batch_size=int(os.getenv("LOCAL_EMBEDDING_BATCH_SIZE", "32")),
+            threads=int(threads) if threads else None,
+            device=os.getenv("LOCAL_EMBEDDING_DEVICE", "cpu"),
+        )
+    raise ValueError(f"지원하지 않는 임베딩 백엔드: {name}")
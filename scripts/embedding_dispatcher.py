@@ -0,0 +1,203 @@
+"""
+임베딩 요청 디스패처 모듈
+분당 요청 수(RPM) / 분당 토큰 수(TPM) 예산 안에서 여러 임베딩 요청을 병렬로 보내고,
+429/5xx/연결 오류는 지터를 준 지수 백오프로 재시도합니다.
+재시도 후에도 실패하면 None을 반환하지 않고 예외를 발생시켜 청크가 조용히 누락되지 않도록 합니다.
+"""
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+import openai
+
+logger = logging.getLogger(__name__)
+
+# 임베딩 API 요청 1회당 최대 입력 수
+MAX_BATCH_INPUTS = 2048
+
+# 예산 측정 구간 (초)
+BUDGET_WINDOW_SECONDS = 60.0
+
+
+class EmbeddingDispatchError(Exception):
+    """
+    재시도 후에도 임베딩을 만들지 못한 경우
+    retry_after: 지연 실행 임계값을 넘는 재시도 대기가 필요해 대기 없이 중단한 경우의 대기 시간(초)
+    """
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RateBudget:
+    """최근 60초 사용량 기준 슬라이딩 윈도 예산 (요청 수 또는 토큰 수)"""
+
+    def __init__(self, limit: int, window: float = BUDGET_WINDOW_SECONDS):
+        self.limit = limit
+        self.window = window
+        self._events = deque()
+        self._used = 0
+        self._lock = None
+
+    def _expire(self, now: float):
+        while self._events and now - self._events[0][0] >= self.window:
+            _, amount = self._events.popleft()
+            self._used -= amount
+
+    async def acquire(self, amount: int):
+        """예산이 생길 때까지 대기 후 사용량 기록 (한도보다 큰 요청은 한도만큼으로 간주)"""
+        amount = min(amount, self.limit)
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._expire(now)
+                if self._used + amount <= self.limit:
+                    self._events.append((now, amount))
+                    self._used += amount
+                    return
+                # 가장 오래된 사용 기록이 만료될 때까지 대기
+                await asyncio.sleep(self.window - (now - self._events[0][0]) + 0.01)
+
+
+class EmbeddingDispatcher:
+    """RPM/TPM 예산과 동시 요청 수를 지키며 임베딩 배치 요청을 병렬 실행"""
+
+    def __init__(self, client, request_options: Dict, count_tokens: Callable[[str], int],
+                 rpm: int = 3000, tpm: int = 1000000, max_concurrency: int = 8,
+                 max_batch_inputs: int = MAX_BATCH_INPUTS, max_batch_tokens: int = 100000,
+                 max_retries: int = 8, base_delay: float = 1.0, max_delay: float = 60.0):
+        self.client = client
+        self.request_options = request_options
+        self.count_tokens = count_tokens
+        self.request_budget = RateBudget(rpm)
+        self.token_budget = RateBudget(tpm)
+        self.max_concurrency = max_concurrency
+        self.max_batch_inputs = max_batch_inputs
+        self.max_batch_tokens = max_batch_tokens
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._semaphore = None
+        # 재시도 대기가 이 시간(초) 이상이면 기다리지 않고 retry_after와 함께 실패 (지연 실행 단계에서 설정)
+        self.defer_after: Optional[float] = None
+        self.stats = {"requests": 0, "retries": 0, "inputs": 0, "tokens": 0}
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # 이벤트 루프 안에서 생성 (Python 3.8의 asyncio 동기화 객체는 생성 시점의 루프에 묶임)
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    def plan_batches(self, texts: List[str]) -> List[Dict]:
+        """
+        입력 수/토큰 수 상한에 맞춰 배치 분할 (전송 전 토큰 계산)
+        반환값: [{"start": 시작 위치, "texts": 텍스트 목록, "tokens": 토큰 합계}, ...]
+        """
+        batches = []
+        current: List[str] = []
+        current_tokens = 0
+        start = 0
+        for i, text in enumerate(texts):
+            tokens = self.count_tokens(text)
+            if current and (len(current) >= self.max_batch_inputs
+                            or current_tokens + tokens > self.max_batch_tokens):
+                batches.append({"start": start, "texts": current, "tokens": current_tokens})
+                current, current_tokens, start = [], 0, i
+            current.append(text)
+            current_tokens += tokens
+        if current:
+            batches.append({"start": start, "texts": current, "tokens": current_tokens})
+        return batches
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        """
+        텍스트 목록 임베딩 (입력 순서 유지)
+        한 배치라도 재시도 후 실패하면 EmbeddingDispatchError 발생
+        """
+        if not texts:
+            return []
+        batches = self.plan_batches(texts)
+        tasks = [asyncio.ensure_future(self._send_batch(batch)) for batch in batches]
+        try:
+            results = await asyncio.gather(*tasks)
+        finally:
+            # 한 배치가 실패(지연 실행 대기 포함)하면 남은 배치가 예산을 계속 쓰거나
+            # 프로세스 공유 루프에 남아 다음 실행 때 깨어나지 않도록 취소하고 끝날 때까지 대기
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        embeddings: List[List[float]] = []
+        for vectors in results:
+            embeddings.extend(vectors)
+        return embeddings
+
+    async def _send_batch(self, batch: Dict) -> List[List[float]]:
+        """배치 하나 전송 (예산 대기 + 재시도)"""
+        for attempt in range(self.max_retries + 1):
+            async with self._get_semaphore():
+                await self.request_budget.acquire(1)
+                await self.token_budget.acquire(batch["tokens"])
+                try:
+                    response = await self.client.embeddings.create(input=batch["texts"], **self.request_options)
+                    self.stats["requests"] += 1
+                    self.stats["inputs"] += len(batch["texts"])
+                    self.stats["tokens"] += batch["tokens"]
+                    return [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+                except Exception as e:
+                    if not self.is_retryable(e) or attempt == self.max_retries:
+                        raise EmbeddingDispatchError(
+                            f"임베딩 요청 실패 ({len(batch['texts'])}개, {attempt + 1}회 시도): {e}"
+                        ) from e
+                    delay = self.retry_delay(e, attempt)
+                    if self.defer_after is not None and delay >= self.defer_after:
+                        raise EmbeddingDispatchError(
+                            f"임베딩 요청 재시도 대기 {delay:.0f}초 - 지연 실행으로 전환: {e}", retry_after=delay
+                        ) from e
+                    self.stats["retries"] += 1
+                    logger.warning(f"임베딩 요청 재시도 {attempt + 1}/{self.max_retries} "
+                                   f"({delay:.1f}초 후): {e}")
+            # 대기 중에는 동시 요청 슬롯을 반납
+            await asyncio.sleep(delay)
+        raise EmbeddingDispatchError("임베딩 요청 재시도 횟수 초과")
+
+    @staticmethod
+    def is_retryable(error: Exception) -> bool:
+        """재시도 대상 오류 여부 (429, 5xx, 연결 오류/타임아웃)"""
+        if isinstance(error, (openai.RateLimitError, openai.APIConnectionError, openai.APITimeoutError,
+                              openai.InternalServerError)):
+            return True
+        if isinstance(error, openai.APIStatusError):
+            return error.status_code == 429 or error.status_code >= 500
+        return isinstance(error, (asyncio.TimeoutError, ConnectionError))
+
+    def retry_delay(self, error: Exception, attempt: int) -> float:
+        """재시도 대기 시간 (full jitter 지수 백오프, 서버의 retry-after가 더 길면 우선)"""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        retry_after = self._retry_after(error)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+    @staticmethod
+    def _retry_after(error: Exception) -> Optional[float]:
+        """응답 헤더의 retry-after-ms / retry-after 값 (초)"""
+        response = getattr(error, "response", None)
+        headers = getattr(response, "headers", None)
+        if not headers:
+            return None
+        try:
+            if headers.get("retry-after-ms"):
+                return float(headers["retry-after-ms"]) / 1000
+            if headers.get("retry-after"):
+                return float(headers["retry-after"])
+        except ValueError:
+            return None
+        return None
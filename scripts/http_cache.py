@@ -0,0 +1,161 @@
+"""
+도움말 센터 페이지 HTTP 재검증 캐시
+URL별 ETag/Last-Modified 검증자와 본문 digest를 {컬렉션}_http_cache에 보관하고, 다음 실행에서는 브라우저 이동 대신
+브라우저 컨텍스트의 HTTP 요청(쿠키 공유, Cloudflare 통과 상태 유지)으로 조건부 GET을 보냅니다.
+304 응답이거나 본문 digest가 같으면 "변경 없음"으로 보고 파싱과 저장을 생략하며,
+챌린지/오류 응답이면 기존처럼 브라우저로 이동합니다.
+"""
+import hashlib
+import logging
+import os
+import re
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from pymongo import UpdateOne
+
+from .crawl_guard import detect_challenge, page_timeout_ms
+
+logger = logging.getLogger(__name__)
+
+# 검증자 컬렉션 접미사
+HTTP_CACHE_SUFFIX = "_http_cache"
+# 한 번에 조회/저장할 검증자 수
+VALIDATOR_BATCH_SIZE = 500
+
+# 조건부 요청 결과
+NOT_MODIFIED = "not_modified"   # 304
+UNCHANGED = "unchanged"         # 200이지만 본문 digest 동일
+CHANGED = "changed"             # 새 본문 (HTTP 응답 본문으로 바로 파싱)
+FALLBACK = "fallback"           # 챌린지/오류 응답 -> 브라우저 이동
+
+# digest 계산 전에 제거할 요청마다 달라지는 부분 (스크립트/스타일, CSRF 토큰, nonce)
+VOLATILE_PATTERNS = [
+    re.compile(r'<script\b.*?</script>', re.I | re.S),
+    re.compile(r'<style\b.*?</style>', re.I | re.S),
+    re.compile(r'<meta[^>]+name="csrf-[^>]*>', re.I),
+    re.compile(r'\s(nonce|data-csrf[\w-]*)="[^"]*"', re.I),
+]
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+def http_cache_enabled() -> bool:
+    """HTTP 재검증 캐시 사용 여부 (CRAWL_HTTP_CACHE_ENABLED, 기본 true)"""
+    return os.getenv("CRAWL_HTTP_CACHE_ENABLED", "true").lower() == "true"
+
+
+def body_digest(html: str) -> str:
+    """요청마다 달라지는 부분을 뺀 HTML 본문 sha256"""
+    for pattern in VOLATILE_PATTERNS:
+        html = pattern.sub("", html)
+    return hashlib.sha256(WHITESPACE_PATTERN.sub(" ", html).encode("utf-8")).hexdigest()
+
+
+class ValidatorStore:
+    """URL별 검증자 문서 {_id: url, etag, last_modified, digest, links?, checked_at} 조회/저장"""
+
+    def __init__(self, store):
+        self.store = store
+
+    @property
+    def collection(self):
+        return self.store.db[f"{self.store.collection_name}{HTTP_CACHE_SUFFIX}"]
+
+    async def load(self, urls: Iterable[str]) -> Dict[str, Dict]:
+        """URL 목록의 검증자 (없는 URL은 제외)"""
+        urls = list(urls)
+        validators = {}
+        for start in range(0, len(urls), VALIDATOR_BATCH_SIZE):
+            async for doc in self.collection.find({"_id": {"$in": urls[start:start + VALIDATOR_BATCH_SIZE]}},
+                                                  projection={"checked_at": 0}):
+                validators[doc.pop("_id")] = doc
+        return validators
+
+    async def load_listings(self) -> Dict[str, Dict]:
+        """목록(카테고리/섹션) 페이지 검증자 (발견 단계용, 링크 목록 포함)"""
+        cursor = self.collection.find({"links": {"$exists": True}}, projection={"checked_at": 0})
+        return {doc.pop("_id"): doc async for doc in cursor}
+
+    async def save(self, validators: Dict[str, Dict]) -> int:
+        """검증자 일괄 저장 (처리가 끝난 URL만 저장해야 다음 실행에서 변경을 놓치지 않음)"""
+        items = list(validators.items())
+        now = datetime.utcnow()
+        for start in range(0, len(items), VALIDATOR_BATCH_SIZE):
+            requests = [UpdateOne({"_id": url}, {"$set": {**fields, "checked_at": now}}, upsert=True)
+                        for url, fields in items[start:start + VALIDATOR_BATCH_SIZE]]
+            await self.collection.bulk_write(requests, ordered=False)
+        return len(items)
+
+
+class ConditionalFetcher:
+    """
+    검증자를 이용한 조건부 GET
+    validators: 이전 실행의 URL별 검증자 (ValidatorStore.load 결과)
+    새로 받은 검증자는 updated에 모아 두고, 호출한 쪽이 처리(저장)를 마친 뒤 ValidatorStore.save로 기록
+    """
+
+    def __init__(self, validators: Optional[Dict[str, Dict]] = None):
+        self.validators = validators or {}
+        self.updated: Dict[str, Dict] = {}
+        self.stats = {NOT_MODIFIED: 0, UNCHANGED: 0, CHANGED: 0, FALLBACK: 0}
+
+    async def fetch(self, request_context, url: str, timeout_ms: Optional[int] = None) -> Tuple[str, Optional[str]]:
+        """
+        조건부 요청 (request_context: BrowserContext.request)
+        반환값: (결과, HTML) - 결과가 CHANGED일 때만 HTML이 있음
+        """
+        cached = self.validators.get(url) or {}
+        headers = {}
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+        try:
+            response = await request_context.get(url, headers=headers, timeout=timeout_ms or page_timeout_ms(),
+                                                  fail_on_status_code=False)
+        except Exception as e:
+            logger.debug(f"조건부 요청 실패 - 브라우저로 이동 ({url}): {e}")
+            return self._count(FALLBACK), None
+
+        if response.status == 304 and cached.get("digest"):
+            self.updated[url] = {**cached, **self._header_validators(response.headers, cached)}
+            return self._count(NOT_MODIFIED), None
+
+        html = await response.text() if response.status == 200 else ""
+        if response.status != 200 or detect_challenge(response.status, html):
+            return self._count(FALLBACK), None
+
+        digest = body_digest(html)
+        self.updated[url] = {**self._header_validators(response.headers, {}), "digest": digest}
+        if digest == cached.get("digest"):
+            if "links" in cached:
+                self.updated[url]["links"] = cached["links"]
+            return self._count(UNCHANGED), None
+        return self._count(CHANGED), html
+
+    def set_links(self, url: str, links: List[str]):
+        """목록 페이지에서 추출한 링크 기록 (변경 없음 응답이면 이 링크를 재사용)"""
+        if url in self.updated:
+            self.updated[url]["links"] = sorted(links)
+
+    def cached_links(self, url: str) -> Optional[List[str]]:
+        return (self.updated.get(url) or {}).get("links")
+
+    def pop_validators(self, url: str) -> Optional[Dict]:
+        return self.updated.pop(url, None)
+
+    @staticmethod
+    def _header_validators(headers: Dict, cached: Dict) -> Dict:
+        return {"etag": headers.get("etag") or cached.get("etag"),
+                "last_modified": headers.get("last-modified") or cached.get("last_modified")}
+
+    def _count(self, result: str) -> str:
+        self.stats[result] += 1
+        return result
+
+    def report(self) -> Dict:
+        """조건부 요청 결과별 횟수와 적중률(변경 없음 / 전체 요청)"""
+        requests = sum(self.stats.values())
+        hits = self.stats[NOT_MODIFIED] + self.stats[UNCHANGED]
+        return {**self.stats, "requests": requests, "hit_rate": round(hits / requests, 4) if requests else None}
@@ -0,0 +1,218 @@
+"""
+한국어 대응 BM25 어휘 인덱스 모듈
+청크 텍스트를 한글 문자 2-gram + 영문/숫자 단어 토큰으로 색인하여
+MongoDB 보조 컬렉션(<knowledge_base>_lexical)에 저장하고 BM25로 검색합니다.
+"""
+import asyncio
+import logging
+import math
+import re
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+from pymongo import ASCENDING, IndexModel, ReplaceOne
+
+from .profiling import profiled
+
+logger = logging.getLogger(__name__)
+
+# 한글 연속 구간 / 영문·숫자 토큰 (BTC, E1001, 0.0005, usdt-trc20 등은 한 토큰)
+_TOKEN_PATTERN = re.compile(r'[가-힣]+|[A-Za-z0-9]+(?:[._-][A-Za-z0-9]+)*')
+
+LEXICAL_INDEXES = [
+    IndexModel([("terms", ASCENDING)], name="terms_idx"),
+    IndexModel([("article_id", ASCENDING)], name="article_idx"),
+]
+
+# 코퍼스 통계(N, 평균 길이) 캐시 유지 시간 (초)
+STATS_TTL_SECONDS = 300
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    한국어 대응 토큰화
+    - 한글: 문자 2-gram (조사/어미가 붙어도 어간 부분이 일치하도록), 한 글자 구간은 그대로
+    - 영문/숫자: 소문자 단어 전체 (코인 티커, 오류 코드, 수수료 값 등 정확 일치용)
+    """
+    tokens = []
+    for match in _TOKEN_PATTERN.finditer(text):
+        token = match.group()
+        if '가' <= token[0] <= '힣':
+            if len(token) == 1:
+                tokens.append(token)
+            else:
+                tokens.extend(token[i:i + 2] for i in range(len(token) - 1))
+        else:
+            tokens.append(token.lower())
+    return tokens
+
+
+class LexicalIndex:
+    """MongoDB 보조 컬렉션 기반 BM25 어휘 인덱스"""
+
+    def __init__(self, collection, k1: float = 1.2, b: float = 0.75, max_candidates: int = 5000):
+        self.collection = collection
+        self.k1 = k1
+        self.b = b
+        self.max_candidates = max_candidates
+        self._stats = None
+        self._stats_at = 0.0
+
+    async def ensure_indexes(self) -> List[str]:
+        """terms(멀티키) / article_id 인덱스 생성"""
+        return await self.collection.create_indexes(LEXICAL_INDEXES)
+
+    @staticmethod
+    def build_posting(chunk_id: str, article_id: str, text: str, doc_type: str = "zendesk_article") -> Dict:
+        """청크 하나의 색인 문서 (고유 토큰 목록과 같은 순서의 출현 빈도)"""
+        counts = Counter(tokenize(text))
+        terms = list(counts)
+        return {
+            "_id": chunk_id,
+            "article_id": article_id,
+            "type": doc_type,
+            "terms": terms,
+            "tf": [counts[term] for term in terms],
+            "length": sum(counts.values()),
+        }
+
+    @profiled()
+    async def index_chunks(self, chunks: List[Dict]) -> int:
+        """청크 목록 색인 ({"id", "article_id", "text"} 목록, 비순차 bulk upsert)"""
+        if not chunks:
+            return 0
+        requests = [
+            ReplaceOne(
+                {"_id": chunk["id"]},
+                self.build_posting(chunk["id"], chunk["article_id"], chunk["text"],
+                                   chunk.get("type", "zendesk_article")),
+                upsert=True,
+            )
+            for chunk in chunks
+        ]
+        await self.collection.bulk_write(requests, ordered=False)
+        self._stats = None
+        return len(requests)
+
+    async def delete_articles(self, article_ids: List[str]) -> int:
+        """아티클들의 색인 문서 삭제"""
+        result = await self.collection.delete_many({"article_id": {"$in": list(article_ids)}})
+        self._stats = None
+        return result.deleted_count
+
+    async def corpus_stats(self) -> Dict:
+        """BM25용 코퍼스 통계 (문서 수, 평균 길이) - 짧은 시간 캐시"""
+        if self._stats is None or time.monotonic() - self._stats_at > STATS_TTL_SECONDS:
+            result = await self.collection.aggregate([
+                {"$group": {"_id": None, "count": {"$sum": 1}, "avg_length": {"$avg": "$length"}}},
+            ]).to_list(length=1)
+            if result:
+                self._stats = {"count": result[0]["count"], "avg_length": result[0]["avg_length"] or 1.0}
+            else:
+                self._stats = {"count": 0, "avg_length": 1.0}
+            self._stats_at = time.monotonic()
+        return self._stats
+
+    async def search(self, query: str, k: int = 10, query_filter: Optional[Dict] = None) -> List[Dict]:
+        """
+        BM25 검색
+        query_filter: 색인 문서 필드(article_id, type) 조건
+        반환값: [{"id", "article_id", "score", "matched_terms", "coverage"}, ...] (점수 내림차순)
+        coverage: 질의 용어(코퍼스에 있는 것) 중 일치한 비율
+        """
+        query_terms = list(dict.fromkeys(tokenize(query)))
+        if not query_terms:
+            return []
+
+        stats = await self.corpus_stats()
+        if not stats["count"]:
+            return []
+
+        # 용어별 문서 빈도는 멀티키 인덱스 카운트로 병렬 계산
+        doc_freqs = await asyncio.gather(*(
+            self.collection.count_documents({"terms": term}) for term in query_terms
+        ))
+        idf = {}
+        df_by_term = {}
+        for term, df in zip(query_terms, doc_freqs):
+            if df:
+                idf[term] = math.log(1 + (stats["count"] - df + 0.5) / (df + 0.5))
+                df_by_term[term] = df
+        if not idf:
+            return []
+
+        scored = []
+        avg_length = stats["avg_length"]
+        async for doc in self._candidates(df_by_term, k, query_filter):
+            positions = {term: i for i, term in enumerate(doc["terms"])}
+            norm = self.k1 * (1 - self.b + self.b * doc["length"] / avg_length)
+            score = 0.0
+            matched = 0
+            for term, weight in idf.items():
+                pos = positions.get(term)
+                if pos is None:
+                    continue
+                tf = doc["tf"][pos]
+                score += weight * tf * (self.k1 + 1) / (tf + norm)
+                matched += 1
+            scored.append({"id": doc["_id"], "article_id": doc["article_id"], "score": score,
+                           "matched_terms": matched, "coverage": matched / len(idf)})
+
+        scored.sort(key=lambda hit: (-hit["score"], hit["id"]))
+        return scored[:k]
+
+    async def _candidates(self, df_by_term: Dict[str, int], k: int, query_filter: Optional[Dict]):
+        """
+        BM25 점수를 매길 후보 문서 (최대 max_candidates개)
+        희귀한 용어(문서 빈도 낮은 순)부터 문서 빈도 합이 max_candidates 이내인 용어까지는 포스팅 전체를 가져오고,
+        후보가 k개보다 적을 때만 흔한 용어("빗썸" 같은 2-gram) 일치 문서로 채움
+        희귀 용어 하나도 상한을 넘으면 모든 용어가 일치하는 문서를 먼저 가져옴 (임의 부분집합 대신 일치 범위 우선)
+        """
+        terms = sorted(df_by_term, key=lambda term: (df_by_term[term], term))
+        selected, total = [], 0
+        for term in terms:
+            if selected and total + df_by_term[term] > self.max_candidates:
+                break
+            selected.append(term)
+            total += df_by_term[term]
+        common = terms[len(selected):]
+
+        projection = {"article_id": 1, "terms": 1, "tf": 1, "length": 1}
+        seen = set()
+        queries = []
+        if total > self.max_candidates:
+            queries.append({"terms": {"$all": terms}})
+        queries.append({"terms": {"$in": selected}})
+        if common:
+            queries.append({"terms": {"$in": common}})
+
+        for i, match in enumerate(queries):
+            if len(seen) >= self.max_candidates:
+                break
+            # 흔한 용어 보충은 후보가 부족할 때만
+            if common and i == len(queries) - 1 and len(seen) >= k:
+                break
+            if seen:
+                match = {**match, "_id": {"$nin": list(seen)}}
+            if query_filter:
+                match = {"$and": [match, query_filter]}
+            # 상한에서 잘리는 경우에도 같은 후보가 나오도록 _id 순서
+            cursor = self.collection.find(match, projection=projection).sort("_id", ASCENDING)
+            async for doc in cursor.limit(self.max_candidates - len(seen)):
+                seen.add(doc["_id"])
+                yield doc
+
+
+def reciprocal_rank_fusion(rankings: List[List[Dict]], k: int, rrf_k: int = 60) -> List[Dict]:
+    """
+    여러 검색 결과 순위를 RRF로 결합
+    반환값: [{"id", "score", "ranks": {순위 목록 번호: 순위}}, ...]
+    """
+    fused: Dict[str, Dict] = {}
+    for source, hits in enumerate(rankings):
+        for rank, hit in enumerate(hits, 1):
+            entry = fused.setdefault(hit["id"], {"id": hit["id"], "score": 0.0, "ranks": {}})
+            entry["score"] += 1.0 / (rrf_k + rank)
+            entry["ranks"][source] = rank
+    return sorted(fused.values(), key=lambda entry: entry["score"], reverse=True)[:k]
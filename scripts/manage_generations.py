@@ -0,0 +1,88 @@
+"""
+knowledge_base 세대 관리 스크립트
+전체 재구축(blue/green)으로 만들어진 세대 컬렉션을 확인하고, 이전 세대로 롤백하거나 정리합니다.
+
+사용 예:
+    python airflow/scripts/manage_generations.py status
+    python airflow/scripts/manage_generations.py rollback
+    python airflow/scripts/manage_generations.py cleanup
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+# 환경 변수 로드
+from dotenv import load_dotenv
+
+# 1. 프로젝트 루트의 .env 파일 확인
+project_env = project_root / '.env'
+# 2. airflow 폴더의 .env 파일 확인
+airflow_dir = Path(__file__).parent.parent
+airflow_env = airflow_dir / '.env'
+
+env_loaded = False
+if project_env.exists():
+    load_dotenv(project_env)
+    env_loaded = True
+
+if airflow_env.exists():
+    load_dotenv(airflow_env, override=True)
+    env_loaded = True
+
+if not env_loaded:
+    print("[WARNING] .env 파일을 찾을 수 없습니다.")
+
+from airflow.scripts.mongodb_store import COLLECTION_POINTERS, AirflowVectorStore
+
+
+async def manage_generations(command: str):
+    """세대 상태 확인 / 롤백 / 정리"""
+    vector_store = AirflowVectorStore()
+    connected = await vector_store.connect()
+
+    if not connected:
+        print("[ERROR] MongoDB 연결 실패")
+        return
+
+    try:
+        if command == "rollback":
+            result = await vector_store.rollback_generation()
+            print(f"[OK] 롤백 완료: 활성 {result['active']} (이전 {result['previous']})")
+        elif command == "cleanup":
+            dropped = await vector_store.drop_old_generations()
+            print(f"[OK] 삭제된 세대: {dropped or '없음'}")
+
+        pointer = await vector_store.db[COLLECTION_POINTERS].find_one({"_id": vector_store.collection_name})
+        print(f"\n[기본 컬렉션] {vector_store.collection_name}")
+        if pointer:
+            print(f"  활성 세대: {pointer['active']}")
+            print(f"  이전 세대: {pointer.get('previous')}")
+            print(f"  전환 시각: {pointer.get('switched_at')}")
+            print(f"  재구축 통계: {pointer.get('stats')}")
+        else:
+            print("  재구축 이력 없음 (기본 컬렉션 사용 중)")
+
+        print("\n[세대 목록]")
+        for generation in await vector_store.list_generations():
+            count = await vector_store.db[generation].estimated_document_count()
+            marker = " (활성)" if pointer and generation == pointer["active"] else ""
+            print(f"  {generation}: 청크 {count}개{marker}")
+
+    except Exception as e:
+        print(f"[ERROR] {e}")
+    finally:
+        await vector_store.disconnect()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='knowledge_base 세대 관리')
+    parser.add_argument('command', choices=['status', 'rollback', 'cleanup'], help='실행할 작업')
+    args = parser.parse_args()
+
+    asyncio.run(manage_generations(args.command))
@@ -0,0 +1,104 @@
+"""
+knowledge_base 스냅샷 내보내기/가져오기 스크립트
+청크/아티클 컬렉션을 Parquet(또는 Arrow IPC) 파일로 내보내고, 스냅샷을 다른 환경(스테이징 등)으로 적재합니다.
+가져올 대상은 MONGODB_URI / MONGODB_DATABASE / MONGODB_COLLECTION 환경 변수로 지정합니다.
+
+사용 예:
+    python airflow/scripts/manage_snapshots.py export --path ./snapshots/kb_20240101
+    python airflow/scripts/manage_snapshots.py export --path ./snapshots/kb_arrow --format arrow --compression none
+    python airflow/scripts/manage_snapshots.py import --path ./snapshots/kb_20240101 --drop
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+# 환경 변수 로드
+from dotenv import load_dotenv
+
+# 1. 프로젝트 루트의 .env 파일 확인
+project_env = project_root / '.env'
+# 2. airflow 폴더의 .env 파일 확인
+airflow_dir = Path(__file__).parent.parent
+airflow_env = airflow_dir / '.env'
+
+env_loaded = False
+if project_env.exists():
+    load_dotenv(project_env)
+    env_loaded = True
+
+if airflow_env.exists():
+    load_dotenv(airflow_env, override=True)
+    env_loaded = True
+
+if not env_loaded:
+    print("[WARNING] .env 파일을 찾을 수 없습니다.")
+
+from airflow.scripts.mongodb_store import AirflowVectorStore
+from airflow.scripts.snapshot import DEFAULT_BATCH_SIZE, export_snapshot, import_snapshot
+
+
+def print_throughput(name: str, stats: dict):
+    print(f"  {name}: {stats['rows']:,}개, {stats['bytes'] / 1024 / 1024:.1f}MB, {stats['elapsed']:.1f}초 "
+          f"({stats['rows_per_second'] or 0:,.0f}개/초, {stats['mb_per_second'] or 0}MB/초)")
+
+
+async def manage_snapshots(args):
+    """스냅샷 내보내기 / 가져오기"""
+    vector_store = AirflowVectorStore()
+    connected = await vector_store.connect()
+
+    if not connected:
+        print("[ERROR] MongoDB 연결 실패")
+        return
+
+    try:
+        if args.command == "export":
+            compression = None if args.compression == "none" else args.compression
+            manifest = await export_snapshot(vector_store, args.path, fmt=args.format, batch_size=args.batch_size,
+                                             compression=compression)
+            print(f"[OK] {manifest['source_collection']} 내보내기 완료: {args.path} ({manifest['elapsed']:.1f}초)")
+            for name, stats in manifest["collections"].items():
+                print_throughput(name, stats)
+        else:
+            result = await import_snapshot(vector_store, args.path, batch_size=args.batch_size, drop=args.drop,
+                                           rebuild_lexical=not args.skip_lexical)
+            print(f"[OK] {vector_store.collection.name} 가져오기 완료 ({result['elapsed']:.1f}초)")
+            for name, stats in result["collections"].items():
+                print_throughput(name, stats)
+                if stats["errors"]:
+                    print(f"  [WARNING] {name} 적재 오류 {stats['errors']}건")
+            if result.get("lexical"):
+                print(f"  어휘 인덱스: {result['lexical']['indexed']:,}개 색인")
+    except Exception as e:
+        print(f"[ERROR] {e}")
+        import traceback
+        traceback.print_exc()
+    finally:
+        await vector_store.disconnect()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='knowledge_base 스냅샷 내보내기/가져오기')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    export_parser = subparsers.add_parser('export', help='청크/아티클 컬렉션을 스냅샷으로 내보내기')
+    export_parser.add_argument('--path', required=True, help='스냅샷 디렉토리')
+    export_parser.add_argument('--format', choices=['parquet', 'arrow'], default='parquet', help='파일 형식 (기본값: parquet)')
+    export_parser.add_argument('--compression', default='zstd', help='압축 코덱 (zstd/lz4/none, parquet은 snappy도 가능, 기본값: zstd)')
+    export_parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                               help=f'커서/레코드 배치 크기 (기본값: {DEFAULT_BATCH_SIZE})')
+
+    import_parser = subparsers.add_parser('import', help='스냅샷을 현재 컬렉션으로 가져오기')
+    import_parser.add_argument('--path', required=True, help='스냅샷 디렉토리')
+    import_parser.add_argument('--drop', action='store_true', help='가져오기 전에 기존 청크/아티클/어휘 문서 삭제')
+    import_parser.add_argument('--skip-lexical', action='store_true', help='어휘 인덱스 재구성 생략')
+    import_parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                               help=f'레코드 배치/bulk_write 크기 (기본값: {DEFAULT_BATCH_SIZE})')
+
+    asyncio.run(manage_snapshots(parser.parse_args()))
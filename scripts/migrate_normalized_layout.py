@@ -0,0 +1,80 @@
+"""
+knowledge_base 정규화 레이아웃 마이그레이션 스크립트
+청크마다 중복 저장된 제목/URL/섹션/이미지를 아티클 문서로 옮기고,
+collStats로 전후 저장 용량을 비교합니다.
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+# 환경 변수 로드
+from dotenv import load_dotenv
+
+# 1. 프로젝트 루트의 .env 파일 확인
+project_env = project_root / '.env'
+# 2. airflow 폴더의 .env 파일 확인
+airflow_dir = Path(__file__).parent.parent
+airflow_env = airflow_dir / '.env'
+
+env_loaded = False
+if project_env.exists():
+    load_dotenv(project_env)
+    env_loaded = True
+
+if airflow_env.exists():
+    load_dotenv(airflow_env, override=True)
+    env_loaded = True
+
+if not env_loaded:
+    print("[WARNING] .env 파일을 찾을 수 없습니다.")
+
+from airflow.scripts.mongodb_store import AirflowVectorStore
+from airflow.scripts.storage_analysis import format_bytes, print_stats
+
+
+async def migrate_normalized_layout(batch_size: int):
+    """구버전 청크 레이아웃 정규화 실행"""
+    print("=" * 60)
+    print("knowledge_base 정규화 레이아웃 마이그레이션")
+    print("=" * 60)
+
+    vector_store = AirflowVectorStore()
+    connected = await vector_store.connect()
+
+    if not connected:
+        print("[ERROR] MongoDB 연결 실패")
+        return
+
+    try:
+        result = await vector_store.normalize_legacy_chunks(batch_size=batch_size)
+        print(f"\n이전된 아티클: {result['articles']}개, 정리된 청크: {result['chunks']}개")
+
+        print_stats("이전 전", result["before"])
+        print_stats("이전 후", result["after"])
+
+        before_total = sum(v["size"] for v in result["before"].values())
+        after_total = sum(v["size"] for v in result["after"].values())
+        print(f"\n[논리 크기 절감] {format_bytes(before_total - after_total)} "
+              f"({format_bytes(before_total)} -> {format_bytes(after_total)})")
+        print("※ storageSize는 WiredTiger가 공간을 재사용하거나 compact 실행 후 줄어듭니다.")
+
+    except Exception as e:
+        print(f"[ERROR] 마이그레이션 중 오류: {e}")
+        import traceback
+        traceback.print_exc()
+    finally:
+        await vector_store.disconnect()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='knowledge_base 정규화 레이아웃 마이그레이션')
+    parser.add_argument('--batch-size', type=int, default=500, help='한 번에 처리할 아티클 수 (기본값: 500)')
+    args = parser.parse_args()
+
+    asyncio.run(migrate_normalized_layout(args.batch_size))
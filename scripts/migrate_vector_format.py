@@ -0,0 +1,84 @@
+"""
+knowledge_base 벡터 저장 형식 마이그레이션 스크립트
+저장된 임베딩을 EMBEDDING_VECTOR_FORMAT / OPENAI_EMBEDDING_DIMENSIONS 설정으로 재인코딩하고,
+collStats로 전후 저장 용량을 비교합니다. (임베딩 API 호출 없음)
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+# 환경 변수 로드
+from dotenv import load_dotenv
+
+# 1. 프로젝트 루트의 .env 파일 확인
+project_env = project_root / '.env'
+# 2. airflow 폴더의 .env 파일 확인
+airflow_dir = Path(__file__).parent.parent
+airflow_env = airflow_dir / '.env'
+
+env_loaded = False
+if project_env.exists():
+    load_dotenv(project_env)
+    env_loaded = True
+
+if airflow_env.exists():
+    load_dotenv(airflow_env, override=True)
+    env_loaded = True
+
+if not env_loaded:
+    print("[WARNING] .env 파일을 찾을 수 없습니다.")
+
+from airflow.scripts.mongodb_store import AirflowVectorStore
+from airflow.scripts.storage_analysis import format_bytes, print_stats
+from airflow.scripts.vector_codec import vector_nbytes
+
+
+async def migrate_vector_format(batch_size: int):
+    """저장된 벡터 재인코딩 실행"""
+    print("=" * 60)
+    print("knowledge_base 벡터 저장 형식 마이그레이션")
+    print("=" * 60)
+
+    vector_store = AirflowVectorStore()
+    print(f"대상 형식: {vector_store.vector_format}, 차원: {vector_store.embedding_dimensions} "
+          f"(벡터당 {format_bytes(vector_nbytes(vector_store.vector_format, vector_store.embedding_dimensions))}, "
+          f"구버전 {format_bytes(vector_nbytes('float64', vector_store.embedding_dimensions))})")
+
+    connected = await vector_store.connect()
+
+    if not connected:
+        print("[ERROR] MongoDB 연결 실패")
+        return
+
+    try:
+        result = await vector_store.reencode_vectors(batch_size=batch_size)
+        print(f"\n변환된 청크: {result['converted']}개, 변환 불가(재임베딩 필요): {result['skipped']}개")
+
+        print_stats("변환 전", result["before"])
+        print_stats("변환 후", result["after"])
+
+        name = vector_store.collection.name
+        saved = result["before"].get(name, {}).get("size", 0) - result["after"].get(name, {}).get("size", 0)
+        print(f"\n[논리 크기 절감] {format_bytes(saved)}")
+        print("※ 벡터 인덱스 정의(차원/유사도)가 바뀌었다면 ensure_indexes()로 갱신하세요.")
+
+    except Exception as e:
+        print(f"[ERROR] 마이그레이션 중 오류: {e}")
+        import traceback
+        traceback.print_exc()
+    finally:
+        await vector_store.disconnect()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='knowledge_base 벡터 저장 형식 마이그레이션')
+    parser.add_argument('--batch-size', type=int, default=500, help='한 번에 처리할 청크 수 (기본값: 500)')
+    args = parser.parse_args()
+
+    asyncio.run(migrate_vector_format(args.batch_size))
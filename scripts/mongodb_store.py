@@ -4,31 +4,165 @@ app과 완전히 분리된 독립적인 모듈
 """
 import os
 import asyncio
-from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo.errors import ConnectionFailure
-from openai import AsyncOpenAI
+from pymongo import ASCENDING, DESCENDING, IndexModel, ReplaceOne, UpdateOne
+from pymongo.errors import BulkWriteError, ConnectionFailure, OperationFailure
 import hashlib
-from typing import List, Dict, Optional
+import re
+from typing import Any, List, Dict, Optional
 import logging
 from datetime import datetime
 
+from .clients import get_mongo_client, get_openai_client
+from .embedding_backends import create_embedding_backend
+from .embedding_dispatcher import EmbeddingDispatchError
+from .lexical_index import LexicalIndex, reciprocal_rank_fusion
+from .near_duplicate import NearDuplicateIndex, signature_bands
+from .profiling import profiled
+from .text_chunker import TokenChunker
+from .vector_codec import VECTOR_FORMATS, encode_vector, truncate_normalized, unpack_vector
+from .vector_index import LocalVectorIndex
+
 logger = logging.getLogger(__name__)
 
+# knowledge_base 보조 인덱스 (조회 패턴별)
+# - article_chunk_idx: check_article_exists / 아티클 단위 삭제 (metadata.article_id + metadata.chunk_index)
+# - type_created_idx: 데이터 확인 쿼리 (metadata.type 필터 + created_at 범위/정렬)
+# - simhash_band_idx: 근사 중복 후보 조회 (대표 청크의 SimHash 밴드, 멀티키)
+# - duplicate_of_idx: 대표 청크가 바뀌거나 삭제될 때 참조하던 중복 청크 조회
+KNOWLEDGE_BASE_INDEXES = [
+    IndexModel(
+        [("metadata.article_id", ASCENDING), ("metadata.chunk_index", ASCENDING)],
+        name="article_chunk_idx",
+    ),
+    IndexModel(
+        [("metadata.type", ASCENDING), ("created_at", DESCENDING)],
+        name="type_created_idx",
+    ),
+    IndexModel([("metadata.simhash_bands", ASCENDING)], name="simhash_band_idx", sparse=True),
+    IndexModel([("metadata.duplicate_of", ASCENDING)], name="duplicate_of_idx", sparse=True),
+]
+
+# 아티클 컬렉션 보조 인덱스
+# - crawl_generation_idx: 크롤링 세대 표시(updateMany) / 이전 세대 아티클 정리(sweep)
+# - next_crawl_idx: 재크롤링 대상 조회 (next_crawl_at 범위/정렬)
+ARTICLE_INDEXES = [
+    IndexModel([("crawl_generation", ASCENDING)], name="crawl_generation_idx"),
+    IndexModel([("next_crawl_at", ASCENDING)], name="next_crawl_idx"),
+]
+
+# 크롤링 세대 표시(updateMany) 한 번에 묶는 아티클 수
+SEEN_BATCH_SIZE = 500
+
+# 아티클 문서에 보관하는 최근 내용 변경 시각 수 (재크롤링 주기 추정용)
+CHANGE_HISTORY_SIZE = 20
+
+# Atlas $vectorSearch numCandidates 상한
+MAX_NUM_CANDIDATES = 10000
+
+# 아티클 문서에 한 번만 저장하는 공통 메타데이터
+ARTICLE_METADATA_FIELDS = ["title", "url", "section_name", "category_name", "images"]
+
+# 구버전 레이아웃에서 청크마다 중복 저장되던 필드 (정규화 시 제거)
+LEGACY_CHUNK_FIELDS = [
+    "source",
+    "metadata.title",
+    "metadata.url",
+    "metadata.section_name",
+    "metadata.category_name",
+    "metadata.images",
+    "metadata.content_hash",
+    "metadata.created_at",
+    "metadata.updated_at",
+]
+
+# 임베딩 버전 기본값 (버전 정보가 없는 기존 청크도 이 버전으로 간주)
+DEFAULT_EMBEDDING_VERSION = "1"
+
+# 활성 컬렉션 세대를 가리키는 포인터 문서 컬렉션 ({_id: 기본 컬렉션명, active, previous})
+COLLECTION_POINTERS = "collection_pointers"
+
+# 전체 재구축 시 스테이징 컬렉션에 한 번에 적재하는 청크 수
+REBUILD_FLUSH_DOCS = 1000
+
+# 벡터 검색 인덱스에서 사전 필터로 사용할 필드
+# (embedding_model/format: 형식 이전 중 혼재된 컬렉션에서 호환 벡터만 검색)
+VECTOR_FILTER_FIELDS = [
+    "metadata.type",
+    "metadata.article_id",
+    "metadata.embedding_model",
+    "metadata.embedding_format",
+]
+
 
 class AirflowVectorStore:
     """Airflow 전용 MongoDB Atlas 벡터 저장소"""
     
     def __init__(self):
         self.client = None
+        # 프로세스 공유 클라이언트면 disconnect에서 닫지 않음 (clients 레지스트리가 관리)
+        self.shared_client = False
         self.db = None
         self.collection = None
+        self.articles_collection = None
+        self.lexical_collection = None
+        self.lexical_index = None
+        # 전체 재구축(blue/green) 진행 상태 (begin_rebuild ~ finish_rebuild/abort_rebuild)
+        self.rebuild = None
+        self.collection_name = os.getenv("MONGODB_COLLECTION", "knowledge_base")
         # OpenAI 클라이언트는 API 키가 있을 때만 초기화
         api_key = os.getenv("OPENAI_API_KEY")
         if api_key:
-            self.openai_client = AsyncOpenAI(api_key=api_key)
+            # 재시도는 EmbeddingDispatcher가 예산/백오프를 고려해 직접 처리 (프로세스 공유 클라이언트)
+            self.openai_client = get_openai_client(api_key)
         else:
             self.openai_client = None
-        self.embedding_model = os.getenv("OPENAI_EMBEDDING_MODEL", "text-embedding-3-small")
+        # 임베딩 백엔드: openai(API, RPM/TPM 예산 + 재시도) | local(sentence-transformers CPU 추론)
+        self.embedding_backend = create_embedding_backend(
+            os.getenv("EMBEDDING_BACKEND", "openai"),
+            client=self.openai_client,
+            count_tokens=lambda text: self.chunker.count_tokens(text),
+        )
+        self.embedding_model = self.embedding_backend.model
+        # text-embedding-3 모델은 dimensions 파라미터로 축소 차원 임베딩 지원
+        self.embedding_dimensions = self.embedding_backend.dimensions
+        # 같은 모델이라도 전처리/접두어 등이 바뀌면 버전을 올려 재임베딩 대상으로 표시
+        self.embedding_version = os.getenv("EMBEDDING_VERSION", DEFAULT_EMBEDDING_VERSION)
+        # 저장 형식: float64(구버전 double 배열) | float32 | int8 | bit
+        self.vector_format = os.getenv("EMBEDDING_VECTOR_FORMAT", "float32")
+        if self.vector_format not in VECTOR_FORMATS:
+            raise ValueError(f"EMBEDDING_VECTOR_FORMAT은 {VECTOR_FORMATS} 중 하나여야 합니다: {self.vector_format}")
+        # Atlas 인덱스 자동 양자화 (none | scalar | binary, float 형식에서만 적용)
+        self.vector_index_quantization = os.getenv("VECTOR_INDEX_QUANTIZATION", "none")
+        # 검색 백엔드: atlas($vectorSearch) | local(오프라인 NumPy 인덱스)
+        self.search_backend = os.getenv("VECTOR_SEARCH_BACKEND", "atlas")
+        self.local_index_path = os.getenv("LOCAL_VECTOR_INDEX_PATH")
+        self.local_index_nprobe = int(os.getenv("LOCAL_VECTOR_INDEX_NPROBE", "0")) or None
+        self.local_index = None
+        self.vector_index_name = os.getenv("MONGODB_VECTOR_INDEX", "vector_index")
+        # 임베딩 모델 토크나이저 기준 청크 분할기 (로컬 모델은 모델 자체 토크나이저와 최대 입력 길이 사용)
+        self.chunker = TokenChunker(
+            self.embedding_model,
+            max_tokens=int(os.getenv("EMBEDDING_CHUNK_TOKENS", "500")),
+            overlap_tokens=int(os.getenv("EMBEDDING_CHUNK_OVERLAP_TOKENS", "50")),
+            tokenizer_loader=self.embedding_backend.tokenizer_loader(),
+        )
+        # structure: 본문 DOM 구조 블록 기준 (블록 정보가 없으면 token으로 대체), token: 토큰 예산 기준
+        self.chunking_mode = os.getenv("CHUNKING_MODE", "structure")
+        # 어휘(BM25) 인덱스: 청크 저장 시 함께 색인, hybrid 검색에서 벡터 순위와 RRF 결합
+        self.lexical_enabled = os.getenv("LEXICAL_INDEX_ENABLED", "true").lower() == "true"
+        # 어휘 1위 점수가 2위의 N배 이상이면 임베딩 호출 없이 어휘 결과 반환 (0이면 항상 결합)
+        self.lexical_shortcut_ratio = float(os.getenv("LEXICAL_SHORTCUT_RATIO", "2.0"))
+        # 생략하려면 어휘 1위가 질의 용어의 이 비율 이상과 일치해야 함 (2-gram 하나만 겹친 약한 일치 제외)
+        self.lexical_shortcut_min_coverage = float(os.getenv("LEXICAL_SHORTCUT_MIN_COVERAGE", "0.8"))
+        # 이번 크롤링 실행의 세대 ID (저장/확인한 아티클에 기록, 이전 세대 아티클은 삭제 대상)
+        self.crawl_generation = None
+        # 한 번의 정리에서 삭제할 수 있는 아티클 비율 상한 (발견 단계 오류로 전체가 지워지는 것 방지)
+        self.sweep_max_ratio = float(os.getenv("SWEEP_MAX_DELETE_RATIO", "0.2"))
+        # 근사 중복 청크는 임베딩 없이 대표 청크 참조로 저장 (SimHash 해밍 거리 기준)
+        self.near_duplicate_enabled = os.getenv("NEAR_DUPLICATE_ENABLED", "true").lower() == "true"
+        self.near_duplicate_max_distance = int(os.getenv("NEAR_DUPLICATE_MAX_DISTANCE", "3"))
+        self.near_duplicate_min_chars = int(os.getenv("NEAR_DUPLICATE_MIN_CHARS", "40"))
+        self.near_duplicates = None
         
     async def connect(self):
         """MongoDB 연결"""
@@ -40,14 +174,8 @@ class AirflowVectorStore:
                 logger.error("MONGODB_URI 환경변수가 설정되지 않았습니다.")
                 return False
             
-            self.client = AsyncIOMotorClient(
-                connection_string,
-                serverSelectionTimeoutMS=5000,
-                connectTimeoutMS=5000,
-                socketTimeoutMS=5000,
-                maxPoolSize=10,
-                minPoolSize=1
-            )
+            # 연결 풀/타임아웃/압축은 MONGODB_* 환경 변수 (같은 프로세스의 다른 저장소와 연결 풀 공유)
+            self.client, self.shared_client = get_mongo_client(connection_string)
             
             # 연결 테스트
             await asyncio.wait_for(
@@ -56,7 +184,7 @@ class AirflowVectorStore:
             )
             
             self.db = self.client[database_name]
-            self.collection = self.db["knowledge_base"]
+            self._bind_collections(await self.resolve_active_collection())
             
             logger.info("MongoDB Atlas 벡터 DB 연결 성공")
             return True
@@ -71,13 +199,188 @@ class AirflowVectorStore:
             logger.error(f"MongoDB 벡터 DB 연결 오류: {e}")
             return False
     
+    async def resolve_active_collection(self) -> str:
+        """포인터 문서가 가리키는 활성 세대 컬렉션명 (재구축 이력이 없으면 기본 컬렉션명)"""
+        pointer = await self.db[COLLECTION_POINTERS].find_one({"_id": self.collection_name})
+        return pointer["active"] if pointer else self.collection_name
+    
+    def _bind_collections(self, name: str):
+        """청크 컬렉션, 아티클 컬렉션(<name>_articles), 어휘 인덱스 컬렉션(<name>_lexical) 바인딩"""
+        self.collection = self.db[name]
+        self.articles_collection = self.db[f"{name}_articles"]
+        self.lexical_collection = self.db[f"{name}_lexical"]
+        self.lexical_index = LexicalIndex(self.lexical_collection)
+        self.near_duplicates = NearDuplicateIndex(
+            self.collection,
+            max_distance=self.near_duplicate_max_distance,
+            min_chars=self.near_duplicate_min_chars,
+        )
+    
     async def disconnect(self):
         """MongoDB 연결 해제"""
-        if self.client:
+        if self.local_index is not None:
+            self.local_index.close()
+            self.local_index = None
+        if self.client and not self.shared_client:
             self.client.close()
+        self.client = None
+    
+    async def ensure_indexes(self) -> Dict:
+        """
+        knowledge_base 보조 인덱스와 벡터 검색 인덱스 생성 (멱등)
+        반환값: {"indexes": 생성/확인된 인덱스 이름 목록, "vector_index": "created|updated|unchanged|unavailable"}
+        """
+        if self.collection is None:
+            logger.error("MongoDB가 연결되지 않았습니다.")
+            return {"indexes": [], "vector_index": "unavailable"}
+        
+        # 동일한 정의의 인덱스가 이미 있으면 서버에서 no-op 처리됨
+        index_names = await self.collection.create_indexes(KNOWLEDGE_BASE_INDEXES)
+        index_names += await self.articles_collection.create_indexes(ARTICLE_INDEXES)
+        if self.lexical_enabled:
+            index_names += await self.lexical_index.ensure_indexes()
+        logger.info(f"보조 인덱스 확인 완료: {index_names}")
+        
+        vector_status = await self.ensure_vector_search_index()
+        return {"indexes": index_names, "vector_index": vector_status}
+    
+    def build_vector_index_definition(self) -> Dict:
+        """Atlas 벡터 검색 인덱스 정의 생성 (차원/필터 필드 선언)"""
+        vector_field: Dict[str, Any] = {
+            "type": "vector",
+            "path": "embedding",
+            "numDimensions": self.embedding_dimensions,
+            # 1비트 벡터는 해밍 거리(euclidean)만 지원
+            "similarity": "euclidean" if self.vector_format == "bit" else "cosine",
+        }
+        if self.vector_format in ("float64", "float32") and self.vector_index_quantization != "none":
+            vector_field["quantization"] = self.vector_index_quantization
+        fields: List[Dict[str, Any]] = [vector_field]
+        fields.extend({"type": "filter", "path": path} for path in VECTOR_FILTER_FIELDS)
+        return {"fields": fields}
+    
+    async def ensure_vector_search_index(self) -> str:
+        """
+        벡터 검색 인덱스를 선언된 정의와 일치시킴
+        반환값: "created" | "updated" | "unchanged" | "unavailable"
+        """
+        definition = self.build_vector_index_definition()
+        
+        try:
+            cursor = self.collection.list_search_indexes(self.vector_index_name)
+            existing = await cursor.to_list(length=1)
+            
+            if not existing:
+                await self.collection.create_search_index({
+                    "name": self.vector_index_name,
+                    "type": "vectorSearch",
+                    "definition": definition,
+                })
+                logger.info(f"벡터 검색 인덱스 생성 요청: {self.vector_index_name}")
+                return "created"
+            
+            current = existing[0].get("latestDefinition") or existing[0].get("definition") or {}
+            if self._normalize_index_fields(current) == self._normalize_index_fields(definition):
+                logger.info(f"벡터 검색 인덱스 변경 없음: {self.vector_index_name}")
+                return "unchanged"
+            
+            await self.collection.update_search_index(self.vector_index_name, definition)
+            logger.info(f"벡터 검색 인덱스 정의 업데이트 요청: {self.vector_index_name}")
+            return "updated"
+            
+        except OperationFailure as e:
+            # Atlas가 아닌 MongoDB(로컬 등)에서는 검색 인덱스 명령을 지원하지 않음
+            logger.warning(f"벡터 검색 인덱스 관리 불가 (Atlas 전용 기능): {e}")
+            return "unavailable"
+    
+    @staticmethod
+    def _normalize_index_fields(definition: Dict) -> List[tuple]:
+        """인덱스 정의 비교용 정규화 (필드 순서 무시)"""
+        return sorted(
+            tuple(sorted((k, str(v)) for k, v in field.items()))
+            for field in definition.get("fields", [])
+        )
+    
+    def hot_query_shapes(self) -> Dict[str, Dict]:
+        """인덱스로 처리되어야 하는 주요 조회 패턴 (explain 검증용)"""
+        return {
+            "check_article_exists": {
+                "filter": {"metadata.article_id": "0", "metadata.chunk_index": 0},
+            },
+            "count_by_type_recent": {
+                "filter": {"metadata.type": "zendesk_article", "created_at": {"$gte": datetime.utcnow()}},
+            },
+            "recent_by_type": {
+                "filter": {"metadata.type": "zendesk_article"},
+                "sort": [("created_at", DESCENDING)],
+            },
+        }
+    
+    async def verify_query_plans(self) -> Dict[str, Dict]:
+        """
+        주요 조회 패턴의 실행 계획 확인
+        반환값: {쿼리명: {"index": 사용 인덱스명 또는 None, "stages": 단계 목록, "ok": 인덱스 사용 여부}}
+        """
+        if self.collection is None:
+            logger.error("MongoDB가 연결되지 않았습니다.")
+            return {}
+        
+        results = {}
+        for name, shape in self.hot_query_shapes().items():
+            cursor = self.collection.find(shape["filter"])
+            if shape.get("sort"):
+                cursor = cursor.sort(shape["sort"])
+            plan = await cursor.limit(1).explain()
+            
+            stages, index_names = [], []
+            self._collect_plan_stages(plan.get("queryPlanner", {}).get("winningPlan", {}), stages, index_names)
+            ok = "COLLSCAN" not in stages and "SORT" not in stages and bool(index_names)
+            results[name] = {"index": index_names[0] if index_names else None, "stages": stages, "ok": ok}
+            
+            if ok:
+                logger.info(f"✅ {name}: 인덱스 사용 ({index_names[0]}) - {' <- '.join(stages)}")
+            else:
+                logger.warning(f"⚠️ {name}: 인덱스 미사용 또는 메모리 정렬 - {' <- '.join(stages)}")
+        
+        return results
+    
+    @classmethod
+    def _collect_plan_stages(cls, plan: Dict, stages: List[str], index_names: List[str]):
+        """winningPlan 트리를 순회하며 단계명과 인덱스명 수집"""
+        if not plan:
+            return
+        # 8.0+ SBE 계획은 queryPlan 아래에 트리가 있음
+        if "queryPlan" in plan:
+            plan = plan["queryPlan"]
+        if plan.get("stage"):
+            stages.append(plan["stage"])
+        if plan.get("indexName"):
+            index_names.append(plan["indexName"])
+        if plan.get("inputStage"):
+            cls._collect_plan_stages(plan["inputStage"], stages, index_names)
+        for child in plan.get("inputStages", []):
+            cls._collect_plan_stages(child, stages, index_names)
+    
+    def chunk_text(self, text: str) -> List[Dict]:
+        """
+        임베딩 모델 토큰 예산 기준으로 텍스트 분할
+        반환값: [{"text", "start", "end", "tokens"}, ...]
+        """
+        return self.chunker.split(text)
+    
+    @profiled()
+    def chunk_article(self, article_data: Dict) -> List[Dict]:
+        """
+        설정된 청크 모드에 따라 아티클 분할
+        structure 모드에서는 크롤러가 추출한 본문 구조 블록을 사용하고 제목 경로를 함께 반환
+        """
+        blocks = article_data.get("blocks")
+        if self.chunking_mode == "structure" and blocks:
+            return self.chunker.split_blocks(blocks, title=article_data.get("title"))
+        return self.chunk_text(article_data["full_text"])
     
     def split_text(self, text: str, chunk_size: int = 1000, overlap: int = 200) -> List[str]:
-        """텍스트를 청크로 분할"""
+        """텍스트를 문자 수 기준 청크로 분할 (구버전 방식, 비교/호환용)"""
         if len(text) <= chunk_size:
             return [text]
         
@@ -106,32 +409,319 @@ class AirflowVectorStore:
                     end = last_dot + 1
             
             chunks.append(text[start:end].strip())
-            start = end - overlap
+            # 짧은 경계에서 겹침 때문에 뒤로 가지 않도록 전진 보장
+            start = max(end - overlap, start + 1)
         
         return chunks
     
+    def supports_reduced_dimensions(self) -> bool:
+        """앞쪽 차원 절단 + 정규화로 축소 차원을 얻을 수 있는 모델 여부 (text-embedding-3)"""
+        return self.embedding_model.startswith("text-embedding-3")
+    
+    def encode_embedding(self, embedding: List[float]):
+        """설정된 저장 형식으로 임베딩 인코딩"""
+        return encode_vector(embedding, self.vector_format)
+    
+    def embedding_metadata(self) -> Dict:
+        """청크에 기록하는 임베딩 백엔드/모델/차원/버전/형식 정보"""
+        return {
+            **self.embedding_backend.metadata(),
+            "embedding_version": self.embedding_version,
+            "embedding_format": self.vector_format,
+        }
+    
+    def stale_embedding_query(self) -> Dict:
+        """
+        현재 설정(모델/차원/버전)과 다른 임베딩을 가진 청크 조건 (재임베딩 대상)
+        current_embedding_query()의 반대 조건이므로 검색이 현재 벡터로 쓰는 청크는 재임베딩하지 않음
+        (대표 청크를 참조하는 중복 청크는 제외)
+        """
+        return {"metadata.duplicate_of": {"$exists": False}, "$nor": [self.current_embedding_query()]}
+    
+    def current_embedding_query(self) -> Dict:
+        """
+        현재 설정의 임베딩을 가진 청크 조건 (검색 대상과 같은 기준)
+        모델/차원 정보가 없는 구버전 청크는 OpenAI 백엔드에서만 현재 벡터로 간주 (embedding_model_condition)
+        """
+        versions = [self.embedding_version]
+        if self.embedding_version == DEFAULT_EMBEDDING_VERSION:
+            versions.append(None)
+        dimensions = {"$eq": self.embedding_dimensions}
+        if self._legacy_vectors_current():
+            dimensions = {"$in": [self.embedding_dimensions, None]}
+        return {
+            "embedding": {"$exists": True},
+            "metadata.embedding_model": self.embedding_model_condition(),
+            "metadata.embedding_dimensions": dimensions,
+            "metadata.embedding_version": {"$in": versions},
+        }
+    
+    def embedding_model_condition(self) -> Dict:
+        """현재 모델 벡터 조회 조건 (모델 정보가 없는 구버전 청크는 OpenAI 백엔드에서만 포함)"""
+        if self._legacy_vectors_current():
+            return {"$in": [self.embedding_model, None]}
+        return {"$eq": self.embedding_model}
+    
+    def _legacy_vectors_current(self) -> bool:
+        """모델 정보 없이 저장된 구버전(OpenAI) 청크를 현재 벡터로 볼지"""
+        return self.embedding_backend.name == "openai"
+    
     async def create_embedding(self, text: str) -> Optional[List[float]]:
-        """텍스트 임베딩 생성"""
-        if not self.openai_client:
-            logger.error("OpenAI API 키가 설정되지 않았습니다. OPENAI_API_KEY 환경 변수를 설정하세요.")
-            return None
-        
+        """텍스트 임베딩 생성 (재시도 후에도 실패하면 None)"""
         try:
-            response = await self.openai_client.embeddings.create(
-                model=self.embedding_model,
-                input=text
-            )
-            return response.data[0].embedding
-        except Exception as e:
+            return (await self.create_embeddings([text]))[0]
+        except EmbeddingDispatchError as e:
             logger.error(f"임베딩 생성 실패: {e}")
             return None
     
+    @profiled()
+    async def create_embeddings(self, texts: List[str], input_type: str = "document") -> List[List[float]]:
+        """
+        설정된 임베딩 백엔드로 여러 텍스트 임베딩 생성 (입력 순서 유지)
+        input_type: document(청크) | query(검색 질의, 로컬 e5 모델은 접두어가 다름)
+        실패한 배치가 있으면 EmbeddingDispatchError 발생 (일부만 반환하지 않음)
+        """
+        return await self.embedding_backend.embed(texts, input_type=input_type)
+    
+    async def search(self, query: str, k: int = 5, filters: Optional[Dict] = None,
+                     backend: Optional[str] = None, mode: str = "vector") -> List[Dict]:
+        """
+        질의 텍스트로 유사 청크 검색
+        filters: {"article_id" | "type" | "section_name" | "category_name": 값 또는 값 목록}
+        mode: vector(임베딩) | lexical(BM25, 임베딩 호출 없음) | hybrid(RRF 결합)
+        반환값: [{"id", "text", "score", "article_id", "chunk_index", ("metadata")}, ...]
+        """
+        if mode == "lexical":
+            return await self.lexical_search(query, k=k, filters=filters)
+        if mode == "hybrid":
+            return await self.hybrid_search(query, k=k, filters=filters, backend=backend)
+        if mode != "vector":
+            raise ValueError(f"지원하지 않는 검색 모드: {mode}")
+        results = await self.search_many([query], k=k, filters=filters, backend=backend)
+        return results[0]
+    
+    async def lexical_search(self, query: str, k: int = 5, filters: Optional[Dict] = None) -> List[Dict]:
+        """BM25 어휘 검색 (청크 텍스트/아티클 메타데이터 포함)"""
+        hits = await self._lexical_hits(query, k, filters)
+        return await self._hydrate_hits(hits)
+    
+    async def hybrid_search(self, query: str, k: int = 5, filters: Optional[Dict] = None,
+                            backend: Optional[str] = None, rrf_k: int = 60) -> List[Dict]:
+        """
+        어휘 + 벡터 검색 순위를 RRF로 결합
+        어휘 결과가 충분히 확실하면(1위 점수가 2위의 lexical_shortcut_ratio배 이상) 임베딩 호출 생략
+        반환값: search()와 같은 형식, metadata 외에 "lexical_rank"/"vector_rank" 포함
+        """
+        lexical_hits = await self._lexical_hits(query, k * 2, filters)
+        if self._lexical_is_decisive(lexical_hits):
+            logger.info(f"어휘 검색 결과가 확실하여 임베딩 생략: {query}")
+            results = await self._hydrate_hits(lexical_hits[:k])
+            for rank, result in enumerate(results, 1):
+                result["lexical_rank"] = rank
+                result["vector_rank"] = None
+            return results
+        
+        vector_hits = await self.search(query, k=k * 2, filters=filters, backend=backend)
+        fused = reciprocal_rank_fusion([lexical_hits, vector_hits], k=k, rrf_k=rrf_k)
+        
+        # 벡터 결과는 이미 텍스트/메타데이터가 있으므로 어휘 전용 결과만 추가 조회
+        by_id = {hit["id"]: hit for hit in vector_hits}
+        missing = [{"id": entry["id"], "score": 0.0} for entry in fused if entry["id"] not in by_id]
+        for hit in await self._hydrate_hits(missing):
+            by_id[hit["id"]] = hit
+        
+        results = []
+        for entry in fused:
+            hit = by_id.get(entry["id"])
+            if hit is None:
+                continue
+            results.append({
+                **hit,
+                "score": entry["score"],
+                "lexical_rank": entry["ranks"].get(0),
+                "vector_rank": entry["ranks"].get(1),
+            })
+        return results
+    
+    def _lexical_is_decisive(self, hits: List[Dict]) -> bool:
+        """어휘 검색만으로 답할 수 있는지 판단 (1위가 질의 용어 대부분과 일치하고 2위와 점수 차가 클 때)"""
+        if not hits or self.lexical_shortcut_ratio <= 0:
+            return False
+        if hits[0].get("coverage", 0.0) < self.lexical_shortcut_min_coverage:
+            return False
+        if len(hits) == 1:
+            return True
+        return hits[0]["score"] >= hits[1]["score"] * self.lexical_shortcut_ratio
+    
+    async def _lexical_hits(self, query: str, k: int, filters: Optional[Dict]) -> List[Dict]:
+        """어휘 인덱스 검색 (필터는 색인 문서 필드 조건으로 변환)"""
+        if self.lexical_index is None:
+            logger.error("MongoDB가 연결되지 않았습니다.")
+            return []
+        if not self.lexical_enabled:
+            return []
+        query_filter = {}
+        for clause in await self._resolve_filter_clauses(filters):
+            for field, condition in clause.items():
+                if field not in ("metadata.article_id", "metadata.type"):
+                    raise ValueError(f"어휘 검색에서 지원하지 않는 필터: {field}")
+                key = field[len("metadata."):]
+                if key in query_filter:
+                    query_filter = {"$and": [query_filter, {key: condition}]}
+                else:
+                    query_filter[key] = condition
+        return await self.lexical_index.search(query, k=k, query_filter=query_filter or None)
+    
+    async def _hydrate_hits(self, hits: List[Dict]) -> List[Dict]:
+        """청크 ID 목록을 검색 결과 형식(텍스트/아티클 메타데이터 포함)으로 변환 (입력 순서 유지)"""
+        if not hits:
+            return []
+        docs = await self.find_chunks_with_article(
+            {"_id": {"$in": [hit["id"] for hit in hits]}},
+            projection={"text": 1, "metadata": 1},
+        )
+        by_id = {str(doc["_id"]): doc for doc in docs}
+        results = []
+        for hit in hits:
+            doc = by_id.get(hit["id"])
+            if doc is None:
+                continue
+            results.append({
+                "id": hit["id"],
+                "text": doc.get("text", ""),
+                "score": hit["score"],
+                "article_id": doc.get("metadata", {}).get("article_id"),
+                "chunk_index": doc.get("metadata", {}).get("chunk_index"),
+                "metadata": doc.get("metadata", {}),
+            })
+        return results
+    
+    async def search_many(self, queries: List[str], k: int = 5, filters: Optional[Dict] = None,
+                          backend: Optional[str] = None) -> List[List[Dict]]:
+        """여러 질의를 한 번의 배치 임베딩으로 검색 (평가용)"""
+        vectors = await self.create_embeddings(queries, input_type="query")
+        return await self.search_vectors(vectors, k=k, filters=filters, backend=backend)
+    
+    async def search_vectors(self, vectors: List[List[float]], k: int = 5, filters: Optional[Dict] = None,
+                             backend: Optional[str] = None) -> List[List[Dict]]:
+        """미리 계산된 질의 벡터로 검색 (local 백엔드는 네트워크 없이 동작)"""
+        backend = backend or self.search_backend
+        if backend == "local":
+            index = self.get_local_index()
+            return index.search(vectors, k=k, filters=filters, nprobe=self.local_index_nprobe)
+        if backend != "atlas":
+            raise ValueError(f"지원하지 않는 검색 백엔드: {backend}")
+        
+        vector_filter = await self._atlas_vector_filter(filters)
+        return list(await asyncio.gather(*(
+            self.vector_search(vector, k=k, vector_filter=vector_filter) for vector in vectors
+        )))
+    
+    def get_local_index(self) -> LocalVectorIndex:
+        """오프라인 벡터 인덱스 로드 (프로세스당 1회)"""
+        if self.local_index is None:
+            if not self.local_index_path:
+                raise ValueError("LOCAL_VECTOR_INDEX_PATH 환경변수가 설정되지 않았습니다.")
+            index = LocalVectorIndex(self.local_index_path)
+            # 다른 모델로 만든 인덱스에 현재 모델의 질의 벡터를 섞어 검색하지 않도록 확인
+            if index.manifest.get("embedding_model") != self.embedding_model:
+                raise ValueError(f"오프라인 인덱스 모델({index.manifest.get('embedding_model')})이 "
+                                 f"현재 임베딩 모델({self.embedding_model})과 다릅니다.")
+            self.local_index = index
+        return self.local_index
+    
+    async def export_local_index(self, path: Optional[str] = None, batch_size: int = 2000,
+                                 ivf_lists: Optional[int] = None) -> Dict:
+        """knowledge_base 임베딩을 오프라인 벡터 인덱스로 내보내기 (ivf_lists 지정 시 IVF 분할 생성)"""
+        path = path or self.local_index_path
+        if not path:
+            raise ValueError("내보낼 경로가 없습니다. LOCAL_VECTOR_INDEX_PATH를 설정하세요.")
+        if self.local_index is not None:
+            # 이전 인덱스의 텍스트 파일 매핑을 닫은 뒤 같은 경로에 다시 내보냄
+            self.local_index.close()
+            self.local_index = None
+        result = await LocalVectorIndex.export_from_store(self, path, batch_size=batch_size)
+        self.local_index = LocalVectorIndex(path)
+        if ivf_lists is not None and self.local_index.count:
+            result["ivf"] = self.local_index.build_ivf(nlist=ivf_lists or None)
+        return result
+    
+    async def _atlas_vector_filter(self, filters: Optional[Dict]) -> Dict:
+        """검색 필터를 $vectorSearch filter로 변환 (모델 조건은 로컬 검색과 같은 embedding_model_condition)"""
+        condition = self.embedding_model_condition()
+        models = condition["$in"] if "$in" in condition else [condition["$eq"]]
+        # $vectorSearch filter는 null을 $eq로만 비교하므로 $or로 풀어 씀 (null은 필드가 없는 구버전 청크도 일치)
+        model_clauses = [{"metadata.embedding_model": {"$eq": model}} for model in models]
+        clauses: List[Dict] = [model_clauses[0] if len(model_clauses) == 1 else {"$or": model_clauses}]
+        clauses.extend(await self._resolve_filter_clauses(filters))
+        return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+    
+    async def _resolve_filter_clauses(self, filters: Optional[Dict]) -> List[Dict]:
+        """검색 필터를 청크 metadata 조건 목록으로 변환 (아티클 단위 필드는 article_id 목록으로 변환)"""
+        clauses: List[Dict] = []
+        for key, value in (filters or {}).items():
+            field = key[len("metadata."):] if key.startswith("metadata.") else key
+            values = list(value) if isinstance(value, (list, tuple, set)) else [value]
+            if field in ARTICLE_METADATA_FIELDS:
+                article_ids = await self.articles_collection.distinct("_id", {field: {"$in": values}})
+                clauses.append({"metadata.article_id": {"$in": article_ids}})
+            elif len(values) == 1:
+                clauses.append({f"metadata.{field}": {"$eq": values[0]}})
+            else:
+                clauses.append({f"metadata.{field}": {"$in": values}})
+        return clauses
+    
+    async def vector_search(self, query_vector: List[float], k: int = 5,
+                            vector_filter: Optional[Dict] = None,
+                            num_candidates: Optional[int] = None) -> List[Dict]:
+        """Atlas $vectorSearch 실행 후 아티클 메타데이터 조인"""
+        if self.collection is None:
+            logger.error("MongoDB가 연결되지 않았습니다.")
+            return []
+        
+        # 1비트 인덱스는 같은 형식의 질의 벡터가 필요
+        if self.vector_format == "bit":
+            query_vector = self.encode_embedding(query_vector)
+        
+        stage: Dict[str, Any] = {
+            "index": self.vector_index_name,
+            "path": "embedding",
+            "queryVector": query_vector,
+            "numCandidates": min(num_candidates or k * 20, MAX_NUM_CANDIDATES),
+            "limit": k,
+        }
+        if vector_filter:
+            stage["filter"] = vector_filter
+        
+        pipeline = [
+            {"$vectorSearch": stage},
+            {"$project": {"text": 1, "metadata": 1, "score": {"$meta": "vectorSearchScore"}}},
+            *self.article_lookup_stages(),
+        ]
+        docs = await self.collection.aggregate(pipeline).to_list(length=k)
+        return [{
+            "id": str(doc["_id"]),
+            "text": doc.get("text", ""),
+            "score": doc.get("score", 0.0),
+            "article_id": doc.get("metadata", {}).get("article_id"),
+            "chunk_index": doc.get("metadata", {}).get("chunk_index"),
+            "metadata": doc.get("metadata", {}),
+        } for doc in docs]
+    
+    @profiled()
     async def check_article_exists(self, article_id: str) -> Optional[Dict]:
-        """아티클이 이미 저장되어 있는지 확인"""
+        """
+        아티클이 이미 저장되어 있는지 확인
+        정규화된 아티클 문서를 우선 조회하고, 없으면 구버전 레이아웃의 첫 번째 청크를 반환
+        """
         if self.collection is None:
             return None
         
         try:
+            article_doc = await self.articles_collection.find_one({"_id": article_id})
+            if article_doc:
+                return article_doc
+            
             # 해당 아티클의 첫 번째 청크를 찾음 (article_id로 검색)
             existing_doc = await self.collection.find_one({
                 "metadata.article_id": article_id,
@@ -146,10 +736,170 @@ class AirflowVectorStore:
         """텍스트 내용의 해시 계산 (변경 감지용)"""
         return hashlib.md5(text.encode('utf-8')).hexdigest()
     
+    async def _delete_stale_chunks(self, article_id: str, keep_ids: List[str]) -> int:
+        """새로 저장한 청크를 제외한 아티클의 이전 청크(와 어휘 색인) 삭제"""
+        stale_filter = {"metadata.article_id": article_id, "_id": {"$nin": keep_ids}}
+        delete_result = await self.collection.delete_many(stale_filter)
+        if self.lexical_enabled:
+            await self.lexical_collection.delete_many({"article_id": article_id, "_id": {"$nin": keep_ids}})
+        return delete_result.deleted_count
+    
+    async def _delete_article_chunks(self, article_id: str) -> int:
+        """아티클의 모든 청크(와 어휘 색인) 삭제"""
+        canonical_ids = await self.collection.distinct("_id", {
+            "metadata.article_id": article_id, "metadata.duplicate_of": {"$exists": False}
+        })
+        delete_result = await self.collection.delete_many({
+            "metadata.article_id": article_id
+        })
+        if self.lexical_enabled:
+            await self.lexical_index.delete_articles([article_id])
+        await self.release_duplicates(canonical_ids)
+        return delete_result.deleted_count
+    
+    @profiled()
+    async def release_duplicates(self, canonical_ids: List[str]) -> int:
+        """
+        대표 청크가 바뀌거나 삭제된 중복 청크의 참조 해제
+        남은 중복 청크끼리 다시 묶어 대표 하나만 임베딩하고 나머지는 새 대표를 참조
+        (임베딩에 실패하면 참조만 해제하여 재임베딩 작업 대상으로 남김)
+        반환값: 참조가 바뀐 청크 수
+        """
+        if not canonical_ids or self.collection is None:
+            return 0
+        
+        docs = await self.collection.find(
+            {"metadata.duplicate_of": {"$in": canonical_ids}},
+            projection={"text": 1, "metadata.article_id": 1, "metadata.simhash": 1},
+        ).to_list(length=None)
+        if not docs:
+            return 0
+        
+        texts = [doc.get("text", "") for doc in docs]
+        signatures = [int(doc["metadata"]["simhash"], 16) for doc in docs]
+        groups = self.near_duplicates.group(texts, signatures)
+        representatives = [i for i, group in enumerate(groups) if group is None]
+        try:
+            vectors = dict(zip(representatives, await self.create_embeddings([texts[i] for i in representatives])))
+        except EmbeddingDispatchError as e:
+            logger.warning(f"중복 청크 대표 임베딩 실패 - 참조만 해제 (재임베딩 대상): {e}")
+            vectors = {}
+        
+        now = datetime.utcnow()
+        metadata = {f"metadata.{key}": value for key, value in self.embedding_metadata().items()}
+        requests = []
+        for i, (doc, group) in enumerate(zip(docs, groups)):
+            # 모든 필터에 이전 참조 조건을 두어 그 사이 다시 저장된 청크는 덮어쓰지 않음
+            doc_filter = {"_id": doc["_id"], "metadata.duplicate_of": {"$in": canonical_ids}}
+            if group is not None and group in vectors:
+                requests.append(UpdateOne(doc_filter, {"$set": {
+                    "metadata.duplicate_of": docs[group]["_id"], "updated_at": now,
+                }}))
+                continue
+            fields = {"metadata.simhash_bands": signature_bands(signatures[i]), "updated_at": now}
+            if i in vectors:
+                fields.update(metadata, embedding=self.encode_embedding(vectors[i]))
+            requests.append(UpdateOne(doc_filter, {"$set": fields, "$unset": {"metadata.duplicate_of": ""}}))
+        await self.collection.bulk_write(requests, ordered=False)
+        
+        if self.lexical_enabled:
+            await self.lexical_index.index_chunks([
+                {"id": docs[i]["_id"], "article_id": docs[i]["metadata"]["article_id"], "text": texts[i]}
+                for i in representatives
+            ])
+        logger.info(f"중복 참조 해제: {len(docs)}개 청크 (새 대표 {len(representatives)}개)")
+        return len(docs)
+    
+    def build_article_document(self, article_data: Dict, content_hash: Optional[str],
+                               total_chunks: int, now: datetime) -> Dict:
+        """아티클 공통 메타데이터(제목/URL/섹션/이미지) 문서 생성 (_id/created_at 제외)"""
+        article_doc = {
+            "type": "zendesk_article",
+            "title": article_data["title"],
+            "total_chunks": total_chunks,
+            # 모든 청크가 저장된 경우에만 해시 기록 (누락 청크가 있으면 다음 실행에서 재처리)
+            "content_hash": content_hash,
+            "updated_at": now,
+        }
+        if self.crawl_generation:
+            article_doc["crawl_generation"] = self.crawl_generation
+            article_doc["last_seen_at"] = now
+        for field in ARTICLE_METADATA_FIELDS:
+            if article_data.get(field):
+                article_doc[field] = article_data[field]
+        return article_doc
+    
+    @profiled()
+    async def _upsert_article_document(self, article_data: Dict, content_hash: Optional[str], total_chunks: int,
+                                       changed: bool = False):
+        """
+        아티클 공통 메타데이터를 아티클 문서 하나에 저장
+        changed: 기존 아티클의 내용 해시가 바뀐 경우 변경 이력(change_history)에 시각 추가
+        """
+        now = datetime.utcnow()
+        article_doc = self.build_article_document(article_data, content_hash, total_chunks, now)
+        update = {"$set": article_doc, "$setOnInsert": {"created_at": now}}
+        if changed:
+            update["$push"] = {"change_history": {"$each": [now], "$slice": -CHANGE_HISTORY_SIZE}}
+        await self.articles_collection.update_one({"_id": article_data["article_id"]}, update, upsert=True)
+    
+    @staticmethod
+    def chunk_document_id(article_id: str, chunk_index: int) -> str:
+        """청크 문서 ID (아티클 ID + 청크 순서로 결정)"""
+        return hashlib.md5(f"zendesk_{article_id}_{chunk_index}".encode()).hexdigest()
+    
+    def build_chunk_documents(self, article_id: str, chunks: List[Dict], embeddings: List[Optional[List[float]]],
+                              now: datetime, signatures: Optional[List[int]] = None,
+                              canonicals: Optional[List[Optional[str]]] = None) -> List[Dict]:
+        """
+        청크 문서 생성 (텍스트/임베딩/위치/아티클 참조만 저장, 제목/URL/이미지는 아티클 문서)
+        canonicals[i]가 있으면 임베딩 없이 대표 청크 참조(metadata.duplicate_of)로 저장
+        """
+        documents = []
+        for i, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
+            canonical_id = canonicals[i] if canonicals else None
+            doc_id = self.chunk_document_id(article_id, i)
+            
+            metadata = {
+                "article_id": article_id,
+                "chunk_index": i,
+                "total_chunks": len(chunks),
+                "token_count": chunk["tokens"],
+                "type": "zendesk_article",
+            }
+            if not canonical_id:
+                metadata.update(self.embedding_metadata())
+            if signatures:
+                metadata.update(NearDuplicateIndex.chunk_fields(signatures[i], canonical_id))
+            
+            # 청크 위치 정보 추가 (token 모드: 문자 오프셋, structure 모드: 블록 범위/제목 경로)
+            if "start" in chunk:
+                metadata["char_start"] = chunk["start"]
+                metadata["char_end"] = chunk["end"]
+            if "heading_path" in chunk:
+                metadata["heading_path"] = chunk["heading_path"]
+                metadata["block_start"] = chunk["block_start"]
+                metadata["block_end"] = chunk["block_end"]
+            
+            document = {
+                "_id": doc_id,
+                "text": chunk["text"],
+                "metadata": metadata,
+                "created_at": now,
+                "updated_at": now
+            }
+            # 중복 참조이거나 임베딩에 실패한 청크는 임베딩 없이 저장 (재임베딩 작업 대상)
+            if not canonical_id and embedding is not None:
+                document["embedding"] = self.encode_embedding(embedding)
+            documents.append(document)
+        return documents
+    
+    @profiled()
     async def store_article(self, article_data: Dict) -> Dict:
         """
-        아티클을 벡터 DB에 저장
-        반환값: {"status": "created|updated|skipped", "chunks": 저장된 청크 수}
+        아티클을 벡터 DB에 저장 (prepare_article -> embed_article_plan -> write_article_plan)
+        공통 메타데이터는 아티클 문서에, 청크 문서에는 텍스트/임베딩/위치/아티클 참조만 저장
+        반환값: {"status": "created|updated|migrated|skipped|error", "chunks": 저장된 청크 수, "duplicates": 중복 참조 청크 수}
         """
         if self.collection is None:
             logger.error("MongoDB가 연결되지 않았습니다.")
@@ -161,140 +911,766 @@ class AirflowVectorStore:
             return {"status": "error", "chunks": 0}
         
         try:
-            # 텍스트를 청크로 분할
-            text = article_data["full_text"]
-            chunks = self.split_text(text, chunk_size=1000, overlap=200)
+            # 전체 재구축 중에는 스테이징 컬렉션에 일괄 적재
+            if self.rebuild is not None:
+                chunks = self.chunk_article(article_data)
+                content_hash = self.calculate_content_hash(article_data["full_text"])
+                return await self._stage_article(article_data, chunks, content_hash)
             
-            # 전체 텍스트 해시 계산 (변경 감지용)
-            content_hash = self.calculate_content_hash(text)
+            plan = await self.prepare_article(article_data)
+            if plan["status"] == "skipped":
+                return {"status": "skipped", "chunks": 0}
             
-            # 기존 문서 확인
-            existing_doc = await self.check_article_exists(article_id)
+            # 모든 청크의 임베딩을 먼저 생성
+            # 실패하면 기존 청크와 content_hash를 그대로 두어 다음 실행에서 다시 처리 (청크 누락 없음)
+            try:
+                await self.embed_article_plan(plan)
+            except EmbeddingDispatchError as e:
+                logger.error(f"아티클 {article_id} 임베딩 생성 실패 - 기존 데이터 유지: {e}")
+                return {"status": "error", "chunks": 0}
             
-            status = "created"  # 기본값: 신규 생성
-            if existing_doc:
-                # 기존 문서의 해시 비교 (메타데이터에 저장된 해시 사용)
+            return await self.write_article_plan(plan)
+            
+        except Exception as e:
+            logger.error(f"아티클 저장 실패 ({article_id}): {e}")
+            return {"status": "error", "chunks": 0}
+    
+    @profiled()
+    async def prepare_article(self, article_data: Dict) -> Dict:
+        """
+        저장 1단계: 청크 분할, 변경 감지, 근사 중복 대표 청크 조회 (DB 읽기만 수행)
+        반환값: JSON 직렬화 가능한 저장 계획
+                {"article", "status", "existing", "content_hash", "chunks", "signatures", "canonicals"}
+                (변경이 없으면 status가 skipped이고 이후 단계 불필요)
+        """
+        article_id = article_data["article_id"]
+        
+        # 텍스트를 청크로 분할
+        text = article_data["full_text"]
+        chunks = self.chunk_article(article_data)
+        
+        # 전체 텍스트 해시 계산 (변경 감지용)
+        content_hash = self.calculate_content_hash(text)
+        
+        plan = {
+            "article": {key: article_data[key] for key in ("article_id", "title", *ARTICLE_METADATA_FIELDS)
+                        if key in article_data},
+            "status": "created",  # 기본값: 신규 생성
+            "existing": False,
+            "content_hash": content_hash,
+            "chunks": chunks,
+            "signatures": None,
+            "canonicals": None,
+        }
+        
+        # 기존 문서 확인
+        existing_doc = await self.check_article_exists(article_id)
+        
+        if existing_doc:
+            plan["existing"] = True
+            # 아티클 문서는 최상위, 구버전 청크는 메타데이터에 해시가 저장됨
+            is_legacy_chunk = "metadata" in existing_doc
+            if is_legacy_chunk:
                 existing_hash = existing_doc.get("metadata", {}).get("content_hash")
-                
-                if existing_hash is None:
-                    # 기존 데이터에 content_hash가 없는 경우 (구버전 데이터)
-                    # 기존 텍스트 내용과 비교하여 변경 여부 확인
-                    existing_text = existing_doc.get("text", "")
-                    existing_title = existing_doc.get("metadata", {}).get("title", "")
-                    
-                    # 첫 번째 청크의 텍스트만으로 빠른 비교
-                    # full_text가 아닌 body만 비교 (제목 포함 여부 차이 무시)
-                    body_text = article_data.get("body", "")
-                    
-                    # 간단한 비교: 첫 500자 비교
-                    existing_preview = existing_text[:500] if existing_text else ""
-                    new_preview = body_text[:500] if body_text else ""
-                    
-                    if existing_title == article_data.get("title", "") and existing_preview == new_preview:
-                        # 제목과 첫 부분이 같으면 변경 없음으로 간주
-                        # 하지만 content_hash가 없으므로 마이그레이션 겸 업데이트
-                        logger.info(f"아티클 {article_id} 기존 데이터 감지 (content_hash 없음) - 마이그레이션 업데이트")
-                        # 해당 아티클의 모든 청크 삭제 후 재저장 (content_hash 추가)
-                        delete_result = await self.collection.delete_many({
-                            "metadata.article_id": article_id
-                        })
-                        logger.info(f"기존 청크 {delete_result.deleted_count}개 삭제됨 (마이그레이션)")
-                        status = "migrated"  # 마이그레이션 상태
-                    else:
-                        # 내용이 다르면 업데이트
-                        logger.info(f"아티클 {article_id} 내용 변경 감지 - 업데이트 시작")
-                        delete_result = await self.collection.delete_many({
-                            "metadata.article_id": article_id
-                        })
-                        logger.info(f"기존 청크 {delete_result.deleted_count}개 삭제됨")
-                        status = "updated"
-                        
-                elif existing_hash == content_hash:
-                    # 내용이 변경되지 않음 (해시 일치)
-                    logger.info(f"아티클 {article_id} 변경사항 없음 (스킵)")
-                    return {"status": "skipped", "chunks": 0}
-                else:
-                    # 내용이 변경됨 - 기존 청크 삭제 후 재저장
-                    logger.info(f"아티클 {article_id} 내용 변경 감지 - 업데이트 시작")
-                    # 해당 아티클의 모든 청크 삭제
-                    delete_result = await self.collection.delete_many({
-                        "metadata.article_id": article_id
-                    })
-                    logger.info(f"기존 청크 {delete_result.deleted_count}개 삭제됨")
-                    status = "updated"
+            else:
+                existing_hash = existing_doc.get("content_hash")
             
-            # 신규 저장 또는 업데이트
-            stored_count = 0
-            for i, chunk in enumerate(chunks):
-                try:
-                    # 임베딩 생성
-                    embedding = await self.create_embedding(chunk)
-                    if not embedding:
-                        continue
-                    
-                    # 문서 ID 생성
-                    doc_id = hashlib.md5(
-                        f"zendesk_{article_id}_{i}".encode()
-                    ).hexdigest()
-                    
-                    # 메타데이터 생성
-                    metadata = {
-                        "article_id": article_id,
-                        "title": article_data["title"],
-                        "chunk_index": i,
-                        "total_chunks": len(chunks),
-                        "type": "zendesk_article",
-                        "content_hash": content_hash,  # 변경 감지를 위한 해시 저장
-                        "created_at": datetime.utcnow().isoformat(),
-                        "updated_at": datetime.utcnow().isoformat()
-                    }
-                    
-                    # URL 정보 추가
-                    if article_data.get("url"):
-                        metadata["url"] = article_data["url"]
-                    
-                    # 섹션/카테고리 정보 추가
-                    if article_data.get("section_name"):
-                        metadata["section_name"] = article_data["section_name"]
-                    if article_data.get("category_name"):
-                        metadata["category_name"] = article_data["category_name"]
-                    
-                    # 이미지 정보 추가 (모든 청크에 포함 - 검색 시 이미지 정보 접근 가능)
-                    if article_data.get("images"):
-                        metadata["images"] = article_data["images"]
-                    
-                    # MongoDB에 저장
-                    document = {
-                        "_id": doc_id,
-                        "text": chunk,
-                        "source": article_data.get("url", ""),
-                        "metadata": metadata,
-                        "embedding": embedding,
-                        "created_at": datetime.utcnow(),
-                        "updated_at": datetime.utcnow()
-                    }
-                    
-                    await self.collection.update_one(
-                        {"_id": doc_id},
-                        {"$set": document},
-                        upsert=True
-                    )
-                    
-                    stored_count += 1
-                    
-                except Exception as e:
-                    logger.error(f"청크 저장 실패 (아티클 {article_id}, 청크 {i}): {e}")
-                    continue
+            if existing_hash == content_hash:
+                # 내용이 변경되지 않음 (해시 일치)
+                logger.info(f"아티클 {article_id} 변경사항 없음 (스킵)")
+                plan.update(status="skipped", chunks=[])
+                return plan
             
-            status_msg = {
-                "created": "신규 저장",
-                "updated": "업데이트",
-                "skipped": "스킵"
-            }.get(status, status)
+            plan["status"] = "updated"
+            if existing_hash is None and is_legacy_chunk:
+                # 기존 데이터에 content_hash가 없는 경우 (구버전 데이터)
+                # 첫 번째 청크의 텍스트만으로 빠른 비교
+                # full_text가 아닌 body만 비교 (제목 포함 여부 차이 무시)
+                existing_text = existing_doc.get("text", "")
+                existing_title = existing_doc.get("metadata", {}).get("title", "")
+                body_text = article_data.get("body", "")
+                
+                # 간단한 비교: 첫 500자 비교
+                existing_preview = existing_text[:500] if existing_text else ""
+                new_preview = body_text[:500] if body_text else ""
+                
+                if existing_title == article_data.get("title", "") and existing_preview == new_preview:
+                    # 제목과 첫 부분이 같으면 변경 없음으로 간주
+                    # 하지만 content_hash가 없으므로 마이그레이션 겸 업데이트
+                    logger.info(f"아티클 {article_id} 기존 데이터 감지 (content_hash 없음) - 마이그레이션 업데이트")
+                    plan["status"] = "migrated"  # 마이그레이션 상태
             
-            logger.info(f"아티클 {article_id} {status_msg} 완료: {stored_count}/{len(chunks)} 청크")
-            return {"status": status, "chunks": stored_count}
+            if plan["status"] == "updated":
+                logger.info(f"아티클 {article_id} 내용 변경 감지 - 업데이트 시작")
+        
+        # 다른 아티클에 같은 내용(공지/면책 문구 등)의 대표 청크가 있으면 임베딩 없이 참조로 저장
+        if self.near_duplicate_enabled:
+            texts = [chunk["text"] for chunk in chunks]
+            plan["signatures"] = self.near_duplicates.signatures(texts)
+            plan["canonicals"] = await self.near_duplicates.find_canonicals(article_id, texts, plan["signatures"])
+        return plan
+    
+    @profiled()
+    async def embed_article_plan(self, plan: Dict) -> Dict:
+        """저장 2단계: 대표 청크가 없는 청크만 임베딩하여 plan["embeddings"]에 기록 (실패 시 EmbeddingDispatchError)"""
+        chunks, canonicals = plan["chunks"], plan.get("canonicals")
+        embed_indices = [i for i in range(len(chunks)) if not canonicals or not canonicals[i]]
+        vectors = await self.create_embeddings([chunks[i]["text"] for i in embed_indices])
+        embeddings: List[Optional[List[float]]] = [None] * len(chunks)
+        for i, vector in zip(embed_indices, vectors):
+            embeddings[i] = vector
+        plan["embeddings"] = embeddings
+        return plan
+    
+    @profiled()
+    async def _revalidate_canonicals(self, plan: Dict) -> List[Optional[str]]:
+        """
+        계획 이후 대표 청크가 바뀌거나 삭제되었으면 해당 청크를 독립 청크로 되돌리고 바로 임베딩
+        (임베딩에 실패하면 임베딩 없이 저장하여 재임베딩 작업 대상으로 남김)
+        """
+        canonicals = list(plan.get("canonicals") or [])
+        canonical_ids = sorted({canonical_id for canonical_id in canonicals if canonical_id})
+        if not canonical_ids:
+            return canonicals
+        
+        current = {doc["_id"]: doc async for doc in self.collection.find(
+            {"_id": {"$in": canonical_ids}, "metadata.duplicate_of": {"$exists": False}, "embedding": {"$exists": True}},
+            projection={"text": 1, "metadata.simhash": 1},
+        )}
+        chunks, signatures = plan["chunks"], plan["signatures"]
+        invalid = []
+        for i, canonical_id in enumerate(canonicals):
+            doc = current.get(canonical_id) if canonical_id else None
+            if canonical_id and not (doc and doc["metadata"].get("simhash") and self.near_duplicates.is_duplicate(
+                    chunks[i]["text"], signatures[i], doc.get("text", ""), int(doc["metadata"]["simhash"], 16))):
+                canonicals[i] = None
+                invalid.append(i)
+        
+        if invalid:
+            try:
+                vectors = await self.create_embeddings([chunks[i]["text"] for i in invalid])
+                for i, vector in zip(invalid, vectors):
+                    plan["embeddings"][i] = vector
+            except EmbeddingDispatchError as e:
+                logger.warning(f"대표 청크 변경으로 임베딩 필요 - 실패하여 재임베딩 대상으로 저장: {e}")
+        return canonicals
+    
+    @profiled()
+    async def write_article_plan(self, plan: Dict) -> Dict:
+        """
+        저장 3단계: 청크 bulk write, 이전 청크/중복 참조 정리, 어휘 색인, 아티클 문서 저장
+        반환값: {"status", "chunks", "duplicates"} (store_article과 같은 형태)
+        """
+        article_data = plan["article"]
+        article_id = article_data["article_id"]
+        status, existing, chunks = plan["status"], plan["existing"], plan["chunks"]
+        canonicals = await self._revalidate_canonicals(plan)
+        
+        # 이 아티클의 청크를 대표로 참조하던 중복 청크 확인용 (내용이 바뀌거나 중복이 되면 참조 해제)
+        previous_texts = {}
+        previous_created = {}
+        if existing:
+            async for doc in self.collection.find(
+                {"metadata.article_id": article_id},
+                projection={"text": 1, "created_at": 1, "metadata.duplicate_of": 1},
+            ):
+                previous_created[doc["_id"]] = doc.get("created_at")
+                if "duplicate_of" not in doc.get("metadata", {}):
+                    previous_texts[doc["_id"]] = doc.get("text")
+        
+        # 신규 저장 또는 업데이트 (ReplaceOne이 created_at을 덮어쓰지 않도록 기존 값 유지)
+        documents = self.build_chunk_documents(article_id, chunks, plan["embeddings"], datetime.utcnow(),
+                                               signatures=plan.get("signatures"), canonicals=canonicals)
+        for doc in documents:
+            doc["created_at"] = previous_created.get(doc["_id"]) or doc["created_at"]
+        requests = [ReplaceOne({"_id": doc["_id"]}, doc, upsert=True) for doc in documents]
+        doc_ids = [doc["_id"] for doc in documents]
+        lexical_chunks = [{"id": doc["_id"], "article_id": article_id, "text": doc["text"]}
+                          for doc in documents if "duplicate_of" not in doc["metadata"]]
+        
+        # MongoDB에 일괄 저장
+        if requests:
+            await self.collection.bulk_write(requests, ordered=False)
+        stored_count = len(requests)
+        duplicate_count = len(documents) - len(lexical_chunks)
+        
+        # 새 청크를 모두 쓴 뒤 남은 이전 청크 정리 (업데이트 중에도 검색 결과가 비지 않음)
+        if existing:
+            deleted_count = await self._delete_stale_chunks(article_id, doc_ids)
+            logger.info(f"이전 청크 {deleted_count}개 정리됨" + (" (마이그레이션)" if status == "migrated" else ""))
+            unchanged = {doc["_id"] for doc in documents
+                         if "duplicate_of" not in doc["metadata"] and previous_texts.get(doc["_id"]) == doc["text"]}
+            await self.release_duplicates([chunk_id for chunk_id in previous_texts if chunk_id not in unchanged])
+        
+        # 중복 청크는 대표 청크와 같은 검색 결과이므로 어휘 색인에서도 제외
+        if self.lexical_enabled and duplicate_count and existing:
+            await self.lexical_collection.delete_many({"_id": {"$in": [
+                doc["_id"] for doc in documents if "duplicate_of" in doc["metadata"]
+            ]}})
+        
+        # 어휘 인덱스 색인 (실패해도 임베딩 검색은 가능하므로 경고만 기록)
+        if self.lexical_enabled:
+            try:
+                await self.lexical_index.index_chunks(lexical_chunks)
+            except Exception as e:
+                logger.warning(f"어휘 색인 실패 (아티클 {article_id}): {e}")
+        
+        # 아티클 공통 메타데이터 저장
+        # 신규/마이그레이션은 내용 변경이 아니므로 이력에 남기지 않음
+        await self._upsert_article_document(article_data, plan["content_hash"], len(chunks),
+                                            changed=status == "updated")
+        
+        status_msg = {
+            "created": "신규 저장",
+            "updated": "업데이트",
+            "skipped": "스킵"
+        }.get(status, status)
+        
+        logger.info(f"아티클 {article_id} {status_msg} 완료: {stored_count}/{len(chunks)} 청크"
+                    + (f" (중복 참조 {duplicate_count}개)" if duplicate_count else ""))
+        return {"status": status, "chunks": stored_count, "duplicates": duplicate_count}
+    
+    async def mark_articles_seen(self, article_ids: List[str]) -> int:
+        """
+        이번 크롤링에서 확인한 아티클에 세대 ID 기록 (배치마다 updateMany 한 번)
+        반환값: 기록된 아티클 수 (아직 저장되지 않은 신규 아티클은 저장 시 기록됨)
+        """
+        if self.articles_collection is None or not self.crawl_generation:
+            return 0
+        
+        now = datetime.utcnow()
+        matched = 0
+        for start in range(0, len(article_ids), SEEN_BATCH_SIZE):
+            batch = article_ids[start:start + SEEN_BATCH_SIZE]
+            result = await self.articles_collection.update_many(
+                {"_id": {"$in": batch}},
+                {"$set": {"crawl_generation": self.crawl_generation, "last_seen_at": now}},
+            )
+            matched += result.matched_count
+        return matched
+    
+    async def sweep_stale_articles(self, max_ratio: Optional[float] = None) -> Dict:
+        """
+        이번 세대에서 확인되지 않은 아티클(도움말 센터에서 삭제됨)의 청크/어휘 색인/아티클 문서 일괄 삭제
+        발견 단계가 누락 없이 끝난 실행에서만 호출해야 하며, 삭제 비율이 max_ratio를 넘으면 삭제하지 않음
+        반환값: {"status": "swept|refused|skipped", "articles": 삭제(대상) 아티클 수, "chunks": 삭제된 청크 수}
+        """
+        if self.articles_collection is None or not self.crawl_generation:
+            return {"status": "skipped", "articles": 0, "chunks": 0}
+        
+        max_ratio = self.sweep_max_ratio if max_ratio is None else max_ratio
+        stale_filter = {"crawl_generation": {"$ne": self.crawl_generation}}
+        total = await self.articles_collection.count_documents({})
+        stale_ids = await self.articles_collection.distinct("_id", stale_filter)
+        if not stale_ids:
+            logger.info("정리할 이전 세대 아티클 없음")
+            return {"status": "swept", "articles": 0, "chunks": 0}
+        
+        ratio = len(stale_ids) / total
+        if ratio > max_ratio:
+            logger.warning(f"⚠️ 이전 세대 아티클 {len(stale_ids)}/{total}개({ratio:.0%})가 삭제 상한 {max_ratio:.0%}을 넘어 "
+                           f"정리하지 않습니다 (발견 단계 오류 가능성)")
+            return {"status": "refused", "articles": len(stale_ids), "chunks": 0}
+        
+        # 청크 -> 어휘 색인 -> 아티클 문서 순서로 삭제 (중간에 실패해도 다음 실행에서 다시 대상이 됨)
+        canonical_ids = await self.collection.distinct("_id", {
+            "metadata.article_id": {"$in": stale_ids}, "metadata.duplicate_of": {"$exists": False}
+        })
+        delete_result = await self.collection.delete_many({"metadata.article_id": {"$in": stale_ids}})
+        if self.lexical_enabled:
+            await self.lexical_index.delete_articles(stale_ids)
+        # 삭제된 청크를 대표로 참조하던 다른 아티클의 중복 청크는 독립 청크로 전환
+        await self.release_duplicates(canonical_ids)
+        await self.articles_collection.delete_many({"_id": {"$in": stale_ids}, **stale_filter})
+        
+        logger.info(f"🧹 삭제된 아티클 정리: {len(stale_ids)}개 아티클, 청크 {delete_result.deleted_count}개")
+        return {"status": "swept", "articles": len(stale_ids), "chunks": delete_result.deleted_count}
+    
+    def article_lookup_stages(self, fields: Optional[List[str]] = None) -> List[Dict]:
+        """
+        청크 조회 파이프라인 뒤에 붙이는 아티클 메타데이터 조인 단계
+        조인 결과를 청크 metadata에 병합하여 구버전 레이아웃과 같은 형태로 반환
+        (구버전 청크처럼 아티클 문서가 없으면 기존 metadata 그대로 유지)
+        """
+        projection = {"_id": 0}
+        for field in fields or ARTICLE_METADATA_FIELDS:
+            projection[field] = 1
+        
+        return [
+            {"$lookup": {
+                "from": self.articles_collection.name,
+                "localField": "metadata.article_id",
+                "foreignField": "_id",
+                "pipeline": [{"$project": projection}],
+                "as": "_article",
+            }},
+            {"$set": {"metadata": {"$mergeObjects": [
+                {"$ifNull": [{"$first": "$_article"}, {}]},
+                "$metadata",
+            ]}}},
+            {"$unset": "_article"},
+        ]
+    
+    async def find_chunks_with_article(self, query: Dict, limit: int = 0,
+                                       fields: Optional[List[str]] = None,
+                                       projection: Optional[Dict] = None,
+                                       sort: Optional[Dict] = None) -> List[Dict]:
+        """아티클 메타데이터를 조인한 청크 조회 (소비자용 읽기 헬퍼)"""
+        if self.collection is None:
+            logger.error("MongoDB가 연결되지 않았습니다.")
+            return []
+        
+        pipeline: List[Dict] = [{"$match": query}]
+        if sort:
+            pipeline.append({"$sort": sort})
+        if limit:
+            pipeline.append({"$limit": limit})
+        if projection:
+            pipeline.append({"$project": projection})
+        pipeline.extend(self.article_lookup_stages(fields))
+        return await self.collection.aggregate(pipeline).to_list(length=None)
+    
+    async def storage_stats(self, extra_collections: Optional[List[str]] = None) -> Dict[str, Dict]:
+        """
+        청크/아티클/어휘 컬렉션(+ extra_collections)의 크기와 인덱스별 크기를 한 번의 집계($collStats + $unionWith)로 수집
+        반환값: {컬렉션명: {"count", "size", "storage_size", "total_index_size", "index_sizes"}}
+        """
+        # 아직 없는 컬렉션은 $collStats가 실패하므로 제외 (마이그레이션 전 아티클 컬렉션 등)
+        existing = set(await self.db.list_collection_names())
+        if self.collection.name not in existing:
+            return {}
+        stage = {"$collStats": {"storageStats": {}}}
+        others = [self.articles_collection.name]
+        if self.lexical_enabled:
+            others.append(self.lexical_collection.name)
+        others += [name for name in extra_collections or [] if name not in others]
+        others = [name for name in others if name in existing]
+        pipeline = [stage, *({"$unionWith": {"coll": name, "pipeline": [stage]}} for name in others)]
+        try:
+            docs = await self.collection.aggregate(pipeline).to_list(length=None)
+        except OperationFailure as e:
+            logger.warning(f"컬렉션 통계 집계 실패: {e}")
+            return {}
+        
+        stats = {}
+        for doc in docs:
+            storage = doc.get("storageStats", {})
+            stats[doc["ns"].split(".", 1)[-1]] = {
+                "count": storage.get("count", 0),
+                "size": storage.get("size", 0),
+                "storage_size": storage.get("storageSize", 0),
+                "total_index_size": storage.get("totalIndexSize", 0),
+                # 인덱스 이름에 '.'이 들어갈 수 있어 이력 저장용으로 목록화
+                "index_sizes": [{"name": name, "size": size} for name, size in storage.get("indexSizes", {}).items()],
+            }
+        return stats
+    
+    async def normalize_legacy_chunks(self, batch_size: int = 500) -> Dict:
+        """
+        구버전 레이아웃(청크마다 제목/URL/이미지 중복 저장)을 정규화 레이아웃으로 이전
+        아티클 단위로 아티클 문서를 만들고, 청크의 중복 필드는 updateMany 한 번으로 제거
+        반환값: {"articles": 이전한 아티클 수, "chunks": 정리된 청크 수, "before": storage_stats(), "after": storage_stats()}
+        """
+        if self.collection is None:
+            logger.error("MongoDB가 연결되지 않았습니다.")
+            return {"articles": 0, "chunks": 0}
+        
+        before = await self.storage_stats()
+        migrated_articles = 0
+        cleaned_chunks = 0
+        
+        legacy_filter = {"metadata.chunk_index": 0, "metadata.title": {"$exists": True}}
+        cursor = self.collection.find(
+            legacy_filter,
+            projection={"metadata": 1, "created_at": 1},
+            batch_size=batch_size,
+        )
+        
+        batch: List[Dict] = []
+        async for doc in cursor:
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                articles, chunks = await self._normalize_legacy_batch(batch)
+                migrated_articles += articles
+                cleaned_chunks += chunks
+                batch = []
+        if batch:
+            articles, chunks = await self._normalize_legacy_batch(batch)
+            migrated_articles += articles
+            cleaned_chunks += chunks
+        
+        after = await self.storage_stats()
+        logger.info(f"정규화 완료: 아티클 {migrated_articles}개, 청크 {cleaned_chunks}개 정리")
+        return {"articles": migrated_articles, "chunks": cleaned_chunks, "before": before, "after": after}
+    
+    async def _normalize_legacy_batch(self, first_chunks: List[Dict]) -> tuple:
+        """구버전 첫 번째 청크 묶음에서 아티클 문서 생성 후 청크의 중복 필드 제거"""
+        requests = []
+        article_ids = []
+        for doc in first_chunks:
+            metadata = doc.get("metadata", {})
+            article_id = metadata.get("article_id")
+            if not article_id:
+                continue
+            article_ids.append(article_id)
+            article_doc = {
+                "type": metadata.get("type", "zendesk_article"),
+                "title": metadata.get("title", ""),
+                "total_chunks": metadata.get("total_chunks"),
+                "content_hash": metadata.get("content_hash"),
+                "updated_at": datetime.utcnow(),
+            }
+            for field in ARTICLE_METADATA_FIELDS:
+                if metadata.get(field):
+                    article_doc[field] = metadata[field]
+            requests.append(UpdateOne(
+                {"_id": article_id},
+                {"$set": article_doc, "$setOnInsert": {"created_at": doc.get("created_at") or datetime.utcnow()}},
+                upsert=True,
+            ))
+        
+        if not requests:
+            return 0, 0
+        
+        await self.articles_collection.bulk_write(requests, ordered=False)
+        unset_result = await self.collection.update_many(
+            {"metadata.article_id": {"$in": article_ids}},
+            {"$unset": {field: "" for field in LEGACY_CHUNK_FIELDS}},
+        )
+        return len(requests), unset_result.modified_count
+    
+    async def reencode_vectors(self, batch_size: int = 500) -> Dict:
+        """
+        저장된 벡터를 현재 설정된 형식/차원으로 재인코딩 (임베딩 API 호출 없음)
+        같은 모델로 만든 벡터만 대상이며, 차원 축소는 text-embedding-3 모델에서만 가능
+        (형식/차원 정보가 없는 구버전 청크는 현재 모델의 double 배열로 간주)
+        반환값: {"converted": 변환 수, "skipped": 변환 불가 수, "before": storage_stats(), "after": storage_stats()}
+        """
+        if self.collection is None:
+            logger.error("MongoDB가 연결되지 않았습니다.")
+            return {"converted": 0, "skipped": 0}
+        
+        before = await self.storage_stats()
+        query = {
+            "metadata.embedding_model": self.embedding_model_condition(),
+            "embedding": {"$exists": True},
+            "$or": [
+                {"metadata.embedding_format": {"$ne": self.vector_format}},
+                {"metadata.embedding_dimensions": {"$ne": self.embedding_dimensions}},
+            ],
+        }
+        cursor = self.collection.find(
+            query,
+            projection={"embedding": 1, "metadata.embedding_format": 1},
+            batch_size=batch_size,
+        )
+        
+        converted = 0
+        skipped = 0
+        requests = []
+        async for doc in cursor:
+            values, stored_format = unpack_vector(doc["embedding"])
+            # 양자화된 벡터는 원래 값으로 되돌릴 수 없으므로 재임베딩 대상
+            if stored_format in ("int8", "bit") or len(values) < self.embedding_dimensions:
+                skipped += 1
+                continue
+            if len(values) > self.embedding_dimensions:
+                if not self.supports_reduced_dimensions():
+                    skipped += 1
+                    continue
+                values = truncate_normalized(values, self.embedding_dimensions)
             
-        except Exception as e:
-            logger.error(f"아티클 저장 실패 ({article_id}): {e}")
-            return {"status": "error", "chunks": 0}
+            requests.append(UpdateOne(
+                {"_id": doc["_id"]},
+                {"$set": {
+                    "embedding": self.encode_embedding(values),
+                    **{f"metadata.{k}": v for k, v in self.embedding_metadata().items()},
+                }},
+            ))
+            if len(requests) >= batch_size:
+                converted += (await self.collection.bulk_write(requests, ordered=False)).modified_count
+                requests = []
+        
+        if requests:
+            converted += (await self.collection.bulk_write(requests, ordered=False)).modified_count
+        
+        after = await self.storage_stats()
+        logger.info(f"벡터 재인코딩 완료: {converted}개 변환, {skipped}개 변환 불가 (재임베딩 필요)")
+        return {"converted": converted, "skipped": skipped, "before": before, "after": after}
+    
+    async def rebuild_lexical_index(self, batch_size: int = 500) -> Dict:
+        """
+        저장된 청크 텍스트로 어휘 인덱스 재구성 (임베딩 API 호출 없음)
+        어휘 인덱스 도입 이전에 저장된 청크 색인용
+        반환값: {"indexed": 색인한 청크 수, "removed": 청크가 없어 삭제된 색인 수}
+        """
+        if self.collection is None:
+            logger.error("MongoDB가 연결되지 않았습니다.")
+            return {"indexed": 0, "removed": 0}
+        
+        await self.lexical_index.ensure_indexes()
+        cursor = self.collection.find(
+            {"metadata.article_id": {"$exists": True}},
+            projection={"text": 1, "metadata.article_id": 1, "metadata.type": 1},
+            batch_size=batch_size,
+        )
+        
+        indexed = 0
+        batch = []
+        seen_ids = set()
+        async for doc in cursor:
+            seen_ids.add(doc["_id"])
+            batch.append({
+                "id": doc["_id"],
+                "article_id": doc["metadata"]["article_id"],
+                "text": doc.get("text", ""),
+                "type": doc["metadata"].get("type", "zendesk_article"),
+            })
+            if len(batch) >= batch_size:
+                indexed += await self.lexical_index.index_chunks(batch)
+                batch = []
+        if batch:
+            indexed += await self.lexical_index.index_chunks(batch)
+        
+        # 청크가 삭제된 색인 문서 정리
+        stale_ids = [doc["_id"] async for doc in self.lexical_collection.find({}, projection={"_id": 1})
+                     if doc["_id"] not in seen_ids]
+        removed = 0
+        for start in range(0, len(stale_ids), batch_size):
+            result = await self.lexical_collection.delete_many({"_id": {"$in": stale_ids[start:start + batch_size]}})
+            removed += result.deleted_count
+        
+        logger.info(f"어휘 인덱스 재구성 완료: {indexed}개 색인, {removed}개 정리")
+        return {"indexed": indexed, "removed": removed}
+    
+    # ------------------------------------------------------------------
+    # 전체 재구축 (blue/green)
+    # ------------------------------------------------------------------
+    async def begin_rebuild(self) -> str:
+        """
+        전체 재구축 시작: 새 세대 스테이징 컬렉션으로 전환 (보조/벡터 인덱스 없이 적재)
+        이후 store_article은 스테이징에 일괄 적재하며, 읽기 쪽은 finish_rebuild 전까지 기존 세대를 사용
+        반환값: 스테이징 세대 컬렉션명
+        """
+        if self.collection is None:
+            raise RuntimeError("MongoDB가 연결되지 않았습니다.")
+        if self.rebuild is not None:
+            raise RuntimeError(f"이미 재구축 중입니다: {self.rebuild['generation']}")
+        
+        generation = f"{self.collection_name}__g{datetime.utcnow():%Y%m%d%H%M%S}"
+        self.rebuild = {
+            "generation": generation,
+            "live": self.collection.name,
+            "live_collection": self.collection,
+            "live_articles": self.articles_collection,
+            "chunks": [],
+            "articles": [],
+            "lexical": [],
+            "stats": {"articles": 0, "chunks": 0, "reused": 0, "errors": 0},
+        }
+        self._bind_collections(generation)
+        logger.info(f"전체 재구축 시작: {self.rebuild['live']} -> {generation}")
+        return generation
+    
+    @profiled()
+    async def _stage_article(self, article_data: Dict, chunks: List[Dict], content_hash: str) -> Dict:
+        """
+        재구축 중 아티클 적재
+        기존 세대에 같은 내용/같은 임베딩 설정의 청크가 있으면 임베딩 API 호출 없이 복사
+        """
+        rebuild = self.rebuild
+        article_id = article_data["article_id"]
+        now = datetime.utcnow()
+        texts = [chunk["text"] for chunk in chunks]
+        
+        live_article = await rebuild["live_articles"].find_one(
+            {"_id": article_id}, projection={"created_at": 1, "content_hash": 1, "change_history": 1}
+        )
+        live_chunks = await rebuild["live_collection"].find(
+            {"metadata.article_id": article_id}
+        ).sort("metadata.chunk_index", ASCENDING).to_list(length=None)
+        current = self.embedding_metadata()
+        reusable = (
+            [doc.get("text") for doc in live_chunks] == texts
+            and all(doc.get("embedding") is not None
+                    and all(doc["metadata"].get(key) == value for key, value in current.items())
+                    for doc in live_chunks)
+        )
+        
+        status = "created" if not live_chunks else "updated"
+        stored_hash = content_hash
+        if reusable:
+            documents = live_chunks
+            status = "skipped"
+            rebuild["stats"]["reused"] += 1
+        else:
+            try:
+                embeddings = await self.create_embeddings(texts)
+                # 스테이징에서는 중복 참조 없이 모두 임베딩 (대표 청크가 같은 세대에 있다는 보장이 없음)
+                signatures = self.near_duplicates.signatures(texts) if self.near_duplicate_enabled else None
+                documents = self.build_chunk_documents(article_id, chunks, embeddings, now, signatures=signatures)
+                live_created = {doc["_id"]: doc.get("created_at") for doc in live_chunks}
+                for doc in documents:
+                    doc["created_at"] = live_created.get(doc["_id"]) or now
+            except EmbeddingDispatchError as e:
+                if not live_chunks:
+                    logger.error(f"아티클 {article_id} 임베딩 생성 실패 (재구축): {e}")
+                    rebuild["stats"]["errors"] += 1
+                    return {"status": "error", "chunks": 0}
+                # 기존 세대 청크를 그대로 옮기고 해시를 비워 다음 증분 실행에서 다시 처리
+                logger.warning(f"아티클 {article_id} 임베딩 생성 실패 - 기존 청크 유지 (재구축): {e}")
+                documents = live_chunks
+                stored_hash = None
+                status = "error"
+                rebuild["stats"]["errors"] += 1
+        
+        article_doc = self.build_article_document(article_data, stored_hash, len(documents), now)
+        article_doc["_id"] = article_id
+        article_doc["created_at"] = (live_article or {}).get("created_at") or now
+        # 재구축 후에도 재크롤링 주기 추정이 이어지도록 변경 이력 유지
+        change_history = list((live_article or {}).get("change_history", []))
+        if live_article and live_article.get("content_hash") not in (None, content_hash):
+            change_history = (change_history + [now])[-CHANGE_HISTORY_SIZE:]
+        if change_history:
+            article_doc["change_history"] = change_history
+        rebuild["articles"].append(article_doc)
+        rebuild["chunks"].extend(documents)
+        if self.lexical_enabled:
+            rebuild["lexical"].extend(
+                LexicalIndex.build_posting(doc["_id"], article_id, doc["text"]) for doc in documents
+            )
+        rebuild["stats"]["articles"] += 1
+        rebuild["stats"]["chunks"] += len(documents)
+        
+        if len(rebuild["chunks"]) >= REBUILD_FLUSH_DOCS:
+            await self._flush_rebuild()
+        return {"status": status, "chunks": len(documents)}
+    
+    async def _flush_rebuild(self):
+        """버퍼된 청크/아티클/어휘 색인 문서를 스테이징 컬렉션에 insert_many로 적재"""
+        rebuild = self.rebuild
+        for collection, key in ((self.collection, "chunks"), (self.articles_collection, "articles"),
+                                (self.lexical_collection, "lexical")):
+            docs = rebuild[key]
+            if not docs:
+                continue
+            try:
+                await collection.insert_many(docs, ordered=False)
+            except BulkWriteError as e:
+                # 같은 아티클이 한 실행에서 두 번 처리된 경우의 중복 키만 무시
+                if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+                    raise
+            rebuild[key] = []
+    
+    async def finish_rebuild(self, min_ratio: float = 0.9, index_timeout: float = 1800) -> Dict:
+        """
+        재구축 완료: 남은 버퍼 적재 → 인덱스 1회 생성 → 벡터 인덱스 준비 대기 → 포인터 전환
+        적재된 청크 수가 기존 세대의 min_ratio 미만이면 전환하지 않음 (부분 크롤링 보호)
+        반환값: {"generation", "previous", "stats", "indexes", "dropped"}
+        """
+        rebuild = self.rebuild
+        if rebuild is None:
+            raise RuntimeError("진행 중인 재구축이 없습니다.")
+        
+        await self._flush_rebuild()
+        staged = await self.collection.count_documents({})
+        live_count = await rebuild["live_collection"].estimated_document_count()
+        if staged == 0 or staged < live_count * min_ratio:
+            raise RuntimeError(f"재구축 결과가 너무 적어 전환하지 않습니다: {staged}개 (기존 {live_count}개)")
+        
+        # 적재가 끝난 뒤 보조/어휘/벡터 인덱스를 한 번에 생성
+        indexes = await self.ensure_indexes()
+        if indexes["vector_index"] != "unavailable":
+            await self.wait_for_search_index(timeout=index_timeout)
+        
+        # 포인터 문서 한 번의 갱신으로 읽기 쪽 전환 (이전 세대는 롤백용으로 보존)
+        await self.db[COLLECTION_POINTERS].update_one(
+            {"_id": self.collection_name},
+            {"$set": {
+                "active": rebuild["generation"],
+                "previous": rebuild["live"],
+                "switched_at": datetime.utcnow(),
+                "stats": rebuild["stats"],
+            }},
+            upsert=True,
+        )
+        self.rebuild = None
+        logger.info(f"전체 재구축 전환 완료: {rebuild['live']} -> {rebuild['generation']} ({rebuild['stats']})")
+        
+        dropped = await self.drop_old_generations()
+        return {
+            "generation": rebuild["generation"],
+            "previous": rebuild["live"],
+            "stats": rebuild["stats"],
+            "indexes": indexes,
+            "dropped": dropped,
+        }
+    
+    async def abort_rebuild(self):
+        """재구축 취소: 스테이징 세대 삭제 후 기존 세대로 복귀"""
+        rebuild = self.rebuild
+        if rebuild is None:
+            return
+        self.rebuild = None
+        await self._drop_generation(rebuild["generation"])
+        self._bind_collections(rebuild["live"])
+        logger.warning(f"전체 재구축 취소: {rebuild['generation']} 삭제, {rebuild['live']} 유지")
+    
+    async def wait_for_search_index(self, timeout: float = 1800, interval: float = 10) -> bool:
+        """벡터 검색 인덱스가 질의 가능(queryable) 상태가 될 때까지 대기"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            indexes = await self.collection.list_search_indexes(self.vector_index_name).to_list(length=1)
+            if indexes and indexes[0].get("queryable"):
+                return True
+            if indexes and indexes[0].get("status") == "FAILED":
+                raise RuntimeError(f"벡터 검색 인덱스 생성 실패: {self.vector_index_name}")
+            if loop.time() >= deadline:
+                raise TimeoutError(f"벡터 검색 인덱스 준비 대기 시간 초과 ({timeout:.0f}초)")
+            await asyncio.sleep(interval)
+    
+    async def rollback_generation(self) -> Dict:
+        """이전 세대로 되돌림 (active와 previous를 맞바꿔 다시 되돌릴 수도 있음)"""
+        pointers = self.db[COLLECTION_POINTERS]
+        pointer = await pointers.find_one({"_id": self.collection_name})
+        if not pointer or not pointer.get("previous"):
+            raise RuntimeError("되돌릴 이전 세대가 없습니다.")
+        if pointer["previous"] not in await self.db.list_collection_names():
+            raise RuntimeError(f"이전 세대 컬렉션이 없습니다: {pointer['previous']}")
+        
+        await pointers.update_one(
+            {"_id": self.collection_name},
+            {"$set": {"active": pointer["previous"], "previous": pointer["active"],
+                      "switched_at": datetime.utcnow()}},
+        )
+        self._bind_collections(pointer["previous"])
+        logger.warning(f"세대 롤백: {pointer['active']} -> {pointer['previous']}")
+        return {"active": pointer["previous"], "previous": pointer["active"]}
+    
+    async def list_generations(self) -> List[str]:
+        """재구축으로 만들어진 세대 컬렉션명 목록 (오래된 순)"""
+        pattern = re.compile(rf"^{re.escape(self.collection_name)}__g\d{{14}}$")
+        names = await self.db.list_collection_names()
+        return sorted(name for name in names if pattern.match(name))
+    
+    async def drop_old_generations(self) -> List[str]:
+        """활성/이전 세대를 제외한 세대 컬렉션 삭제 (기본 컬렉션은 삭제하지 않음)"""
+        pointer = await self.db[COLLECTION_POINTERS].find_one({"_id": self.collection_name}) or {}
+        keep = {pointer.get("active"), pointer.get("previous")}
+        if self.rebuild is not None:
+            keep.add(self.rebuild["generation"])
+        
+        dropped = []
+        for generation in await self.list_generations():
+            if generation not in keep:
+                await self._drop_generation(generation)
+                dropped.append(generation)
+        if dropped:
+            logger.info(f"이전 세대 삭제: {dropped}")
+        return dropped
+    
+    async def _drop_generation(self, generation: str):
+        """세대 컬렉션과 부속 컬렉션(_articles/_lexical/_jobs) 삭제"""
+        for suffix in ("", "_articles", "_lexical", "_jobs"):
+            await self.db.drop_collection(f"{generation}{suffix}")
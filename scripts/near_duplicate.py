@@ -0,0 +1,184 @@
+"""
+청크 근사 중복 탐지 모듈
+청크 텍스트의 문자 3-gram SimHash(64비트)를 16비트 밴드 4개로 나누어 knowledge_base의 멀티키 인덱스로
+후보를 찾고, 해밍 거리가 임계값 이하이면서 숫자(수수료/한도/날짜 등)가 모두 같은 청크를 중복으로 판단합니다.
+중복 청크는 임베딩 없이 대표 청크 참조(metadata.duplicate_of)로 저장됩니다.
+"""
+import hashlib
+import logging
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from .profiling import profiled
+
+logger = logging.getLogger(__name__)
+
+SIMHASH_BITS = 64
+# 64비트 서명을 16비트 밴드 4개로 분할 (해밍 거리 3 이하면 최소 한 밴드가 반드시 일치)
+SIMHASH_BANDS = 4
+SHINGLE_SIZE = 3
+
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+# 숫자가 다르면 내용이 같아도 다른 안내 (예: 출금 수수료 0.0005 BTC / 0.001 BTC)
+_NUMBER_PATTERN = re.compile(r'\d+(?:[.,]\d+)*')
+
+
+def normalize_text(text: str) -> str:
+    """공백을 하나로 합치고 소문자로 변환"""
+    return _WHITESPACE_PATTERN.sub(' ', text).strip().lower()
+
+
+def simhash(text: str) -> int:
+    """정규화한 텍스트의 문자 3-gram 출현 빈도 가중 64비트 SimHash"""
+    normalized = normalize_text(text)
+    if len(normalized) < SHINGLE_SIZE:
+        shingles = Counter([normalized])
+    else:
+        shingles = Counter(normalized[i:i + SHINGLE_SIZE] for i in range(len(normalized) - SHINGLE_SIZE + 1))
+
+    weights = [0] * SIMHASH_BITS
+    for shingle, count in shingles.items():
+        value = int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += count if value >> bit & 1 else -count
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def signature_hex(signature: int) -> str:
+    """저장용 16자리 16진수 문자열 (BSON int64 부호 문제 회피)"""
+    return f"{signature:016x}"
+
+
+def signature_bands(signature: int) -> List[str]:
+    """밴드 번호를 붙인 16비트 밴드 목록 (멀티키 인덱스 조회 키)"""
+    width = SIMHASH_BITS // SIMHASH_BANDS
+    mask = (1 << width) - 1
+    return [f"{band}:{signature >> (band * width) & mask:04x}" for band in range(SIMHASH_BANDS)]
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """두 서명의 해밍 거리"""
+    return bin(a ^ b).count('1')
+
+
+class NearDuplicateIndex:
+    """knowledge_base 청크의 SimHash 밴드 인덱스 기반 근사 중복 탐지"""
+
+    def __init__(self, collection, max_distance: int = 3, min_chars: int = 40, max_candidates: int = 1000):
+        self.collection = collection
+        self.max_distance = max_distance
+        # 짧은 청크는 서명이 불안정하고 중복으로 묶어도 절약이 적으므로 제외
+        self.min_chars = min_chars
+        self.max_candidates = max_candidates
+
+    @profiled()
+    def signatures(self, texts: List[str]) -> List[int]:
+        """청크 텍스트별 SimHash 서명"""
+        return [simhash(text) for text in texts]
+
+    @profiled()
+    async def find_canonicals(self, article_id: str, texts: List[str],
+                              signatures: List[int]) -> List[Optional[str]]:
+        """
+        청크별 대표 청크 ID 조회 (중복이 아니면 None)
+        대표 청크: 다른 아티클의, 임베딩이 있고 그 자신은 중복이 아닌 청크
+        """
+        targets = [i for i, text in enumerate(texts) if len(normalize_text(text)) >= self.min_chars]
+        canonicals: List[Optional[str]] = [None] * len(texts)
+        if not targets:
+            return canonicals
+
+        bands = sorted({band for i in targets for band in signature_bands(signatures[i])})
+        candidates = await self.collection.find(
+            {
+                "metadata.simhash_bands": {"$in": bands},
+                "metadata.article_id": {"$ne": article_id},
+                "metadata.duplicate_of": {"$exists": False},
+                "embedding": {"$exists": True},
+            },
+            projection={"text": 1, "metadata.simhash": 1},
+            limit=self.max_candidates,
+        ).to_list(length=self.max_candidates)
+
+        parsed: List[Tuple[str, int, str]] = [
+            (doc["_id"], int(doc["metadata"]["simhash"], 16), doc.get("text", ""))
+            for doc in candidates if doc.get("metadata", {}).get("simhash")
+        ]
+        for i in targets:
+            best = None
+            for candidate_id, candidate_signature, candidate_text in parsed:
+                if not self.is_duplicate(texts[i], signatures[i], candidate_text, candidate_signature):
+                    continue
+                distance = hamming_distance(signatures[i], candidate_signature)
+                if best is None or distance < best[0]:
+                    best = (distance, candidate_id)
+            if best:
+                canonicals[i] = best[1]
+        return canonicals
+
+    def is_duplicate(self, text: str, signature: int, other_text: str, other_signature: int) -> bool:
+        """해밍 거리가 임계값 이하이고 숫자가 모두 같으면 중복"""
+        return (len(normalize_text(text)) >= self.min_chars
+                and hamming_distance(signature, other_signature) <= self.max_distance
+                and _NUMBER_PATTERN.findall(text) == _NUMBER_PATTERN.findall(other_text))
+
+    def group(self, texts: List[str], signatures: List[int]) -> List[Optional[int]]:
+        """
+        목록 내부 중복 묶기 (대표 청크가 사라져 참조를 옮길 때 사용)
+        반환값: 청크별 대표 위치 (스스로 대표면 None)
+        """
+        representatives: List[int] = []
+        groups: List[Optional[int]] = []
+        for i, text in enumerate(texts):
+            match = next((r for r in representatives
+                          if self.is_duplicate(text, signatures[i], texts[r], signatures[r])), None)
+            if match is None:
+                representatives.append(i)
+            groups.append(match)
+        return groups
+
+    @staticmethod
+    def chunk_fields(signature: int, canonical_id: Optional[str]) -> Dict:
+        """
+        청크 metadata에 추가할 서명 필드
+        대표 청크만 밴드를 저장하여 후보 조회 대상이 되고, 중복 청크는 대표 청크 참조만 저장
+        """
+        fields = {"simhash": signature_hex(signature)}
+        if canonical_id:
+            fields["duplicate_of"] = canonical_id
+        else:
+            fields["simhash_bands"] = signature_bands(signature)
+        return fields
+
+
+class RunDuplicateRegistry:
+    """
+    아직 저장되지 않은 대표 청크의 메모리 내 밴드 색인
+    임베딩과 저장이 분리된 파이프라인에서 같은 실행의 다른 아티클 청크와의 중복 탐지에 사용
+    """
+
+    def __init__(self, index: NearDuplicateIndex):
+        self.index = index
+        self.bands: Dict[str, List[int]] = {}
+        self.entries: List[Tuple[str, int, str]] = []
+
+    def find(self, text: str, signature: int) -> Optional[str]:
+        """등록된 대표 청크 중 중복 대상 ID (없으면 None)"""
+        positions = {pos for band in signature_bands(signature) for pos in self.bands.get(band, ())}
+        best = None
+        for pos in positions:
+            chunk_id, other_signature, other_text = self.entries[pos]
+            if not self.index.is_duplicate(text, signature, other_text, other_signature):
+                continue
+            distance = hamming_distance(signature, other_signature)
+            if best is None or distance < best[0]:
+                best = (distance, chunk_id)
+        return best[1] if best else None
+
+    def add(self, chunk_id: str, text: str, signature: int):
+        """대표 청크 등록"""
+        pos = len(self.entries)
+        self.entries.append((chunk_id, signature, text))
+        for band in signature_bands(signature):
+            self.bands.setdefault(band, []).append(pos)
@@ -0,0 +1,706 @@
+"""
+크롤링 파이프라인 단계 모듈
+discover(URL 목록) -> select(크롤링 대상) -> fetch(아티클 JSONL) -> embed(임베딩된 저장 계획 JSONL.gz)
+-> load(MongoDB 저장)
+단계마다 실행별 디렉토리(CRAWL_ARTIFACT_DIR/<run_id>)에 산출물과 매니페스트(입력/산출물 digest)를 남겨
+각 단계를 따로 재시도할 수 있고, 입력이 바뀌지 않은 단계는 다시 실행하지 않습니다.
+중단된 단계는 부분 산출물(<산출물>.partial)에서 이어서 처리합니다.
+긴 대기를 triggerer에 넘긴(StageDeferred) 단계는 부분 산출물과 단계 상태(<단계>.state.json)로 이어서 처리합니다.
+"""
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set
+
+from .crawl_guard import CircuitBreaker, CircuitOpenError, CrawlDeadline, StageDeferred, stop_reason
+from .http_cache import ConditionalFetcher, ValidatorStore, http_cache_enabled
+from .near_duplicate import RunDuplicateRegistry
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ARTIFACT_DIR = Path(__file__).parent.parent / "data" / "crawl_artifacts"
+
+URLS_FILE = "urls.json"
+DUE_FILE = "due.json"
+ARTICLES_FILE = "articles.jsonl"
+PLANS_FILE = "chunks.jsonl.gz"
+LOAD_FILE = "load.jsonl"
+MANIFEST_SUFFIX = ".manifest.json"
+PARTIAL_SUFFIX = ".partial"
+STATE_SUFFIX = ".state.json"
+
+
+# ----------------------------------------------------------------------
+# 산출물 / 매니페스트
+# ----------------------------------------------------------------------
+def artifact_root() -> Path:
+    """산출물 루트 디렉토리 (CRAWL_ARTIFACT_DIR, 모든 태스크가 같은 경로를 볼 수 있어야 함)"""
+    return Path(os.getenv("CRAWL_ARTIFACT_DIR") or DEFAULT_ARTIFACT_DIR)
+
+
+def run_directory(run_id: str) -> Path:
+    """실행별 산출물 디렉토리 (Airflow run_id 기준, 없으면 생성)"""
+    path = artifact_root() / re.sub(r'[^A-Za-z0-9_.-]', '_', run_id)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def prune_old_runs(keep: int, current: Optional[Path] = None) -> List[str]:
+    """오래된 실행 디렉토리 삭제 (최근 keep개와 현재 실행은 유지)"""
+    root = artifact_root()
+    if keep <= 0 or not root.exists():
+        return []
+    runs = sorted((path for path in root.iterdir() if path.is_dir() and path != current),
+                  key=lambda path: path.stat().st_mtime, reverse=True)
+    removed = []
+    for path in runs[keep:]:
+        shutil.rmtree(path, ignore_errors=True)
+        removed.append(path.name)
+    if removed:
+        logger.info(f"오래된 크롤링 산출물 {len(removed)}개 삭제")
+    return removed
+
+
+def file_digest(path: Path) -> str:
+    """파일 sha256"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def combined_digest(*parts: str) -> str:
+    """여러 입력 digest/설정 문자열을 하나의 digest로 결합"""
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+def _write_json_atomic(path: Path, data: Dict):
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2, default=str)
+    os.replace(tmp_path, path)
+
+
+def read_manifest(run_dir: Path, stage: str) -> Optional[Dict]:
+    """단계 매니페스트 조회 (없으면 None)"""
+    path = run_dir / f"{stage}{MANIFEST_SUFFIX}"
+    if not path.exists():
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_manifest(run_dir: Path, stage: str, input_digest: str, output: str, stats: Dict) -> Dict:
+    """단계 완료 기록 (입력 digest, 산출물 digest, 처리 통계)"""
+    manifest = {
+        "stage": stage,
+        "input_digest": input_digest,
+        "output": output,
+        "output_digest": file_digest(run_dir / output),
+        "stats": stats,
+        "finished_at": datetime.utcnow().isoformat(),
+    }
+    _write_json_atomic(run_dir / f"{stage}{MANIFEST_SUFFIX}", manifest)
+    return manifest
+
+
+def completed_stage(run_dir: Path, stage: str, input_digest: str) -> Optional[Dict]:
+    """입력 digest가 같고 산출물이 그대로 남아 있으면 이전 매니페스트 반환 (단계 생략)"""
+    manifest = read_manifest(run_dir, stage)
+    if not manifest or manifest["input_digest"] != input_digest:
+        return None
+    output = run_dir / manifest["output"]
+    if not output.exists() or file_digest(output) != manifest["output_digest"]:
+        return None
+    logger.info(f"{stage} 단계 입력 변경 없음 - 이전 산출물 사용 ({manifest['output']})")
+    return manifest
+
+
+def iter_jsonl(path: Path) -> Iterator[Dict]:
+    """JSONL(.gz) 레코드 순회"""
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+class PartialOutput:
+    """
+    단계 산출물을 부분 파일에 한 줄씩 기록하고 완료 시 확정
+    같은 입력으로 재시도하면 이미 기록된 레코드는 유지하고 이어서 기록 (잘린 마지막 줄은 버림)
+    """
+
+    def __init__(self, run_dir: Path, output: str, input_digest: str, key: str):
+        self.run_dir = run_dir
+        self.output = output
+        self.key = key
+        self.path = run_dir / (output + PARTIAL_SUFFIX)
+        self.done: Set[str] = set()
+        self.records = 0
+
+        # 입력이 같은 부분 파일만 이어쓰기 (유효한 줄만 새 파일로 옮김)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as out:
+            out.write(json.dumps({"input_digest": input_digest}) + "\n")
+            if self.path.exists():
+                with open(self.path, encoding="utf-8") as f:
+                    header = self._parse(f.readline())
+                    if header and header.get("input_digest") == input_digest:
+                        for line in f:
+                            record = self._parse(line)
+                            if record is None:
+                                break
+                            out.write(line if line.endswith("\n") else line + "\n")
+                            self.done.add(record[key])
+                            self.records += 1
+        os.replace(tmp_path, self.path)
+        if self.records:
+            logger.info(f"{output}: 이전 시도에서 처리한 {self.records}개 이후부터 이어서 처리")
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    @staticmethod
+    def _parse(line: str) -> Optional[Dict]:
+        try:
+            return json.loads(line)
+        except ValueError:
+            return None
+
+    def write(self, record: Dict):
+        """레코드 한 줄 기록 (즉시 flush하여 중단되어도 보존)"""
+        self._file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        self._file.flush()
+        self.done.add(record[self.key])
+        self.records += 1
+
+    def iter_records(self) -> Iterator[Dict]:
+        """지금까지 기록된 레코드 순회 (헤더 제외)"""
+        self._file.flush()
+        with open(self.path, encoding="utf-8") as f:
+            f.readline()
+            for line in f:
+                yield json.loads(line)
+
+    def commit(self) -> Path:
+        """부분 파일을 최종 산출물로 확정 (.gz 산출물은 압축)"""
+        self._file.close()
+        target = self.run_dir / self.output
+        tmp_path = target.with_name(target.name + ".tmp")
+        opener = gzip.open if target.suffix == ".gz" else open
+        with open(self.path, encoding="utf-8") as src, opener(tmp_path, "wt", encoding="utf-8") as dst:
+            src.readline()
+            shutil.copyfileobj(src, dst)
+        os.replace(tmp_path, target)
+        self.path.unlink()
+        return target
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+
+class StageState:
+    """
+    지연 실행(StageDeferred) 후 재개할 때 필요한 부분 산출물 밖의 단계 상태 (<단계>.state.json)
+    입력 digest가 다르면 이전 상태는 무시
+    """
+
+    def __init__(self, run_dir: Path, stage: str, input_digest: str):
+        self.path = run_dir / f"{stage}{STATE_SUFFIX}"
+        self.input_digest = input_digest
+        self.data: Dict = {}
+        if self.path.exists():
+            with open(self.path, encoding="utf-8") as f:
+                saved = json.load(f)
+            if saved.get("input_digest") == input_digest:
+                self.data = saved["state"]
+                logger.info(f"{stage} 단계 지연 실행 상태 복원 (지연 {self.data.get('deferrals', 0)}회)")
+
+    def save(self, **fields):
+        self.data.update(fields)
+        _write_json_atomic(self.path, {"input_digest": self.input_digest, "state": self.data})
+
+    def defer(self, error: StageDeferred, **fields):
+        """지연 횟수를 늘려 상태 저장 후 StageDeferred 재발생용"""
+        self.save(deferrals=self.data.get("deferrals", 0) + 1,
+                  last_deferral={"reason": error.reason, "seconds": round(error.seconds, 1)}, **fields)
+        logger.info(f"⏸️ {error} - 체크포인트 저장 후 triggerer에서 대기")
+
+    def clear(self):
+        if self.path.exists():
+            self.path.unlink()
+
+
+def merge_browser_reports(previous: Optional[Dict], current: Optional[Dict]) -> Optional[Dict]:
+    """지연 실행 전후 브라우저 보고 합산 (이동/재활용 횟수 합, 메모리 최대값)"""
+    if not previous or not current:
+        return current or previous
+    peaks = {key: max((value for value in (previous.get(key), current.get(key)) if value is not None), default=None)
+             for key in ("peak_rss_mb", "peak_js_heap_mb")}
+    recycles = dict(previous.get("recycles", {}))
+    for reason, count in current.get("recycles", {}).items():
+        recycles[reason] = recycles.get(reason, 0) + count
+    return {"navigations": previous.get("navigations", 0) + current.get("navigations", 0), "recycles": recycles,
+            **peaks, "samples": previous.get("samples", []) + current.get("samples", [])}
+
+
+# ----------------------------------------------------------------------
+# 단계
+# ----------------------------------------------------------------------
+async def discover_stage(run_dir: Path, limit: Optional[int] = None, headless: bool = True,
+                         store=None, deadline: Optional[CrawlDeadline] = None) -> Dict:
+    """
+    1단계: 아티클 URL 목록 발견 -> urls.json
+    store가 있고 HTTP 캐시가 켜져 있으면 카테고리/섹션 목록 페이지를 조건부 요청으로 확인 (변경 없으면 이전 링크 사용)
+    deadline이 지나면 그때까지 발견한 URL로 불완전(complete=False) 목록을 남김
+    반환값: {"urls": 발견 수, "complete": 누락 없이 발견했는지, "failures": 실패 페이지 수, "http_cache": 적중률 보고}
+    """
+    input_digest = combined_digest(f"limit={limit}")
+    manifest = completed_stage(run_dir, "discover", input_digest)
+    if manifest:
+        return manifest["stats"]
+
+    from . import bithumb_crawler as crawler
+    if not crawler.PLAYWRIGHT_AVAILABLE:
+        raise ImportError("Playwright가 설치되지 않았습니다.")
+
+    validator_store = ValidatorStore(store) if store is not None and http_cache_enabled() else None
+    fetcher = ConditionalFetcher(await validator_store.load_listings()) if validator_store else None
+    async with crawler.async_playwright() as p:
+        browser, context = await crawler.launch_browser_context(p, headless=headless)
+        try:
+            page = await context.new_page()
+            catalog = await crawler.discover_article_catalog(page, limit=limit, fetcher=fetcher,
+                                                              deadline=deadline)
+        finally:
+            await context.close()
+            await browser.close()
+    if fetcher is not None:
+        await validator_store.save(fetcher.updated)
+
+    urls = sorted(catalog["urls"])[:limit] if limit else sorted(catalog["urls"])
+    if not urls:
+        # 빈 목록을 산출물로 남기면 재시도해도 같은 결과이므로 실패 처리
+        raise RuntimeError("아티클을 찾을 수 없습니다.")
+
+    _write_json_atomic(run_dir / URLS_FILE, {
+        "urls": urls,
+        "complete": catalog["complete"] and not limit,
+        "failures": catalog["failures"],
+        "discovered_at": datetime.utcnow().isoformat(),
+    })
+    stats = {"urls": len(urls), "complete": catalog["complete"] and not limit, "failures": catalog["failures"],
+             "http_cache": fetcher.report() if fetcher is not None else None}
+    write_manifest(run_dir, "discover", input_digest, URLS_FILE, stats)
+    logger.info(f"✅ URL 발견 완료: {stats}")
+    return stats
+
+
+async def select_stage(run_dir: Path, store, full: bool = False, limit: Optional[int] = None) -> Dict:
+    """
+    크롤링 대상 선택 -> due.json
+    이번 실행에서 발견 단계를 거쳤으면 발견된 URL 중 신규/재크롤링 시각이 지난 아티클(full이면 전체),
+    발견을 건너뛴 실행이면 저장된 아티클 중 재크롤링 시각이 지난 아티클 (이 경우 urls.json도 불완전 목록으로 기록)
+    HTTP 캐시가 켜져 있으면(전체 재구축 제외) 대상 URL의 이전 검증자도 함께 기록 (추출 단계는 MongoDB 없이 실행)
+    반환값: {"due": 대상 수, "discovered": 발견 수 (발견을 건너뛰었으면 None)}
+    """
+    from .recrawl_scheduler import RecrawlScheduler
+
+    urls_path = run_dir / URLS_FILE
+    discovered = urls_path.exists() and read_manifest(run_dir, "discover") is not None
+    input_digest = combined_digest(file_digest(urls_path) if discovered else "scheduled", f"full={full}")
+    manifest = completed_stage(run_dir, "select", input_digest)
+    if manifest:
+        return manifest["stats"]
+
+    scheduler = RecrawlScheduler(store)
+    if discovered:
+        with open(urls_path, encoding="utf-8") as f:
+            urls = json.load(f)["urls"]
+        due = urls if full else await scheduler.select_due(urls)
+    else:
+        urls = None
+        due = await scheduler.due_article_urls(limit=limit)
+        # 적재 단계는 urls.json 기준으로 세대를 표시하며, 불완전 목록이므로 삭제 정리는 하지 않음
+        _write_json_atomic(urls_path, {
+            "urls": due,
+            "complete": False,
+            "failures": 0,
+            "discovered_at": datetime.utcnow().isoformat(),
+        })
+
+    due_payload = {"urls": due}
+    if http_cache_enabled() and not full:
+        due_payload["validators"] = await ValidatorStore(store).load(due)
+    _write_json_atomic(run_dir / DUE_FILE, due_payload)
+    stats = {"due": len(due), "discovered": len(urls) if urls is not None else None}
+    write_manifest(run_dir, "select", input_digest, DUE_FILE, stats)
+    logger.info(f"✅ 크롤링 대상 선택 완료: {stats}")
+    return stats
+
+
+async def fetch_stage(run_dir: Path, headless: bool = True, delay: float = 1.0,
+                      deadline: Optional[CrawlDeadline] = None, defer_after: Optional[float] = None) -> Dict:
+    """
+    2단계: 크롤링 대상 아티클 본문 추출 -> articles.jsonl (재시도 시 추출된 URL은 건너뜀)
+    마감 시각(deadline)이 지나거나 서킷 브레이커로 중단되면 추출한 아티클까지만 확정하고 status="partial"로 완료
+    (남은 아티클은 재크롤링 일정이 갱신되지 않으므로 다음 실행에서 다시 대상이 됨)
+    due.json에 검증자가 있으면 조건부 요청으로 확인하여 변경 없는 아티클은 {"unchanged": True} 레코드만 기록,
+    새 검증자는 레코드의 http_validators로 넘겨 적재가 끝난 뒤 저장
+    defer_after가 있으면 그보다 긴 서킷 브레이커 대기(사이트 차단/429 포함)는 상태를 저장하고 StageDeferred 발생
+    반환값: {"status": complete|partial, "stopped": 중단 사유, "remaining": 미처리 수, "articles": 추출 수,
+             "failed": 실패 URL 목록, "browser": 브라우저 재활용/메모리 표본 보고, "guard": 서킷 브레이커 보고,
+             "http_cache": 조건부 요청 적중률 보고, "deferrals": 지연 실행 횟수}
+    """
+    due_path = run_dir / DUE_FILE
+    input_digest = file_digest(due_path)
+    manifest = completed_stage(run_dir, "fetch", input_digest)
+    if manifest:
+        return manifest["stats"]
+
+    from . import bithumb_crawler as crawler
+
+    with open(due_path, encoding="utf-8") as f:
+        due = json.load(f)
+    urls = due["urls"]
+    fetcher = ConditionalFetcher(due["validators"]) if "validators" in due else None
+
+    output = PartialOutput(run_dir, ARTICLES_FILE, input_digest, key="url")
+    # 지연 실행 전 상태 (이번 실행에서 실패한 URL, 서킷 브레이커, 조건부 요청 통계, 브라우저 보고)
+    state = StageState(run_dir, "fetch", input_digest)
+    failed = list(state.data.get("failed", []))
+    breaker = CircuitBreaker()
+    breaker.restore(state.data.get("guard", {}))
+    if fetcher is not None:
+        fetcher.stats.update(state.data.get("http_cache", {}))
+    report = {"browser": None, "guard": breaker.report(), "stopped": None, "remaining": 0}
+    try:
+        pending = [url for url in urls if url not in output.done and url not in failed]
+        if pending:
+            report = await _fetch_articles(crawler, pending, output, failed, headless, delay,
+                                           deadline or CrawlDeadline(), fetcher, breaker, defer_after)
+        else:
+            # 재크롤링 시각이 된 아티클이 없으면 브라우저를 띄우지 않고 빈 산출물로 완료
+            logger.info("추출할 아티클 없음")
+        output.commit()
+    except StageDeferred as e:
+        state.defer(e, failed=failed, guard=breaker.report(),
+                    http_cache=fetcher.stats if fetcher is not None else {},
+                    browser=merge_browser_reports(state.data.get("browser"), getattr(e, "browser", None)))
+        raise
+    finally:
+        output.close()
+
+    stats = {"status": "partial" if report["stopped"] else "complete", **report,
+             "browser": merge_browser_reports(state.data.get("browser"), report["browser"]),
+             "articles": output.records, "failed": failed,
+             "http_cache": fetcher.report() if fetcher is not None else None,
+             "deferrals": state.data.get("deferrals", 0)}
+    write_manifest(run_dir, "fetch", input_digest, ARTICLES_FILE, stats)
+    state.clear()
+    if report["stopped"]:
+        logger.warning(f"⚠️ 본문 추출 부분 완료 ({report['stopped']}): {output.records}개, "
+                       f"미처리 {report['remaining']}개는 다음 실행에서 처리")
+    else:
+        logger.info(f"✅ 본문 추출 완료: {output.records}개 (실패 {len(failed)}개)")
+    return stats
+
+
+async def _fetch_articles(crawler, urls: List[str], output: PartialOutput, failed: List[str],
+                          headless: bool, delay: float, deadline: CrawlDeadline,
+                          fetcher: Optional[ConditionalFetcher] = None, breaker: Optional[CircuitBreaker] = None,
+                          defer_after: Optional[float] = None) -> Dict:
+    """
+    브라우저 하나로 아티클을 차례로 추출하여 부분 산출물에 기록 (실패 URL은 failed에 추가)
+    서킷 브레이커 대기가 defer_after 이상이면 브라우저를 닫고 StageDeferred 발생 (브라우저 보고는 예외의 browser)
+    반환값: {"browser": 재활용/메모리 표본 보고, "guard": 서킷 브레이커 보고, "stopped": 중단 사유, "remaining": 미처리 수}
+    """
+    if not crawler.PLAYWRIGHT_AVAILABLE:
+        raise ImportError("Playwright가 설치되지 않았습니다.")
+
+    breaker = breaker or CircuitBreaker()
+    stopped = None
+    processed = 0
+    async with crawler.async_playwright() as p:
+        browser, context = await crawler.launch_browser_context(p, headless=headless)
+        recycler = crawler.create_page_recycler(browser, context)
+        try:
+            for i, url in enumerate(urls, 1):
+                pause = breaker.defer_seconds(defer_after, deadline)
+                if pause:
+                    raise StageDeferred(pause, "circuit_breaker")
+                stopped = await stop_reason(breaker, deadline)
+                if stopped:
+                    break
+                processed = i
+                logger.info(f"[{i}/{len(urls)}] 크롤링 중: {url}")
+                try:
+                    article_data = await crawler.fetch_article(recycler, url, breaker, deadline, fetcher)
+                except CircuitOpenError as e:
+                    failed.append(url)
+                    stopped = "circuit_open"
+                    logger.error(f"크롤링 중단: {e}")
+                    break
+                if not article_data:
+                    failed.append(url)
+                    logger.warning(f"내용 추출 실패: {url}")
+                else:
+                    if fetcher is not None and url in fetcher.updated:
+                        article_data["http_validators"] = fetcher.pop_validators(url)
+                    output.write(article_data)
+                await asyncio.sleep(delay)  # Rate limit 방지
+        except StageDeferred as e:
+            e.browser = recycler.report()
+            raise
+        finally:
+            await recycler.close()
+            await browser.close()
+    return {"browser": recycler.report(), "guard": breaker.report(), "stopped": stopped,
+            "remaining": len(urls) - processed}
+
+
+async def embed_stage(run_dir: Path, store, defer_after: Optional[float] = None) -> Dict:
+    """
+    3단계: 변경된 아티클만 청크 분할/근사 중복 조회/임베딩 -> chunks.jsonl.gz (저장 계획)
+    변경 없는 아티클은 계획을 남기지 않음. 일부 아티클 임베딩 실패는 기록만 하고(다음 실행에서 재처리)
+    모든 시도가 실패하면(API 장애 등) 예외를 발생시켜 이 단계만 재시도
+    HTTP 캐시에서 변경 없음으로 확인된 아티클은 변경 감지 없이 건너뜀
+    defer_after가 있으면 그보다 긴 임베딩 API 재시도 대기(속도 제한/장애)는 상태를 저장하고 StageDeferred 발생
+    아티클 임베딩은 EMBEDDING_ARTICLE_CONCURRENCY개(기본 4)까지 동시에 요청
+    반환값: {"planned", "skipped", "errors", "error_ids", "chunks", "duplicate_chunks", "deferrals"}
+    """
+    from .embedding_dispatcher import EmbeddingDispatchError
+
+    articles_path = run_dir / ARTICLES_FILE
+    # 임베딩 설정이 바뀌면 같은 입력이라도 다시 계획
+    input_digest = combined_digest(file_digest(articles_path),
+                                   json.dumps(store.embedding_metadata(), sort_keys=True))
+    manifest = completed_stage(run_dir, "embed", input_digest)
+    if manifest:
+        return manifest["stats"]
+
+    output = PartialOutput(run_dir, PLANS_FILE, input_digest, key="article_id")
+    # 아직 저장되지 않은 이번 실행의 대표 청크 (적재 단계에서 계획 순서대로 먼저 저장됨)
+    registry = RunDuplicateRegistry(store.near_duplicates)
+    for plan in output.iter_records():
+        _register_canonicals(registry, store, plan)
+    
+    # 지연 실행 전에 실패 처리한 아티클은 다시 시도하지 않음
+    state = StageState(run_dir, "embed", input_digest)
+    error_ids = list(state.data.get("error_ids", []))
+    stats = {"planned": 0, "skipped": 0, "errors": len(error_ids), "error_ids": error_ids, "chunks": 0,
+             "duplicate_chunks": 0}
+    attempted = state.data.get("attempted", 0)
+    dispatcher = getattr(store.embedding_backend, "dispatcher", None)
+    if dispatcher is not None:
+        dispatcher.defer_after = defer_after
+    # 여러 아티클의 임베딩 요청을 동시에 보냄 (실제 요청 수/속도는 디스패처가 제한)
+    concurrency = max(int(os.getenv("EMBEDDING_ARTICLE_CONCURRENCY", "4")), 1)
+    in_flight: Dict[asyncio.Future, tuple] = {}
+    retry_after: Optional[float] = None
+    deferred_count = 0
+
+    async def settle(return_when):
+        """끝난 임베딩 결과 반영 (성공은 기록, 재시도 대기는 지연 실행 대상으로, 실패는 오류로 기록)"""
+        nonlocal retry_after, deferred_count
+        done, _ = await asyncio.wait(list(in_flight), return_when=return_when)
+        for task in done:
+            article_id, plan = in_flight.pop(task)
+            error = task.exception()
+            if error is None:
+                output.write({"article_id": article_id, **plan})
+                _register_canonicals(registry, store, plan)
+            elif isinstance(error, EmbeddingDispatchError) and error.retry_after is not None:
+                retry_after = max(retry_after or 0.0, error.retry_after)
+                deferred_count += 1
+            elif isinstance(error, EmbeddingDispatchError):
+                stats["errors"] += 1
+                stats["error_ids"].append(article_id)
+                logger.error(f"아티클 {article_id} 임베딩 생성 실패 - 기존 데이터 유지: {error}")
+            else:
+                raise error
+
+    try:
+        for article_data in iter_jsonl(articles_path):
+            if retry_after is not None:
+                break
+            article_id = article_data.get("article_id")
+            if not article_id or article_id in output.done or article_id in error_ids:
+                continue
+            if article_data.pop("unchanged", False):
+                stats["skipped"] += 1
+                continue
+            article_data.pop("http_validators", None)
+            plan = await store.prepare_article(article_data)
+            if plan["status"] == "skipped":
+                stats["skipped"] += 1
+                continue
+            if plan.get("signatures"):
+                for i, chunk in enumerate(plan["chunks"]):
+                    if not plan["canonicals"][i]:
+                        plan["canonicals"][i] = registry.find(chunk["text"], plan["signatures"][i])
+            attempted += 1
+            in_flight[asyncio.ensure_future(store.embed_article_plan(plan))] = (article_id, plan)
+            if len(in_flight) >= concurrency:
+                await settle(asyncio.FIRST_COMPLETED)
+        if in_flight:
+            await settle(asyncio.ALL_COMPLETED)
+
+        if retry_after is not None:
+            # 계획은 성공한 뒤에만 기록하므로 재개 시 대기한 아티클들을 다시 준비/임베딩함
+            deferred = StageDeferred(retry_after, "embedding_retry")
+            state.defer(deferred, error_ids=error_ids, attempted=attempted - deferred_count)
+            raise deferred
+
+        if attempted and stats["errors"] == attempted:
+            raise EmbeddingDispatchError(f"임베딩 대상 {attempted}개 모두 실패")
+
+        for plan in output.iter_records():
+            stats["planned"] += 1
+            stats["chunks"] += len(plan["chunks"])
+            stats["duplicate_chunks"] += sum(1 for canonical_id in plan.get("canonicals") or [] if canonical_id)
+        output.commit()
+    finally:
+        for task in in_flight:
+            task.cancel()
+        output.close()
+
+    stats["deferrals"] = state.data.get("deferrals", 0)
+    write_manifest(run_dir, "embed", input_digest, PLANS_FILE, stats)
+    state.clear()
+    rate = stats["duplicate_chunks"] / stats["chunks"] if stats["chunks"] else 0.0
+    logger.info(f"✅ 임베딩 완료: 계획 {stats['planned']}개, 변경 없음 {stats['skipped']}개, "
+                f"실패 {stats['errors']}개, 청크 {stats['chunks']}개 (중복 참조 {rate:.1%})")
+    return stats
+
+
+def _register_canonicals(registry: RunDuplicateRegistry, store, plan: Dict):
+    """임베딩된 계획의 대표 청크(중복 참조가 아닌 청크)를 실행 내 중복 색인에 등록"""
+    if not plan.get("signatures"):
+        return
+    for i, chunk in enumerate(plan["chunks"]):
+        if not plan["canonicals"][i]:
+            registry.add(store.chunk_document_id(plan["article"]["article_id"], i), chunk["text"], plan["signatures"][i])
+
+
+async def load_stage(run_dir: Path, store, crawl_generation: str) -> Dict:
+    """
+    4단계: 저장 계획을 MongoDB에 기록, 발견된 아티클에 세대 표시, 발견이 완전하면 삭제된 아티클 정리
+    추출한 아티클(변경 없음 포함)의 다음 크롤링 시각과 HTTP 검증자 갱신 (재시도 시 이미 기록한 아티클은 건너뜀)
+    추출하지 못한 대상 URL은 추출 대기 목록에 기록 (다음 실행의 select 단계가 먼저 선택)
+    반환값: {"created", "updated", "errors", "chunks", "duplicates", "sweep", "schedule", "pending", "http_validators"}
+    """
+    urls_path, plans_path = run_dir / URLS_FILE, run_dir / PLANS_FILE
+    input_digest = combined_digest(file_digest(urls_path), file_digest(plans_path))
+    manifest = completed_stage(run_dir, "load", input_digest)
+    if manifest:
+        return manifest["stats"]
+
+    from .bithumb_crawler import ARTICLE_ID_PATTERN
+    from .recrawl_scheduler import RecrawlScheduler
+
+    with open(urls_path, encoding="utf-8") as f:
+        discovery = json.load(f)
+
+    store.crawl_generation = crawl_generation
+    # 변경 없는 아티클은 저장하지 않으므로 발견 목록 기준으로 일괄 표시
+    article_ids = [match.group(1) for match in map(ARTICLE_ID_PATTERN.search, discovery["urls"]) if match]
+    marked = await store.mark_articles_seen(article_ids)
+    logger.info(f"기존 아티클 {marked}개에 세대 표시")
+
+    output = PartialOutput(run_dir, LOAD_FILE, input_digest, key="article_id")
+    try:
+        for plan in iter_jsonl(plans_path):
+            if plan["article_id"] in output.done:
+                continue
+            try:
+                result = await store.write_article_plan(plan)
+            except Exception as e:
+                logger.error(f"아티클 저장 실패 ({plan['article_id']}): {e}")
+                result = {"status": "error", "chunks": 0, "duplicates": 0}
+            output.write({"article_id": plan["article_id"], **result})
+
+        stats = {"created": 0, "updated": 0, "errors": 0, "chunks": 0, "duplicates": 0}
+        for record in output.iter_records():
+            key = {"created": "created", "error": "errors"}.get(record["status"], "updated")
+            stats[key] += 1
+            stats["chunks"] += record.get("chunks", 0)
+            stats["duplicates"] += record.get("duplicates", 0)
+
+        # 전체 목록을 누락 없이 확인한 실행에서만 삭제된 아티클 정리
+        scheduler = RecrawlScheduler(store)
+        if discovery["complete"]:
+            stats["sweep"] = await store.sweep_stale_articles()
+            if stats["sweep"]["status"] == "swept":
+                await scheduler.record_discovery(crawl_generation, len(article_ids))
+        else:
+            logger.info("발견 단계가 불완전하거나 일부만 크롤링하여 삭제된 아티클 정리를 건너뜁니다")
+            stats["sweep"] = {"status": "skipped", "articles": 0, "chunks": 0}
+
+        # 추출에 실패한 아티클은 일정을 그대로 두어 다음 실행에서 다시 시도
+        fetched = list(iter_jsonl(run_dir / ARTICLES_FILE))
+        stats["schedule"] = await scheduler.schedule([article["article_id"] for article in fetched])
+        # 추출하지 못한 대상(마감/서킷 브레이커로 중단, 실패)은 대기 목록으로 (신규 아티클은 DB 일정이 없으므로)
+        with open(run_dir / DUE_FILE, encoding="utf-8") as f:
+            due_urls = json.load(f)["urls"]
+        fetched_urls = [article["url"] for article in fetched]
+        fetched_set = set(fetched_urls)
+        stats["pending"] = await scheduler.record_pending([url for url in due_urls if url not in fetched_set],
+                                                          fetched_urls, replace=discovery["complete"])
+
+        # 임베딩/저장에 실패한 아티클의 검증자는 저장하지 않음 (다음 실행에서 변경 없음으로 건너뛰지 않도록)
+        embed_manifest = read_manifest(run_dir, "embed") or {"stats": {}}
+        failed_ids = set(embed_manifest["stats"].get("error_ids", []))
+        failed_ids.update(record["article_id"] for record in output.iter_records() if record["status"] == "error")
+        validators = {article["url"]: article["http_validators"] for article in fetched
+                      if article.get("http_validators") and article["article_id"] not in failed_ids}
+        stats["http_validators"] = await ValidatorStore(store).save(validators) if validators else 0
+        output.commit()
+    finally:
+        output.close()
+
+    write_manifest(run_dir, "load", input_digest, LOAD_FILE, stats)
+    logger.info(f"✅ 저장 완료: {stats}")
+    return stats
+
+
+async def rebuild_stage(run_dir: Path, store, crawl_generation: str) -> Dict:
+    """
+    전체 재구축(blue/green) 적재: 추출된 아티클 전체를 새 세대에 적재한 뒤 전환
+    (기존 세대 청크 재사용/임베딩이 세대 전환과 한 프로세스에서 이루어져야 하므로 embed/load 대신 사용)
+    반환값: finish_rebuild 결과
+    """
+    from .recrawl_scheduler import RecrawlScheduler
+
+    fetch_manifest = read_manifest(run_dir, "fetch")
+    if fetch_manifest and fetch_manifest["stats"].get("status") == "partial":
+        # 일부만 추출된 목록으로 전환하면 나머지 아티클이 새 세대에서 빠지므로 전환하지 않음
+        raise RuntimeError(f"본문 추출이 중단되어({fetch_manifest['stats']['stopped']}) 전체 재구축을 진행할 수 없습니다.")
+
+    store.crawl_generation = crawl_generation
+    await store.begin_rebuild()
+    try:
+        article_ids = []
+        for article_data in iter_jsonl(run_dir / ARTICLES_FILE):
+            await store.store_article(article_data)
+            article_ids.append(article_data["article_id"])
+        result = await store.finish_rebuild()
+        # 전환된 세대의 아티클 문서에 다음 크롤링 시각 기록 (변경 이력은 재구축 시 복사됨)
+        scheduler = RecrawlScheduler(store)
+        await scheduler.schedule(article_ids)
+        with open(run_dir / URLS_FILE, encoding="utf-8") as f:
+            if json.load(f)["complete"]:
+                await scheduler.record_discovery(crawl_generation, len(article_ids))
+        return result
+    finally:
+        # 전환하지 못한 재구축(오류/중단)은 스테이징 세대를 삭제하고 기존 세대 유지
+        if store.rebuild is not None:
+            await store.abort_rebuild()
@@ -0,0 +1,145 @@
+"""
+단일 아티클 프로파일링 스크립트
+느린 아티클 하나를 추출 -> HTML 파싱 -> 청크 분할 -> 변경 감지/중복 조회 -> 임베딩 (-> 저장) 순으로 실행하며
+샘플링 프로파일러와 함수 타이머 결과를 기록합니다 (<출력 디렉토리>/article_<ID>.folded / .summary.txt / .json).
+기본은 MongoDB에 쓰지 않으며, --write를 주면 실제 저장까지 측정합니다.
+
+사용 예:
+    python airflow/scripts/profile_article.py --url https://support.bithumb.com/hc/ko/articles/123456
+    python airflow/scripts/profile_article.py --html saved.html --url https://support.bithumb.com/hc/ko/articles/123456 --offline
+    python airflow/scripts/profile_article.py --jsonl data/crawl_artifacts/<run_id>/articles.jsonl --article-id 123456 --force
+"""
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+# 환경 변수 로드
+from dotenv import load_dotenv
+
+# 1. 프로젝트 루트의 .env 파일 확인
+project_env = project_root / '.env'
+# 2. airflow 폴더의 .env 파일 확인
+airflow_dir = Path(__file__).parent.parent
+airflow_env = airflow_dir / '.env'
+
+if project_env.exists():
+    load_dotenv(project_env)
+if airflow_env.exists():
+    load_dotenv(airflow_env, override=True)
+
+from airflow.scripts import bithumb_crawler as crawler
+from airflow.scripts.profiling import ProfileSession, default_profile_dir, format_summary
+
+
+async def load_article(args):
+    """입력 방식(--jsonl / --html / --url)에 따라 아티클 데이터 준비"""
+    if args.jsonl:
+        with open(args.jsonl, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    article = json.loads(line)
+                    if article.get("article_id") == args.article_id:
+                        return article
+        raise SystemExit(f"[ERROR] {args.jsonl}에 아티클 {args.article_id}가 없습니다.")
+
+    if args.html:
+        html = Path(args.html).read_text(encoding="utf-8")
+        return crawler.parse_article_html(html, args.url)
+
+    if not crawler.PLAYWRIGHT_AVAILABLE:
+        raise SystemExit("[ERROR] Playwright가 설치되지 않았습니다. --html 또는 --jsonl을 사용하세요.")
+    async with crawler.async_playwright() as p:
+        browser, context = await crawler.launch_browser_context(p, headless=True)
+        try:
+            page = await context.new_page()
+            return await crawler.extract_article_content(page, args.url)
+        finally:
+            await context.close()
+            await browser.close()
+
+
+async def process_article(args, article):
+    """청크 분할(반복) 후 저장 경로 실행 (--offline이면 청크 분할까지만)"""
+    from airflow.scripts.mongodb_store import AirflowVectorStore
+
+    store = AirflowVectorStore()
+    for _ in range(args.repeat):
+        chunks = store.chunk_article(article)
+    print(f"청크 {len(chunks)}개, 토큰 {sum(chunk['tokens'] for chunk in chunks):,}개")
+    if args.offline:
+        return
+
+    if not await store.connect():
+        raise SystemExit("[ERROR] MongoDB 연결 실패 (--offline으로 파싱/청크 분할만 측정할 수 있습니다)")
+    try:
+        plan = await store.prepare_article(article)
+        print(f"변경 감지: {plan['status']}")
+        if plan["status"] == "skipped":
+            if not args.force:
+                print("변경이 없어 임베딩/저장을 생략합니다 (--force로 임베딩까지 측정)")
+                return
+            # 내용이 같아도 임베딩 경로를 측정 (저장은 하지 않음)
+            await store.embed_article_plan({"chunks": store.chunk_article(article), "canonicals": None})
+            return
+        await store.embed_article_plan(plan)
+        if args.write:
+            result = await store.write_article_plan(plan)
+            print(f"저장 결과: {result}")
+    finally:
+        await store.disconnect()
+
+
+async def run(args):
+    article = await load_article(args)
+    if not article or not article.get("body"):
+        raise SystemExit("[ERROR] 아티클 내용 추출 실패")
+    article_id = article.get("article_id") or "unknown"
+    print(f"아티클 {article_id}: {article.get('title', '')[:60]} (본문 {len(article['body']):,}자)")
+
+    session = ProfileSession(Path(args.output), f"article_{article_id}", interval=args.interval_ms / 1000)
+    session.start()
+    try:
+        # HTML 입력은 파싱도 세션 안에서 다시 측정
+        if args.html:
+            for _ in range(args.repeat):
+                article = crawler.parse_article_html(Path(args.html).read_text(encoding="utf-8"), args.url)
+        await process_article(args, article)
+    finally:
+        result = session.stop()
+
+    print()
+    print(format_summary(result))
+    print(f"flamegraph 입력: {result['folded']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="단일 아티클 크롤링/적재 경로 프로파일링")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--url", help="아티클 URL (Playwright로 추출, --html과 함께 쓰면 URL만 사용)")
+    source.add_argument("--jsonl", help="크롤링 산출물 articles.jsonl 경로 (--article-id 필요)")
+    parser.add_argument("--html", help="저장된 아티클 HTML 파일 (브라우저 없이 파싱, --url 필요)")
+    parser.add_argument("--article-id", help="--jsonl에서 찾을 아티클 ID")
+    parser.add_argument("--offline", action="store_true", help="MongoDB/임베딩 없이 파싱/청크 분할만 측정")
+    parser.add_argument("--force", action="store_true", help="변경이 없어도 임베딩까지 측정")
+    parser.add_argument("--write", action="store_true", help="MongoDB 저장까지 실행")
+    parser.add_argument("--repeat", type=int, default=1, help="파싱/청크 분할 반복 횟수 (CPU 구간 표본 확보)")
+    parser.add_argument("--interval-ms", type=float, default=1.0, help="샘플링 간격(ms)")
+    parser.add_argument("--output", default=str(default_profile_dir()), help="프로파일 산출물 디렉토리")
+    args = parser.parse_args()
+    if args.jsonl and not args.article_id:
+        parser.error("--jsonl에는 --article-id가 필요합니다.")
+    if args.html and not args.url:
+        parser.error("--html에는 --url이 필요합니다.")
+    args.repeat = max(1, args.repeat)
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""
+크롤링/적재 경로 프로파일링 모듈 (선택 기능)
+CRAWL_PROFILE=true 또는 DAG param profile=true일 때만 동작하며, 꺼져 있으면 @profiled 함수는
+전역 플래그 확인 한 번만 추가됩니다.
+- 샘플링 프로파일러: 별도 스레드가 주기적으로 대상 스레드의 스택(sys._current_frames)을 수집하여
+  flamegraph.pl / speedscope에서 열 수 있는 folded stack 파일로 기록
+- 함수별 타이머: @profiled 함수의 호출 수, 벽시계 시간, 스레드 CPU 시간
+  (async 함수의 벽시계 - CPU 차이는 대부분 OpenAI/MongoDB/브라우저 대기 시간)
+"""
+import functools
+import inspect
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 현재 활성 프로파일 세션 (없으면 @profiled 함수는 그대로 실행)
+_active_session = None
+
+
+def default_profile_dir() -> Path:
+    """DAG 밖에서 실행할 때의 프로파일 산출물 디렉토리 (CRAWL_PROFILE_DIR, 기본 airflow/data/profiles)"""
+    return Path(os.getenv("CRAWL_PROFILE_DIR") or Path(__file__).parent.parent / "data" / "profiles")
+
+
+def profiling_enabled(override: Optional[bool] = None) -> bool:
+    """프로파일링 사용 여부 (override가 주어지면 우선, 없으면 CRAWL_PROFILE 환경 변수)"""
+    if override is not None:
+        return bool(override)
+    return os.getenv("CRAWL_PROFILE", "false").lower() == "true"
+
+
+class FunctionTimers:
+    """함수별 호출 수 / 벽시계 / 스레드 CPU 누적 (중첩 호출은 포함 시간으로 집계)"""
+
+    def __init__(self):
+        self.stats: Dict[str, Dict] = {}
+
+    def record(self, name: str, wall: float, cpu: float):
+        entry = self.stats.setdefault(name, {"calls": 0, "wall": 0.0, "cpu": 0.0, "max_wall": 0.0})
+        entry["calls"] += 1
+        entry["wall"] += wall
+        entry["cpu"] += cpu
+        entry["max_wall"] = max(entry["max_wall"], wall)
+
+    def rows(self) -> List[Dict]:
+        """벽시계 시간 내림차순 표"""
+        return sorted(({"name": name, **entry} for name, entry in self.stats.items()),
+                      key=lambda row: row["wall"], reverse=True)
+
+
+def profiled(name: Optional[str] = None) -> Callable:
+    """
+    프로파일 세션이 활성일 때 함수 벽시계/CPU 시간을 기록하는 데코레이터 (동기/async 함수 모두 지원)
+    CPU 시간은 이벤트 루프 스레드 기준이라 동시에 실행된 다른 태스크의 시간이 섞일 수 있음
+    """
+    def decorator(func: Callable) -> Callable:
+        label = name or func.__qualname__
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                session = _active_session
+                if session is None:
+                    return await func(*args, **kwargs)
+                wall, cpu = time.perf_counter(), time.thread_time()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    session.timers.record(label, time.perf_counter() - wall, time.thread_time() - cpu)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            session = _active_session
+            if session is None:
+                return func(*args, **kwargs)
+            wall, cpu = time.perf_counter(), time.thread_time()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                session.timers.record(label, time.perf_counter() - wall, time.thread_time() - cpu)
+        return wrapper
+
+    return decorator
+
+
+class StackSampler:
+    """대상 스레드의 호출 스택을 주기적으로 수집 (folded stack: "루트;...;리프" -> 표본 수)"""
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    @staticmethod
+    def _frame_label(frame) -> str:
+        code = frame.f_code
+        return f"{code.co_name} ({Path(code.co_filename).name}:{frame.f_lineno})"
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            labels = []
+            while frame is not None:
+                labels.append(self._frame_label(frame))
+                frame = frame.f_back
+            self.stacks[";".join(reversed(labels))] += 1
+            self.samples += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def top_functions(self, limit: int) -> Dict[str, List[Dict]]:
+        """
+        표본이 많은 함수 상위 N개
+        반환값: {"self": 리프(직접 실행) 기준, "inclusive": 스택에 포함된 표본 기준}
+        """
+        self_counts, inclusive = Counter(), Counter()
+        for stack, count in self.stacks.items():
+            # 줄 번호를 빼고 함수 단위로 합산
+            frames = [label.rsplit(":", 1)[0] + ")" for label in stack.split(";")]
+            self_counts[frames[-1]] += count
+            for label in set(frames):
+                inclusive[label] += count
+        total = self.samples or 1
+        return {
+            key: [{"function": label, "samples": count, "ratio": round(count / total, 4)}
+                  for label, count in counter.most_common(limit)]
+            for key, counter in (("self", self_counts), ("inclusive", inclusive))
+        }
+
+
+class ProfileSession:
+    """
+    샘플링 프로파일러 + 함수 타이머 세션
+    종료 시 output_dir에 <label>.folded(flamegraph 입력), <label>.summary.txt(상위 N개), <label>.json 기록
+    """
+
+    def __init__(self, output_dir: Path, label: str, interval: Optional[float] = None, top_n: Optional[int] = None):
+        self.output_dir = Path(output_dir)
+        self.label = label
+        self.interval = interval or float(os.getenv("CRAWL_PROFILE_INTERVAL_MS", "5")) / 1000
+        self.top_n = top_n or int(os.getenv("CRAWL_PROFILE_TOP_N", "30"))
+        self.timers = FunctionTimers()
+        self.sampler = None
+        self.started = None
+        self.elapsed = 0.0
+        self.result = None
+
+    def start(self):
+        global _active_session
+        if _active_session is not None:
+            raise RuntimeError("이미 실행 중인 프로파일 세션이 있습니다.")
+        _active_session = self
+        self.sampler = StackSampler(threading.get_ident(), self.interval)
+        self.started = time.perf_counter()
+        self.sampler.start()
+
+    def stop(self) -> Dict:
+        """세션 종료 후 산출물 기록 (반환값: 요약 + 산출물 경로)"""
+        global _active_session
+        self.sampler.stop()
+        self.elapsed = time.perf_counter() - self.started
+        _active_session = None
+        self.result = self.write()
+        return self.result
+
+    def summary(self) -> Dict:
+        return {
+            "label": self.label,
+            "elapsed_seconds": round(self.elapsed, 3),
+            "samples": self.sampler.samples,
+            "interval_ms": self.interval * 1000,
+            "timers": [{**row, "wall": round(row["wall"], 4), "cpu": round(row["cpu"], 4),
+                        "max_wall": round(row["max_wall"], 4)} for row in self.timers.rows()],
+            "top": self.sampler.top_functions(self.top_n),
+        }
+
+    def write(self) -> Dict:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        summary = self.summary()
+        folded_path = self.output_dir / f"{self.label}.folded"
+        with open(folded_path, "w", encoding="utf-8") as f:
+            for stack, count in self.sampler.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        with open(self.output_dir / f"{self.label}.json", "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        text_path = self.output_dir / f"{self.label}.summary.txt"
+        with open(text_path, "w", encoding="utf-8") as f:
+            f.write(format_summary(summary))
+        logger.info(f"프로파일 저장: {folded_path} (표본 {summary['samples']}개, {summary['elapsed_seconds']}초)")
+        return {**summary, "folded": str(folded_path), "summary_text": str(text_path)}
+
+
+def format_summary(summary: Dict) -> str:
+    """상위 N개 요약 텍스트 (함수 타이머 + 샘플링 self/inclusive 상위)"""
+    lines = [f"# {summary['label']}: {summary['elapsed_seconds']}초, 표본 {summary['samples']}개 "
+             f"({summary['interval_ms']:.1f}ms 간격)", "",
+             "## 함수 타이머 (벽시계 내림차순, 대기 = 벽시계 - CPU)",
+             f"{'함수':<48} {'호출':>7} {'벽시계(s)':>10} {'CPU(s)':>9} {'대기(s)':>9} {'최대(s)':>9}"]
+    for row in summary["timers"]:
+        lines.append(f"{row['name']:<48} {row['calls']:>7} {row['wall']:>10.3f} {row['cpu']:>9.3f} "
+                     f"{row['wall'] - row['cpu']:>9.3f} {row['max_wall']:>9.3f}")
+    for key, title in (("self", "직접 실행 상위"), ("inclusive", "포함 시간 상위")):
+        lines += ["", f"## 샘플링 {title}"]
+        lines += [f"{row['ratio']:>7.1%} {row['samples']:>7}  {row['function']}" for row in summary["top"][key]]
+    return "\n".join(lines) + "\n"
+
+
+@contextmanager
+def maybe_profile(output_dir: Path, label: str, enabled: Optional[bool] = None) -> Iterator[Optional[ProfileSession]]:
+    """
+    프로파일링이 켜져 있으면 세션을 열고 종료 시 산출물 기록
+    꺼져 있거나 이미 바깥 세션이 실행 중이면 None (바깥 세션이 함께 기록)
+    """
+    if not profiling_enabled(enabled) or _active_session is not None:
+        yield None
+        return
+    session = ProfileSession(output_dir, label)
+    session.start()
+    try:
+        yield session
+    finally:
+        session.stop()
@@ -0,0 +1,181 @@
+"""
+아티클별 변경 빈도 기반 재크롤링 스케줄러
+아티클 변경을 포아송 과정으로 보고 변경 이력(change_history, 내용 해시가 바뀐 시각)에서 변경률 λ를 추정한 뒤,
+다음 확인 전까지 변경되었을 확률이 RECRAWL_CHANGE_PROBABILITY 이하가 되는 간격 t = -ln(1 - p) / λ를
+[RECRAWL_MIN_INTERVAL_HOURS, RECRAWL_MAX_INTERVAL_HOURS]로 제한하여 next_crawl_at에 기록합니다.
+자주 바뀌는 공지는 매시간, 오래 바뀌지 않은 가이드는 주 1회 수준으로 확인됩니다.
+"""
+import logging
+import math
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from pymongo import ASCENDING, UpdateOne
+
+from .bithumb_crawler import ARTICLE_ID_PATTERN
+from .mongodb_store import CHANGE_HISTORY_SIZE, SEEN_BATCH_SIZE
+
+logger = logging.getLogger(__name__)
+
+# 관측 기간이 짧은 신규 아티클의 변경률이 과대 추정되지 않도록 하는 최소 관측 기간
+MIN_OBSERVATION_HOURS = 24.0
+# 변경이 한 번도 없던 아티클도 점차 간격이 늘어나도록 더하는 사전 변경 수
+PRIOR_CHANGES = 0.5
+# 발견(전체 목록 확인) 시각을 기록하는 상태 컬렉션 접미사
+CRAWL_STATE_SUFFIX = "_crawl_state"
+
+
+def estimate_change_rate(change_history: List[datetime], observed_since: Optional[datetime],
+                         now: datetime) -> float:
+    """
+    시간당 변경률 λ 추정 (관측 기간 동안의 변경 수 / 관측 시간)
+    이력이 가득 찼으면 가장 오래된 기록 이후만 관측 기간으로 사용 (최근 변경 빈도 반영)
+    """
+    window_start = observed_since or now
+    if len(change_history) >= CHANGE_HISTORY_SIZE:
+        window_start = change_history[0]
+    hours = max((now - window_start).total_seconds() / 3600, MIN_OBSERVATION_HOURS)
+    return (len(change_history) + PRIOR_CHANGES) / hours
+
+
+def recrawl_interval_hours(rate: float, change_probability: float, min_hours: float, max_hours: float) -> float:
+    """변경되었을 확률이 change_probability가 되는 재확인 간격(시간), [min_hours, max_hours]로 제한"""
+    if rate <= 0:
+        return max_hours
+    hours = -math.log(1 - change_probability) / rate
+    return min(max(hours, min_hours), max_hours)
+
+
+class RecrawlScheduler:
+    """아티클 문서의 변경 이력으로 재크롤링 시각을 계산하고 크롤링 대상(due-list)을 선택"""
+
+    def __init__(self, store, min_hours: Optional[float] = None, max_hours: Optional[float] = None,
+                 change_probability: Optional[float] = None):
+        self.store = store
+        self.min_hours = min_hours or float(os.getenv("RECRAWL_MIN_INTERVAL_HOURS", "1"))
+        self.max_hours = max_hours or float(os.getenv("RECRAWL_MAX_INTERVAL_HOURS", "168"))
+        self.change_probability = change_probability or float(os.getenv("RECRAWL_CHANGE_PROBABILITY", "0.3"))
+        if not 0 < self.change_probability < 1:
+            raise ValueError(f"RECRAWL_CHANGE_PROBABILITY는 0과 1 사이여야 합니다: {self.change_probability}")
+
+    @property
+    def state_collection(self):
+        return self.store.db[f"{self.store.collection_name}{CRAWL_STATE_SUFFIX}"]
+
+    def next_crawl(self, article_doc: Dict, now: datetime) -> Dict:
+        """아티클 문서 기준 재크롤링 필드 {"next_crawl_at", "recrawl_interval_hours", "change_rate"}"""
+        history = article_doc.get("change_history", [])
+        rate = estimate_change_rate(history, article_doc.get("created_at"), now)
+        hours = recrawl_interval_hours(rate, self.change_probability, self.min_hours, self.max_hours)
+        return {
+            "next_crawl_at": now + timedelta(hours=hours),
+            "recrawl_interval_hours": round(hours, 2),
+            "change_rate": rate,
+        }
+
+    async def schedule(self, article_ids: List[str], now: Optional[datetime] = None) -> Dict:
+        """
+        이번 실행에서 확인(추출 후 변경 감지)한 아티클의 다음 크롤링 시각 기록
+        반환값: {"scheduled": 기록한 아티클 수, "hot": 최소 간격, "cold": 최대 간격 아티클 수}
+        """
+        now = now or datetime.utcnow()
+        stats = {"scheduled": 0, "hot": 0, "cold": 0}
+        articles = self.store.articles_collection
+        for start in range(0, len(article_ids), SEEN_BATCH_SIZE):
+            batch = article_ids[start:start + SEEN_BATCH_SIZE]
+            requests = []
+            async for doc in articles.find({"_id": {"$in": batch}},
+                                           projection={"change_history": 1, "created_at": 1}):
+                fields = self.next_crawl(doc, now)
+                fields["last_checked_at"] = now
+                requests.append(UpdateOne({"_id": doc["_id"]}, {"$set": fields}))
+                stats["hot"] += fields["recrawl_interval_hours"] <= self.min_hours
+                stats["cold"] += fields["recrawl_interval_hours"] >= self.max_hours
+            if requests:
+                await articles.bulk_write(requests, ordered=False)
+                stats["scheduled"] += len(requests)
+        logger.info(f"재크롤링 일정 갱신: {stats['scheduled']}개 "
+                    f"(최소 간격 {stats['hot']}개, 최대 간격 {stats['cold']}개)")
+        return stats
+
+    async def due_article_urls(self, now: Optional[datetime] = None, limit: Optional[int] = None) -> List[str]:
+        """
+        재크롤링 시각이 지났거나 일정이 없는 아티클 URL (오래 밀린 순)
+        이전 실행에서 발견했지만 추출하지 못한 URL(대기 목록, 아직 저장된 적 없는 신규 아티클 포함)을 먼저 반환
+        """
+        now = now or datetime.utcnow()
+        due = list(dict.fromkeys(await self.pending_urls()))
+        if limit and len(due) >= limit:
+            return due[:limit]
+        cursor = self.store.articles_collection.find(
+            {"url": {"$exists": True},
+             "$or": [{"next_crawl_at": {"$lte": now}}, {"next_crawl_at": {"$exists": False}}]},
+            projection={"url": 1},
+        ).sort("next_crawl_at", ASCENDING)
+        if limit:
+            cursor = cursor.limit(limit)
+        pending = set(due)
+        due.extend([doc["url"] async for doc in cursor if doc["url"] not in pending])
+        return due[:limit] if limit else due
+
+    async def pending_urls(self) -> List[str]:
+        """추출 대기 목록 (마감/서킷 브레이커로 추출하지 못한 크롤링 대상 URL)"""
+        state = await self.state_collection.find_one({"_id": "pending"})
+        return state.get("urls", []) if state else []
+
+    async def record_pending(self, unfetched: List[str], fetched: List[str], replace: bool = False) -> int:
+        """
+        이번 실행에서 추출하지 못한 대상 URL을 대기 목록에 기록 (다음 매시간 실행의 select 단계가 먼저 선택)
+        신규 아티클은 추출 전까지 아티클 문서가 없어 재크롤링 일정으로는 다시 선택되지 않으므로 필요
+        replace: 전체 목록을 누락 없이 확인한 실행이면 이전 대기 목록을 버리고 이번 목록으로 교체 (삭제된 아티클 제외)
+        반환값: 대기 목록 URL 수
+        """
+        done = set(fetched)
+        previous = [] if replace else await self.pending_urls()
+        urls = [url for url in dict.fromkeys(previous + list(unfetched)) if url not in done]
+        await self.state_collection.update_one(
+            {"_id": "pending"},
+            {"$set": {"urls": urls, "updated_at": datetime.utcnow()}},
+            upsert=True,
+        )
+        if urls:
+            logger.info(f"추출 대기 목록: {len(urls)}개 (다음 실행에서 먼저 처리)")
+        return len(urls)
+
+    async def select_due(self, urls: List[str], now: Optional[datetime] = None) -> List[str]:
+        """발견된 URL 중 크롤링할 URL (저장된 적 없는 신규 아티클 + 재크롤링 시각이 지난 아티클)"""
+        now = now or datetime.utcnow()
+        ids = {url: match.group(1) for url, match in zip(urls, map(ARTICLE_ID_PATTERN.search, urls)) if match}
+        scheduled = {}
+        id_list = list(ids.values())
+        for start in range(0, len(id_list), SEEN_BATCH_SIZE):
+            async for doc in self.store.articles_collection.find(
+                {"_id": {"$in": id_list[start:start + SEEN_BATCH_SIZE]}}, projection={"next_crawl_at": 1}
+            ):
+                scheduled[doc["_id"]] = doc.get("next_crawl_at")
+        due = []
+        for url in urls:
+            article_id = ids.get(url)
+            next_crawl_at = scheduled.get(article_id)
+            if article_id is None or next_crawl_at is None or next_crawl_at <= now:
+                due.append(url)
+        logger.info(f"크롤링 대상: {len(due)}/{len(urls)}개 (나머지는 재크롤링 시각 전)")
+        return due
+
+    async def discovery_due(self, max_age_hours: Optional[float] = None) -> bool:
+        """마지막으로 전체 목록을 누락 없이 확인한 지 max_age_hours가 지났는지"""
+        max_age_hours = max_age_hours or float(os.getenv("RECRAWL_DISCOVERY_INTERVAL_HOURS", "24"))
+        state = await self.state_collection.find_one({"_id": "discovery"})
+        if not state or not state.get("completed_at"):
+            return True
+        return datetime.utcnow() - state["completed_at"] >= timedelta(hours=max_age_hours)
+
+    async def record_discovery(self, crawl_generation: str, articles: int):
+        """전체 목록 확인(발견 + 삭제 정리) 완료 시각 기록"""
+        await self.state_collection.update_one(
+            {"_id": "discovery"},
+            {"$set": {"completed_at": datetime.utcnow(), "crawl_generation": crawl_generation,
+                      "articles": articles}},
+            upsert=True,
+        )
@@ -0,0 +1,134 @@
+"""
+재임베딩 백필 작업 모듈
+knowledge_base를 _id 순서의 배치 단위로 훑으며 현재 임베딩 설정(모델/차원/버전)과 다른 청크만
+큰 배치로 다시 임베딩하고 bulk write로 되돌려 씁니다.
+진행 위치는 체크포인트 컬렉션(<knowledge_base>_jobs)에 배치마다 기록하여 중단 후 이어서 실행할 수 있습니다.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+
+class ReembedJob:
+    """재개 가능한 재임베딩 백필 작업"""
+
+    def __init__(self, store, batch_size: int = 1000, max_chunks_per_minute: Optional[int] = None):
+        self.store = store
+        self.batch_size = batch_size
+        self.max_chunks_per_minute = max_chunks_per_minute
+        self.jobs_collection = store.db[f"{store.collection.name}_jobs"]
+
+    @property
+    def job_id(self) -> str:
+        """대상 임베딩 설정별 작업 ID (설정이 바뀌면 새 작업으로 처음부터 실행)"""
+        return (f"reembed:{self.store.embedding_backend.name}:{self.store.embedding_model}:"
+                f"{self.store.embedding_dimensions}:{self.store.embedding_version}")
+
+    async def load_checkpoint(self, reset: bool = False) -> Dict:
+        """체크포인트 조회 (없거나 reset이면 새로 생성)"""
+        now = datetime.utcnow()
+        if reset:
+            await self.jobs_collection.delete_one({"_id": self.job_id})
+        checkpoint = await self.jobs_collection.find_one({"_id": self.job_id})
+        if checkpoint is None:
+            checkpoint = {
+                "_id": self.job_id,
+                "target": self.store.embedding_metadata(),
+                "last_id": None,
+                "processed": 0,
+                "status": "running",
+                "started_at": now,
+                "updated_at": now,
+            }
+            await self.jobs_collection.insert_one(checkpoint)
+        return checkpoint
+
+    async def _save_checkpoint(self, checkpoint: Dict, **fields):
+        checkpoint.update(fields, updated_at=datetime.utcnow())
+        await self.jobs_collection.update_one(
+            {"_id": self.job_id},
+            {"$set": {key: checkpoint[key] for key in (*fields, "updated_at")}},
+        )
+
+    async def run(self, reset: bool = False, limit: Optional[int] = None) -> Dict:
+        """
+        재임베딩 실행 (체크포인트 이후부터)
+        limit: 이번 실행에서 처리할 최대 청크 수 (나머지는 다음 실행에서 이어서 처리)
+        반환값: {"job_id", "processed": 이번 실행 처리 수, "total_processed", "remaining", "status", "elapsed"}
+        """
+        checkpoint = await self.load_checkpoint(reset=reset)
+        if checkpoint["status"] == "completed" and not reset:
+            # 완료 후 새로 생긴 구버전 청크가 있을 수 있으므로 처음부터 다시 확인
+            await self._save_checkpoint(checkpoint, last_id=None, status="running")
+
+        stale_query = self.store.stale_embedding_query()
+        remaining = await self.store.collection.count_documents(self._page_query(stale_query, checkpoint["last_id"]))
+        logger.info(f"재임베딩 시작 ({self.job_id}): 대상 {remaining}개, 누적 처리 {checkpoint['processed']}개")
+
+        started = time.perf_counter()
+        processed = 0
+        while not limit or processed < limit:
+            # _id 기준 키셋 페이지 조회 (임베딩/대기 중에 서버 커서가 만료되지 않음)
+            batch = await self.store.collection.find(
+                self._page_query(stale_query, checkpoint["last_id"]),
+                projection={"text": 1},
+                sort=[("_id", 1)],
+                limit=self.batch_size,
+            ).to_list(length=self.batch_size)
+            if not batch:
+                await self._save_checkpoint(checkpoint, status="completed")
+                break
+            processed += await self._process_batch(batch, checkpoint)
+            await self._throttle(processed, started)
+
+        elapsed = time.perf_counter() - started
+        rate = processed / elapsed * 60 if elapsed else 0.0
+        logger.info(f"재임베딩 {checkpoint['status']}: 이번 실행 {processed}개 ({rate:.0f}개/분), "
+                    f"누적 {checkpoint['processed']}개")
+        return {
+            "job_id": self.job_id,
+            "processed": processed,
+            "total_processed": checkpoint["processed"],
+            "remaining": max(remaining - processed, 0),
+            "status": checkpoint["status"],
+            "elapsed": elapsed,
+        }
+
+    @staticmethod
+    def _page_query(stale_query: Dict, last_id) -> Dict:
+        """체크포인트 이후의 재임베딩 대상 조건"""
+        if last_id is None:
+            return stale_query
+        return {"$and": [stale_query, {"_id": {"$gt": last_id}}]}
+
+    async def _process_batch(self, docs: List[Dict], checkpoint: Dict) -> int:
+        """배치 임베딩 후 bulk write, 체크포인트 기록 (임베딩 실패 시 예외로 중단 - 다음 실행에서 재개)"""
+        embeddings = await self.store.create_embeddings([doc.get("text", "") for doc in docs])
+        metadata = {f"metadata.{key}": value for key, value in self.store.embedding_metadata().items()}
+        now = datetime.utcnow()
+        requests = [
+            # 그 사이 크롤러가 청크를 다시 썼다면(텍스트 변경) 덮어쓰지 않음
+            UpdateOne(
+                {"_id": doc["_id"], "text": doc.get("text", "")},
+                {"$set": {"embedding": self.store.encode_embedding(embedding), **metadata, "updated_at": now}},
+            )
+            for doc, embedding in zip(docs, embeddings)
+        ]
+        await self.store.collection.bulk_write(requests, ordered=False)
+        await self._save_checkpoint(checkpoint, last_id=docs[-1]["_id"], processed=checkpoint["processed"] + len(docs))
+        return len(docs)
+
+    async def _throttle(self, processed: int, started: float):
+        """분당 처리량 상한에 맞춰 대기"""
+        if not self.max_chunks_per_minute:
+            return
+        expected = processed / self.max_chunks_per_minute * 60
+        elapsed = time.perf_counter() - started
+        if expected > elapsed:
+            await asyncio.sleep(expected - elapsed)
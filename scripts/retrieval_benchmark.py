@@ -0,0 +1,226 @@
+"""
+검색 지연시간/재현율 및 인덱스 상태 벤치마크
+고정 질의 세트로 벡터 검색(어휘 인덱스가 켜져 있으면 어휘 검색도)을 실행해 p50/p95/p99 지연시간과
+라벨(relevant_article_ids) 기준 recall@k를 측정하고, 컬렉션/인덱스 크기와 청크 상태를 함께 수집합니다.
+결과는 이력 컬렉션(`{컬렉션}_benchmarks`)에 저장되며, 직전 기록보다 p95가 크게 나빠지면 회귀로 표시합니다.
+"""
+import json
+import logging
+import math
+import os
+import statistics
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from pymongo import DESCENDING
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+CONFIG_DIR = Path(__file__).parent.parent / "config"
+DEFAULT_QUERY_SET = CONFIG_DIR / "retrieval_benchmark.json"
+EXAMPLE_QUERY_SET = CONFIG_DIR / "retrieval_benchmark.example.json"
+PERCENTILES = (50, 95, 99)
+
+
+def load_query_set(path: Optional[str] = None) -> Dict:
+    """
+    질의 세트 로드 (RETRIEVAL_BENCHMARK_PATH > config/retrieval_benchmark.json > 예제 파일)
+    반환값: {"k", "queries": [{"query", "relevant_article_ids"}, ...]}
+    """
+    path = path or os.getenv("RETRIEVAL_BENCHMARK_PATH")
+    if path:
+        candidate = Path(path)
+    else:
+        candidate = DEFAULT_QUERY_SET if DEFAULT_QUERY_SET.exists() else EXAMPLE_QUERY_SET
+    with open(candidate, encoding="utf-8") as f:
+        query_set = json.load(f)
+
+    queries = [q for q in query_set.get("queries", []) if q.get("query")]
+    if not queries:
+        raise ValueError(f"벤치마크 질의가 없습니다: {candidate}")
+    return {
+        "path": str(candidate),
+        "k": int(query_set.get("k", 5)),
+        "queries": [{"query": q["query"], "relevant_article_ids": [str(a) for a in q.get("relevant_article_ids", [])]}
+                    for q in queries],
+    }
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """nearest-rank 백분위수 (값이 없으면 0)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def latency_summary(samples_ms: List[float]) -> Dict:
+    """지연시간 표본(ms) 요약"""
+    summary = {f"p{pct}": round(percentile(samples_ms, pct), 2) for pct in PERCENTILES}
+    summary["mean"] = round(sum(samples_ms) / len(samples_ms), 2) if samples_ms else 0.0
+    summary["samples"] = len(samples_ms)
+    return summary
+
+
+def recall_summary(results: List[List[Dict]], queries: List[Dict]) -> Dict:
+    """
+    라벨이 있는 질의의 recall@k와 적중률 (상위 k개 결과의 아티클 ID 기준)
+    반환값: {"labelled", "recall", "hit_rate", "misses": [적중하지 못한 질의]}
+    """
+    recalls, hits, misses = [], 0, []
+    for query, hits_for_query in zip(queries, results):
+        relevant = set(query["relevant_article_ids"])
+        if not relevant:
+            continue
+        found = relevant & {str(hit.get("article_id")) for hit in hits_for_query}
+        recalls.append(len(found) / len(relevant))
+        if found:
+            hits += 1
+        else:
+            misses.append(query["query"])
+    if not recalls:
+        return {"labelled": 0, "recall": None, "hit_rate": None, "misses": []}
+    return {
+        "labelled": len(recalls),
+        "recall": round(sum(recalls) / len(recalls), 4),
+        "hit_rate": round(hits / len(recalls), 4),
+        "misses": misses,
+    }
+
+
+async def _timed(coroutine_factory) -> tuple:
+    """코루틴 실행 시간(ms)과 결과"""
+    started = time.perf_counter()
+    result = await coroutine_factory()
+    return (time.perf_counter() - started) * 1000, result
+
+
+async def measure_searches(store, query_set: Dict, repeats: int = 3) -> Dict:
+    """
+    모드별 검색 지연시간과 recall 측정
+    질의 임베딩은 한 번만 계산하여 검색 자체의 지연시간과 분리 (임베딩 시간은 별도 기록)
+    반환값: {"embedding": {...}, "vector": {"latency_ms", "recall"}, ("lexical": {...})}
+    """
+    queries = query_set["queries"]
+    texts = [q["query"] for q in queries]
+    k = query_set["k"]
+
+    embedding_ms, vectors = await _timed(lambda: store.create_embeddings(texts, input_type="query"))
+    report = {"embedding": {"total_ms": round(embedding_ms, 2), "queries": len(texts)}}
+
+    searches = {"vector": lambda i: store.search_vectors([vectors[i]], k=k)}
+    if store.lexical_enabled:
+        searches["lexical"] = lambda i: store.lexical_search(texts[i], k=k)
+
+    for mode, search in searches.items():
+        # 첫 질의는 연결/캐시 준비용으로 측정에서 제외 (Atlas가 아니면 벡터 검색 자체가 실패)
+        try:
+            await search(0)
+        except OperationFailure as e:
+            logger.warning(f"{mode} 검색 불가: {e}")
+            report[mode] = {"error": str(e)}
+            continue
+        samples, results = [], []
+        for round_index in range(repeats):
+            for i in range(len(texts)):
+                elapsed, result = await _timed(lambda: search(i))
+                samples.append(elapsed)
+                if round_index == 0:
+                    results.append(result[0] if mode == "vector" else result)
+        report[mode] = {"latency_ms": latency_summary(samples), "recall": recall_summary(results, queries)}
+        logger.info(f"{mode} 검색: p50 {report[mode]['latency_ms']['p50']}ms, "
+                    f"p95 {report[mode]['latency_ms']['p95']}ms, recall {report[mode]['recall']['recall']}")
+    return report
+
+
+async def chunk_health(store) -> Dict:
+    """청크 상태 집계 (전체/임베딩 보유/중복 참조/재임베딩 대상 수)"""
+    pipeline = [{"$facet": {
+        "total": [{"$count": "n"}],
+        "embedded": [{"$match": {"embedding": {"$exists": True}}}, {"$count": "n"}],
+        "duplicates": [{"$match": {"metadata.duplicate_of": {"$exists": True}}}, {"$count": "n"}],
+        "stale": [{"$match": store.stale_embedding_query()}, {"$count": "n"}],
+    }}]
+    docs = await store.collection.aggregate(pipeline).to_list(length=1)
+    facets = docs[0] if docs else {}
+    return {name: (facets.get(name) or [{"n": 0}])[0]["n"] for name in ("total", "embedded", "duplicates", "stale")}
+
+
+async def search_index_status(store) -> Dict:
+    """벡터 검색 인덱스 상태 (Atlas가 아니면 unavailable)"""
+    try:
+        indexes = await store.collection.list_search_indexes(store.vector_index_name).to_list(length=1)
+    except OperationFailure:
+        return {"status": "unavailable"}
+    if not indexes:
+        return {"status": "missing"}
+    return {"status": indexes[0].get("status", "unknown"), "queryable": indexes[0].get("queryable", False)}
+
+
+def find_regressions(current: Dict, history: List[Dict], max_ratio: float) -> List[Dict]:
+    """
+    최근 기록들의 중앙값 대비 p95 지연시간이 max_ratio배 넘게 늘었거나 recall이 떨어진 모드
+    (직전 기록 하나와만 비교하면 조금씩 느려지는 추세를 놓치므로 최근 N개 기록의 중앙값을 기준으로 사용)
+    반환값: [{"mode", "metric", "baseline", "current"}, ...]
+    """
+    regressions = []
+    for mode in ("vector", "lexical"):
+        now = current.get(mode)
+        if not now or "error" in now:
+            continue
+        before = [record["searches"][mode] for record in history
+                  if mode in record.get("searches", {}) and "error" not in record["searches"][mode]]
+        p95s = [result["latency_ms"]["p95"] for result in before if result["latency_ms"].get("p95")]
+        if p95s:
+            baseline = statistics.median(p95s)
+            if now["latency_ms"]["p95"] > baseline * max_ratio:
+                regressions.append({"mode": mode, "metric": "p95_ms", "baseline": baseline,
+                                    "current": now["latency_ms"]["p95"]})
+        recalls = [result["recall"]["recall"] for result in before if result["recall"]["recall"] is not None]
+        recall = now["recall"]["recall"]
+        if recall is not None and recalls and recall < statistics.median(recalls):
+            regressions.append({"mode": mode, "metric": "recall", "baseline": statistics.median(recalls),
+                                "current": recall})
+    return regressions
+
+
+async def run_benchmark(store, run_id: str, query_set: Optional[Dict] = None,
+                        repeats: Optional[int] = None, regression_ratio: Optional[float] = None) -> Dict:
+    """
+    검색 벤치마크 + 인덱스 상태 수집 후 이력 컬렉션에 저장
+    반환값: 저장한 기록 (XCom 전달용으로 datetime은 ISO 문자열)
+    """
+    query_set = query_set or load_query_set()
+    repeats = repeats or int(os.getenv("RETRIEVAL_BENCHMARK_REPEATS", "3"))
+    regression_ratio = regression_ratio or float(os.getenv("RETRIEVAL_BENCHMARK_REGRESSION_RATIO", "1.5"))
+    history_size = int(os.getenv("RETRIEVAL_BENCHMARK_HISTORY", "10"))
+    history = store.db[f"{store.collection_name}_benchmarks"]
+
+    searches = await measure_searches(store, query_set, repeats=repeats)
+    record = {
+        "run_id": run_id,
+        "collection": store.collection.name,
+        "query_set": query_set["path"],
+        "k": query_set["k"],
+        "embedding_model": store.embedding_model,
+        "search_backend": store.search_backend,
+        "searches": searches,
+        "storage": await store.storage_stats(),
+        "chunks": await chunk_health(store),
+        "search_index": await search_index_status(store),
+    }
+
+    recent = await history.find({"search_backend": store.search_backend}, projection={"searches": 1},
+                                sort=[("created_at", DESCENDING)]).to_list(length=history_size)
+    record["regressions"] = find_regressions(searches, recent, regression_ratio)
+    for regression in record["regressions"]:
+        logger.warning(f"⚠️ 검색 성능 회귀 ({regression['mode']} {regression['metric']}): "
+                       f"최근 {len(recent)}회 중앙값 {regression['baseline']} -> {regression['current']}")
+
+    created_at = datetime.utcnow()
+    await history.insert_one({**record, "created_at": created_at})
+    return {**record, "created_at": created_at.isoformat()}
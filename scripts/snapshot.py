@@ -0,0 +1,434 @@
+"""
+knowledge_base 스냅샷 내보내기/가져오기 모듈 (Parquet / Arrow IPC)
+- 내보내기: 큰 배치 커서로 청크/아티클 컬렉션을 스트리밍하여 레코드 배치 단위로 기록
+  (임베딩은 fixed_size_list<float32> 열, metadata는 타입이 있는 열, 스키마에 없는 필드는 extra(JSON) 열)
+- 가져오기: 파일을 레코드 배치 단위로 읽어 순서 없는(unordered) bulk_write로 적재
+  (다음 배치 읽기/변환을 스레드에서 실행해 이전 배치 쓰기와 겹침, 메모리에는 배치 두 개까지만 유지)
+어휘 인덱스 컬렉션은 청크에서 다시 만들 수 있으므로 스냅샷에 포함하지 않습니다.
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from bson import json_util
+from pymongo import ReplaceOne
+from pymongo.errors import BulkWriteError
+
+# PyArrow 설정 (스냅샷에만 필요)
+try:
+    import numpy as np
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+    logging.warning("PyArrow가 설치되지 않았습니다. 스냅샷 내보내기/가져오기를 사용할 수 없습니다.")
+
+from .vector_codec import pack_float32_bytes, pack_vector, unpack_vector
+
+logger = logging.getLogger(__name__)
+
+# 스냅샷 디렉토리 구성 파일
+MANIFEST_FILE = "manifest.json"
+SNAPSHOT_FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+# 커서/레코드 배치/bulk_write 배치 크기
+DEFAULT_BATCH_SIZE = 5000
+
+# 열 정의: (열 이름, 문서 경로, 타입)
+# 타입이 맞지 않거나 값이 None인 필드는 열 대신 extra에 기록하여 원본 그대로 복원
+CHUNK_COLUMNS = [
+    ("_id", "_id", "string"),
+    ("text", "text", "string"),
+    ("article_id", "metadata.article_id", "string"),
+    ("chunk_index", "metadata.chunk_index", "int32"),
+    ("total_chunks", "metadata.total_chunks", "int32"),
+    ("token_count", "metadata.token_count", "int32"),
+    ("type", "metadata.type", "string"),
+    ("embedding_backend", "metadata.embedding_backend", "string"),
+    ("embedding_model", "metadata.embedding_model", "string"),
+    ("embedding_dimensions", "metadata.embedding_dimensions", "int32"),
+    ("embedding_version", "metadata.embedding_version", "string"),
+    ("embedding_format", "metadata.embedding_format", "string"),
+    ("simhash", "metadata.simhash", "string"),
+    ("simhash_bands", "metadata.simhash_bands", "string_list"),
+    ("duplicate_of", "metadata.duplicate_of", "string"),
+    ("char_start", "metadata.char_start", "int32"),
+    ("char_end", "metadata.char_end", "int32"),
+    ("heading_path", "metadata.heading_path", "string_list"),
+    ("block_start", "metadata.block_start", "int32"),
+    ("block_end", "metadata.block_end", "int32"),
+    ("created_at", "created_at", "timestamp"),
+    ("updated_at", "updated_at", "timestamp"),
+]
+ARTICLE_COLUMNS = [
+    ("_id", "_id", "string"),
+    ("type", "type", "string"),
+    ("title", "title", "string"),
+    ("url", "url", "string"),
+    ("section_name", "section_name", "string"),
+    ("category_name", "category_name", "string"),
+    ("total_chunks", "total_chunks", "int32"),
+    ("content_hash", "content_hash", "string"),
+    ("crawl_generation", "crawl_generation", "string"),
+    ("last_seen_at", "last_seen_at", "timestamp"),
+    ("next_crawl_at", "next_crawl_at", "timestamp"),
+    ("change_history", "change_history", "timestamp_list"),
+    ("created_at", "created_at", "timestamp"),
+    ("updated_at", "updated_at", "timestamp"),
+]
+
+INT32_RANGE = (-2 ** 31, 2 ** 31 - 1)
+
+
+def _arrow_type(kind: str):
+    return {
+        "string": pa.string(),
+        "int32": pa.int32(),
+        "timestamp": pa.timestamp("ms"),
+        "string_list": pa.list_(pa.string()),
+        "timestamp_list": pa.list_(pa.timestamp("ms")),
+    }[kind]
+
+
+def _fits(kind: str, value) -> bool:
+    """값이 열 타입으로 손실 없이 저장되는지"""
+    if kind == "string":
+        return isinstance(value, str)
+    if kind == "int32":
+        return isinstance(value, int) and not isinstance(value, bool) and INT32_RANGE[0] <= value <= INT32_RANGE[1]
+    if kind == "timestamp":
+        return isinstance(value, datetime) and value.tzinfo is None
+    if kind == "string_list":
+        return isinstance(value, list) and all(isinstance(v, str) for v in value)
+    if kind == "timestamp_list":
+        return isinstance(value, list) and all(isinstance(v, datetime) and v.tzinfo is None for v in value)
+    return False
+
+
+def build_schema(columns: List[Tuple[str, str, str]], dimensions: Optional[int] = None):
+    """열 정의로 Arrow 스키마 생성 (dimensions가 있으면 임베딩 열 추가)"""
+    fields = [pa.field(name, _arrow_type(kind)) for name, _, kind in columns]
+    if dimensions:
+        fields += [pa.field("embedding", pa.list_(pa.float32(), dimensions)),
+                   pa.field("vector_format", pa.string())]
+    fields.append(pa.field("extra", pa.string()))
+    return pa.schema(fields)
+
+
+def split_document(doc: Dict, columns: List[Tuple[str, str, str]]) -> Tuple[Dict, Optional[str]]:
+    """
+    문서를 열 값과 나머지 필드로 분리 (doc은 변경됨)
+    반환값: (열 이름 -> 값, 나머지 필드의 Extended JSON 또는 None)
+    """
+    row = {}
+    emptied = set()
+    for name, path, kind in columns:
+        parent, key = doc, path
+        if "." in path:
+            head, key = path.split(".", 1)
+            parent = doc.get(head)
+            if not isinstance(parent, dict):
+                continue
+            emptied.add(head)
+        if key in parent and _fits(kind, parent[key]):
+            row[name] = parent.pop(key)
+    # 열로 옮기고 비어 버린 하위 문서만 제거 (원래 비어 있던 하위 문서는 extra에 남김)
+    for head in emptied:
+        if not doc[head] and any(row.get(name) is not None for name, path, _ in columns
+                                 if path.startswith(f"{head}.")):
+            del doc[head]
+    return row, (json_util.dumps(doc) if doc else None)
+
+
+def merge_document(row: Dict, columns: List[Tuple[str, str, str]], extra: Optional[str]) -> Dict:
+    """열 값과 extra로 원래 문서 복원"""
+    doc: Dict = {}
+    for name, path, _ in columns:
+        value = row.get(name)
+        if value is None:
+            continue
+        if "." in path:
+            head, key = path.split(".", 1)
+            doc.setdefault(head, {})[key] = value
+        else:
+            doc[path] = value
+    if extra:
+        for key, value in json_util.loads(extra).items():
+            if isinstance(value, dict) and isinstance(doc.get(key), dict):
+                doc[key].update(value)
+            else:
+                doc[key] = value
+    return doc
+
+
+def _embedding_column(vectors: List[Optional[bytes]], dimensions: int):
+    """float32 리틀엔디언 바이트 목록으로 fixed_size_list<float32> 열 생성 (None은 null)"""
+    zeros = bytes(dimensions * 4)
+    values = np.frombuffer(b"".join(v if v is not None else zeros for v in vectors), dtype="<f4")
+    validity = pa.array([v is not None for v in vectors], type=pa.bool_()).buffers()[1]
+    return pa.FixedSizeListArray.from_buffers(
+        pa.list_(pa.float32(), dimensions), len(vectors), [validity], children=[pa.array(values, type=pa.float32())]
+    )
+
+
+def _vector_bytes(stored, dimensions: int) -> Tuple[Optional[bytes], Optional[str]]:
+    """
+    저장된 벡터를 float32 바이트와 원래 저장 형식으로 변환
+    (float32 BinData는 그대로 복사, int8/bit 값은 float32로 정확히 표현되어 가져올 때 원래 형식으로 복원,
+     구버전 float64 배열은 float32 정밀도로 저장됨)
+    반환값: (바이트, 형식) - 차원이 맞지 않으면 (None, None)
+    """
+    data = bytes(stored) if not isinstance(stored, (list, tuple)) else None
+    if data is not None and data[0] == 0x27 and len(data) - 2 == dimensions * 4:
+        return data[2:], "float32"
+    values, fmt = unpack_vector(stored)
+    if len(values) != dimensions:
+        return None, None
+    return np.asarray(values, dtype="<f4").tobytes(), fmt
+
+
+def _open_writer(path: str, schema, fmt: str, compression: Optional[str]):
+    if fmt == "parquet":
+        return pq.ParquetWriter(path, schema, compression=compression or "none")
+    options = pa.ipc.IpcWriteOptions(compression=compression) if compression else None
+    return pa.ipc.new_file(path, schema, options=options)
+
+
+def _iter_batches(path: str, fmt: str, batch_size: int) -> Iterator:
+    """파일을 레코드 배치 단위로 읽기 (파일 전체를 메모리에 올리지 않음)"""
+    if fmt == "parquet":
+        yield from pq.ParquetFile(path).iter_batches(batch_size=batch_size)
+        return
+    with pa.memory_map(path) as source:
+        reader = pa.ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            yield reader.get_batch(i)
+
+
+def _throughput(rows: int, path: str, elapsed: float) -> Dict:
+    size = os.path.getsize(path)
+    return {
+        "rows": rows,
+        "bytes": size,
+        "elapsed": round(elapsed, 3),
+        "rows_per_second": round(rows / elapsed, 1) if elapsed else None,
+        "mb_per_second": round(size / 1024 / 1024 / elapsed, 2) if elapsed else None,
+    }
+
+
+async def export_collection(collection, path: str, columns: List[Tuple[str, str, str]], fmt: str = "parquet",
+                            batch_size: int = DEFAULT_BATCH_SIZE, dimensions: Optional[int] = None,
+                            compression: Optional[str] = "zstd") -> Dict:
+    """
+    컬렉션을 배치 커서로 스트리밍하여 파일로 기록 (batch_size 문서마다 레코드 배치 하나)
+    dimensions가 있으면 embedding 필드를 fixed_size_list<float32> 열로 기록
+    반환값: {"rows", "bytes", "elapsed", "rows_per_second", "mb_per_second", "embedding_other_dimensions"}
+    """
+    schema = build_schema(columns, dimensions)
+    started = time.perf_counter()
+    rows, other_dimensions = 0, 0
+    writer = _open_writer(path, schema, fmt, compression)
+
+    def flush(docs: List[Dict]):
+        nonlocal other_dimensions
+        data: Dict[str, List] = {field.name: [] for field in schema}
+        vectors = []
+        for doc in docs:
+            stored = doc.pop("embedding", None) if dimensions else None
+            vector, vector_format = _vector_bytes(stored, dimensions) if stored is not None else (None, None)
+            if stored is not None and vector is None:
+                # 차원이 다른 벡터(다른 모델)는 고정 크기 열에 담을 수 없어 extra에 원래 값 그대로 기록
+                doc["embedding"] = stored
+                other_dimensions += 1
+            row, extra = split_document(doc, columns)
+            for name, _, _ in columns:
+                data[name].append(row.get(name))
+            data["extra"].append(extra)
+            if dimensions:
+                vectors.append(vector)
+                data["vector_format"].append(vector_format)
+        arrays = [pa.array(data[name], type=_arrow_type(kind)) for name, _, kind in columns]
+        if dimensions:
+            arrays += [_embedding_column(vectors, dimensions), pa.array(data["vector_format"], type=pa.string())]
+        arrays.append(pa.array(data["extra"], type=pa.string()))
+        writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+
+    try:
+        docs = []
+        async for doc in collection.find({}, batch_size=batch_size):
+            docs.append(doc)
+            if len(docs) >= batch_size:
+                flush(docs)
+                rows += len(docs)
+                docs = []
+        if docs:
+            flush(docs)
+            rows += len(docs)
+    finally:
+        writer.close()
+
+    result = {**_throughput(rows, path, time.perf_counter() - started), "embedding_other_dimensions": other_dimensions}
+    logger.info(f"{collection.name} 내보내기: {rows}개 ({result['rows_per_second']}개/초, {result['bytes']:,} bytes)")
+    return result
+
+
+def _documents(batch, columns: List[Tuple[str, str, str]]) -> List[Dict]:
+    """레코드 배치를 문서 목록으로 변환 (임베딩은 원래 저장 형식으로 다시 인코딩)"""
+    names = set(batch.schema.names)
+    rows = batch.select([name for name, _, _ in columns if name in names] + ["extra"]).to_pylist()
+    docs = [merge_document(row, columns, row.get("extra")) for row in rows]
+    if "embedding" not in names:
+        return docs
+
+    embeddings = batch.column("embedding")
+    dimensions = embeddings.type.list_size
+    values = embeddings.values.slice(embeddings.offset * dimensions, len(embeddings) * dimensions)
+    matrix = values.to_numpy(zero_copy_only=False).reshape(len(embeddings), dimensions)
+    formats = batch.column("vector_format").to_pylist()
+    for i, (doc, valid, vector_format) in enumerate(zip(docs, embeddings.is_valid().to_pylist(), formats)):
+        if not valid:
+            continue
+        row = matrix[i]
+        if vector_format in ("int8", "bit"):
+            doc["embedding"] = pack_vector([int(v) for v in row], vector_format)
+        elif vector_format == "float64":
+            doc["embedding"] = pack_vector(row.tolist(), vector_format)
+        else:
+            doc["embedding"] = pack_float32_bytes(row.astype("<f4", copy=False).tobytes())
+    return docs
+
+
+async def import_collection(collection, path: str, columns: List[Tuple[str, str, str]], fmt: str = "parquet",
+                            batch_size: int = DEFAULT_BATCH_SIZE) -> Dict:
+    """
+    파일을 레코드 배치 단위로 읽어 _id 기준 upsert (순서 없는 bulk_write)
+    배치 읽기/변환은 스레드 풀에서 실행하여 이전 배치의 쓰기와 겹치고 이벤트 루프를 막지 않음
+    반환값: {"rows", "bytes", "elapsed", "rows_per_second", "mb_per_second", "errors"}
+    """
+    started = time.perf_counter()
+    rows, errors = 0, 0
+    loop = asyncio.get_running_loop()
+    batches = _iter_batches(path, fmt, batch_size)
+
+    def next_requests() -> Optional[List]:
+        """다음 배치를 읽어 upsert 요청으로 변환 (파일 끝이면 None)"""
+        batch = next(batches, None)
+        if batch is None:
+            return None
+        return [ReplaceOne({"_id": doc["_id"]}, doc, upsert=True) for doc in _documents(batch, columns)]
+
+    async def write(requests: List) -> int:
+        try:
+            await collection.bulk_write(requests, ordered=False)
+            return 0
+        except BulkWriteError as e:
+            write_errors = e.details.get("writeErrors", [])
+            logger.warning(f"{collection.name} 적재 오류 {len(write_errors)}건 (첫 오류: {write_errors[:1]})")
+            return len(write_errors)
+
+    converting = None
+    try:
+        requests = await loop.run_in_executor(None, next_requests)
+        while requests is not None:
+            # 이 배치를 쓰는 동안 다음 배치를 스레드에서 변환
+            converting = loop.run_in_executor(None, next_requests)
+            errors += await write(requests)
+            rows += len(requests)
+            requests = await converting
+            converting = None
+    finally:
+        if converting is not None:
+            # 변환 중인 스레드가 끝난 뒤 파일을 닫음 (같은 생성기를 동시에 사용하지 않도록)
+            await asyncio.wait([converting])
+        batches.close()
+
+    result = {**_throughput(rows, path, time.perf_counter() - started), "errors": errors}
+    logger.info(f"{collection.name} 가져오기: {rows}개 ({result['rows_per_second']}개/초, 오류 {errors}건)")
+    return result
+
+
+def _snapshot_files(path: str, fmt: str) -> Dict[str, str]:
+    suffix = SNAPSHOT_FORMATS[fmt]
+    return {"chunks": os.path.join(path, f"chunks{suffix}"), "articles": os.path.join(path, f"articles{suffix}")}
+
+
+async def export_snapshot(store, path: str, fmt: str = "parquet", batch_size: int = DEFAULT_BATCH_SIZE,
+                          compression: Optional[str] = "zstd") -> Dict:
+    """
+    청크/아티클 컬렉션을 스냅샷 디렉토리로 내보내기 (chunks.<형식>, articles.<형식>, manifest.json)
+    반환값: manifest 내용 (컬렉션별 행 수/처리량 포함)
+    """
+    if not PYARROW_AVAILABLE:
+        raise ImportError("PyArrow가 설치되지 않았습니다.")
+    if fmt not in SNAPSHOT_FORMATS:
+        raise ValueError(f"지원하지 않는 스냅샷 형식: {fmt} (parquet/arrow)")
+    os.makedirs(path, exist_ok=True)
+    files = _snapshot_files(path, fmt)
+
+    started = time.perf_counter()
+    chunks = await export_collection(store.collection, files["chunks"], CHUNK_COLUMNS, fmt, batch_size,
+                                     dimensions=store.embedding_dimensions, compression=compression)
+    articles = await export_collection(store.articles_collection, files["articles"], ARTICLE_COLUMNS, fmt,
+                                       batch_size, compression=compression)
+    if chunks["embedding_other_dimensions"]:
+        logger.warning(f"차원이 {store.embedding_dimensions}이 아닌 임베딩 {chunks['embedding_other_dimensions']}개는 "
+                       f"embedding 열 대신 extra에 기록했습니다")
+
+    manifest = {
+        "format": fmt,
+        "compression": compression,
+        "created_at": datetime.utcnow().isoformat(),
+        "source_collection": store.collection.name,
+        "embedding": store.embedding_metadata(),
+        "collections": {"chunks": chunks, "articles": articles},
+        "elapsed": round(time.perf_counter() - started, 3),
+    }
+    with open(os.path.join(path, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
+
+
+def read_manifest(path: str) -> Dict:
+    with open(os.path.join(path, MANIFEST_FILE), encoding="utf-8") as f:
+        return json.load(f)
+
+
+async def import_snapshot(store, path: str, batch_size: int = DEFAULT_BATCH_SIZE, drop: bool = False,
+                          rebuild_lexical: bool = True) -> Dict:
+    """
+    스냅샷 디렉토리를 현재 청크/아티클 컬렉션으로 가져오기 (_id 기준 upsert)
+    drop: 가져오기 전에 기존 문서 삭제 (스테이징 복제용)
+    rebuild_lexical: 어휘 인덱스가 켜져 있으면 가져온 청크로 다시 생성
+    반환값: {"collections": {"chunks", "articles"}, "lexical", "elapsed"}
+    """
+    if not PYARROW_AVAILABLE:
+        raise ImportError("PyArrow가 설치되지 않았습니다.")
+    manifest = read_manifest(path)
+    fmt = manifest["format"]
+    files = _snapshot_files(path, fmt)
+    source_model = manifest.get("embedding", {}).get("embedding_model")
+    if source_model and source_model != store.embedding_model:
+        logger.warning(f"스냅샷 임베딩 모델({source_model})이 현재 모델({store.embedding_model})과 다릅니다. "
+                       f"가져온 청크는 재임베딩 대상이 됩니다.")
+
+    started = time.perf_counter()
+    if drop:
+        await store.collection.delete_many({})
+        await store.articles_collection.delete_many({})
+        if store.lexical_enabled:
+            await store.lexical_collection.delete_many({})
+
+    result = {"collections": {
+        "articles": await import_collection(store.articles_collection, files["articles"], ARTICLE_COLUMNS, fmt,
+                                            batch_size),
+        "chunks": await import_collection(store.collection, files["chunks"], CHUNK_COLUMNS, fmt, batch_size),
+    }}
+    if rebuild_lexical and store.lexical_enabled:
+        result["lexical"] = await store.rebuild_lexical_index()
+    result["elapsed"] = round(time.perf_counter() - started, 3)
+    return result
@@ -0,0 +1,265 @@
+"""
+knowledge_base 저장 공간 분석
+- 청크 컬렉션 한 번의 $facet 집계: 문서 크기, 필드별 바이트($bsonSize: 임베딩/텍스트/메타데이터/청크마다 반복되는 메타데이터),
+  임베딩 저장 형식, 아티클별 청크 수 분포, 가장 큰 아티클
+- $collStats($unionWith로 한 번에): 컬렉션/인덱스 크기
+- $indexStats + 코드의 인덱스 정의 비교: 사용되지 않는 인덱스, 누락/정의에 없는 인덱스
+결과는 JSON으로 직렬화할 수 있는 dict로 반환하여 실행마다 기록(추세 비교)할 수 있습니다.
+"""
+import logging
+from datetime import datetime
+from typing import AsyncIterator, Dict, List
+
+from pymongo.errors import OperationFailure
+
+from .lexical_index import LEXICAL_INDEXES
+from .mongodb_store import ARTICLE_INDEXES, KNOWLEDGE_BASE_INDEXES, LEGACY_CHUNK_FIELDS
+
+logger = logging.getLogger(__name__)
+
+# 집계 커서 배치 크기
+DEFAULT_BATCH_SIZE = 1000
+# 빈 BSON 문서 크기 (길이 4 + 종료 1)
+EMPTY_DOCUMENT_BYTES = 5
+# {"v": 값}으로 값 크기를 잴 때 빼는 오버헤드 (빈 문서 + 타입 1바이트 + 키 "v" 2바이트)
+VALUE_WRAPPER_BYTES = EMPTY_DOCUMENT_BYTES + 3
+# 아티클별 청크 수 분포 구간
+CHUNK_COUNT_BOUNDARIES = [1, 2, 4, 8, 16, 32, 64]
+# 청크마다 같은 값으로 반복 저장되는 metadata 필드 (아티클/컬렉션 단위로 옮기면 절약 가능)
+REPEATED_METADATA_FIELDS = ["type", "total_chunks", "embedding_backend", "embedding_model",
+                            "embedding_dimensions", "embedding_version", "embedding_format"]
+
+
+def format_bytes(size: float) -> str:
+    """바이트 수를 읽기 쉬운 단위로 변환"""
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(size) < 1024:
+            return f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}TB"
+
+
+def print_stats(label: str, stats: Dict[str, Dict]):
+    """AirflowVectorStore.storage_stats() 결과 요약 출력 (마이그레이션 전후 비교용)"""
+    print(f"\n[{label}]")
+    for name, values in stats.items():
+        average = values["size"] / values["count"] if values["count"] else 0
+        print(f"  {name}: 문서 {values['count']}개, 크기 {format_bytes(values['size'])}, "
+              f"평균 {format_bytes(average)}, 스토리지 {format_bytes(values['storage_size'])}, "
+              f"인덱스 {format_bytes(values['total_index_size'])}")
+
+
+def _field_bytes(expression) -> Dict:
+    """값 하나의 BSON 바이트 수 (필드가 없으면 0)"""
+    return {"$max": [{"$subtract": [{"$bsonSize": {"v": expression}}, VALUE_WRAPPER_BYTES]}, 0]}
+
+
+def _chunk_footprint_stage() -> Dict:
+    """청크 문서별 크기 분해 $project"""
+    repeated = {field: f"$metadata.{field}" for field in REPEATED_METADATA_FIELDS}
+    return {"$project": {
+        "_id": 0,
+        "article_id": "$metadata.article_id",
+        "total": {"$bsonSize": "$$ROOT"},
+        "embedding": _field_bytes("$embedding"),
+        "text": _field_bytes("$text"),
+        "metadata": _field_bytes("$metadata"),
+        "repeated_metadata": {"$subtract": [{"$bsonSize": repeated}, EMPTY_DOCUMENT_BYTES]},
+        "embedding_type": {"$type": "$embedding"},
+        "duplicate": {"$cond": [{"$ifNull": ["$metadata.duplicate_of", False]}, 1, 0]},
+        "legacy": {"$cond": [{"$or": [{"$ne": [{"$type": f"${field}"}, "missing"]} for field in LEGACY_CHUNK_FIELDS]},
+                             1, 0]},
+    }}
+
+
+def footprint_pipeline(top_n: int = 10) -> List[Dict]:
+    """청크 컬렉션 크기 분석 집계 (한 번의 $facet)"""
+    per_article = {"$group": {"_id": "$article_id", "chunks": {"$sum": 1}, "bytes": {"$sum": "$total"}}}
+    return [
+        _chunk_footprint_stage(),
+        {"$facet": {
+            "totals": [{"$group": {
+                "_id": None,
+                "chunks": {"$sum": 1},
+                "bytes": {"$sum": "$total"},
+                "max_bytes": {"$max": "$total"},
+                "embedding": {"$sum": "$embedding"},
+                "text": {"$sum": "$text"},
+                "metadata": {"$sum": "$metadata"},
+                "repeated_metadata": {"$sum": "$repeated_metadata"},
+                "duplicates": {"$sum": "$duplicate"},
+                "legacy_chunks": {"$sum": "$legacy"},
+            }}],
+            "embedding_formats": [
+                {"$group": {"_id": "$embedding_type", "chunks": {"$sum": 1}, "bytes": {"$sum": "$embedding"}}},
+                {"$sort": {"chunks": -1}},
+            ],
+            "chunks_per_article": [
+                per_article,
+                {"$group": {"_id": None, "articles": {"$sum": 1}, "avg": {"$avg": "$chunks"},
+                            "min": {"$min": "$chunks"}, "max": {"$max": "$chunks"}}},
+            ],
+            "chunk_count_buckets": [
+                per_article,
+                {"$bucket": {"groupBy": "$chunks", "boundaries": CHUNK_COUNT_BOUNDARIES,
+                             "default": f"{CHUNK_COUNT_BOUNDARIES[-1]}+", "output": {"articles": {"$sum": 1}}}},
+            ],
+            "largest_articles": [per_article, {"$sort": {"bytes": -1}}, {"$limit": top_n}],
+        }},
+    ]
+
+
+def summarize_footprint(facets: Dict) -> Dict:
+    """$facet 결과를 보고서 형태로 정리 (필드별 바이트와 전체 대비 비율)"""
+    totals = (facets.get("totals") or [{}])[0]
+    chunks, total_bytes = totals.get("chunks", 0), totals.get("bytes", 0)
+    fields = {name: totals.get(name, 0) for name in ("embedding", "text", "metadata", "repeated_metadata")}
+    # repeated_metadata는 metadata에 포함되므로 나머지 계산에서 제외
+    fields["other"] = max(total_bytes - fields["embedding"] - fields["text"] - fields["metadata"], 0)
+    distribution = (facets.get("chunks_per_article") or [{}])[0]
+    return {
+        "chunks": chunks,
+        "bytes": total_bytes,
+        "avg_bytes": round(total_bytes / chunks, 1) if chunks else 0,
+        "max_bytes": totals.get("max_bytes", 0),
+        "fields": fields,
+        "field_ratios": {name: round(size / total_bytes, 4) if total_bytes else 0.0 for name, size in fields.items()},
+        "duplicates": totals.get("duplicates", 0),
+        "legacy_chunks": totals.get("legacy_chunks", 0),
+        "embedding_formats": [{"type": row["_id"], "chunks": row["chunks"], "bytes": row["bytes"]}
+                              for row in facets.get("embedding_formats", [])],
+        "chunks_per_article": {
+            "articles": distribution.get("articles", 0),
+            "avg": round(distribution.get("avg") or 0, 2),
+            "min": distribution.get("min", 0),
+            "max": distribution.get("max", 0),
+            "buckets": [{"from": row["_id"], "articles": row["articles"]}
+                        for row in facets.get("chunk_count_buckets", [])],
+        },
+        "largest_articles": [{"article_id": row["_id"], "chunks": row["chunks"], "bytes": row["bytes"]}
+                             for row in facets.get("largest_articles", [])],
+    }
+
+
+async def chunk_footprint(store, top_n: int = 10, batch_size: int = DEFAULT_BATCH_SIZE) -> Dict:
+    """청크 컬렉션 크기 분석 (한 번의 $facet 집계)"""
+    cursor = store.collection.aggregate(footprint_pipeline(top_n), allowDiskUse=True, batchSize=batch_size)
+    facets = {}
+    async for doc in cursor:
+        facets = doc
+    return summarize_footprint(facets)
+
+
+async def iter_article_footprints(store, batch_size: int = DEFAULT_BATCH_SIZE) -> AsyncIterator[Dict]:
+    """
+    아티클별 청크 수/바이트를 배치 커서로 순회 (아티클 ID 순, 메모리에 전체를 올리지 않음)
+    반환값: {"article_id", "chunks", "bytes", "embedding_bytes", "duplicates"} 스트림
+    """
+    pipeline = [
+        _chunk_footprint_stage(),
+        {"$group": {"_id": "$article_id", "chunks": {"$sum": 1}, "bytes": {"$sum": "$total"},
+                    "embedding_bytes": {"$sum": "$embedding"}, "duplicates": {"$sum": "$duplicate"}}},
+        {"$sort": {"_id": 1}},
+    ]
+    async for doc in store.collection.aggregate(pipeline, allowDiskUse=True, batchSize=batch_size):
+        doc["article_id"] = doc.pop("_id")
+        yield doc
+
+
+def _key_pattern(key) -> List[List]:
+    """인덱스 키 정의를 비교 가능한 [[필드, 방향], ...] 목록으로 변환"""
+    return [[field, direction] for field, direction in key.items()]
+
+
+async def index_report(collection, expected_models: List, sizes: Dict[str, int]) -> Dict:
+    """
+    컬렉션 인덱스 사용 현황과 코드 정의 비교
+    반환값: {"indexes": [{"name", "key", "size", "ops", "since"}], "unused", "missing", "unexpected"}
+    ($indexStats 사용 횟수는 서버 재시작 시 초기화되므로 since 이후 기준)
+    """
+    existing = {}
+    async for index in collection.list_indexes():
+        existing[index["name"]] = _key_pattern(index["key"])
+
+    usage = {}
+    try:
+        async for doc in collection.aggregate([{"$indexStats": {}}]):
+            usage[doc["name"]] = doc.get("accesses", {})
+    except OperationFailure as e:
+        logger.warning(f"{collection.name} 인덱스 사용 통계 조회 실패: {e}")
+
+    indexes = []
+    for name, key in existing.items():
+        accesses = usage.get(name)
+        indexes.append({
+            "name": name,
+            "key": key,
+            "size": sizes.get(name, 0),
+            "ops": accesses.get("ops") if accesses else None,
+            "since": accesses["since"].isoformat() if accesses and isinstance(accesses.get("since"), datetime) else None,
+        })
+
+    expected = {model.document["name"]: _key_pattern(model.document["key"]) for model in expected_models}
+    existing_keys = [key for key in existing.values()]
+    return {
+        "indexes": indexes,
+        "unused": [index["name"] for index in indexes if index["ops"] == 0 and index["name"] != "_id_"],
+        "missing": [name for name, key in expected.items() if key not in existing_keys],
+        "unexpected": [name for name, key in existing.items()
+                       if name != "_id_" and key not in expected.values()],
+    }
+
+
+async def auxiliary_collections(store) -> List[str]:
+    """<컬렉션>_jobs / _http_cache / _crawl_state / _benchmarks 등 보조 컬렉션 (재구축 세대 컬렉션 제외)"""
+    prefixes = {f"{store.collection_name}_", f"{store.collection.name}_"}
+    names = await store.db.list_collection_names()
+    return sorted(name for name in names
+                  if any(name.startswith(prefix) for prefix in prefixes) and "__g" not in name[len(store.collection_name):])
+
+
+def findings(report: Dict) -> List[str]:
+    """절감 후보 요약 (사용되지 않는 인덱스, 누락 인덱스, 반복 메타데이터, 구버전 필드)"""
+    notes = []
+    for collection, indexes in report["indexes"].items():
+        sizes = {index["name"]: index["size"] for index in indexes["indexes"]}
+        for name in indexes["unused"]:
+            notes.append(f"{collection}.{name}: since 이후 사용되지 않음 ({sizes.get(name, 0):,} bytes)")
+        for name in indexes["missing"]:
+            notes.append(f"{collection}.{name}: 코드에 정의되었지만 없음 (ensure_indexes 필요)")
+        for name in indexes["unexpected"]:
+            notes.append(f"{collection}.{name}: 코드에 정의되지 않은 인덱스")
+    chunks = report["chunks"]
+    if chunks["fields"]["repeated_metadata"]:
+        notes.append(f"청크마다 반복되는 metadata {chunks['fields']['repeated_metadata']:,} bytes "
+                     f"(전체의 {chunks['field_ratios']['repeated_metadata']:.1%})")
+    if chunks["legacy_chunks"]:
+        notes.append(f"구버전 레이아웃 필드가 남은 청크 {chunks['legacy_chunks']}개 (정규화 마이그레이션 필요)")
+    return notes
+
+
+async def analyze_storage(store, top_n: int = 10, batch_size: int = DEFAULT_BATCH_SIZE) -> Dict:
+    """
+    저장 공간 분석 보고서
+    반환값: {"analyzed_at", "collection", "collections", "chunks", "indexes", "findings"}
+    """
+    collections = await store.storage_stats(extra_collections=await auxiliary_collections(store))
+    index_sizes = {name: {row["name"]: row["size"] for row in stats["index_sizes"]}
+                   for name, stats in collections.items()}
+
+    targets = [(store.collection, KNOWLEDGE_BASE_INDEXES), (store.articles_collection, ARTICLE_INDEXES)]
+    if store.lexical_enabled:
+        targets.append((store.lexical_collection, LEXICAL_INDEXES))
+    indexes = {}
+    for collection, models in targets:
+        indexes[collection.name] = await index_report(collection, models, index_sizes.get(collection.name, {}))
+
+    report = {
+        "analyzed_at": datetime.utcnow().isoformat(),
+        "collection": store.collection.name,
+        "collections": collections,
+        "chunks": await chunk_footprint(store, top_n=top_n, batch_size=batch_size),
+        "indexes": indexes,
+    }
+    report["findings"] = findings(report)
+    return report
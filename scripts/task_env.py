@@ -0,0 +1,34 @@
+"""
+태스크 실행 환경 변수(.env) 로드 모듈
+스케줄러가 DAG를 파싱할 때마다 .env 파일을 읽지 않도록 태스크 시작 시 프로세스당 한 번만 로드합니다.
+DAG 파일이 파싱 시점에 import하므로 표준 라이브러리만 사용합니다 (python-dotenv는 실제 로드할 때 import).
+"""
+from pathlib import Path
+from typing import List, Optional
+
+# airflow 폴더와 프로젝트 루트의 .env (airflow/.env가 우선)
+AIRFLOW_DIR = Path(__file__).parent.parent
+PROJECT_ROOT = AIRFLOW_DIR.parent
+PROJECT_ENV = PROJECT_ROOT / '.env'
+AIRFLOW_ENV = AIRFLOW_DIR / '.env'
+
+_loaded: Optional[List[Path]] = None
+
+
+def load_task_env(context=None) -> List[Path]:
+    """
+    환경 변수(.env) 로드 - 프로젝트 루트 .env를 먼저 읽고 airflow/.env로 덮어씀
+    DAG default_args의 on_execute_callback으로 태스크 시작 시(지연 실행 후 재개할 때도) 호출됨
+    반환값: 로드한 .env 파일 목록 (같은 프로세스에서 다시 호출하면 처음 결과)
+    """
+    global _loaded
+    if _loaded is not None:
+        return _loaded
+    from dotenv import load_dotenv
+
+    _loaded = []
+    for env_file, override in ((PROJECT_ENV, False), (AIRFLOW_ENV, True)):
+        if env_file.exists():
+            load_dotenv(env_file, override=override)
+            _loaded.append(env_file)
+    return _loaded
@@ -0,0 +1,316 @@
+"""
+토큰 예산 기반 텍스트 청크 분할 모듈
+임베딩 모델의 토크나이저 기준으로 청크 크기를 맞추고,
+원문 내 문자 오프셋을 함께 반환합니다.
+"""
+import bisect
+import logging
+import re
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+
+# tiktoken 설정 (없으면 근사 토큰 계산 사용)
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+    logging.warning("tiktoken이 설치되지 않았습니다. 토큰 수를 근사치로 계산합니다.")
+
+from .profiling import profiled
+
+logger = logging.getLogger(__name__)
+
+# 경계 후보 (우선순위 순): 문단 > 줄바꿈 > 문장 끝
+_BOUNDARY_PATTERN = re.compile(r'(?P<para>\n{2,})|(?P<line>\n)|(?P<sent>[.!?。])(?=\s|$)')
+_BOUNDARY_LEVELS = ("para", "line", "sent")
+
+# tiktoken이 없을 때 BPE 분할을 흉내내는 근사 토큰 패턴
+_APPROX_TOKEN_PATTERN = re.compile(r'[A-Za-z]{1,4}|\d{1,3}|\s+|\S')
+
+
+@lru_cache(maxsize=8)
+def _get_encoding(model: str):
+    """모델에 맞는 tiktoken 인코딩 (프로세스당 1회 로드, 실패 시 None)"""
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            # 토크나이저 매핑이 없는 모델은 cl100k_base 사용
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        # BPE 파일 다운로드 실패 (오프라인 워커 등) - 근사 토큰 계산으로 대체
+        logger.warning(f"tiktoken 인코딩 로드 실패 ({model}), 근사 토큰 계산 사용: {e}")
+        return None
+
+
+class TokenChunker:
+    """임베딩 모델 토큰 예산 기반 청크 분할기"""
+
+    def __init__(self, model: str, max_tokens: int = 500, overlap_tokens: int = 50,
+                 min_tokens: Optional[int] = None,
+                 tokenizer_loader: Optional[Callable[[], Tuple[object, Optional[int]]]] = None):
+        if max_tokens <= 0:
+            raise ValueError("max_tokens는 1 이상이어야 합니다.")
+        self.model = model
+        self._min_tokens = min_tokens
+        self._set_budget(max_tokens, overlap_tokens)
+        # tiktoken 대신 쓸 임베딩 모델 토크나이저 로더 (처음 사용할 때 (HF fast 토크나이저, 최대 입력 토큰 수) 반환)
+        self._tokenizer_loader = tokenizer_loader
+        self.tokenizer = None
+        self.encoding = _get_encoding(model) if TIKTOKEN_AVAILABLE and tokenizer_loader is None else None
+
+    def _set_budget(self, max_tokens: int, overlap_tokens: int):
+        self.max_tokens = max_tokens
+        # 겹침은 청크 크기의 절반 미만으로 제한 (전진 보장)
+        self.overlap_tokens = max(0, min(overlap_tokens, max_tokens // 2))
+        # 경계를 찾을 때 이보다 짧은 청크는 만들지 않음 (청크 크기 미만으로 제한)
+        min_tokens = self._min_tokens if self._min_tokens is not None else max_tokens // 2
+        self.min_tokens = max(0, min(min_tokens, max_tokens - 1))
+
+    def _load_tokenizer(self):
+        """모델 토크나이저 지연 로드 (모델 최대 입력보다 긴 청크는 인코딩 때 잘리므로 예산을 줄임)"""
+        if self._tokenizer_loader is None:
+            return
+        loader, self._tokenizer_loader = self._tokenizer_loader, None
+        self.tokenizer, limit = loader()
+        if limit is not None and limit < self.max_tokens:
+            logger.info(f"{self.model} 최대 입력 {limit}토큰에 맞춰 청크 크기 조정 ({self.max_tokens} -> {limit})")
+            self._set_budget(max(limit, 1), self.overlap_tokens)
+
+    def count_tokens(self, text: str) -> int:
+        """텍스트의 토큰 수 계산"""
+        self._load_tokenizer()
+        if self.tokenizer is not None:
+            return len(self.tokenizer(text, add_special_tokens=False)["input_ids"])
+        if self.encoding is not None:
+            return len(self.encoding.encode(text, disallowed_special=()))
+        return sum(1 for _ in _APPROX_TOKEN_PATTERN.finditer(text))
+
+    def token_offsets(self, text: str) -> List[int]:
+        """각 토큰의 원문 내 시작 문자 오프셋 목록"""
+        self._load_tokenizer()
+        if self.tokenizer is not None:
+            encoded = self.tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)
+            return [start for start, _ in encoded["offset_mapping"]]
+        if self.encoding is not None:
+            tokens = self.encoding.encode(text, disallowed_special=())
+            _, offsets = self.encoding.decode_with_offsets(tokens)
+            return offsets
+        return [m.start() for m in _APPROX_TOKEN_PATTERN.finditer(text)]
+
+    @profiled()
+    def split(self, text: str) -> List[Dict]:
+        """
+        텍스트를 토큰 예산 단위 청크로 분할
+        반환값: [{"text": 청크, "start": 시작 오프셋, "end": 끝 오프셋, "tokens": 토큰 수}, ...]
+        """
+        if not text:
+            return []
+
+        offsets = self.token_offsets(text)
+        total_tokens = len(offsets)
+        text_len = len(text)
+
+        if total_tokens <= self.max_tokens:
+            chunk = self._make_chunk(text, 0, text_len, total_tokens)
+            return [chunk] if chunk else []
+
+        # 원문을 한 번만 훑어 경계 후보 위치를 우선순위별로 수집
+        boundaries: Dict[str, List[int]] = {level: [] for level in _BOUNDARY_LEVELS}
+        for match in _BOUNDARY_PATTERN.finditer(text):
+            boundaries[match.lastgroup].append(match.end())
+
+        chunks = []
+        start_tok = 0
+
+        while start_tok < total_tokens:
+            limit_tok = start_tok + self.max_tokens
+
+            if limit_tok >= total_tokens:
+                end_char, end_tok = text_len, total_tokens
+            else:
+                # limit_char 이전의 경계 중 최소 길이를 넘는 가장 뒤쪽 경계 선택
+                limit_char = offsets[limit_tok]
+                floor_char = offsets[start_tok + self.min_tokens]
+                end_char = limit_char
+                for level in _BOUNDARY_LEVELS:
+                    positions = boundaries[level]
+                    idx = bisect.bisect_right(positions, limit_char) - 1
+                    if idx >= 0 and positions[idx] > floor_char:
+                        end_char = positions[idx]
+                        break
+                end_tok = bisect.bisect_left(offsets, end_char, start_tok + 1, limit_tok + 1)
+
+            chunk = self._make_chunk(text, offsets[start_tok], end_char, end_tok - start_tok)
+            if chunk:
+                chunks.append(chunk)
+
+            if end_tok >= total_tokens:
+                break
+
+            # 겹침을 적용해도 항상 앞으로 전진
+            next_tok = end_tok - self.overlap_tokens
+            start_tok = next_tok if next_tok > start_tok else end_tok
+
+        return chunks
+
+    @profiled()
+    def split_blocks(self, blocks: List[Dict], title: Optional[str] = None) -> List[Dict]:
+        """
+        본문 구조 블록 단위 청크 분할
+        - 제목(heading) 경계에서 청크를 나누고, 목록/표는 예산을 넘지 않는 한 통째로 유지
+        - 이미지 설명은 가장 가까운 블록에 붙임
+        - 각 청크 앞에 "제목 > 상위 섹션" 경로를 붙여 겹침 없이 맥락 유지
+        반환값: [{"text", "tokens", "heading_path", "block_start", "block_end"}, ...]
+        """
+        self._load_tokenizer()
+        units = self._build_block_units(blocks)
+        min_section_tokens = self.max_tokens // 4
+
+        chunks: List[Dict] = []
+        current: List[Dict] = []
+        current_tokens = 0
+        header_tokens = 0
+
+        def flush():
+            nonlocal current, current_tokens
+            if current:
+                path = self._common_path([unit["path"] for unit in current])
+                body = "\n\n".join(unit["text"] for unit in current)
+                chunks.append(self._make_block_chunk(
+                    title, path, body, current[0]["start"], current[-1]["end"]
+                ))
+            current = []
+            current_tokens = 0
+
+        for unit in units:
+            if unit["kind"] == "heading":
+                if current:
+                    # 짧은 섹션 뒤에 오는 하위 섹션만 합치고, 형제/상위 섹션에서는 새 청크 시작
+                    parent_path = unit["path"][:-1]
+                    current_path = self._common_path([u["path"] for u in current])
+                    if current_tokens >= min_section_tokens or parent_path[:len(current_path)] != current_path:
+                        flush()
+                if current:
+                    # 합친 경우 제목은 본문에 남겨 맥락 유지
+                    current.append(unit)
+                    current_tokens += unit["tokens"]
+                continue
+
+            if not current:
+                header_tokens = self.count_tokens(self._heading_header(title, unit["path"]))
+            budget = self.max_tokens - header_tokens
+
+            if current and current_tokens + unit["tokens"] > budget:
+                flush()
+                header_tokens = self.count_tokens(self._heading_header(title, unit["path"]))
+                budget = self.max_tokens - header_tokens
+
+            if unit["tokens"] > budget:
+                # 블록 하나가 예산을 넘으면 해당 블록만 토큰 기준으로 분할
+                flush()
+                piece_chunker = TokenChunker(self.model, max_tokens=max(budget, 1),
+                                             overlap_tokens=self.overlap_tokens)
+                for piece in piece_chunker.split(unit["text"]):
+                    chunks.append(self._make_block_chunk(
+                        title, unit["path"], piece["text"], unit["start"], unit["end"]
+                    ))
+                continue
+
+            current.append(unit)
+            current_tokens += unit["tokens"]
+
+        flush()
+        return chunks
+
+    def _build_block_units(self, blocks: List[Dict]) -> List[Dict]:
+        """블록 목록을 제목 경로가 붙은 청크 단위로 변환 (이미지 블록은 인접 블록에 병합)"""
+        units: List[Dict] = []
+        heading_stack: List[tuple] = []
+        pending_images: List[str] = []
+
+        for index, block in enumerate(blocks):
+            if block.get("type") == "heading":
+                level = block.get("level", 6)
+                while heading_stack and heading_stack[-1][0] >= level:
+                    heading_stack.pop()
+                heading_stack.append((level, block["text"]))
+                units.append({
+                    "kind": "heading", "text": block["text"], "path": self._stack_path(heading_stack),
+                    "start": index, "end": index + 1, "tokens": self.count_tokens(block["text"]),
+                })
+                continue
+
+            images = block.get("images") or []
+            path = self._stack_path(heading_stack)
+
+            if not block.get("text"):
+                # 이미지만 있는 블록: 같은 섹션의 직전 블록에 붙이고, 없으면 다음 블록으로 넘김
+                last = units[-1] if units else None
+                if last is not None and last["kind"] == "content" and last["path"] == path:
+                    last["text"] = "\n".join([last["text"]] + images)
+                    last["end"] = index + 1
+                    last["tokens"] = self.count_tokens(last["text"])
+                else:
+                    pending_images.extend(images)
+                continue
+
+            text = "\n".join(pending_images + [block["text"]] + images)
+            pending_images = []
+            units.append({
+                "kind": "content", "text": text, "path": path,
+                "start": index, "end": index + 1, "tokens": self.count_tokens(text),
+            })
+
+        if pending_images:
+            units.append({
+                "kind": "content", "text": "\n".join(pending_images), "path": self._stack_path(heading_stack),
+                "start": len(blocks), "end": len(blocks), "tokens": self.count_tokens("\n".join(pending_images)),
+            })
+
+        return units
+
+    def _make_block_chunk(self, title: Optional[str], path: tuple, body: str,
+                          block_start: int, block_end: int) -> Dict:
+        """제목 경로 헤더를 붙인 블록 청크 생성"""
+        header = self._heading_header(title, path)
+        text = f"{header}\n\n{body}" if header else body
+        return {
+            "text": text,
+            "tokens": self.count_tokens(text),
+            "heading_path": list(path),
+            "block_start": block_start,
+            "block_end": block_end,
+        }
+
+    @staticmethod
+    def _stack_path(heading_stack: List[tuple]) -> tuple:
+        return tuple(text for _, text in heading_stack)
+
+    @staticmethod
+    def _heading_header(title: Optional[str], path: tuple) -> str:
+        parts = ([title] if title else []) + [p for p in path if p != title]
+        return " > ".join(parts)
+
+    @staticmethod
+    def _common_path(paths: List[tuple]) -> tuple:
+        """여러 제목 경로의 공통 상위 경로"""
+        common = paths[0]
+        for path in paths[1:]:
+            size = 0
+            while size < min(len(common), len(path)) and common[size] == path[size]:
+                size += 1
+            common = common[:size]
+        return common
+
+    @staticmethod
+    def _make_chunk(text: str, start: int, end: int, tokens: int) -> Optional[Dict]:
+        """앞뒤 공백을 오프셋 조정으로 제거한 청크 생성"""
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        if start >= end:
+            return None
+        return {"text": text[start:end], "start": start, "end": end, "tokens": tokens}
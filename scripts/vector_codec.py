@@ -0,0 +1,116 @@
+"""
+임베딩 벡터 저장 형식 변환 모듈
+BSON 벡터(BinData subtype 9) 형식으로 float32 / int8 / 1비트 벡터를 인코딩합니다.
+Atlas Vector Search가 인덱싱할 수 있는 형식과 동일합니다.
+"""
+import math
+from typing import List, Sequence, Tuple, Union
+
+from bson.binary import VECTOR_SUBTYPE, Binary, BinaryVectorDtype
+
+# 지원 형식
+# - float64: 구버전 방식 (BSON double 배열, 차원당 8바이트)
+# - float32: BinData float32 (차원당 4바이트, 사실상 무손실)
+# - int8: 벡터별 스케일 정규화 후 int8 양자화 (차원당 1바이트)
+# - bit: 부호 기반 1비트 양자화 (8차원당 1바이트, euclidean(해밍) 유사도 필요)
+VECTOR_FORMATS = ("float64", "float32", "int8", "bit")
+
+# 형식별 BSON 벡터 dtype
+_DTYPE_BY_FORMAT = {
+    "float32": BinaryVectorDtype.FLOAT32,
+    "int8": BinaryVectorDtype.INT8,
+    "bit": BinaryVectorDtype.PACKED_BIT,
+}
+_FORMAT_BY_DTYPE = {dtype: fmt for fmt, dtype in _DTYPE_BY_FORMAT.items()}
+
+StoredVector = Union[List[float], Binary]
+
+
+def quantize(values: Sequence[float], fmt: str) -> List:
+    """실수 벡터를 저장 형식의 값 범위로 변환 (int8/bit 양자화)"""
+    if fmt in ("float64", "float32"):
+        return [float(v) for v in values]
+    if fmt == "int8":
+        # 코사인 유사도는 스케일에 무관하므로 벡터별 최대 절댓값으로 정규화
+        max_abs = max((abs(v) for v in values), default=0.0) or 1.0
+        scale = 127.0 / max_abs
+        return [max(-128, min(127, int(round(v * scale)))) for v in values]
+    if fmt == "bit":
+        return [1 if v > 0 else 0 for v in values]
+    raise ValueError(f"지원하지 않는 벡터 형식: {fmt}")
+
+
+def pack_vector(values: Sequence, fmt: str) -> StoredVector:
+    """이미 저장 형식 범위에 있는 값을 BSON 저장 값으로 패킹 (양자화 없음)"""
+    if fmt == "float64":
+        return [float(v) for v in values]
+    if fmt != "bit":
+        return Binary.from_vector(list(values), _DTYPE_BY_FORMAT[fmt])
+
+    # bit: 상위 비트부터 8개씩 1바이트로 묶고 마지막 바이트의 남는 비트 수를 padding으로 기록
+    packed = [sum(0x80 >> offset for offset, bit in enumerate(values[start:start + 8]) if bit)
+              for start in range(0, len(values), 8)]
+    return Binary.from_vector(packed, BinaryVectorDtype.PACKED_BIT, (8 - len(values) % 8) % 8)
+
+
+def pack_float32_bytes(data: bytes) -> Binary:
+    """float32 리틀엔디언 바이트를 값 변환 없이 BSON float32 벡터로 패킹"""
+    return Binary(BinaryVectorDtype.FLOAT32.value + b"\x00" + data, VECTOR_SUBTYPE)
+
+
+def encode_vector(values: Sequence[float], fmt: str) -> StoredVector:
+    """실수 임베딩을 지정 형식으로 양자화/인코딩"""
+    return pack_vector(quantize(values, fmt), fmt)
+
+
+def unpack_vector(stored: StoredVector) -> Tuple[List, str]:
+    """
+    저장된 벡터를 원시 값과 형식으로 복원
+    반환값: (값 목록, 형식) - int8은 정수, bit는 0/1 값
+    """
+    if isinstance(stored, (list, tuple)):
+        return list(stored), "float64"
+    if not isinstance(stored, (bytes, Binary)):
+        raise ValueError(f"알 수 없는 벡터 타입: {type(stored)}")
+    if not isinstance(stored, Binary) or stored.subtype != VECTOR_SUBTYPE:
+        stored = Binary(bytes(stored), VECTOR_SUBTYPE)
+
+    try:
+        vector = stored.as_vector()
+    except ValueError as e:
+        raise ValueError(f"알 수 없는 벡터 dtype: {bytes(stored)[0]:#x}") from e
+    fmt = _FORMAT_BY_DTYPE[vector.dtype]
+    if fmt != "bit":
+        return list(vector.data), fmt
+
+    bits = [(byte >> (7 - offset)) & 1 for byte in vector.data for offset in range(8)]
+    return (bits[:len(bits) - vector.padding] if vector.padding else bits), fmt
+
+
+def decode_vector(stored: StoredVector) -> List[float]:
+    """저장된 벡터를 실수 목록으로 복원 (int8/bit는 근사치)"""
+    values, fmt = unpack_vector(stored)
+    if fmt == "bit":
+        return [1.0 if v else -1.0 for v in values]
+    return [float(v) for v in values]
+
+
+def truncate_normalized(values: Sequence[float], dimensions: int) -> List[float]:
+    """
+    앞쪽 차원만 남기고 L2 정규화
+    text-embedding-3 모델은 이 방식으로 dimensions 파라미터와 동일한 축소 벡터를 얻을 수 있음
+    """
+    head = [float(v) for v in values[:dimensions]]
+    norm = math.sqrt(sum(v * v for v in head)) or 1.0
+    return [v / norm for v in head]
+
+
+def vector_nbytes(fmt: str, dimensions: int) -> int:
+    """형식별 벡터 1개의 저장 바이트 수 (BSON 헤더 제외)"""
+    if fmt == "float64":
+        return dimensions * 8
+    if fmt == "float32":
+        return dimensions * 4 + 2
+    if fmt == "int8":
+        return dimensions + 2
+    return (dimensions + 7) // 8 + 2
@@ -0,0 +1,337 @@
+"""
+오프라인 벡터 인덱스 모듈
+knowledge_base 임베딩을 메모리 매핑 float32 행렬과 메타데이터 배열로 내보내고,
+네트워크 없이 배치 코사인 top-k 검색(전수 또는 IVF 분할)을 수행합니다.
+"""
+import json
+import logging
+import mmap
+import os
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+# NumPy 설정 (오프라인 인덱스에만 필요)
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    logging.warning("NumPy가 설치되지 않았습니다. 오프라인 벡터 인덱스를 사용할 수 없습니다.")
+
+from .vector_codec import decode_vector
+
+logger = logging.getLogger(__name__)
+
+# 인덱스 디렉토리 구성 파일
+MANIFEST_FILE = "manifest.json"
+EMBEDDINGS_FILE = "embeddings.npy"
+TEXTS_FILE = "texts.jsonl"
+
+# 필터로 사용할 수 있는 범주형 메타데이터 (코드 배열 + 어휘 목록으로 저장)
+CATEGORICAL_FIELDS = ("type", "section_name", "category_name")
+
+# 전수 검색 시 한 번에 점수를 계산할 행 수 (메모리 상한)
+SEARCH_BLOCK_ROWS = 65536
+
+
+def _normalize_rows(matrix):
+    """행 단위 L2 정규화 (코사인 유사도 = 내적)"""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _merge_topk(best_scores, best_rows, scores, rows, k):
+    """기존 top-k와 새 블록 점수를 합쳐 다시 top-k 선택 (쿼리 배치 단위)"""
+    all_scores = np.concatenate([best_scores, scores], axis=1)
+    all_rows = np.concatenate([best_rows, rows], axis=1)
+    if all_scores.shape[1] > k:
+        part = np.argpartition(-all_scores, k - 1, axis=1)[:, :k]
+        all_scores = np.take_along_axis(all_scores, part, axis=1)
+        all_rows = np.take_along_axis(all_rows, part, axis=1)
+    return all_scores, all_rows
+
+
+class LocalVectorIndex:
+    """memmap float32 임베딩 행렬 기반 오프라인 벡터 인덱스"""
+
+    def __init__(self, path: str):
+        if not NUMPY_AVAILABLE:
+            raise ImportError("NumPy가 설치되지 않았습니다.")
+        self.path = path
+        with open(os.path.join(path, MANIFEST_FILE), encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        self.count = self.manifest["count"]
+        self.dimensions = self.manifest["dimensions"]
+
+        # 임베딩 행렬은 메모리 매핑으로 열어 필요한 페이지만 읽음
+        self.embeddings = np.load(os.path.join(path, EMBEDDINGS_FILE), mmap_mode="r")[:self.count]
+        self.ids = np.load(os.path.join(path, "ids.npy"))[:self.count]
+        self.article_ids = np.load(os.path.join(path, "article_ids.npy"))[:self.count]
+        self.chunk_index = np.load(os.path.join(path, "chunk_index.npy"))[:self.count]
+        self.text_offsets = np.load(os.path.join(path, "text_offsets.npy"))
+        self.codes = {
+            field: np.load(os.path.join(path, f"{field}_codes.npy"))[:self.count]
+            for field in CATEGORICAL_FIELDS
+        }
+        self.vocab = self.manifest["vocab"]
+        # 청크 텍스트 파일은 인덱스당 한 번만 메모리 매핑 (검색 결과마다 파일을 다시 열지 않음)
+        with open(os.path.join(path, TEXTS_FILE), "rb") as f:
+            self._texts = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else b""
+
+        self.ivf_centroids = None
+        if self.manifest.get("ivf"):
+            self.ivf_centroids = np.load(os.path.join(path, "ivf_centroids.npy"))
+            self.ivf_order = np.load(os.path.join(path, "ivf_order.npy"))
+            self.ivf_offsets = np.load(os.path.join(path, "ivf_offsets.npy"))
+
+    # ------------------------------------------------------------------
+    # 내보내기
+    # ------------------------------------------------------------------
+    @classmethod
+    async def export_from_store(cls, store, path: str, batch_size: int = 2000,
+                                query: Optional[Dict] = None) -> Dict:
+        """
+        knowledge_base를 배치 커서로 스트리밍하여 오프라인 인덱스 파일로 내보내기
+        현재 임베딩 설정(모델/차원/버전)의 청크만 포함 (Atlas 검색과 같은 current_embedding_query 기준)
+        반환값: {"count": 내보낸 청크 수, "elapsed": 소요 초}
+        """
+        if not NUMPY_AVAILABLE:
+            raise ImportError("NumPy가 설치되지 않았습니다.")
+        os.makedirs(path, exist_ok=True)
+        started = time.perf_counter()
+
+        query = {**store.current_embedding_query(), **(query or {})}
+        capacity = await store.collection.count_documents(query)
+
+        # 아티클 단위 메타데이터 (섹션/카테고리)는 아티클 컬렉션에서 한 번에 로드
+        article_meta = {}
+        async for doc in store.articles_collection.find({}, projection={"section_name": 1, "category_name": 1}):
+            article_meta[doc["_id"]] = doc
+
+        dims = store.embedding_dimensions
+        embeddings = np.lib.format.open_memmap(
+            os.path.join(path, EMBEDDINGS_FILE), mode="w+", dtype=np.float32, shape=(max(capacity, 1), dims)
+        )
+        ids, article_ids, chunk_index, text_offsets = [], [], [], []
+        vocab: Dict[str, List[str]] = {field: [""] for field in CATEGORICAL_FIELDS}
+        vocab_lookup: Dict[str, Dict[str, int]] = {field: {"": 0} for field in CATEGORICAL_FIELDS}
+        codes: Dict[str, List[int]] = {field: [] for field in CATEGORICAL_FIELDS}
+
+        def code_for(field: str, value: Optional[str]) -> int:
+            value = value or ""
+            if value not in vocab_lookup[field]:
+                vocab_lookup[field][value] = len(vocab[field])
+                vocab[field].append(value)
+            return vocab_lookup[field][value]
+
+        row = 0
+        cursor = store.collection.find(
+            query, projection={"text": 1, "embedding": 1, "metadata": 1}, batch_size=batch_size
+        )
+        with open(os.path.join(path, TEXTS_FILE), "wb") as texts_file:
+            block = []
+            async for doc in cursor:
+                if row + len(block) >= capacity:
+                    break  # 내보내는 중 추가된 문서는 다음 내보내기에서 포함
+                vector = decode_vector(doc["embedding"])
+                if len(vector) != dims:
+                    continue
+                block.append(vector)
+
+                metadata = doc.get("metadata", {})
+                article_id = metadata.get("article_id", "")
+                meta_source = article_meta.get(article_id, metadata)
+                ids.append(str(doc["_id"]))
+                article_ids.append(article_id)
+                chunk_index.append(metadata.get("chunk_index", 0))
+                codes["type"].append(code_for("type", metadata.get("type")))
+                codes["section_name"].append(code_for("section_name", meta_source.get("section_name")))
+                codes["category_name"].append(code_for("category_name", meta_source.get("category_name")))
+                text_offsets.append(texts_file.tell())
+                texts_file.write(json.dumps(doc.get("text", ""), ensure_ascii=False).encode("utf-8") + b"\n")
+
+                if len(block) >= batch_size:
+                    embeddings[row:row + len(block)] = _normalize_rows(np.asarray(block, dtype=np.float32))
+                    row += len(block)
+                    block = []
+            if block:
+                embeddings[row:row + len(block)] = _normalize_rows(np.asarray(block, dtype=np.float32))
+                row += len(block)
+            text_offsets.append(texts_file.tell())
+        embeddings.flush()
+        del embeddings
+
+        np.save(os.path.join(path, "ids.npy"), np.asarray(ids, dtype="U64"))
+        np.save(os.path.join(path, "article_ids.npy"), np.asarray(article_ids, dtype="U32"))
+        np.save(os.path.join(path, "chunk_index.npy"), np.asarray(chunk_index, dtype=np.int32))
+        np.save(os.path.join(path, "text_offsets.npy"), np.asarray(text_offsets, dtype=np.int64))
+        for field in CATEGORICAL_FIELDS:
+            np.save(os.path.join(path, f"{field}_codes.npy"), np.asarray(codes[field], dtype=np.int32))
+
+        manifest = {
+            "count": row,
+            "dimensions": dims,
+            "embedding_model": store.embedding_model,
+            "exported_at": datetime.utcnow().isoformat(),
+            "source": store.collection.name,
+            "vocab": vocab,
+            "ivf": None,
+        }
+        with open(os.path.join(path, MANIFEST_FILE), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+        elapsed = time.perf_counter() - started
+        logger.info(f"오프라인 벡터 인덱스 내보내기 완료: {row}개 청크, {elapsed:.1f}초 ({path})")
+        return {"count": row, "elapsed": elapsed}
+
+    def build_ivf(self, nlist: Optional[int] = None, iterations: int = 10,
+                  sample_size: int = 50000, seed: int = 0) -> Dict:
+        """
+        구면 k-means로 IVF 분할 생성 (검색 시 nprobe개 분할만 탐색)
+        반환값: {"nlist": 분할 수, "elapsed": 소요 초}
+        """
+        started = time.perf_counter()
+        nlist = nlist or max(1, int(np.sqrt(self.count)))
+        rng = np.random.default_rng(seed)
+        sample_rows = rng.choice(self.count, size=min(sample_size, self.count), replace=False)
+        sample = np.asarray(self.embeddings[np.sort(sample_rows)])
+
+        centroids = sample[rng.choice(len(sample), size=min(nlist, len(sample)), replace=False)].copy()
+        for _ in range(iterations):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(len(centroids)):
+                members = sample[assign == c]
+                if len(members):
+                    centroids[c] = members.mean(axis=0)
+            centroids = _normalize_rows(centroids)
+
+        # 전체 행 할당 (블록 단위)
+        assignments = np.empty(self.count, dtype=np.int32)
+        for start in range(0, self.count, SEARCH_BLOCK_ROWS):
+            block = np.asarray(self.embeddings[start:start + SEARCH_BLOCK_ROWS])
+            assignments[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+
+        order = np.argsort(assignments, kind="stable").astype(np.int64)
+        offsets = np.searchsorted(assignments[order], np.arange(len(centroids) + 1)).astype(np.int64)
+
+        np.save(os.path.join(self.path, "ivf_centroids.npy"), centroids.astype(np.float32))
+        np.save(os.path.join(self.path, "ivf_order.npy"), order)
+        np.save(os.path.join(self.path, "ivf_offsets.npy"), offsets)
+        self.manifest["ivf"] = {"nlist": len(centroids), "iterations": iterations}
+        with open(os.path.join(self.path, MANIFEST_FILE), "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=2)
+
+        self.ivf_centroids, self.ivf_order, self.ivf_offsets = centroids.astype(np.float32), order, offsets
+        elapsed = time.perf_counter() - started
+        logger.info(f"IVF 분할 생성 완료: {len(centroids)}개 분할, {elapsed:.1f}초")
+        return {"nlist": len(centroids), "elapsed": elapsed}
+
+    # ------------------------------------------------------------------
+    # 검색
+    # ------------------------------------------------------------------
+    def filter_mask(self, filters: Optional[Dict]):
+        """필터 조건을 행 마스크로 변환 (None이면 전체)"""
+        if not filters:
+            return None
+        mask = np.ones(self.count, dtype=bool)
+        for key, value in filters.items():
+            field = key[len("metadata."):] if key.startswith("metadata.") else key
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            if field == "article_id":
+                mask &= np.isin(self.article_ids, [str(v) for v in values])
+            elif field in CATEGORICAL_FIELDS:
+                lookup = {name: code for code, name in enumerate(self.vocab[field])}
+                wanted = [lookup[v] for v in values if v in lookup]
+                mask &= np.isin(self.codes[field], wanted)
+            else:
+                raise ValueError(f"오프라인 인덱스에서 지원하지 않는 필터: {key}")
+        return mask
+
+    def search(self, query_vectors: Sequence, k: int = 5, filters: Optional[Dict] = None,
+               nprobe: Optional[int] = None, with_text: bool = True) -> List[List[Dict]]:
+        """
+        쿼리 벡터 배치의 코사인 top-k 검색
+        nprobe를 지정하면 IVF 분할 중 가까운 nprobe개만 탐색 (build_ivf 필요)
+        반환값: 쿼리별 [{"id", "article_id", "chunk_index", "score", "text"}, ...]
+        score는 Atlas cosine 점수와 같은 (1 + cos) / 2 척도
+        """
+        queries = _normalize_rows(np.atleast_2d(np.asarray(query_vectors, dtype=np.float32)))
+        if queries.shape[1] != self.dimensions:
+            raise ValueError(f"쿼리 차원 불일치: {queries.shape[1]} != {self.dimensions}")
+        k = min(k, self.count)
+        if k <= 0:
+            return [[] for _ in range(len(queries))]
+
+        mask = self.filter_mask(filters)
+        if nprobe and self.ivf_centroids is not None:
+            scores, rows = self._search_ivf(queries, k, mask, nprobe)
+        else:
+            scores, rows = self._search_exact(queries, k, mask)
+
+        results = []
+        for q in range(len(queries)):
+            order = np.argsort(-scores[q])
+            hits = []
+            for pos in order:
+                row = int(rows[q, pos])
+                if row < 0 or not np.isfinite(scores[q, pos]):
+                    continue
+                hit = {
+                    "id": str(self.ids[row]),
+                    "article_id": str(self.article_ids[row]),
+                    "chunk_index": int(self.chunk_index[row]),
+                    "score": float((1.0 + scores[q, pos]) / 2.0),
+                }
+                if with_text:
+                    hit["text"] = self.text(row)
+                hits.append(hit)
+            results.append(hits)
+        return results
+
+    def _search_exact(self, queries, k, mask):
+        """전수 검색: 행 블록 단위 행렬곱 후 top-k 병합"""
+        best_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+        best_rows = np.full((len(queries), 0), -1, dtype=np.int64)
+        for start in range(0, self.count, SEARCH_BLOCK_ROWS):
+            block = np.asarray(self.embeddings[start:start + SEARCH_BLOCK_ROWS])
+            scores = queries @ block.T
+            if mask is not None:
+                scores[:, ~mask[start:start + len(block)]] = -np.inf
+            rows = np.broadcast_to(np.arange(start, start + len(block)), scores.shape)
+            best_scores, best_rows = _merge_topk(best_scores, best_rows, scores, rows, k)
+        return best_scores, best_rows
+
+    def _search_ivf(self, queries, k, mask, nprobe):
+        """IVF 검색: 쿼리별로 가까운 nprobe개 분할의 행만 점수 계산"""
+        nprobe = min(nprobe, len(self.ivf_centroids))
+        probe = np.argpartition(-(queries @ self.ivf_centroids.T), nprobe - 1, axis=1)[:, :nprobe]
+        best_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        best_rows = np.full((len(queries), k), -1, dtype=np.int64)
+        for q, lists in enumerate(probe):
+            candidates = np.concatenate([
+                self.ivf_order[self.ivf_offsets[c]:self.ivf_offsets[c + 1]] for c in lists
+            ])
+            if mask is not None:
+                candidates = candidates[mask[candidates]]
+            if not len(candidates):
+                continue
+            candidates.sort()  # memmap 순차 접근
+            scores = np.asarray(self.embeddings[candidates]) @ queries[q]
+            top = min(k, len(candidates))
+            part = np.argpartition(-scores, top - 1)[:top]
+            best_scores[q, :top] = scores[part]
+            best_rows[q, :top] = candidates[part]
+        return best_scores, best_rows
+
+    def text(self, row: int) -> str:
+        """행 번호의 청크 텍스트 조회 (파일 오프셋 기반)"""
+        start, end = int(self.text_offsets[row]), int(self.text_offsets[row + 1])
+        return json.loads(self._texts[start:end].decode("utf-8"))
+
+    def close(self):
+        """청크 텍스트 메모리 매핑 해제"""
+        if isinstance(self._texts, mmap.mmap):
+            self._texts.close()
+        self._texts = b""